@@ -2,8 +2,9 @@ from datetime import timedelta
 import os
 import random
 
-from eink.image import EinkGraphics
 from eink.image import Palette
+from eink.image import ResourceCache
+from eink.image import TransformCache
 from eink.server import Server
 from PIL import Image
 
@@ -61,6 +62,8 @@ class SlideshowServer(Server):
 
         # Display the next image
         image_filename = self._image_filenames.pop()
-        image = Image.open(image_filename)
-        return EinkGraphics.dither(
-            image.resize((self._width, self._height)), self._palette)
+        image = ResourceCache.default().image(image_filename)
+        transform_cache = TransformCache.default()
+        return transform_cache.dither(
+            transform_cache.resize(image, (self._width, self._height)),
+            self._palette)
@@ -5,10 +5,10 @@ import os
 import urllib
 
 from eink.image import Palette
+from eink.image import ResourceCache
+from eink.image import TextRenderer
 from eink.server import Server
 from PIL import Image
-from PIL import ImageDraw
-from PIL import ImageFont
 
 
 class WeatherServer(Server):
@@ -44,6 +44,7 @@ class WeatherServer(Server):
         self._width = width
         self._height = height
         self._palette = palette
+        self._text_renderer = TextRenderer(palette)
 
     def update_time(self):
         return timedelta(minutes=30)
@@ -61,13 +62,12 @@ class WeatherServer(Server):
         font_filename = os.path.join(
             dir_, 'src', 'eink', 'assets', 'server_skeleton',
             'GentiumPlus-R.ttf')
-        font = ImageFont.truetype(font_filename, 50)
+        font = ResourceCache.default().font(font_filename, 50)
 
         # Fetch the weather forecast
         weather = self._fetch_weather()
 
         image = Image.new('L', (self._width, self._height), 255)
-        draw = ImageDraw.Draw(image)
         x = (self._width // 2) - 250
         y = (self._height // 2) - 185
 
@@ -88,7 +88,7 @@ class WeatherServer(Server):
             high = round(day_forecast['temp']['max'])
             low = round(day_forecast['temp']['min'])
             text = f'{day_str}: {high}\u00b0 / {low}\u00b0'
-            draw.text((x, y), text, fill=0, font=font)
+            self._text_renderer.draw_text(image, (x, y), text, font)
             y += 70
         return image
 
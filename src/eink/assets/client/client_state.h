@@ -1,9 +1,17 @@
 #ifndef __CLIENT_STATE_H__
 #define __CLIENT_STATE_H__
 
+#include <limits.h>
+
 #include "generated.h"
 
 
+// The value of a telemetry field, such as ClientState.lastDrawTimeMs, that
+// indicates that the value is unknown. It duplicates the Python constant
+// Request._UNKNOWN.
+#define UNKNOWN_TELEMETRY INT_MIN
+
+
 /**
  * The persistent state of the client program. All of the fields are stored by
  * value, so that the state may be persisted as an RTC_DATA_ATTR (deep sleep)
@@ -49,6 +57,82 @@ typedef struct {
     // is being depleted more quickly. If we are in deep sleep, then this
     // indicates the timer value for when we wake.
     int checkBatteryTimer;
+
+    // The amount of time to wait before displaying each of the scheduled
+    // frames, as in the Python method Server.frame_times, in tenths of a
+    // second. frameDelaysDs[0] is relative to when we received the response
+    // containing the frames, and each subsequent element is relative to when we
+    // displayed the previous frame.
+    int frameDelaysDs[MAX_FRAMES];
+
+    // The number of frames stored in frameDelaysDs
+    int frameCount;
+
+    // The index in frameDelaysDs of the next frame to display. This is equal
+    // to frameCount if we have displayed all of the frames.
+    int frameIndex;
+
+    // The amount of time left until we display the next scheduled frame, in
+    // tenths of a second. If this is INT_MAX, then there are no more frames to
+    // display. If we are in deep sleep, then this indicates the time left when
+    // we wake.
+    int frameTimeDs;
+
+    // The number of times we have woken from sleep since we were last reset
+    int wakeCount;
+
+    // The number of milliseconds it took to download, decode, and draw the
+    // image from the most recent successful server response, or
+    // UNKNOWN_TELEMETRY if there has not been such a response
+    int lastDrawTimeMs;
+
+    // A random value identifying our current attempt to obtain updated content,
+    // as in the Python field Request.nonce. We only change it after we
+    // successfully apply a response, so that the server can recognize retries.
+    int requestNonce;
+
+    // The ID of the most recent image we received from the server, as in the
+    // Python method ServerIO.frame_id, or all zeros if we have not received an
+    // image or we are displaying the screensaver. We send it as the Python
+    // field Request.long_poll_frame_id if LONG_POLL_TIMEOUT_MS is nonzero.
+    char contentFrameId[FRAME_ID_LENGTH];
+
+    // The IDs of the frames in the frame cache, as in the Python method
+    // ServerIO.frame_id. The image file for each slot is stored in flash
+    // memory. See the comments for clearFrameCache.
+    char cachedFrameIds[FRAME_CACHE_SIZE][FRAME_ID_LENGTH];
+
+    // Whether each slot in cachedFrameIds contains a frame
+    bool cachedFrameValid[FRAME_CACHE_SIZE];
+
+    // The value of frameCacheClock when we most recently stored or displayed
+    // the frame in each slot in cachedFrameIds
+    int cachedFrameUseTimes[FRAME_CACHE_SIZE];
+
+    // A counter that we increment each time we store or display a frame in the
+    // frame cache. This determines which frame is the least recently used.
+    int frameCacheClock;
+
+    // The ID of the image whose download was interrupted, as in the Python
+    // field Request.resume_frame_id. This is unspecified if
+    // partialFrameChunkCount is 0.
+    char partialFrameId[FRAME_ID_LENGTH];
+
+    // The slot in cachedFrameIds whose file contains the chunks of the image
+    // partialFrameId that we have received. The slot is not valid, as in
+    // cachedFrameValid, until we have received the whole image.
+    int partialFrameSlot;
+
+    // The number of checksummed chunks of the image partialFrameId that we have
+    // received and stored, as in the Python field Request.resume_chunk. This is
+    // 0 if there is no interrupted download to resume.
+    int partialFrameChunkCount;
+
+    // The index of the transport in TRANSPORT_TYPES and the like to try first
+    // when making a request, as in the Python field
+    // Response.preferred_transport. We try the other transports afterward, in
+    // order.
+    int preferredTransport;
 } ClientState;
 
 #endif
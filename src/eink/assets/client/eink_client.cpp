@@ -7,7 +7,9 @@
 #include "client_state.h"
 #include "define_test_eink.h"
 #include "eink_client.h"
+#include "frame_cache.h"
 #include "request.h"
+#include "scheduled_frames.h"
 #include "shared.h"
 #include "status_images.h"
 
@@ -66,6 +68,13 @@ static void initClientState(ClientState* state) {
     memset(state->screensaverId, 0, sizeof(state->screensaverId));
     state->screensaverTimeDs = INT_MAX;
     state->checkBatteryTimer = CHECK_BATTERY_TIMER;
+    clearScheduledFrames(state);
+    state->wakeCount = 0;
+    state->lastDrawTimeMs = UNKNOWN_TELEMETRY;
+    resetRequestNonce(state);
+    memset(state->contentFrameId, 0, FRAME_ID_LENGTH);
+    clearFrameCache(state);
+    state->preferredTransport = 0;
 }
 
 /** Causes the device to idle permanently (or rather, until reset). */
@@ -98,6 +107,7 @@ void clientSetup(ClientState* state, Inkplate* display) {
     #else
         if (esp_sleep_get_wakeup_cause() == ESP_SLEEP_WAKEUP_TIMER) {
             memcpy(state, &sleepState, sizeof(ClientState));
+            state->wakeCount++;
         } else {
             display->setRotation(ROTATION);
             checkBattery(display);
@@ -108,8 +118,9 @@ void clientSetup(ClientState* state, Inkplate* display) {
 }
 
 /**
- * Updates state->requestTimeDs, state->screensaverTimeDs, and
- * state->checkBatteryTimer to reflect the specified amount of time elapsing.
+ * Updates state->requestTimeDs, state->screensaverTimeDs, state->frameTimeDs,
+ * and state->checkBatteryTimer to reflect the specified amount of time
+ * elapsing.
  * @param state The client state.
  * @param timeDs The amount of time, in tenths of a second.
  * @param checkBatteryMult The multiplier for decreasing
@@ -132,6 +143,14 @@ void handleTimeElapsedDs(ClientState* state, int timeDs, int checkBatteryMult) {
         }
     }
 
+    if (state->frameTimeDs < INT_MAX) {
+        if (state->frameTimeDs > timeDs) {
+            state->frameTimeDs -= timeDs;
+        } else {
+            state->frameTimeDs = 0;
+        }
+    }
+
     if (state->checkBatteryTimer < INT_MAX) {
         if (timeDs <= INT_MAX / checkBatteryMult &&
                 state->checkBatteryTimer > checkBatteryMult * timeDs) {
@@ -167,6 +186,7 @@ static void delayDs(ClientState* state, int delayTimeDs) {
         handleTimeElapsedDs(state, delayTimeDs, CHECK_BATTERY_MULT_LIGHT_SLEEP);
         esp_sleep_enable_timer_wakeup(US_PER_DS * delayTimeDs);
         esp_light_sleep_start();
+        state->wakeCount++;
     } else {
         log_i("Entering deep sleep");
         handleTimeElapsedDs(state, delayTimeDs, CHECK_BATTERY_MULT_DEEP_SLEEP);
@@ -198,6 +218,9 @@ static int delayToNextEvent(ClientState* state, bool isWiFiOn) {
     if (state->screensaverTimeDs < delayTimeDs) {
         delayTimeDs = state->screensaverTimeDs;
     }
+    if (state->frameTimeDs < delayTimeDs) {
+        delayTimeDs = state->frameTimeDs;
+    }
     if (maxBatteryTimeDs < delayTimeDs) {
         delayTimeDs = maxBatteryTimeDs;
     }
@@ -250,8 +273,8 @@ static long long handleMeasuredElapsedTime(
 
 /**
  * Executes the corresponding events if state->requestTimeDs,
- * state->screensaverTimeDs, or state->checkBatteryTimer is 0. This sets those
- * fields to their new values if they were 0.
+ * state->screensaverTimeDs, state->frameTimeDs, or state->checkBatteryTimer is
+ * 0. This sets those fields to their new values if they were 0.
  * @param state The client state.
  * @param display The Inkplate display.
  */
@@ -265,9 +288,18 @@ static void execEvents(ClientState* state, Inkplate* display) {
         makeRequest(state, display);
     }
 
+    if (state->frameTimeDs <= 0) {
+        drawScheduledFrame(state, display);
+    }
+
     if (state->screensaverTimeDs <= 0) {
+        // The scheduled frames are at least as stale as the current content
         drawStatusImageById(display, state->screensaverId);
         state->screensaverTimeDs = INT_MAX;
+        clearScheduledFrames(state);
+
+        // A long-poll request should not wait for the content to change
+        memset(state->contentFrameId, 0, FRAME_ID_LENGTH);
     }
 }
 
@@ -17,26 +17,32 @@ test(handleTimeElapsedDs) {
     ClientState state;
     state.requestTimeDs = 12000;
     state.screensaverTimeDs = INT_MAX;
+    state.frameTimeDs = 500;
     state.checkBatteryTimer = 300000;
     handleTimeElapsedDs(&state, 100, 10);
     assertEqual(state.requestTimeDs, 11900);
     assertEqual(state.screensaverTimeDs, INT_MAX);
+    assertEqual(state.frameTimeDs, 400);
     assertEqual(state.checkBatteryTimer, 299000);
 
     state.requestTimeDs = INT_MAX;
     state.screensaverTimeDs = 700;
+    state.frameTimeDs = INT_MAX;
     state.checkBatteryTimer = INT_MAX;
     handleTimeElapsedDs(&state, 300, 5);
     assertEqual(state.requestTimeDs, INT_MAX);
     assertEqual(state.screensaverTimeDs, 400);
+    assertEqual(state.frameTimeDs, INT_MAX);
     assertEqual(state.checkBatteryTimer, INT_MAX);
 
     state.requestTimeDs = 0;
     state.screensaverTimeDs = 40;
+    state.frameTimeDs = 60;
     state.checkBatteryTimer = 700;
     handleTimeElapsedDs(&state, 100, 10);
     assertEqual(state.requestTimeDs, 0);
     assertEqual(state.screensaverTimeDs, 0);
+    assertEqual(state.frameTimeDs, 0);
     assertEqual(state.checkBatteryTimer, 0);
 
     // Test overflow and near overflow
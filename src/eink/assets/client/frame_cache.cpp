@@ -0,0 +1,386 @@
+#include <stdio.h>
+#include <string.h>
+
+#include <esp32-hal.h>
+#include <FS.h>
+#include <SPIFFS.h>
+
+#include "draw_image.h"
+#include "frame_cache.h"
+#include "generated.h"
+
+
+// The maximum number of characters in the return value of cacheFilename,
+// including the null terminator
+#define CACHE_FILENAME_LENGTH 16
+
+/** The context argument to readChunks. */
+typedef struct {
+    // The client state
+    ClientState* state;
+
+    // The reader from which to read the checksummed chunks
+    Reader* source;
+
+    // The name of the file in which we store the image
+    const char* filename;
+
+    // The file in which we store the image. While prefixRemaining is positive,
+    // this is open for reading the chunks we stored during previous attempts to
+    // download the image. After that, it is open for appending the chunks we
+    // receive from "source".
+    File file;
+
+    // Whether we are storing the image in "file"
+    bool storing;
+
+    // The number of bytes we have yet to read from the chunks we stored during
+    // previous attempts to download the image
+    int prefixRemaining;
+
+    // The number of bytes of the image we have yet to read from "source"
+    int remaining;
+
+    // The number of bytes in the current chunk, which is stored in chunkBuffer
+    int chunkLength;
+
+    // The number of bytes in the current chunk that we have already returned
+    int chunkOffset;
+} ChunkReaderContext;
+
+// The chunk of the image that we most recently read in readChunks. This is
+// static rather than a local variable, to save stack space.
+static char chunkBuffer[IMAGE_CHUNK_SIZE];
+
+/**
+ * Attempts to mount the SPIFFS file system, if we have not done so already.
+ * @return Whether the file system is available.
+ */
+static bool beginCacheStorage() {
+    static bool haveBegun = false;
+    if (!haveBegun) {
+        haveBegun = SPIFFS.begin(true);
+        if (!haveBegun) {
+            log_e("Failed to mount SPIFFS");
+        }
+    }
+    return haveBegun;
+}
+
+/**
+ * Stores the name of the file containing the frame in the specified slot of the
+ * cache in "filename". "filename" must have room for CACHE_FILENAME_LENGTH
+ * characters.
+ */
+static void cacheFilename(char* filename, int slot) {
+    snprintf(filename, CACHE_FILENAME_LENGTH, "/cache%d.png", slot);
+}
+
+/**
+ * Returns the slot in the cache containing the frame with the specified ID, or
+ * -1 if there is no such slot.
+ */
+static int findCachedFrame(ClientState* state, const char* frameId) {
+    for (int i = 0; i < FRAME_CACHE_SIZE; i++) {
+        if (state->cachedFrameValid[i] &&
+                memcmp(state->cachedFrameIds[i], frameId, FRAME_ID_LENGTH) ==
+                    0) {
+            return i;
+        }
+    }
+    return -1;
+}
+
+/**
+ * Returns the slot in the cache to store a new frame in: an empty slot if
+ * there is one, and the least recently used slot otherwise. This matches the
+ * Python method FrameCache._slot_to_replace.
+ */
+static int slotToReplace(ClientState* state) {
+    int bestSlot = 0;
+    for (int i = 0; i < FRAME_CACHE_SIZE; i++) {
+        if (!state->cachedFrameValid[i]) {
+            return i;
+        }
+        if (state->cachedFrameUseTimes[i] <
+                state->cachedFrameUseTimes[bestSlot]) {
+            bestSlot = i;
+        }
+    }
+    return bestSlot;
+}
+
+/** Records that we are using the frame in the specified slot of the cache. */
+static void touchCachedFrame(ClientState* state, int slot) {
+    state->frameCacheClock++;
+    state->cachedFrameUseTimes[slot] = state->frameCacheClock;
+}
+
+/**
+ * readFunc function for initReader for reading a cached frame. "context" is a
+ * pointer to the File.
+ */
+static int readCacheFile(void* data, int length, void* context) {
+    File* file = (File*)context;
+    return file->read((uint8_t*)data, length);
+}
+
+/**
+ * Stops storing the image we are downloading, e.g. because we failed to write
+ * it to flash memory. We will not be able to resume the download.
+ */
+static void stopStoringChunks(ChunkReaderContext* context) {
+    if (context->storing) {
+        context->file.close();
+        context->storing = false;
+    }
+    context->state->partialFrameChunkCount = 0;
+}
+
+/**
+ * Reads the next checksummed chunk of the image from context->source into
+ * chunkBuffer and appends it to context->file.
+ * @return Whether we successfully read and verified the chunk.
+ */
+static bool readChunk(ChunkReaderContext* context) {
+    if (context->remaining == 0) {
+        return false;
+    }
+    int length = context->remaining;
+    if (length > IMAGE_CHUNK_SIZE) {
+        length = IMAGE_CHUNK_SIZE;
+    }
+    unsigned char checksumBytes[4];
+    readBytes(context->source, chunkBuffer, length);
+    readBytes(context->source, checksumBytes, 4);
+    if (readerPassedEof(context->source)) {
+        return false;
+    }
+    unsigned int checksum =
+        (unsigned int)checksumBytes[0] |
+        (unsigned int)checksumBytes[1] << 8 |
+        (unsigned int)checksumBytes[2] << 16 |
+        (unsigned int)checksumBytes[3] << 24;
+    if (crc32Checksum(chunkBuffer, length) != checksum) {
+        log_e("Image chunk does not match its checksum");
+        return false;
+    }
+
+    if (context->storing) {
+        if (context->file.write((uint8_t*)chunkBuffer, length) == length) {
+            context->state->partialFrameChunkCount++;
+        } else {
+            log_e("Failed to store image chunk");
+            stopStoringChunks(context);
+        }
+    }
+    context->remaining -= length;
+    context->chunkLength = length;
+    context->chunkOffset = 0;
+    return true;
+}
+
+/**
+ * readFunc function for initReader that reads the image from the chunks we
+ * stored during previous attempts to download it, followed by the checksummed
+ * chunks in a response payload. "context" is a pointer to a
+ * ChunkReaderContext.
+ */
+static int readChunks(void* data, int length, void* context) {
+    ChunkReaderContext* chunkContext = (ChunkReaderContext*)context;
+    char* bytes = (char*)data;
+    int offset = 0;
+    while (offset < length && chunkContext->prefixRemaining > 0) {
+        int count = length - offset;
+        if (count > chunkContext->prefixRemaining) {
+            count = chunkContext->prefixRemaining;
+        }
+        int read = chunkContext->file.read((uint8_t*)bytes + offset, count);
+        if (read <= 0) {
+            log_e("Failed to read stored image chunks");
+            return offset;
+        }
+        offset += read;
+        chunkContext->prefixRemaining -= read;
+        if (chunkContext->prefixRemaining == 0) {
+            chunkContext->file.close();
+            chunkContext->file =
+                SPIFFS.open(chunkContext->filename, FILE_APPEND);
+            if (!chunkContext->file) {
+                chunkContext->storing = false;
+                chunkContext->state->partialFrameChunkCount = 0;
+            }
+        }
+    }
+
+    while (offset < length) {
+        if (chunkContext->chunkOffset == chunkContext->chunkLength &&
+                !readChunk(chunkContext)) {
+            break;
+        }
+        int count = length - offset;
+        int available = chunkContext->chunkLength - chunkContext->chunkOffset;
+        if (count > available) {
+            count = available;
+        }
+        memcpy(bytes + offset, chunkBuffer + chunkContext->chunkOffset, count);
+        offset += count;
+        chunkContext->chunkOffset += count;
+    }
+    return offset;
+}
+
+void clearFrameCache(ClientState* state) {
+    for (int i = 0; i < FRAME_CACHE_SIZE; i++) {
+        state->cachedFrameValid[i] = false;
+        state->cachedFrameUseTimes[i] = 0;
+    }
+    state->frameCacheClock = 0;
+    state->partialFrameChunkCount = 0;
+}
+
+void writeCachedFrameIds(ClientState* state, Writer* writer) {
+    int count = 0;
+    for (int i = 0; i < FRAME_CACHE_SIZE; i++) {
+        if (state->cachedFrameValid[i]) {
+            count++;
+        }
+    }
+    writeInt(writer, count);
+    for (int i = 0; i < FRAME_CACHE_SIZE; i++) {
+        if (state->cachedFrameValid[i]) {
+            writeBytes(writer, state->cachedFrameIds[i], FRAME_ID_LENGTH);
+        }
+    }
+}
+
+bool hasCachedFrame(ClientState* state, const char* frameId) {
+    return findCachedFrame(state, frameId) >= 0;
+}
+
+bool drawCachedFrame(
+        ClientState* state, Inkplate* display, const char* frameId) {
+    int slot = findCachedFrame(state, frameId);
+    if (slot < 0 || !beginCacheStorage()) {
+        return false;
+    }
+
+    char filename[CACHE_FILENAME_LENGTH];
+    cacheFilename(filename, slot);
+    File file = SPIFFS.open(filename, FILE_READ);
+    if (!file) {
+        log_e("Missing cached frame %d", slot);
+        state->cachedFrameValid[slot] = false;
+        return false;
+    }
+
+    Reader reader;
+    initReader(&reader, readCacheFile, &file);
+    drawPngFromReader(display, &reader, file.size(), 0, 0);
+    file.close();
+    if (readerPassedEof(&reader)) {
+        log_e("Cached frame %d is incomplete", slot);
+        state->cachedFrameValid[slot] = false;
+        return false;
+    }
+    touchCachedFrame(state, slot);
+    log_i("Displayed cached frame %d", slot);
+    return true;
+}
+
+bool downloadFrame(
+        ClientState* state, Inkplate* display, Reader* reader, int length,
+        int startChunk, const char* frameId) {
+    int prefixLength = startChunk * IMAGE_CHUNK_SIZE;
+    if (startChunk < 0 || prefixLength >= length ||
+            (startChunk > 0 &&
+                (state->partialFrameChunkCount != startChunk ||
+                    memcmp(state->partialFrameId, frameId, FRAME_ID_LENGTH) !=
+                        0))) {
+        log_e("The server resumed a download we did not ask to resume");
+        state->partialFrameChunkCount = 0;
+        return false;
+    }
+
+    int slot;
+    if (startChunk > 0) {
+        slot = state->partialFrameSlot;
+    } else {
+        // Invalidate the slot before we overwrite its file, in case we are
+        // interrupted
+        slot = findCachedFrame(state, frameId);
+        if (slot < 0) {
+            slot = slotToReplace(state);
+        }
+        state->cachedFrameValid[slot] = false;
+        memcpy(state->partialFrameId, frameId, FRAME_ID_LENGTH);
+        state->partialFrameSlot = slot;
+        state->partialFrameChunkCount = 0;
+    }
+
+    char filename[CACHE_FILENAME_LENGTH];
+    cacheFilename(filename, slot);
+    ChunkReaderContext context;
+    context.state = state;
+    context.source = reader;
+    context.filename = filename;
+    context.storing = false;
+    context.prefixRemaining = prefixLength;
+    context.remaining = length - prefixLength;
+    context.chunkLength = 0;
+    context.chunkOffset = 0;
+    if (beginCacheStorage()) {
+        context.file = SPIFFS.open(
+            filename, startChunk > 0 ? FILE_READ : FILE_WRITE);
+        context.storing = (bool)context.file;
+    }
+    if (startChunk > 0 &&
+            (!context.storing || (int)context.file.size() != prefixLength)) {
+        log_e("Missing stored image chunks");
+        stopStoringChunks(&context);
+        return false;
+    }
+
+    Reader chunkReader;
+    initReader(&chunkReader, readChunks, &context);
+    drawPngFromReader(display, &chunkReader, length, 0, 0);
+    bool storing = context.storing;
+    if (storing) {
+        context.file.close();
+    }
+
+    if (!readerPassedEof(&chunkReader) && context.remaining == 0 &&
+            context.prefixRemaining == 0) {
+        state->partialFrameChunkCount = 0;
+        if (storing) {
+            memcpy(state->cachedFrameIds[slot], frameId, FRAME_ID_LENGTH);
+            state->cachedFrameValid[slot] = true;
+            touchCachedFrame(state, slot);
+        } else {
+            log_e("Failed to cache frame %d", slot);
+        }
+        return true;
+    }
+
+    if (!readerPassedEof(&chunkReader) || context.prefixRemaining > 0) {
+        // The image file is invalid, or we failed to read the chunks we stored,
+        // so resuming the download would not help
+        state->partialFrameChunkCount = 0;
+    } else if (state->partialFrameChunkCount > 0) {
+        log_i(
+            "Stored %d chunks of the image for resuming the download",
+            state->partialFrameChunkCount);
+    }
+    return false;
+}
+
+void writeResumePoint(ClientState* state, Writer* writer) {
+    if (state->partialFrameChunkCount > 0) {
+        writeBytes(writer, state->partialFrameId, FRAME_ID_LENGTH);
+    } else {
+        char noFrameId[FRAME_ID_LENGTH];
+        memset(noFrameId, 0, FRAME_ID_LENGTH);
+        writeBytes(writer, noFrameId, FRAME_ID_LENGTH);
+    }
+    writeInt(writer, state->partialFrameChunkCount);
+}
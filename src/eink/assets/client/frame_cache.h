@@ -0,0 +1,78 @@
+#ifndef __FRAME_CACHE_H__
+#define __FRAME_CACHE_H__
+
+#include <Inkplate.h>
+
+#include "client_state.h"
+#include "server_io.h"
+
+
+/**
+ * Empties the frame cache, i.e. the images we have recently received from the
+ * server, which are stored in flash memory. The server may instruct us to
+ * display one of these images by its ID, as in the Python method
+ * ServerIO.frame_id, rather than sending it again. The Python class FrameCache
+ * is a reference model of the cache.
+ * @param state The client state.
+ */
+void clearFrameCache(ClientState* state);
+
+/**
+ * Writes the IDs of the frames in the cache, as in the Python field
+ * Request.cached_frame_ids.
+ * @param state The client state.
+ * @param writer The writer to write the IDs to.
+ */
+void writeCachedFrameIds(ClientState* state, Writer* writer);
+
+/**
+ * Returns whether the cache contains the frame with the specified ID.
+ * @param state The client state.
+ * @param frameId The frame ID. This has FRAME_ID_LENGTH bytes.
+ */
+bool hasCachedFrame(ClientState* state, const char* frameId);
+
+/**
+ * Draws the frame with the specified ID from the cache. This does not call
+ * display->display().
+ * @param state The client state.
+ * @param display The Inkplate display.
+ * @param frameId The frame ID. This has FRAME_ID_LENGTH bytes.
+ * @return Whether we were successful. If not, we remove the frame from the
+ *     cache.
+ */
+bool drawCachedFrame(
+    ClientState* state, Inkplate* display, const char* frameId);
+
+/**
+ * Downloads an image from "reader", draws it, and adds it to the cache,
+ * replacing the least recently used frame if the cache is full. This does not
+ * call display->display(). The image is divided into checksummed chunks, as in
+ * the Python method Response.to_chunks. We store each chunk in flash memory as
+ * soon as we verify it, so that if the download is interrupted, the next
+ * request can ask the server for only the remaining chunks (see
+ * writeResumePoint).
+ * @param state The client state.
+ * @param display The Inkplate display.
+ * @param reader The reader containing the checksummed chunks.
+ * @param length The total number of bytes in the image file.
+ * @param startChunk The index of the first chunk in "reader". If this is
+ *     positive, we resume the interrupted download of the image, and we read
+ *     the preceding chunks from flash memory.
+ * @param frameId The frame ID of the image. This has FRAME_ID_LENGTH bytes.
+ * @return Whether we drew the whole image. This is false if we pass the end of
+ *     "reader" or a chunk does not match its checksum.
+ */
+bool downloadFrame(
+    ClientState* state, Inkplate* display, Reader* reader, int length,
+    int startChunk, const char* frameId);
+
+/**
+ * Writes the point from which we would like to resume an interrupted download,
+ * as in the Python fields Request.resume_frame_id and Request.resume_chunk.
+ * @param state The client state.
+ * @param writer The writer to write the resume point to.
+ */
+void writeResumePoint(ClientState* state, Writer* writer);
+
+#endif
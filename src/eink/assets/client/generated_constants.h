@@ -10,6 +10,11 @@
 // 4. Landscape
 extern const int ROTATION;
 
+// The maximum amount of time the server holds a long-poll request, in
+// milliseconds, as in the Python method ClientConfig.set_long_poll_timeout. 0
+// indicates that we do not make long-poll requests.
+extern const int LONG_POLL_TIMEOUT_MS;
+
 // The bytes at the beginning of every payload sent to or from the server. We
 // use this as a crude way of checking whether we are dealing with a correctly
 // formatted payload.
@@ -47,9 +52,23 @@ extern const char* STATUS_IMAGE_IDS[];
 // that type.
 extern const int STATUS_IMAGES_BY_TYPE[];
 
-// The URLs of the servers, in the order we should attempt to reach them
+// The types of the servers' transports, in the order we should attempt to
+// reach them. Each element is TRANSPORT_TYPE_WEB or TRANSPORT_TYPE_TCP.
+extern const int TRANSPORT_TYPES[];
+
+// The URLs of the servers, in the order we should attempt to reach them. This
+// is parallel to TRANSPORT_TYPES. The elements for TCP transports are empty.
 extern const char* TRANSPORT_URLS[];
 
+// The host names or IP addresses of the servers, in the order we should attempt
+// to reach them. This is parallel to TRANSPORT_TYPES. The elements for web
+// transports are empty.
+extern const char* TRANSPORT_HOSTS[];
+
+// The TCP ports of the servers, in the order we should attempt to reach them.
+// This is parallel to TRANSPORT_TYPES. The elements for web transports are 0.
+extern const int TRANSPORT_PORTS[];
+
 // The number of elements in WI_FI_SSIDS
 extern const int WI_FI_NETWORK_COUNT;
 
@@ -1,6 +1,11 @@
+#include <limits.h>
+#include <string.h>
+
+#include <Esp.h>
 #include <esp32-hal.h>
 
 #include "byte_array.h"
+#include "frame_cache.h"
 #include "generated.h"
 #include "request.h"
 #include "server_io.h"
@@ -24,31 +29,123 @@ static Transport* requestTransports() {
     if (!haveSetTransports) {
         for (int i = 0; i < TRANSPORT_COUNT; i++) {
             Transport* transport = transports + i;
+            transport->wiFi.type = TRANSPORT_TYPES[i];
             transport->wiFi.url = (char*)TRANSPORT_URLS[i];
+            transport->wiFi.host = (char*)TRANSPORT_HOSTS[i];
+            transport->wiFi.port = TRANSPORT_PORTS[i];
         }
     }
     return transports;
 }
 
-/** Returns the request payload to use. */
-static ByteArray requestPayload() {
+// If LONG_POLL_TIMEOUT_MS is nonzero, the amount of time from the start of a
+// successful request to the start of the next request, in tenths of a second.
+// The server usually holds a long-poll request for longer than this, in which
+// case we make the next request as soon as we apply the response. This limits
+// the rate of requests if the server responds immediately.
+static const int LONG_POLL_PERIOD_DS = 10 * 10;
+
+// The number of bytes in the device ID we send to the server
+#define DEVICE_ID_LENGTH 6
+
+/**
+ * Stores the ID of this device, as in the Python field Request.device_id, in
+ * "deviceId". This is the device's factory-programmed MAC address.
+ * @param deviceId The buffer in which to store the ID. This must have room for
+ *     DEVICE_ID_LENGTH bytes.
+ */
+static void deviceId(char* deviceId) {
+    uint64_t mac = ESP.getEfuseMac();
+    for (int i = 0; i < DEVICE_ID_LENGTH; i++) {
+        deviceId[i] = (char)(mac >> (8 * i));
+    }
+}
+
+/**
+ * Returns the request payload to use.
+ * @param state The client state.
+ * @param display The Inkplate display.
+ */
+static ByteArray requestPayload(ClientState* state, Inkplate* display) {
     Writer writer;
     initWriter(&writer);
     writeBytes(&writer, (void*)HEADER, HEADER_LENGTH);
     writeByteArray(
         &writer,
         createByteArray((void*)PROTOCOL_VERSION, PROTOCOL_VERSION_LENGTH));
+
+    char id[DEVICE_ID_LENGTH];
+    deviceId(id);
+    writeByteArray(&writer, createByteArray(id, DEVICE_ID_LENGTH));
+
+    // Write the telemetry, as in the Python class Request
+    writeInt(&writer, (int)(1000 * display->readBattery() + 0.5));
+    writeInt(&writer, wiFiRssi());
+    writeInt(&writer, wiFiConnectTimeMs());
+    writeInt(&writer, state->lastDrawTimeMs);
+    writeInt(&writer, state->wakeCount);
+    writeInt(&writer, state->requestNonce);
+
+    writeCachedFrameIds(state, &writer);
+    writeResumePoint(state, &writer);
+
+    // The Python field Request.long_poll_frame_id. An all-zero frame ID
+    // indicates that this is not a long-poll request.
+    if (LONG_POLL_TIMEOUT_MS > 0) {
+        writeBytes(&writer, state->contentFrameId, FRAME_ID_LENGTH);
+    } else {
+        char noFrameId[FRAME_ID_LENGTH];
+        memset(noFrameId, 0, FRAME_ID_LENGTH);
+        writeBytes(&writer, noFrameId, FRAME_ID_LENGTH);
+    }
+
+    // The transport index, as in the Python field Request.transport_index.
+    // setPayloadTransport overwrites this for each transport we try.
+    writeInt(&writer, 0);
     return finishWriter(&writer);
 }
 
+/**
+ * Sets the transport index in a payload returned by requestPayload, as in the
+ * Python field Request.transport_index.
+ * @param payload The payload.
+ * @param transportIndex The index of the transport in TRANSPORT_TYPES and the
+ *     like.
+ */
+static void setPayloadTransport(ByteArray payload, int transportIndex) {
+    char* bytes = (char*)payload.data + payload.length - 4;
+    bytes[0] = (char)transportIndex;
+    bytes[1] = (char)(transportIndex >> 8);
+    bytes[2] = (char)(transportIndex >> 16);
+    bytes[3] = (char)(transportIndex >> 24);
+}
+
+void resetRequestNonce(ClientState* state) {
+    // Avoid UNKNOWN_TELEMETRY, which would indicate that there is no nonce
+    int nonce;
+    do {
+        nonce = (int)esp_random();
+    } while (nonce == UNKNOWN_TELEMETRY);
+    state->requestNonce = nonce;
+}
+
 void makeRequest(ClientState* state, Inkplate* display) {
     log_i("Requesting content updates");
-    ByteArray request = requestPayload();
     prepareForWiFiRequests();
+    ByteArray request = requestPayload(state, display);
     Transport* transports = requestTransports();
     bool success = false;
-    for (int i = 0; i < TRANSPORT_COUNT; i++) {
-        if (makeWiFiRequest(state, display, request, &transports[i].wiFi)) {
+
+    // Try the preferred transport first, and then the others in order
+    int preferredTransport = state->preferredTransport;
+    for (int i = -1; i < TRANSPORT_COUNT; i++) {
+        int transportIndex = i < 0 ? preferredTransport : i;
+        if (i == preferredTransport) {
+            continue;
+        }
+        setPayloadTransport(request, transportIndex);
+        if (makeWiFiRequest(
+                state, display, request, &transports[transportIndex].wiFi)) {
             success = true;
             break;
         }
@@ -61,6 +158,12 @@ void makeRequest(ClientState* state, Inkplate* display) {
             state->requestTimeIndex++;
         }
         state->requestTimeDs = state->requestTimesDs[state->requestTimeIndex];
+    } else if (
+            LONG_POLL_TIMEOUT_MS > 0 &&
+            state->requestTimeDs > LONG_POLL_PERIOD_DS &&
+            state->requestTimeDs < INT_MAX) {
+        // clientLoop deducts the time we spent making the request
+        state->requestTimeDs = LONG_POLL_PERIOD_DS;
     }
     handleRadioSilenceWiFi(state->requestTimeDs);
 }
@@ -9,10 +9,20 @@
 /**
  * Requests updated content from the server(s). If successful, applies the
  * results to the ClientState and display. In any event, this sets
- * state->requestTimeDs to the time until the next request.
+ * state->requestTimeDs to the time until the next request. If
+ * LONG_POLL_TIMEOUT_MS is nonzero, this makes a long-poll request, which the
+ * server may hold for up to that amount of time.
  * @param state The client state.
  * @param display The Inkplate display.
  */
 void makeRequest(ClientState* state, Inkplate* display);
 
+/**
+ * Sets state->requestNonce to a new random value. We call this after we
+ * successfully apply a server response, so that the server can distinguish
+ * retries of a request from new requests.
+ * @param state The client state.
+ */
+void resetRequestNonce(ClientState* state);
+
 #endif
@@ -2,24 +2,37 @@
 #include <string.h>
 
 #include "draw_image.h"
+#include "frame_cache.h"
 #include "generated.h"
+#include "request.h"
 #include "response.h"
+#include "scheduled_frames.h"
 #include "server_io.h"
 #include "shared.h"
-#include "status_images.h"
 
 
+// The value of the image length in a response payload that indicates that we
+// should display the frame from the frame cache with the given ID. This
+// duplicates the Python constant Response._CACHED_IMAGE_LENGTH.
+#define CACHED_IMAGE_LENGTH -1
+
+// The value of the preferred transport in a response payload that indicates
+// that we should keep our current preference. This duplicates the Python
+// constant Response._NO_PREFERRED_TRANSPORT.
+#define NO_PREFERRED_TRANSPORT -1
+
 /**
- * Handles the case where we reach the end of the response payload while we are
- * in the middle of drawing the image with the updated content. This could
- * happen if our connection to the server is interrupted.
+ * Handles the case where we fail to draw the image with the updated content,
+ * e.g. because we reach the end of the response payload while we are in the
+ * middle of downloading the image. This could happen if our connection to the
+ * server is interrupted. We keep displaying the current content, and we retry
+ * soon. The retry only needs to download the chunks of the image that we have
+ * not already stored (see downloadFrame).
  */
-static void handleIncompleteImage(ClientState* state, Inkplate* display) {
+static void handleIncompleteImage(ClientState* state) {
     log_e(
-        "Prematurely reached end of server response. The connection with the "
-        "server may have been interrupted. We don't have a good way of "
-        "recovering from this.");
-    drawStatusImageByType(display, STATUS_IMAGE_INITIAL);
+        "Failed to download or draw the image in the server response. The "
+        "connection with the server may have been interrupted.");
     memcpy(
         state->requestTimesDs, INITIAL_REQUEST_TIMES_DS,
         sizeof(int) * INITIAL_REQUEST_TIMES_COUNT);
@@ -27,6 +40,7 @@ static void handleIncompleteImage(ClientState* state, Inkplate* display) {
     state->requestTimeIndex = 0;
     state->requestTimeDs = INITIAL_REQUEST_TIMES_DS[0];
     state->screensaverTimeDs = INT_MAX;
+    clearScheduledFrames(state);
 }
 
 bool execResponse(ClientState* state, Inkplate* display, Reader* reader) {
@@ -50,9 +64,22 @@ bool execResponse(ClientState* state, Inkplate* display, Reader* reader) {
     char screensaverId[STATUS_IMAGE_ID_LENGTH];
     readBytes(reader, screensaverId, STATUS_IMAGE_ID_LENGTH);
     int screensaverTimeDs = readInt(reader);
+    int preferredTransport = readInt(reader);
+    char imageId[FRAME_ID_LENGTH];
+    readBytes(reader, imageId, FRAME_ID_LENGTH);
     int imageLength = readInt(reader);
+    int imageStartChunk = 0;
+    if (imageLength > 0) {
+        imageStartChunk = readInt(reader);
+    }
 
-    if (readerPassedEof(reader)) {
+    if (readerPassedEof(reader) ||
+            (imageLength < 0 && imageLength != CACHED_IMAGE_LENGTH)) {
+        return false;
+    }
+    if (imageLength == CACHED_IMAGE_LENGTH &&
+            !hasCachedFrame(state, imageId)) {
+        log_e("The server referred to a frame that is not in the cache");
         return false;
     }
 
@@ -65,14 +92,41 @@ bool execResponse(ClientState* state, Inkplate* display, Reader* reader) {
     state->requestTimeDs = requestTimesDs[0];
     memcpy(state->screensaverId, screensaverId, STATUS_IMAGE_ID_LENGTH);
     state->screensaverTimeDs = screensaverTimeDs;
+    if (preferredTransport != NO_PREFERRED_TRANSPORT) {
+        if (preferredTransport >= 0 && preferredTransport < TRANSPORT_COUNT) {
+            state->preferredTransport = preferredTransport;
+        } else {
+            log_e("The server preferred a transport that does not exist");
+        }
+    }
+
+    if (imageLength == 0) {
+        // The server is busy, and it instructed us to keep displaying the
+        // current content
+        log_i("Keeping current content at the server's request");
+        resetRequestNonce(state);
+        return true;
+    }
 
+    long long drawStartTimeUs = esp_timer_get_time();
     display->clearDisplay();
-    drawPngFromReader(display, reader, imageLength, 0, 0);
-    if (!readerPassedEof(reader)) {
+    bool drewImage;
+    if (imageLength == CACHED_IMAGE_LENGTH) {
+        drewImage = drawCachedFrame(state, display, imageId);
+    } else {
+        drewImage = downloadFrame(
+            state, display, reader, imageLength, imageStartChunk, imageId);
+    }
+    if (drewImage) {
         display->display();
+        memcpy(state->contentFrameId, imageId, FRAME_ID_LENGTH);
+        state->lastDrawTimeMs =
+            (int)((esp_timer_get_time() - drawStartTimeUs) / 1000);
         log_i("Updated content from server response");
+        storeScheduledFrames(state, reader);
+        resetRequestNonce(state);
     } else {
-        handleIncompleteImage(state, display);
+        handleIncompleteImage(state);
     }
     return true;
 }
@@ -0,0 +1,151 @@
+#include <limits.h>
+#include <stdio.h>
+#include <string.h>
+
+#include <esp32-hal.h>
+#include <FS.h>
+#include <SPIFFS.h>
+
+#include "draw_image.h"
+#include "generated.h"
+#include "scheduled_frames.h"
+
+
+// The number of bytes to copy at a time when storing a frame's image file
+#define COPY_FRAME_BUFFER_SIZE 1024
+
+// The maximum number of characters in the return value of frameFilename,
+// including the null terminator
+#define FRAME_FILENAME_LENGTH 16
+
+/**
+ * Attempts to mount the SPIFFS file system, if we have not done so already.
+ * @return Whether the file system is available.
+ */
+static bool beginFrameStorage() {
+    static bool haveBegun = false;
+    if (!haveBegun) {
+        haveBegun = SPIFFS.begin(true);
+        if (!haveBegun) {
+            log_e("Failed to mount SPIFFS");
+        }
+    }
+    return haveBegun;
+}
+
+/**
+ * Stores the name of the file containing the frame with the specified index in
+ * "filename". "filename" must have room for FRAME_FILENAME_LENGTH characters.
+ */
+static void frameFilename(char* filename, int index) {
+    snprintf(filename, FRAME_FILENAME_LENGTH, "/frame%d.png", index);
+}
+
+/**
+ * readFunc function for initReader for reading a stored frame. "context" is a
+ * pointer to the File.
+ */
+static int readFrameFile(void* data, int length, void* context) {
+    File* file = (File*)context;
+    return file->read((uint8_t*)data, length);
+}
+
+/**
+ * Copies the specified number of bytes from "reader" to the file for the frame
+ * with the specified index.
+ * @return Whether we were successful.
+ */
+static bool storeFrame(Reader* reader, int index, int length) {
+    char filename[FRAME_FILENAME_LENGTH];
+    frameFilename(filename, index);
+    File file = SPIFFS.open(filename, FILE_WRITE);
+    if (!file) {
+        return false;
+    }
+
+    char buffer[COPY_FRAME_BUFFER_SIZE];
+    int remaining = length;
+    bool success = true;
+    while (remaining > 0) {
+        int chunkLength =
+            remaining < COPY_FRAME_BUFFER_SIZE ?
+            remaining : COPY_FRAME_BUFFER_SIZE;
+        readBytes(reader, buffer, chunkLength);
+        if (readerPassedEof(reader) ||
+                file.write((uint8_t*)buffer, chunkLength) != chunkLength) {
+            success = false;
+            break;
+        }
+        remaining -= chunkLength;
+    }
+    file.close();
+    return success;
+}
+
+void storeScheduledFrames(ClientState* state, Reader* reader) {
+    clearScheduledFrames(state);
+    int frameCount = readInt(reader);
+    if (readerPassedEof(reader) || frameCount <= 0 ||
+            frameCount > MAX_FRAMES || !beginFrameStorage()) {
+        return;
+    }
+
+    int frameDelaysDs[MAX_FRAMES];
+    int prevTimeDs = 0;
+    for (int i = 0; i < frameCount; i++) {
+        int timeDs = readInt(reader);
+        int length = readInt(reader);
+        if (readerPassedEof(reader) || timeDs < prevTimeDs || length <= 0 ||
+                !storeFrame(reader, i, length)) {
+            log_e("Failed to store the scheduled frames");
+            return;
+        }
+        frameDelaysDs[i] = timeDs - prevTimeDs;
+        prevTimeDs = timeDs;
+    }
+
+    memcpy(state->frameDelaysDs, frameDelaysDs, sizeof(int) * frameCount);
+    state->frameCount = frameCount;
+    state->frameIndex = 0;
+    state->frameTimeDs = frameDelaysDs[0];
+    log_i("Stored %d scheduled frames", frameCount);
+}
+
+void clearScheduledFrames(ClientState* state) {
+    state->frameCount = 0;
+    state->frameIndex = 0;
+    state->frameTimeDs = INT_MAX;
+}
+
+void drawScheduledFrame(ClientState* state, Inkplate* display) {
+    int index = state->frameIndex;
+    state->frameIndex++;
+    if (state->frameIndex < state->frameCount) {
+        state->frameTimeDs = state->frameDelaysDs[state->frameIndex];
+    } else {
+        state->frameTimeDs = INT_MAX;
+    }
+    if (index >= state->frameCount || !beginFrameStorage()) {
+        return;
+    }
+
+    char filename[FRAME_FILENAME_LENGTH];
+    frameFilename(filename, index);
+    File file = SPIFFS.open(filename, FILE_READ);
+    if (!file) {
+        log_e("Missing scheduled frame %d", index);
+        return;
+    }
+
+    Reader reader;
+    initReader(&reader, readFrameFile, &file);
+    display->clearDisplay();
+    drawPngFromReader(display, &reader, file.size(), 0, 0);
+    file.close();
+    if (!readerPassedEof(&reader)) {
+        display->display();
+        log_i("Displayed scheduled frame %d", index);
+    } else {
+        log_e("Scheduled frame %d is incomplete", index);
+    }
+}
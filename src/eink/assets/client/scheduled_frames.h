@@ -0,0 +1,36 @@
+#ifndef __SCHEDULED_FRAMES_H__
+#define __SCHEDULED_FRAMES_H__
+
+#include <Inkplate.h>
+
+#include "client_state.h"
+#include "server_io.h"
+
+
+/**
+ * Reads the scheduled frames from a server response payload and stores them,
+ * as in the Python method Server.frame_times. The image files are stored in
+ * flash memory, so that they survive deep sleep. This replaces any previously
+ * stored frames. If we detect that the frames are not correctly formatted, or
+ * we are unable to store them, we discard all of the frames.
+ * @param state The client state.
+ * @param reader The reader containing the response payload, positioned at the
+ *     start of the frames.
+ */
+void storeScheduledFrames(ClientState* state, Reader* reader);
+
+/**
+ * Discards any scheduled frames that we have not yet displayed.
+ * @param state The client state.
+ */
+void clearScheduledFrames(ClientState* state);
+
+/**
+ * Displays the next scheduled frame and updates state->frameIndex and
+ * state->frameTimeDs accordingly.
+ * @param state The client state.
+ * @param display The Inkplate display.
+ */
+void drawScheduledFrame(ClientState* state, Inkplate* display);
+
+#endif
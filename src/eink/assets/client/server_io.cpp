@@ -65,6 +65,18 @@ int readInt(Reader* reader) {
         (int)bytes[3] << 24;
 }
 
+unsigned int crc32Checksum(const void* data, int length) {
+    const unsigned char* bytes = (const unsigned char*)data;
+    unsigned int crc = 0xffffffff;
+    for (int i = 0; i < length; i++) {
+        crc ^= bytes[i];
+        for (int j = 0; j < 8; j++) {
+            crc = (crc >> 1) ^ (0xedb88320 & (0 - (crc & 1)));
+        }
+    }
+    return ~crc;
+}
+
 void writeByteArray(Writer* writer, ByteArray data) {
     writeInt(writer, data.length);
     writeBytes(writer, data.data, data.length);
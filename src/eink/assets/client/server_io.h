@@ -88,6 +88,13 @@ void writeInt(Writer* writer, int value);
  */
 int readInt(Reader* reader);
 
+/**
+ * Returns the CRC-32 checksum of the specified bytes. This duplicates the
+ * Python function zlib.crc32, which the Python method Response.to_chunks uses
+ * to compute the checksums of the chunks of an image.
+ */
+unsigned int crc32Checksum(const void* data, int length);
+
 /**
  * Writes the specified ByteArray to the specified writer. Unlike writeBytes,
  * this does not assume prior knowledge of the number of bytes. It writes the
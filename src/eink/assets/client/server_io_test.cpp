@@ -226,6 +226,12 @@ test(readWriteByteArray) {
     assertTrue(checkReadWriteByteArray(data2, 1));
 }
 
+test(crc32Checksum) {
+    assertEqual(crc32Checksum(NULL, 0), 0u);
+    assertEqual(crc32Checksum("123456789", 9), 0xcbf43926u);
+    assertEqual(crc32Checksum("Hello, world!", 13), 0xebe6c6e6u);
+}
+
 // Test that reading a value that is potentially invalidly encoded doesn't
 // result in an error.
 test(readNoErrors) {
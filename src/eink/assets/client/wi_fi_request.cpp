@@ -1,3 +1,4 @@
+#include <stdlib.h>
 #include <string.h>
 
 #include <esp32-hal.h>
@@ -19,6 +20,10 @@ static const long long WI_FI_CONNECT_TIMEOUT_US = 20 * 1000000LL;
 // an HTTP response before giving up
 static const long long WI_FI_READ_TIMEOUT_US = 5 * 1000000LL;
 
+// The maximum number of milliseconds to wait for the response to an HTTP
+// request, if it is not a long-poll request
+static const int WEB_TIMEOUT_MS = 30000;
+
 // The threshold for turning off the Wi-Fi hardware. If we will not make a web
 // request for at least WI_FI_OFF_TIME_DS tenths of a second, then we turn it
 // off to save energy.
@@ -33,6 +38,9 @@ static const int WI_FI_SCAN_THRESHOLD = 2;
 // connect
 #define WI_FI_MAX_NETWORKS_TO_TRY 3
 
+// The return value of wiFiConnectTimeMs()
+static int connectTimeMs = UNKNOWN_TELEMETRY;
+
 /**
  * Attempts to connect to the specified Wi-Fi network.
  * @param ssid The network's SSID.
@@ -211,20 +219,62 @@ static int readWiFi(void* data, int length, void* context) {
     return offset;
 }
 
-bool makeWiFiRequest(
+/**
+ * Waits until we receive data from the specified WiFiClient, the connection is
+ * closed, or WI_FI_READ_TIMEOUT_US plus LONG_POLL_TIMEOUT_MS elapses. The
+ * server may hold a long-poll request for up to LONG_POLL_TIMEOUT_MS before it
+ * starts to respond.
+ * @param wiFi The WiFiClient.
+ * @return Whether we received data.
+ */
+static bool waitForResponse(WiFiClient* wiFi) {
+    long long startTime = esp_timer_get_time();
+    long long timeoutUs = WI_FI_READ_TIMEOUT_US + 1000LL * LONG_POLL_TIMEOUT_MS;
+    while (esp_timer_get_time() - startTime < timeoutUs) {
+        if (wiFi->available() > 0) {
+            return true;
+        }
+        if (!wiFi->connected()) {
+            return false;
+        }
+        delay(20);
+    }
+    return wiFi->available() > 0;
+}
+
+/**
+ * Requests updated content from the specified web server. If successful,
+ * applies the results to the ClientState and display. For
+ * TRANSPORT_TYPE_STATIC_WEB, we make a GET request and ignore the request
+ * payload.
+ * @param state The client state.
+ * @param display The Inkplate display.
+ * @param payload The request payload.
+ * @param transport The server. This must have the type TRANSPORT_TYPE_WEB or
+ *     TRANSPORT_TYPE_STATIC_WEB.
+ * @return Whether the update was successful.
+ */
+static bool makeWebRequest(
         ClientState* state, Inkplate* display, ByteArray payload,
         WiFiTransport* transport) {
-    if (WiFi.status() != WL_CONNECTED) {
-        return false;
+    // HTTPClient's timeout is a 16-bit number of milliseconds, which is why
+    // the Python class ClientCodeGenerator limits LONG_POLL_TIMEOUT_MS
+    int timeoutMs = LONG_POLL_TIMEOUT_MS + (int)(WI_FI_READ_TIMEOUT_US / 1000);
+    if (timeoutMs < WEB_TIMEOUT_MS) {
+        timeoutMs = WEB_TIMEOUT_MS;
     }
-
     HTTPClient http;
-    http.setTimeout(30000);
+    http.setTimeout(timeoutMs);
     if (!http.begin(transport->url)) {
         return false;
     }
 
-    int status = http.POST((uint8_t*)payload.data, payload.length);
+    int status;
+    if (transport->type == TRANSPORT_TYPE_STATIC_WEB) {
+        status = http.GET();
+    } else {
+        status = http.POST((uint8_t*)payload.data, payload.length);
+    }
     if (status < 200 || status >= 300) {
         http.end();
         return false;
@@ -238,8 +288,88 @@ bool makeWiFiRequest(
     return success;
 }
 
+/**
+ * Requests updated content from the specified TCP server, as in the Python
+ * class TcpTransport. If successful, applies the results to the ClientState and
+ * display.
+ * @param state The client state.
+ * @param display The Inkplate display.
+ * @param payload The request payload.
+ * @param transport The server. This must have the type TRANSPORT_TYPE_TCP.
+ * @return Whether the update was successful.
+ */
+static bool makeTcpRequest(
+        ClientState* state, Inkplate* display, ByteArray payload,
+        WiFiTransport* transport) {
+    WiFiClient client;
+    if (!client.connect(
+            transport->host, transport->port,
+            (int)(WI_FI_READ_TIMEOUT_US / 1000))) {
+        return false;
+    }
+
+    // Send the length of the payload, followed by the payload
+    Writer writer;
+    initWriter(&writer);
+    writeByteArray(&writer, payload);
+    ByteArray framedPayload = finishWriter(&writer);
+    size_t written = client.write(
+        (uint8_t*)framedPayload.data, framedPayload.length);
+    free(framedPayload.data);
+    if (written != (size_t)framedPayload.length) {
+        client.stop();
+        return false;
+    }
+
+    if (!waitForResponse(&client)) {
+        client.stop();
+        return false;
+    }
+
+    // The response payload is preceded by its length
+    Reader reader;
+    initReader(&reader, readWiFi, &client);
+    int responseLength = readInt(&reader);
+    if (readerPassedEof(&reader) || responseLength <= 0) {
+        client.stop();
+        return false;
+    }
+    bool success = execResponse(state, display, &reader);
+    client.stop();
+    return success;
+}
+
+bool makeWiFiRequest(
+        ClientState* state, Inkplate* display, ByteArray payload,
+        WiFiTransport* transport) {
+    if (WiFi.status() != WL_CONNECTED) {
+        return false;
+    }
+    if (transport->type == TRANSPORT_TYPE_TCP) {
+        return makeTcpRequest(state, display, payload, transport);
+    } else {
+        return makeWebRequest(state, display, payload, transport);
+    }
+}
+
 void prepareForWiFiRequests() {
-    connectToWiFi();
+    long long startTime = esp_timer_get_time();
+    if (connectToWiFi()) {
+        connectTimeMs = (int)((esp_timer_get_time() - startTime) / 1000);
+    } else {
+        connectTimeMs = UNKNOWN_TELEMETRY;
+    }
+}
+
+int wiFiConnectTimeMs() {
+    return connectTimeMs;
+}
+
+int wiFiRssi() {
+    if (WiFi.status() != WL_CONNECTED) {
+        return UNKNOWN_TELEMETRY;
+    }
+    return WiFi.RSSI();
 }
 
 void handleRadioSilenceWiFi(int timeDs) {
@@ -7,10 +7,36 @@
 #include "client_state.h"
 
 
+// The value of WiFiTransport.type for a web server, to which we make HTTP POST
+// requests. This duplicates the Python constant
+// ClientCodeGenerator._TRANSPORT_TYPE_WEB.
+#define TRANSPORT_TYPE_WEB 0
+
+// The value of WiFiTransport.type for a server to which we send payloads over
+// a raw TCP connection, as in the Python class TcpTransport. This duplicates
+// the Python constant ClientCodeGenerator._TRANSPORT_TYPE_TCP.
+#define TRANSPORT_TYPE_TCP 1
+
+// The value of WiFiTransport.type for a static file server, to which we make
+// HTTP GET requests, as in the Python class StaticWebTransport. This
+// duplicates the Python constant
+// ClientCodeGenerator._TRANSPORT_TYPE_STATIC_WEB.
+#define TRANSPORT_TYPE_STATIC_WEB 2
+
 /** Describes a way of making requests to a Wi-Fi server. */
 typedef struct {
-    // The request URL
+    // The type of the transport: TRANSPORT_TYPE_WEB, TRANSPORT_TYPE_TCP, or
+    // TRANSPORT_TYPE_STATIC_WEB
+    int type;
+
+    // The request URL, for TRANSPORT_TYPE_WEB and TRANSPORT_TYPE_STATIC_WEB
     char* url;
+
+    // The server's host name or IP address, for TRANSPORT_TYPE_TCP
+    char* host;
+
+    // The server's TCP port, for TRANSPORT_TYPE_TCP
+    int port;
 } WiFiTransport;
 
 /**
@@ -29,6 +55,19 @@ bool makeWiFiRequest(
 /** Makes any preparations required for upcoming calls to makeWiFiRequest. */
 void prepareForWiFiRequests();
 
+/**
+ * Returns the number of milliseconds the most recent call to
+ * prepareForWiFiRequests spent connecting to Wi-Fi. Returns 0 if we were
+ * already connected, and UNKNOWN_TELEMETRY if we failed to connect.
+ */
+int wiFiConnectTimeMs();
+
+/**
+ * Returns the strength of the Wi-Fi signal in dBm, or UNKNOWN_TELEMETRY if we
+ * are not connected to Wi-Fi.
+ */
+int wiFiRssi();
+
 /**
  * Handles the fact that we will not make any requests to a Wi-Fi server for the
  * specified amount of time, in tenths of a second.
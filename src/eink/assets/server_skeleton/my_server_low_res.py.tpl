@@ -1,10 +1,10 @@
 import os
 
-from eink.image import EinkGraphics
-${import_palette}from eink.server import Server
+${import_palette}from eink.image import ResourceCache
+from eink.image import TransformCache
+from eink.server import Server
 from PIL import Image
 from PIL import ImageDraw
-from PIL import ImageFont
 
 
 class MyServer(Server):
@@ -27,7 +27,7 @@ $palette_method
         # Load the font
         dir_ = os.path.dirname(os.path.abspath(__file__))
         font_filename = os.path.join(dir_, 'assets', 'GentiumPlus-R.ttf')
-        font = ImageFont.truetype(font_filename, 18)
+        font = ResourceCache.default().font(font_filename, 18)
 
         # Render the header text
         image = Image.new($image_line_break$image_mode, (MyServer.WIDTH, MyServer.HEIGHT), $background_color)
@@ -53,7 +53,7 @@ $palette_method
         gradient = Image.linear_gradient('L').resize((width, height))
         rotated_gradient = gradient.transpose(Image.ROTATE_90)
         shaded_circle = Image.composite(white, rotated_gradient, circle)
-        return EinkGraphics.dither(shaded_circle$palette_arg)
+        return TransformCache.default().dither(shaded_circle$palette_arg)
 
     @staticmethod
     def instance():
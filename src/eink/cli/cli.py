@@ -1,8 +1,18 @@
 from argparse import ArgumentParser
+from datetime import timedelta
+from importlib import import_module
+import logging
+import os
 import sys
 
 from ..generate import ServerCodeGenerator
+from ..server.http_server import HttpServer
+from ..server.long_poll_client import LongPollClient
+from ..server.replica_receiver import ReplicaReceiver
+from ..server.replica_store import ReplicaStore
+from ..server.replication_leader import ReplicationLeader
 from ..server.simulator import Simulator
+from ..server.static_publisher import StaticPublisher
 
 
 class Cli:
@@ -18,8 +28,114 @@ class Cli:
         parsed_args = Cli._parse_args(cli_args)
         if parsed_args.command == 'skeleton':
             ServerCodeGenerator.gen_skeleton()
+        elif parsed_args.command == 'serve':
+            logging.basicConfig(
+                format='%(asctime)s %(process)d %(levelname)s %(message)s',
+                level=logging.INFO)
+            server_spec = parsed_args.server
+            replica_dir = parsed_args.replica_dir
+
+            def server_factory():
+                server = Cli._load_server(server_spec)
+                if replica_dir is not None:
+                    server.use_replica_store(ReplicaStore(replica_dir))
+                return server
+
+            if parsed_args.long_poll_timeout is not None:
+                long_poll_timeout = timedelta(
+                    seconds=parsed_args.long_poll_timeout)
+            else:
+                long_poll_timeout = None
+            HttpServer(
+                server_factory, parsed_args.host, parsed_args.port,
+                parsed_args.path, parsed_args.workers,
+                parsed_args.max_request_size, tcp_port=parsed_args.tcp_port,
+                long_poll_timeout=long_poll_timeout).serve_forever()
+        elif parsed_args.command == 'publish':
+            logging.basicConfig(
+                format='%(asctime)s %(levelname)s %(message)s',
+                level=logging.INFO)
+            publisher = StaticPublisher(
+                Cli._load_server(parsed_args.server), parsed_args.dir)
+            if parsed_args.once:
+                publisher.publish()
+            else:
+                publisher.publish_forever()
+        elif parsed_args.command == 'lead':
+            logging.basicConfig(
+                format='%(asctime)s %(levelname)s %(message)s',
+                level=logging.INFO)
+            leader = ReplicationLeader(
+                Cli._load_server(parsed_args.server),
+                [Cli._parse_peer(peer) for peer in parsed_args.peers])
+            if parsed_args.once:
+                if leader.replicate():
+                    sys.exit(1)
+            else:
+                leader.replicate_forever()
+        elif parsed_args.command == 'receive':
+            logging.basicConfig(
+                format='%(asctime)s %(levelname)s %(message)s',
+                level=logging.INFO)
+            ReplicaReceiver(
+                ReplicaStore(parsed_args.dir), parsed_args.host,
+                parsed_args.port).serve_forever()
+        elif parsed_args.long_poll:
+            LongPollClient(parsed_args.url).poll_forever(
+                lambda image: image.show())
+        else:
+            image = Simulator.connect(parsed_args.url, parsed_args.static)
+            if image is not None:
+                image.show()
+            else:
+                print(
+                    'The server instructed the device to keep its current '
+                    'image')
+
+    @staticmethod
+    def _load_server(server_spec):
+        """Return the ``Server`` identified by the given specification.
+
+        Arguments:
+            server_spec (str): A string of the form
+                ``'module:ServerClass'``, where ``module`` is the name
+                of a module that may be imported from the current
+                directory and ``ServerClass`` is the name of a
+                ``Server`` subclass in that module. If the class has a
+                static ``instance()`` method, as in the skeleton code,
+                we return its result. Otherwise, we call the class's
+                initializer with no arguments.
+
+        Returns:
+            Server: The server.
+        """
+        module_name, separator, class_name = server_spec.partition(':')
+        if not separator or not module_name or not class_name:
+            raise ValueError(
+                'The server must be specified as module:ServerClass')
+        if os.getcwd() not in sys.path:
+            sys.path.insert(0, os.getcwd())
+        server_class = getattr(import_module(module_name), class_name)
+        instance = getattr(server_class, 'instance', None)
+        if callable(instance):
+            return instance()
         else:
-            Simulator.connect(parsed_args.url).show()
+            return server_class()
+
+    @staticmethod
+    def _parse_peer(peer_spec):
+        """Return the host and port identified by the given specification.
+
+        Arguments:
+            peer_spec (str): A string of the form ``'host:port'``.
+
+        Returns:
+            tuple<str, int>: The host and port.
+        """
+        host, separator, port = peer_spec.rpartition(':')
+        if not separator or not host or not port.isdigit():
+            raise ValueError('Each peer must be specified as host:port')
+        return (host, int(port))
 
     @staticmethod
     def _parse_args(cli_args):
@@ -43,7 +159,91 @@ class Cli:
             description='Connect to an e-ink server, and display what would '
             'be shown on the e-ink display.')
         connect_parser.add_argument(
-            'url', help='the server URL to connect to', metavar='URL')
+            'url', metavar='URL',
+            help='the server URL to connect to, or tcp://host:port to '
+            'connect using raw TCP')
+        connect_parser.add_argument(
+            '--static', action='store_true',
+            help='make a GET request, as in StaticWebTransport')
+        connect_parser.add_argument(
+            '--long-poll', action='store_true',
+            help='keep making long-poll requests, and display each new image '
+            'the server returns')
+        serve_parser = subparsers.add_parser(
+            'serve',
+            description='Run an e-ink server using the built-in HTTP server.')
+        serve_parser.add_argument(
+            'server', metavar='module:ServerClass',
+            help='the module containing the server and the name of its class')
+        serve_parser.add_argument(
+            '--host', default='',
+            help='the host to listen on (default: all interfaces)')
+        serve_parser.add_argument(
+            '--port', type=int, default=5000,
+            help='the port to listen on (default: 5000)')
+        serve_parser.add_argument(
+            '--path', default='/eink_server',
+            help='the URL path of the endpoint (default: /eink_server)')
+        serve_parser.add_argument(
+            '--workers', type=int, default=1,
+            help='the number of worker processes (default: 1)')
+        serve_parser.add_argument(
+            '--max-request-size', type=int, default=64 * 1024,
+            help='the maximum size of a request body in bytes (default: '
+            '65536)')
+        serve_parser.add_argument(
+            '--tcp-port', type=int,
+            help='the port to listen on for raw TCP connections from devices '
+            'that use a TcpTransport (default: none)')
+        serve_parser.add_argument(
+            '--replica-dir', metavar='DIR',
+            help='respond using the content a render leader replicated to '
+            'this directory, rather than rendering it (default: none)')
+        serve_parser.add_argument(
+            '--long-poll-timeout', type=float, metavar='SECONDS',
+            help='hold long-poll requests from mains-powered devices for up '
+            'to this many seconds, until the content changes (default: '
+            'respond immediately)')
+        publish_parser = subparsers.add_parser(
+            'publish',
+            description='Periodically write an e-ink server\'s content to a '
+            'directory, for devices that use a StaticWebTransport.')
+        publish_parser.add_argument(
+            'server', metavar='module:ServerClass',
+            help='the module containing the server and the name of its class')
+        publish_parser.add_argument(
+            'dir', metavar='DIR',
+            help='the directory to write to, e.g. a static file server\'s '
+            'document root')
+        publish_parser.add_argument(
+            '--once', action='store_true',
+            help='publish the content once and then exit')
+        lead_parser = subparsers.add_parser(
+            'lead',
+            description='Periodically render an e-ink server\'s content and '
+            'push it to serving nodes that are running "receive".')
+        lead_parser.add_argument(
+            'server', metavar='module:ServerClass',
+            help='the module containing the server and the name of its class')
+        lead_parser.add_argument(
+            'peers', metavar='host:port', nargs='+',
+            help='the address of each serving node\'s receiver')
+        lead_parser.add_argument(
+            '--once', action='store_true',
+            help='replicate the content once and then exit')
+        receive_parser = subparsers.add_parser(
+            'receive',
+            description='Receive content from a render leader running '
+            '"lead", for "serve --replica-dir".')
+        receive_parser.add_argument(
+            'dir', metavar='DIR',
+            help='the directory in which to store the content')
+        receive_parser.add_argument(
+            '--host', default='',
+            help='the host to listen on (default: all interfaces)')
+        receive_parser.add_argument(
+            '--port', type=int, default=5001,
+            help='the port to listen on (default: 5001)')
 
         parsed_args = parser.parse_args(cli_args)
         if parsed_args.command is None:
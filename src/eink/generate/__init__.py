@@ -2,10 +2,13 @@ from .client_code_generator import ClientCodeGenerator
 from .client_config import ClientConfig
 from .rotation import Rotation
 from .server_code_generator import ServerCodeGenerator
+from .static_web_transport import StaticWebTransport
 from .status_images import StatusImages
+from .tcp_transport import TcpTransport
 from .transport import Transport
 from .web_transport import WebTransport
 
 __all__ = [
     'ClientCodeGenerator', 'ClientConfig', 'Rotation', 'ServerCodeGenerator',
-    'StatusImages', 'Transport', 'WebTransport']
+    'StaticWebTransport', 'StatusImages', 'TcpTransport', 'Transport',
+    'WebTransport']
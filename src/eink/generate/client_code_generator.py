@@ -1,3 +1,4 @@
+from datetime import timedelta
 import os
 import shutil
 
@@ -6,14 +7,33 @@ from ..image.image_data import ImageData
 from ..project.project import Project
 from ..server import Server
 from ..server.server_io import ServerIO
+from .static_web_transport import StaticWebTransport
+from .tcp_transport import TcpTransport
 
 
 class ClientCodeGenerator:
     """Generates client-side source code for the Inkplate device."""
 
+    # The maximum value of ClientConfig._long_poll_timeout. The client's HTTP
+    # library accepts timeouts of up to about 65 seconds, and the client waits
+    # a few seconds longer than the long-poll timeout.
+    _MAX_LONG_POLL_TIMEOUT = timedelta(minutes=1)
+
     # The cached return value of _str_literal_list()
     _str_literal_list_cache = None
 
+    # The element of TRANSPORT_TYPES for a WebTransport. This duplicates the
+    # C++ constant TRANSPORT_TYPE_WEB.
+    _TRANSPORT_TYPE_WEB = 0
+
+    # The element of TRANSPORT_TYPES for a TcpTransport. This duplicates the
+    # C++ constant TRANSPORT_TYPE_TCP.
+    _TRANSPORT_TYPE_TCP = 1
+
+    # The element of TRANSPORT_TYPES for a StaticWebTransport. This duplicates
+    # the C++ constant TRANSPORT_TYPE_STATIC_WEB.
+    _TRANSPORT_TYPE_STATIC_WEB = 2
+
     @staticmethod
     def gen(config, dir_):
         """Generate client-side source code files for the Inkplate device.
@@ -37,6 +57,13 @@ class ClientCodeGenerator:
             raise ValueError('No Transports provided')
         if not config._wi_fi_networks:
             raise ValueError('No Wi-Fi networks provided')
+        long_poll_timeout = config._long_poll_timeout
+        if long_poll_timeout is not None and not (
+                timedelta() < long_poll_timeout <=
+                ClientCodeGenerator._MAX_LONG_POLL_TIMEOUT):
+            raise ValueError(
+                'The long-poll timeout must be positive and at most one '
+                'minute')
 
         status_images = config._status_images
         images = status_images._images
@@ -360,12 +387,31 @@ class ClientCodeGenerator:
             '// The maximum number of elements in ClientState.requestTimesDs\n'
             '#define MAX_REQUEST_TIMES {:d}\n\n'.format(
                 Server._MAX_REQUEST_TIMES))
+        file.write(
+            '// The maximum number of elements in ClientState.frameDelaysDs\n'
+            '#define MAX_FRAMES {:d}\n\n'.format(Server._MAX_FRAMES))
         file.write(
             '// The number of bytes in an image ID, as in the return value of '
             'the Python\n'
             '// method ServerIO.image_id\n'
             '#define STATUS_IMAGE_ID_LENGTH {:d}\n\n'.format(
                 ServerIO.STATUS_IMAGE_ID_LENGTH))
+        file.write(
+            '// The number of bytes in a frame ID, as in the return value of '
+            'the Python\n'
+            '// method ServerIO.frame_id\n'
+            '#define FRAME_ID_LENGTH {:d}\n\n'.format(
+                ServerIO.FRAME_ID_LENGTH))
+        file.write(
+            '// The number of frames in the frame cache\n'
+            '#define FRAME_CACHE_SIZE {:d}\n\n'.format(
+                Server._FRAME_CACHE_SIZE))
+        file.write(
+            '// The number of bytes in each checksummed chunk of the image '
+            'data in a\n'
+            '// response payload, except possibly the last\n'
+            '#define IMAGE_CHUNK_SIZE {:d}\n\n'.format(
+                ServerIO.IMAGE_CHUNK_SIZE))
         file.write(
             '// The number of elements in the return value of '
             'requestTransports()\n'
@@ -443,11 +489,42 @@ class ClientCodeGenerator:
                 program, in the order the client should try to connect
                 to them.
         """
-        transport_urls = list([
-            transport._url.encode() for transport in transports])
+        transport_types = []
+        transport_urls = []
+        transport_hosts = []
+        transport_ports = []
+        for transport in transports:
+            if isinstance(transport, TcpTransport):
+                transport_types.append(
+                    ClientCodeGenerator._TRANSPORT_TYPE_TCP)
+                transport_urls.append(b'')
+                transport_hosts.append(transport._host.encode())
+                transport_ports.append(transport._port)
+            elif isinstance(transport, StaticWebTransport):
+                transport_types.append(
+                    ClientCodeGenerator._TRANSPORT_TYPE_STATIC_WEB)
+                transport_urls.append(transport._url.encode())
+                transport_hosts.append(b'')
+                transport_ports.append(0)
+            else:
+                transport_types.append(
+                    ClientCodeGenerator._TRANSPORT_TYPE_WEB)
+                transport_urls.append(transport._url.encode())
+                transport_hosts.append(b'')
+                transport_ports.append(0)
+
+        file.write('const int TRANSPORT_TYPES[] = ')
+        ClientCodeGenerator._write_int_array(file, transport_types)
+        file.write(';\n')
         file.write('const char* TRANSPORT_URLS[] = ')
         ClientCodeGenerator._write_str_array(file, transport_urls)
         file.write(';\n')
+        file.write('const char* TRANSPORT_HOSTS[] = ')
+        ClientCodeGenerator._write_str_array(file, transport_hosts)
+        file.write(';\n')
+        file.write('const int TRANSPORT_PORTS[] = ')
+        ClientCodeGenerator._write_int_array(file, transport_ports)
+        file.write(';\n')
 
     @staticmethod
     def _write_generated_cpp(file, config):
@@ -466,6 +543,14 @@ class ClientCodeGenerator:
             '#include "status_image_data.h"\n\n\n')
         file.write(
             'const int ROTATION = {:d};\n'.format(config._rotation.value))
+        if config._long_poll_timeout is not None:
+            long_poll_timeout_ms = int(
+                config._long_poll_timeout.total_seconds() * 1000 + 0.5)
+        else:
+            long_poll_timeout_ms = 0
+        file.write(
+            'const int LONG_POLL_TIMEOUT_MS = {:d};\n'.format(
+                long_poll_timeout_ms))
 
         file.write('const char HEADER[] = ')
         ClientCodeGenerator._write_bytes_literal(file, ServerIO.HEADER, True)
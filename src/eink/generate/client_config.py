@@ -9,6 +9,9 @@ class ClientConfig:
 
     # Private attributes:
     #
+    # timedelta _long_poll_timeout - The maximum amount of time the server
+    #     holds a long-poll request, as in the long_poll_timeout argument to
+    #     HttpServer, or None if the client should not make long-poll requests.
     # Palette _palette - The color palette to use.
     # Rotation _rotation - The rotation to use when drawing to the Inkplate
     #     device.
@@ -38,6 +41,7 @@ class ClientConfig:
             self._transports = transport
         self._status_images = status_images
         self._wi_fi_networks = []
+        self._long_poll_timeout = None
         self._palette = Palette.THREE_BIT_GRAYSCALE
         self._rotation = Rotation.LANDSCAPE
 
@@ -55,6 +59,29 @@ class ClientConfig:
         """
         self._wi_fi_networks.append((ssid, password))
 
+    def set_long_poll_timeout(self, timeout):
+        """Make long-poll requests to a server that holds them.
+
+        By default, the client makes requests at the times the server
+        specifies, and sleeps in between. A device that is not battery
+        powered can instead make long-poll requests (see
+        ``Request.long_poll_frame_id``), so that it displays new content
+        as soon as it is available. After each successful request, the
+        client makes another one shortly afterward, without sleeping or
+        turning off Wi-Fi. Each server must hold long-poll requests, as
+        in the ``long_poll_timeout`` argument to ``HttpServer``, or else
+        the client makes requests every few seconds.
+
+        Arguments:
+            timeout (timedelta): The maximum amount of time the servers
+                hold a long-poll request, as in the
+                ``long_poll_timeout`` argument to ``HttpServer``. The
+                client waits somewhat longer than this for a response.
+                This may not exceed one minute. ``None`` indicates that
+                the client should not make long-poll requests.
+        """
+        self._long_poll_timeout = timeout
+
     def set_palette(self, palette):
         """Set the color palette to use.
 
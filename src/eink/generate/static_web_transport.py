@@ -0,0 +1,14 @@
+from .web_transport import WebTransport
+
+
+class StaticWebTransport(WebTransport):
+    """A ``Transport`` for fetching payloads from a static file server.
+
+    Each request is submitted as a GET request to a given URL, and the
+    response body is the response payload. The URL should refer to the
+    pointer file written by a ``StaticPublisher``, which may be served
+    by nginx or any other static file server. The device does not send
+    a request payload, so the server does not receive its device ID or
+    telemetry.
+    """
+    pass
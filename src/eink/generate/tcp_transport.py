@@ -0,0 +1,30 @@
+from .transport import Transport
+
+
+class TcpTransport(Transport):
+    """A ``Transport`` for connecting to a server over a raw TCP connection.
+
+    This avoids the overhead of HTTP. Each request payload is sent
+    preceded by its length, encoded as in ``ServerIO.write_int``, and
+    the server responds with the response payload preceded by its
+    length. A connection may carry multiple requests. The server side
+    is provided by the ``tcp_port`` argument to ``HttpServer`` (or the
+    ``--tcp-port`` option of ``einkserver serve``).
+    """
+
+    # Private attributes:
+    #
+    # str _host - The server's host name or IP address.
+    # int _port - The server's TCP port.
+
+    def __init__(self, host, port):
+        """Initialize a new ``TcpTransport``.
+
+        Arguments:
+            host (str): The server's host name or IP address.
+            port (int): The server's TCP port.
+        """
+        if not 0 < port < 65536:
+            raise ValueError('Invalid port number')
+        self._host = host
+        self._port = port
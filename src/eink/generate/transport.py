@@ -1,8 +1,9 @@
 class Transport:
     """A transport mechanism for the client to communicate with a server.
 
-    This is an abstract base class. For now, the only subclass is
-    ``WebTransport``, but we could imagine adding ``BluetoothTransport``
-    or ``SerialTransport`` in the future.
+    This is an abstract base class. For now, the subclasses are
+    ``WebTransport``, ``StaticWebTransport``, and ``TcpTransport``, but
+    we could imagine adding
+    ``BluetoothTransport`` or ``SerialTransport`` in the future.
     """
     pass
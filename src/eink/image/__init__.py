@@ -1,4 +1,12 @@
+from .array_image import ArrayImage
 from .eink_graphics import EinkGraphics
 from .palette import Palette
+from .reduction import Reduction
+from .region_image import RegionImage
+from .resource_cache import ResourceCache
+from .text_renderer import TextRenderer
+from .transform_cache import TransformCache
 
-__all__ = ['EinkGraphics', 'Palette']
+__all__ = [
+    'ArrayImage', 'EinkGraphics', 'Palette', 'Reduction', 'RegionImage',
+    'ResourceCache', 'TextRenderer', 'TransformCache']
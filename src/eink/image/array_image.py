@@ -0,0 +1,93 @@
+from PIL import Image
+
+
+class ArrayImage:
+    """An image whose pixels are stored in an array or other buffer.
+
+    ``Server.render()`` may return an ``ArrayImage``, or a NumPy array
+    or any other object that supports the buffer protocol, rather than
+    an ``Image``. This avoids the cost of converting numerically
+    computed frames, such as charts and heatmaps, to ``Image`` objects.
+    Where Pillow permits, we wrap the buffer without copying it.
+
+    The pixels are stored in row-major order, with one byte per
+    component. The following modes are supported:
+
+    * ``'L'``: Grayscale, with one byte per pixel.
+    * ``'RGB'``: Color, with three bytes per pixel. Pillow stores RGB
+      images with four bytes per pixel, so converting such an image to
+      an ``Image`` requires a copy.
+    * ``'P'``: Palette indices, with one byte per pixel. Each byte is
+      an index into the colors of the server's ``Palette``, so the
+      image does not need to be reduced to the palette.
+
+    Public attributes:
+
+    object data - The pixel data. This supports the buffer protocol.
+        The caller must not modify the data while the server is using
+        the image.
+    str mode - The image mode: ``'L'``, ``'RGB'``, or ``'P'``.
+    tuple<int, int> size - The width and height of the image.
+    """
+
+    def __init__(self, data, mode=None, size=None):
+        """Initialize a new ``ArrayImage``.
+
+        Arguments:
+            data (object): The pixel data. This must support the buffer
+                protocol. If it has two dimensions, such as a NumPy
+                array with shape ``(height, width)``, the default mode
+                is ``'L'``. If it has three dimensions with a last
+                dimension of 3, as in a NumPy array with shape
+                ``(height, width, 3)``, the default mode is ``'RGB'``.
+            mode (str): The image mode, as in the ``mode`` attribute.
+                This is required if ``data`` does not have two or three
+                dimensions.
+            size (tuple<int, int>): The width and height of the image.
+                This is required if ``data`` does not have two or three
+                dimensions.
+        """
+        view = memoryview(data)
+        if view.ndim == 2 or (view.ndim == 3 and view.shape[2] == 3):
+            if size is None:
+                size = (view.shape[1], view.shape[0])
+            if mode is None:
+                if view.ndim == 2:
+                    mode = 'L'
+                else:
+                    mode = 'RGB'
+        if mode not in ('L', 'RGB', 'P'):
+            raise ValueError('ArrayImage mode must be L, RGB, or P')
+        if size is None:
+            raise ValueError('The size of the ArrayImage must be specified')
+        if view.itemsize != 1:
+            raise ValueError('ArrayImage data must consist of bytes')
+        if not view.c_contiguous:
+            raise ValueError('ArrayImage data must be contiguous')
+        if view.nbytes != size[0] * size[1] * len(mode):
+            raise ValueError(
+                'The length of the ArrayImage data does not match its size')
+        self.data = data
+        self.mode = mode
+        self.size = tuple(size)
+
+    def to_image(self, palette):
+        """Return an ``Image`` with the pixels in this ``ArrayImage``.
+
+        For modes ``'L'`` and ``'P'``, the result shares memory with
+        ``data``, and it is read-only.
+
+        Arguments:
+            palette (Palette): The palette that the indices refer to,
+                for mode ``'P'``.
+
+        Returns:
+            Image: The image. This has the same mode as the
+            ``ArrayImage``.
+        """
+        view = memoryview(self.data).cast('B')
+        image = Image.frombuffer(
+            self.mode, self.size, view, 'raw', self.mode, 0, 1)
+        if self.mode == 'P':
+            image.putpalette(palette._flattened_colors())
+        return image
@@ -1,6 +1,9 @@
 from PIL import Image
 
+from .array_image import ArrayImage
 from .palette import Palette
+from .reduction import Reduction
+from .region_image import RegionImage
 
 
 class EinkGraphics:
@@ -18,6 +21,41 @@ class EinkGraphics:
         if EinkGraphics._has_alpha(image):
             raise ValueError('Alpha channels are not supported')
 
+    @staticmethod
+    def _is_reduced(image, palette):
+        """Return whether the given ``Image`` is already reduced to a palette.
+
+        This is the case if it has mode ``'P'``, its palette consists of
+        the colors of ``palette``, and each pixel is an index into
+        ``palette``.
+        """
+        return (
+            image.mode == 'P' and
+            image.getpalette() == palette._flattened_colors() and
+            image.getextrema()[1] < len(palette._colors))
+
+    @staticmethod
+    def _to_image(image, palette):
+        """Return an ``Image`` with the pixels of the specified image.
+
+        Arguments:
+            image (object): The image. This is an ``Image``, an
+                ``ArrayImage``, or an object that supports the buffer
+                protocol, as in the ``data`` argument to the
+                ``ArrayImage`` initializer.
+            palette (Palette): The palette that the image's indices
+                refer to, if it is an ``ArrayImage`` with mode ``'P'``.
+
+        Returns:
+            Image: The image. This shares memory with ``image`` where
+            possible.
+        """
+        if isinstance(image, Image.Image):
+            return image
+        if not isinstance(image, ArrayImage):
+            image = ArrayImage(image)
+        return image.to_image(palette)
+
     @staticmethod
     def round(image, palette=Palette.THREE_BIT_GRAYSCALE):
         """Return the result of rounding the given image to the given palette.
@@ -28,12 +66,28 @@ class EinkGraphics:
         device. The image may not have an alpha channel.
 
         This does not perform dithering. See also ``dither``.
+
+        The image may also be an ``ArrayImage`` or a buffer, such as a
+        NumPy array, as described in the comments for ``ArrayImage``.
+        An ``ArrayImage`` of mode ``'P'`` is already reduced, so we
+        return it as is, wrapped in an ``Image``. Likewise, we return an
+        ``Image`` of mode ``'P'`` whose palette consists of the colors
+        of ``palette``, such as a frame from ``Canvas.render()``, as is.
         """
+        if isinstance(image, ArrayImage) and image.mode == 'P':
+            return image.to_image(palette)
+        if (isinstance(image, Image.Image) and
+                EinkGraphics._is_reduced(image, palette)):
+            return image
+        image = EinkGraphics._to_image(image, palette)
         EinkGraphics._assert_doesnt_have_alpha(image)
         if palette._is_grayscale:
             # First convert to grayscale, in order to apply the luminosity
             # transform function L = 0.299 * R + 0.587 * G + 0.114 * B
-            grayscale_image = image.convert('L')
+            if image.mode == 'L':
+                grayscale_image = image
+            else:
+                grayscale_image = image.convert('L')
 
             # At time of writing, the "quantize" method rounds each component
             # down to the nearest multiple of four before rounding a pixel to
@@ -64,11 +118,110 @@ class EinkGraphics:
         However, in some cases, a more flatly shaded look might be
         preferable. For example, dithering might be undesirable for
         icons that have large areas of solid shading.
+
+        The image may also be an ``ArrayImage`` or a buffer, as in
+        ``round``.
         """
+        image = EinkGraphics._to_image(image, palette)
         EinkGraphics._assert_doesnt_have_alpha(image)
-        if palette._is_grayscale:
+        if palette._is_grayscale and image.mode != 'L':
             # First convert to grayscale, in order to apply the luminosity
             # transform function L = 0.299 * R + 0.587 * G + 0.114 * B
             image = image.convert('L')
         return image.convert('RGB').quantize(
             dither=Image.Dither.FLOYDSTEINBERG, palette=palette._image())
+
+    @staticmethod
+    def _reduce(image, reduction, palette):
+        """Return the result of reducing the given image to the given palette.
+
+        Arguments:
+            image (Image): The image.
+            reduction (Reduction): The method to use.
+            palette (Palette): The palette.
+
+        Returns:
+            Image: The result. This has mode ``'L'`` if the palette is
+            grayscale and ``'P'`` otherwise.
+        """
+        if reduction == Reduction.DITHER:
+            result = EinkGraphics.dither(image, palette)
+        else:
+            result = EinkGraphics.round(image, palette)
+        if palette._is_grayscale and result.mode != 'L':
+            return result.convert('L')
+        return result
+
+    @staticmethod
+    def reduce(image, palette=Palette.THREE_BIT_GRAYSCALE):
+        """Return the result of reducing the given image to the given palette.
+
+        If ``image`` is an ``Image``, this is equivalent to
+        ``round(image, palette)``. If it is a ``RegionImage``, we reduce
+        each of its regions using the region's ``Reduction``, and we
+        reduce the rest of the image using its ``default_reduction``.
+        The image may not have an alpha channel.
+
+        Dithering only diffuses error within a region, so each dithered
+        region looks the same as it would if we dithered it as a
+        separate image. Rounding treats each pixel separately, so if the
+        default reduction is ``Reduction.ROUND``, we do not reduce
+        rounded regions a second time, except where they cover earlier
+        regions.
+
+        Arguments:
+            image (object): The image. This is an ``Image``, an
+                ``ArrayImage``, a buffer as in ``round``, or a
+                ``RegionImage``.
+            palette (Palette): The palette.
+
+        Returns:
+            Image: The result. This has mode ``'L'`` if the palette is
+            grayscale and ``'P'`` otherwise, unless ``image`` is not a
+            ``RegionImage`` and is already reduced, as in ``round``.
+        """
+        if not isinstance(image, RegionImage):
+            return EinkGraphics.round(image, palette)
+
+        source = EinkGraphics._to_image(image.image, palette)
+        EinkGraphics._assert_doesnt_have_alpha(source)
+        result = EinkGraphics._reduce(
+            source, image.default_reduction, palette)
+        copied = result is not source
+
+        # The boxes of the regions we have pasted into the result
+        pasted_boxes = []
+        for box, reduction in image.regions:
+            left = max(box[0], 0)
+            top = max(box[1], 0)
+            right = min(box[2], source.width)
+            bottom = min(box[3], source.height)
+            if left >= right or top >= bottom:
+                continue
+            clipped_box = (left, top, right, bottom)
+            if (reduction == Reduction.ROUND and
+                    image.default_reduction == Reduction.ROUND and
+                    not any(
+                        EinkGraphics._intersects(clipped_box, pasted_box)
+                        for pasted_box in pasted_boxes)):
+                # The result already has the rounded pixels
+                continue
+            if not copied:
+                # The source is already reduced, as in round. Don't modify
+                # it.
+                result = result.copy()
+                copied = True
+            result.paste(
+                EinkGraphics._reduce(
+                    source.crop(clipped_box), reduction, palette),
+                clipped_box)
+            pasted_boxes.append(clipped_box)
+        return result
+
+    @staticmethod
+    def _intersects(box1, box2):
+        """Return whether the specified boxes have a non-empty intersection.
+        """
+        return (
+            box1[0] < box2[2] and box2[0] < box1[2] and
+            box1[1] < box2[3] and box2[1] < box1[3])
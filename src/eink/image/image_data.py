@@ -2,6 +2,8 @@ import io
 
 from PIL import Image
 
+from .eink_graphics import EinkGraphics
+
 
 class ImageData:
     """Provides methods for converting an ``Image`` to image file data."""
@@ -53,6 +55,42 @@ class ImageData:
         Returns:
             bytes: The image file data.
         """
-        p_image = image.convert('RGB').quantize(
-            dither=Image.Dither.NONE, palette=palette._image())
+        if palette._is_grayscale and image.mode == 'L':
+            # Map each gray level directly to its palette index, rather than
+            # converting to RGB and quantizing
+            p_image = image.point(palette._index_lookup_table())
+            p_image.putpalette(palette._flattened_colors())
+        elif EinkGraphics._is_reduced(image, palette):
+            # The pixels are already indices into the palette
+            p_image = image
+        else:
+            p_image = image.convert('RGB').quantize(
+                dither=Image.Dither.NONE, palette=palette._image())
         return ImageData._render(p_image, 'PNG', optimize=optimize)
+
+    @staticmethod
+    def reencode_png(image_data, palette, coarse=False):
+        """Return a cheaper encoding of the specified PNG image file data.
+
+        This spends extra time minimizing the length of the data, as in
+        the ``optimize`` argument to ``render_png``.
+
+        Arguments:
+            image_data (bytes): The PNG image file data, as returned by
+                ``render_png``.
+            palette (Palette): The color palette for the image.
+            coarse (bool): Whether to round each pixel to the nearest
+                color in a coarser palette, with about half as many
+                colors. This reduces the length of the data at the
+                expense of image quality. It only applies to grayscale
+                palettes with more than two colors.
+
+        Returns:
+            bytes: The image file data.
+        """
+        image = Image.open(io.BytesIO(image_data))
+        if coarse and palette._coarse() is not palette:
+            return ImageData.render_png(
+                image.convert('L'), palette._coarse(), True)
+        else:
+            return ImageData.render_png(image, palette, True)
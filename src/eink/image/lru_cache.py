@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import threading
+
+
+class LruCache:
+    """A map that evicts its least recently used entries to limit its size.
+
+    Each entry has a size, which is an estimate of the amount of memory
+    it uses in bytes. Whenever the total size of the entries exceeds the
+    cache's maximum size, we remove the least recently used entries
+    until it doesn't (or until the cache is empty).
+
+    ``LruCache`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # OrderedDict<object, tuple<object, int>> _entries - A map from each key
+    #     to a pair of its value and its size. The entries are in order from
+    #     least recently to most recently used.
+    # Lock _lock - The lock for accessing the fields of this LruCache.
+    # int _max_size - The maximum total size of the entries.
+    # int _size - The total size of the entries.
+
+    def __init__(self, max_size):
+        """Initialize a new ``LruCache``.
+
+        Arguments:
+            max_size (int): The maximum total size of the entries.
+        """
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._size = 0
+
+    def get(self, key):
+        """Return the value for the specified key, or ``None`` if it is absent.
+
+        This marks the entry as the most recently used entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        """Set the value for the specified key.
+
+        Arguments:
+            key (object): The key. This must be hashable.
+            value (object): The value. This may not be ``None``.
+            size (int): The size of the entry.
+        """
+        with self._lock:
+            prev_entry = self._entries.pop(key, None)
+            if prev_entry is not None:
+                self._size -= prev_entry[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self._max_size and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def remove(self, key):
+        """Remove the entry for the specified key, if any."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry[1]
+
+    def clear(self):
+        """Remove all of the entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def size(self):
+        """Return the total size of the entries."""
+        with self._lock:
+            return self._size
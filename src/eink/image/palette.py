@@ -19,10 +19,13 @@ class Palette:
 
     # Private attributes:
     #
+    # Palette _coarse_cache - The cached return value of _coarse().
     # list<tuple<int, int, int>> _colors - The colors in the palette. Each
     #     color is represented as a tuple of the red, green, and blue
     #     components, in the range [0, 255].
     # Image _image_cache - The cached return value of _image().
+    # list<int> _index_lookup_table_cache - The cached return value of
+    #     _index_lookup_table().
     # bool _is_grayscale - Whether the palette consists exclusively of
     #     grayscale colors.
     # string _name - A string identifying the palette in client code. This
@@ -39,6 +42,8 @@ class Palette:
         self._name = name
         self._round_lookup_table_cache = None
         self._image_cache = None
+        self._index_lookup_table_cache = None
+        self._coarse_cache = None
 
         self._is_grayscale = True
         for color in colors:
@@ -66,6 +71,30 @@ class Palette:
                 self._round_lookup_table_cache.append(sorted_colors[index])
         return self._round_lookup_table_cache
 
+    def _coarse(self):
+        """Return a coarser version of this palette.
+
+        For a grayscale palette with more than two colors, this returns
+        a palette with about half as many colors, evenly spaced among
+        this palette's colors and including the darkest and lightest
+        colors. Images that use fewer colors compress better. For other
+        palettes, this returns ``self``. The returned palette has the
+        same name as this palette.
+        """
+        if self._coarse_cache is None:
+            if not self._is_grayscale or len(self._colors) <= 2:
+                self._coarse_cache = self
+            else:
+                sorted_colors = sorted(self._colors)
+                count = (len(sorted_colors) + 1) // 2
+                self._coarse_cache = Palette(
+                    list([
+                        sorted_colors[
+                            round(i * (len(sorted_colors) - 1) / (count - 1))]
+                        for i in range(count)]),
+                    self._name)
+        return self._coarse_cache
+
     def _image(self):
         """Return an ``Image`` whose palette is the colors of this palette.
 
@@ -73,13 +102,38 @@ class Palette:
         the colors of this palette.
         """
         if self._image_cache is None:
-            palette = []
-            for color in self._colors:
-                palette.extend(color)
             self._image_cache = Image.new('P', (1, 1))
-            self._image_cache.putpalette(palette)
+            self._image_cache.putpalette(self._flattened_colors())
         return self._image_cache
 
+    def _flattened_colors(self):
+        """Return the colors of this palette as a flat list of components.
+
+        Return a list consisting of the red, green, and blue components
+        of the first color, followed by those of the second color, and
+        so on. This is suitable for passing to ``Image.putpalette``.
+        """
+        flattened_colors = []
+        for color in self._colors:
+            flattened_colors.extend(color)
+        return flattened_colors
+
+    def _index_lookup_table(self):
+        """Return a lookup table for rounding to the nearest color's index.
+
+        Assume that ``_is_grayscale`` is true. The return value is an
+        array of 256 integers. The (i + 1)th element is the index in
+        ``_colors`` of the palette color nearest to the color ``(i, i,
+        i)`` (with ties broken arbitrarily).
+        """
+        if self._index_lookup_table_cache is None:
+            indices = {}
+            for index, color in enumerate(self._colors):
+                indices.setdefault(color[0], index)
+            self._index_lookup_table_cache = list([
+                indices[color] for color in self._round_lookup_table()])
+        return self._index_lookup_table_cache
+
 
 Palette.THREE_BIT_GRAYSCALE = Palette(
     [(round(255 * color / 7),) * 3 for color in range(8)], '3_BIT_GRAYSCALE')
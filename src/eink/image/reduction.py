@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class Reduction(Enum):
+    """A method for reducing a region of an image to a ``Palette``."""
+
+    # Round each pixel to the nearest palette color, as in EinkGraphics.round.
+    # This is appropriate for text, icons, and line art.
+    ROUND = 1
+
+    # Use dithering, as in EinkGraphics.dither. This is appropriate for photos
+    # and gradients.
+    DITHER = 2
@@ -0,0 +1,45 @@
+from .reduction import Reduction
+
+
+class RegionImage:
+    """An image whose regions are reduced to a palette in different ways.
+
+    ``Server.render()`` may return a ``RegionImage`` rather than an
+    ``Image`` in order to have different parts of the frame reduced to
+    the device's palette differently. For example, a dashboard might
+    dither a photo while rounding the surrounding text, so that the
+    text stays crisp and only the photo pays the cost of dithering.
+    See ``EinkGraphics.reduce``.
+
+    Public attributes:
+
+    Reduction default_reduction - The method for reducing the parts of
+        the image that are not in any region.
+    object image - The image. This is an ``Image``, which may not have
+        an alpha channel, or an ``ArrayImage`` or buffer, as in
+        ``EinkGraphics.round``.
+    list<tuple<tuple<int, int, int, int>, Reduction>> regions - The
+        regions, in order. Each region is a pair of a box and the method
+        for reducing the pixels in the box. A box is a tuple of the
+        left, top, right, and bottom coordinates, where the right and
+        bottom coordinates are exclusive. Where regions overlap, later
+        regions take precedence over earlier regions.
+    """
+
+    def __init__(self, image, regions=None, default_reduction=Reduction.ROUND):
+        self.image = image
+        if regions is not None:
+            self.regions = list(regions)
+        else:
+            self.regions = []
+        self.default_reduction = default_reduction
+
+    def add_region(self, box, reduction):
+        """Add a region to the end of ``regions``.
+
+        Arguments:
+            box (tuple<int, int, int, int>): The box, as in ``regions``.
+            reduction (Reduction): The method for reducing the pixels in
+                the box.
+        """
+        self.regions.append((tuple(box), reduction))
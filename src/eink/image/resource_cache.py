@@ -0,0 +1,157 @@
+import os
+import threading
+
+from PIL import Image
+from PIL import ImageFont
+
+from .lru_cache import LruCache
+
+
+class ResourceCache:
+    """Caches fonts, images, and other assets that are loaded from files.
+
+    ``Server.render()`` is typically called many times with the same
+    fonts and images, and loading them from disk each time is wasteful.
+    A ``ResourceCache`` loads each asset once and then returns the same
+    object until the file's modification time or size changes. It
+    limits the amount of memory it uses by evicting the least recently
+    used assets.
+
+    Callers must not modify the objects that a ``ResourceCache``
+    returns, since they are shared between calls. For example, use
+    ``image.copy()`` before drawing on an ``Image`` returned by
+    ``image``.
+
+    ``ResourceCache`` is thread-safe. Most programs can use the shared
+    instance returned by ``ResourceCache.default()``.
+    """
+
+    # Private attributes:
+    #
+    # LruCache _cache - The cached assets. Each key is a tuple whose first
+    #     element is a string identifying the type of asset, whose second
+    #     element is the absolute filename, and whose remaining elements are
+    #     the parameters used to load the asset. Each value is a pair of the
+    #     file's signature, as in _signature, and the asset.
+
+    # The shared instance returned by default()
+    _default_instance = None
+
+    # The lock for creating _default_instance
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """Initialize a new ``ResourceCache``.
+
+        Arguments:
+            max_bytes (int): The approximate maximum number of bytes of
+                memory to use for the cached assets.
+        """
+        self._cache = LruCache(max_bytes)
+
+    @staticmethod
+    def default():
+        """Return the shared ``ResourceCache``."""
+        if ResourceCache._default_instance is None:
+            with ResourceCache._default_lock:
+                if ResourceCache._default_instance is None:
+                    ResourceCache._default_instance = ResourceCache()
+        return ResourceCache._default_instance
+
+    @staticmethod
+    def _signature(filename):
+        """Return a value that changes when the specified file changes.
+
+        Arguments:
+            filename (str): The filename.
+
+        Returns:
+            tuple<int, int>: The signature.
+        """
+        stat = os.stat(filename)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self, filename, loader, params=(), size=None):
+        """Return the asset that ``loader`` loads from the specified file.
+
+        Arguments:
+            filename (str): The filename.
+            loader (callable): A function for loading the asset. We call
+                ``loader(filename, *params)`` if the asset is not
+                cached.
+            params (tuple): Additional arguments to ``loader``. These
+                must be hashable.
+            size (callable): A function for estimating the number of
+                bytes of memory an asset uses. We call ``size(asset)``.
+                If this is ``None``, we use the size of the file.
+
+        Returns:
+            object: The asset.
+        """
+        filename = os.path.abspath(filename)
+        signature = ResourceCache._signature(filename)
+        key = (loader, filename) + tuple(params)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        asset = loader(filename, *params)
+        if size is not None:
+            asset_size = size(asset)
+        else:
+            asset_size = signature[1]
+        self._cache.put(key, (signature, asset), asset_size)
+        return asset
+
+    def font(self, filename, size, index=0):
+        """Return a TrueType or OpenType font, as in ``ImageFont.truetype``.
+
+        Arguments:
+            filename (str): The font filename.
+            size (int): The font size.
+            index (int): The font face to load, for files that contain
+                multiple faces.
+
+        Returns:
+            FreeTypeFont: The font.
+        """
+        return self.load(
+            filename, ResourceCache._load_font, (size, index))
+
+    def image(self, filename):
+        """Return the ``Image`` stored in the specified file.
+
+        The image is fully loaded, so that there is no need to keep the
+        file open.
+
+        Arguments:
+            filename (str): The filename.
+
+        Returns:
+            Image: The image.
+        """
+        return self.load(
+            filename, ResourceCache._load_image,
+            size=ResourceCache._image_size)
+
+    def clear(self):
+        """Remove all of the cached assets."""
+        self._cache.clear()
+
+    @staticmethod
+    def _load_font(filename, size, index):
+        """Loader function for ``font``."""
+        return ImageFont.truetype(filename, size, index)
+
+    @staticmethod
+    def _load_image(filename):
+        """Loader function for ``image``."""
+        with Image.open(filename) as image:
+            image.load()
+            return image.copy()
+
+    @staticmethod
+    def _image_size(image):
+        """Return the approximate number of bytes used by the given ``Image``.
+        """
+        return image.width * image.height * len(image.getbands())
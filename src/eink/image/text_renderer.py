@@ -0,0 +1,174 @@
+import os
+
+from PIL import Image
+from PIL import ImageDraw
+
+from .eink_graphics import EinkGraphics
+from .lru_cache import LruCache
+from .palette import Palette
+
+
+class TextRenderer:
+    """Draws text onto images, caching the rasterized text.
+
+    Rasterizing text with ``ImageDraw.text`` is relatively slow, and
+    ``Server.render()`` often draws the same labels in the same fonts
+    every time it is called. ``TextRenderer`` rasterizes each run of
+    text once, and then composites the cached raster onto subsequent
+    images.
+
+    The cached rasters are reduced to a particular ``Palette``. The
+    text color is rounded to the nearest palette color. For grayscale
+    palettes, the anti-aliased edges of the glyphs are rounded to the
+    levels of the palette, so that drawing black or white text on a
+    black or white background only produces colors in the palette. For
+    other palettes, the edges are not anti-aliased.
+
+    Only ``FreeTypeFont`` objects loaded from a file or from bytes, as
+    with ``ImageFont.truetype``, are cached. Fonts loaded from the same
+    source with the same arguments share cache entries. Text in other
+    fonts, and in variable fonts, whose current variation we cannot
+    determine, is rasterized each time it is drawn.
+
+    ``TextRenderer`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # LruCache _cache - The cached text runs. Each key is a tuple of the
+    #     arguments that affect the raster, as in _key. Each value is a tuple
+    #     of the x and y offsets of the raster relative to the drawing
+    #     position, the raster's mask, and the color to fill it with.
+    # list<int> _mask_lookup_table - A lookup table that we pass to
+    #     Image.point to reduce a mask's levels to the palette.
+    # Palette _palette - The palette to reduce to.
+
+    def __init__(
+            self, palette=Palette.THREE_BIT_GRAYSCALE,
+            max_bytes=16 * 1024 * 1024):
+        """Initialize a new ``TextRenderer``.
+
+        Arguments:
+            palette (Palette): The palette to reduce the text to.
+            max_bytes (int): The approximate maximum number of bytes of
+                memory to use for the cached text.
+        """
+        self._cache = LruCache(max_bytes)
+        self._palette = palette
+        if palette._is_grayscale:
+            self._mask_lookup_table = palette._round_lookup_table()
+        else:
+            self._mask_lookup_table = [
+                255 if value >= 128 else 0 for value in range(256)]
+
+    def draw_text(
+            self, image, xy, text, font, fill=0, anchor=None, spacing=4,
+            align='left'):
+        """Draw the specified text onto the specified ``Image``.
+
+        The arguments are the same as those for
+        ``ImageDraw.multiline_text``, so the text may consist of
+        multiple lines.
+
+        Arguments:
+            image (Image): The image to draw onto. This must have mode
+                ``'L'`` or ``'RGB'``.
+            xy (tuple<int, int>): The anchor coordinates of the text.
+            text (str): The text.
+            font (FreeTypeFont): The font.
+            fill (object): The color of the text, in a format
+                appropriate for the image's mode.
+            anchor (str): The text anchor, as in
+                ``ImageDraw.multiline_text``.
+            spacing (int): The number of pixels between lines.
+            align (str): The alignment of the lines: ``'left'``,
+                ``'center'``, or ``'right'``.
+        """
+        key = TextRenderer._key(
+            image.mode, text, font, fill, anchor, spacing, align)
+        if key is not None:
+            entry = self._cache.get(key)
+        else:
+            entry = None
+        if entry is None:
+            entry = self._render(
+                image.mode, text, font, fill, anchor, spacing, align)
+            if key is not None:
+                mask = entry[2]
+                self._cache.put(key, entry, mask.width * mask.height)
+
+        left, top, mask, reduced_fill = entry
+        if mask.width > 0 and mask.height > 0:
+            image.paste(
+                reduced_fill, (round(xy[0]) + left, round(xy[1]) + top),
+                mask)
+
+    @staticmethod
+    def _font_key(font):
+        """Return the part of a cache key that identifies a font.
+
+        Return ``None`` if we should not cache text in the font. See
+        the comments for ``TextRenderer``.
+        """
+        path = getattr(font, 'path', None)
+        if isinstance(path, (str, bytes, os.PathLike)):
+            source = os.fspath(path)
+        else:
+            # The font was loaded from a file object. Bytes objects cache
+            # their hash codes, so using the font's bytes in the key is
+            # cheap.
+            source = getattr(font, 'font_bytes', None)
+            if source is None:
+                return None
+
+        try:
+            font.get_variation_axes()
+            return None
+        except (AttributeError, OSError):
+            # This is not a variable font
+            pass
+        return (
+            source, font.size, font.index, font.encoding, font.layout_engine)
+
+    @staticmethod
+    def _key(mode, text, font, fill, anchor, spacing, align):
+        """Return the cache key for a call to ``draw_text``.
+
+        Return ``None`` if we should not cache the text.
+        """
+        font_key = TextRenderer._font_key(font)
+        if font_key is None:
+            return None
+        if isinstance(fill, list):
+            fill = tuple(fill)
+        return (mode, text, font_key, fill, anchor, spacing, align)
+
+    def _render(self, mode, text, font, fill, anchor, spacing, align):
+        """Rasterize the specified text.
+
+        Returns:
+            tuple<int, int, Image, object>: A tuple of the x and y
+            offsets of the raster relative to the drawing position, the
+            mask for the raster, and the color to fill it with.
+        """
+        if mode not in ('L', 'RGB'):
+            raise ValueError(
+                'TextRenderer only supports images of mode L or RGB')
+        draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+        left, top, right, bottom = draw.multiline_textbbox(
+            (0, 0), text, font=font, anchor=anchor, spacing=spacing,
+            align=align)
+        mask = Image.new('L', (max(right - left, 0), max(bottom - top, 0)), 0)
+        ImageDraw.Draw(mask).multiline_text(
+            (-left, -top), text, fill=255, font=font, anchor=anchor,
+            spacing=spacing, align=align)
+        mask = mask.point(self._mask_lookup_table)
+
+        color = EinkGraphics.round(
+            Image.new(mode, (1, 1), fill), self._palette)
+        reduced_fill = color.convert(mode).getpixel((0, 0))
+        return (left, top, mask, reduced_fill)
+
+    def clear(self):
+        """Remove all of the cached text."""
+        self._cache.clear()
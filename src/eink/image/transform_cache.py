@@ -0,0 +1,140 @@
+import hashlib
+import threading
+
+from .eink_graphics import EinkGraphics
+from .lru_cache import LruCache
+from .palette import Palette
+
+
+class TransformCache:
+    """Memoizes ``EinkGraphics.round``, ``EinkGraphics.dither``, and resizing.
+
+    Reducing an image to a palette, especially using dithering, is
+    relatively slow. Static artwork, such as icons and photos, is
+    usually reduced the same way every time ``Server.render()`` is
+    called. ``TransformCache`` stores the results of these transforms,
+    keyed by a hash of the source image's contents and the transform's
+    parameters, so that each image is only transformed once. It limits
+    the amount of memory it uses by evicting the least recently used
+    results.
+
+    Callers must not modify the images that a ``TransformCache``
+    returns, since they are shared between calls.
+
+    ``TransformCache`` is thread-safe. Most programs can use the shared
+    instance returned by ``TransformCache.default()``.
+    """
+
+    # Private attributes:
+    #
+    # LruCache _cache - The cached results. Each key is a tuple whose first
+    #     element is the name of the transform, whose second element is the
+    #     return value of _content_hash for the source image, and whose
+    #     remaining elements are the transform's parameters. Each value is
+    #     the resulting Image.
+
+    # The shared instance returned by default()
+    _default_instance = None
+
+    # The lock for creating _default_instance
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """Initialize a new ``TransformCache``.
+
+        Arguments:
+            max_bytes (int): The approximate maximum number of bytes of
+                memory to use for the cached images.
+        """
+        self._cache = LruCache(max_bytes)
+
+    @staticmethod
+    def default():
+        """Return the shared ``TransformCache``."""
+        if TransformCache._default_instance is None:
+            with TransformCache._default_lock:
+                if TransformCache._default_instance is None:
+                    TransformCache._default_instance = TransformCache()
+        return TransformCache._default_instance
+
+    @staticmethod
+    def _content_hash(image):
+        """Return a hash of the contents of the specified ``Image``.
+
+        Two images have the same hash if they have the same mode, size,
+        pixels, and (for palette images) palette.
+
+        Returns:
+            bytes: The hash.
+        """
+        hash_ = hashlib.sha256()
+        hash_.update('{:s} {:d} {:d}\n'.format(
+            image.mode, image.width, image.height).encode())
+        if image.mode == 'P':
+            hash_.update(bytes(image.getpalette() or []))
+        hash_.update(image.tobytes())
+        return hash_.digest()
+
+    def _transform(self, image, name, params, transform):
+        """Return the result of the specified transform, using the cache.
+
+        Arguments:
+            image (Image): The source image.
+            name (str): The name of the transform.
+            params (tuple): The transform's parameters, which must be
+                hashable.
+            transform (callable): A function that performs the
+                transform. We call ``transform()`` if the result is not
+                cached.
+
+        Returns:
+            Image: The result.
+        """
+        key = (name, TransformCache._content_hash(image)) + params
+        result = self._cache.get(key)
+        if result is None:
+            result = transform()
+            self._cache.put(
+                key, result,
+                result.width * result.height * len(result.getbands()))
+        return result
+
+    def round(self, image, palette=Palette.THREE_BIT_GRAYSCALE):
+        """Return the same result as ``EinkGraphics.round(image, palette)``.
+        """
+        return self._transform(
+            image, 'round', (palette,),
+            lambda: EinkGraphics.round(image, palette))
+
+    def dither(self, image, palette=Palette.THREE_BIT_GRAYSCALE):
+        """Return the same result as ``EinkGraphics.dither(image, palette)``.
+        """
+        return self._transform(
+            image, 'dither', (palette,),
+            lambda: EinkGraphics.dither(image, palette))
+
+    def resize(self, image, size, resample=None):
+        """Return the same result as ``image.resize(size, resample)``.
+
+        Arguments:
+            image (Image): The image to resize.
+            size (tuple<int, int>): The width and height to resize to.
+            resample (int): The resampling filter, as in
+                ``Image.resize``. If this is ``None``, we use the
+                default filter for the image's mode.
+
+        Returns:
+            Image: The resized image.
+        """
+        size = tuple(size)
+        if resample is None:
+            return self._transform(
+                image, 'resize', (size, None), lambda: image.resize(size))
+        else:
+            return self._transform(
+                image, 'resize', (size, resample),
+                lambda: image.resize(size, resample))
+
+    def clear(self):
+        """Remove all of the cached images."""
+        self._cache.clear()
@@ -1,5 +1,23 @@
+from .adaptive_encoder import AdaptiveEncoder
 from .errors import ServerError
+from .frame_cache import FrameCache
+from .http_server import HttpServer
+from .long_poll_client import LongPollClient
+from .metrics_sink import MetricsSink
+from .prerenderer import Prerenderer
+from .replica_receiver import ReplicaReceiver
+from .replica_store import ReplicaStore
+from .replication_leader import ReplicationLeader
+from .request import Request
+from .schedule_policy import SchedulePolicy
 from .server import Server
 from .simulator import Simulator
+from .static_publisher import StaticPublisher
+from .transport_balancer import TransportBalancer
 
-__all__ = ['Server', 'ServerError', 'Simulator']
+__all__ = [
+    'AdaptiveEncoder', 'FrameCache', 'HttpServer', 'LongPollClient',
+    'MetricsSink', 'Prerenderer',
+    'ReplicaReceiver', 'ReplicaStore', 'ReplicationLeader', 'Request',
+    'SchedulePolicy', 'Server', 'ServerError', 'Simulator',
+    'StaticPublisher', 'TransportBalancer']
@@ -0,0 +1,237 @@
+from collections import OrderedDict
+from datetime import timedelta
+import threading
+
+from ..image.image_data import ImageData
+from ..image.lru_cache import LruCache
+from .server_io import ServerIO
+
+
+class AdaptiveEncoder:
+    """Chooses cheaper image encodings for devices with poor connections.
+
+    By default, every device receives the same image file data. If a
+    ``Server`` has an ``AdaptiveEncoder`` (see
+    ``Server.adaptive_encoder()``), then for devices whose connections
+    are slow or unreliable, we re-encode the images to reduce the
+    amount of data we send. There are three levels of encoding:
+
+    * ``NORMAL``: The image file data, unchanged.
+    * ``COMPRESSED``: The same image, with a stronger PNG compression
+      profile. This is somewhat smaller and looks the same.
+    * ``COARSE``: The image rounded to a coarser palette, with about
+      half as many shades of gray, with the stronger compression
+      profile. This is typically much smaller, at the expense of image
+      quality. For palettes other than grayscale palettes with more
+      than two colors, this is the same as ``COMPRESSED``.
+
+    We choose the level based on the Wi-Fi signal strength that the
+    device reports (see ``Request.wi_fi_rssi``) and on how long it has
+    taken the device to download previous images. We estimate the
+    latter using ``Request.draw_time_ms``, which includes the time it
+    took to download the image we previously sent, and the length of
+    that image.
+
+    ``AdaptiveEncoder`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # LruCache<tuple<bytes, int>, bytes> _cache - A cache from the frame ID
+    #     (as in ServerIO.frame_id) of the original image file data and the
+    #     encoding level to the re-encoded image file data.
+    # OrderedDict<bytes, tuple<int, float>> _devices - A map from the ID of
+    #     each device we are tracking to a pair of the number of bytes of
+    #     image data we sent in our most recent response to the device and
+    #     our estimate of the number of seconds it takes the device to
+    #     download a byte. The number of bytes is 0 if we have already used
+    #     it to update the estimate, and the estimate is None if we do not
+    #     have one. The entries are in order from least recently to most
+    #     recently used.
+    # int _draw_overhead_ms - Our estimate of the number of milliseconds of
+    #     Request.draw_time_ms that a device spends on things other than
+    #     downloading the image.
+    # int _fair_rssi - The RSSI below which we use at least COMPRESSED.
+    # Lock _lock - The lock for accessing _devices.
+    # int _max_devices - The maximum number of entries in _devices.
+    # LruCache<bytes, bytes> _sources - A cache from the frame ID of each
+    #     re-encoded image in _cache to the frame ID of the original image.
+    #     Each entry has a size of 1.
+    # timedelta _max_transfer_time - The amount of time it should take a
+    #     device to download an image. If we estimate that downloading the
+    #     original image would take longer, we use at least COMPRESSED, and
+    #     if we estimate it would take more than twice as long, we use
+    #     COARSE.
+    # int _poor_rssi - The RSSI below which we use COARSE.
+
+    # The maximum number of entries in _sources
+    _MAX_SOURCES = 4096
+
+    # The encoding level for sending the image file data unchanged
+    NORMAL = 0
+
+    # The encoding level for a stronger PNG compression profile
+    COMPRESSED = 1
+
+    # The encoding level for rounding the image to a coarser palette
+    COARSE = 2
+
+    def __init__(
+            self, fair_rssi=-70, poor_rssi=-80,
+            max_transfer_time=timedelta(seconds=5),
+            draw_overhead=timedelta(seconds=2), max_devices=1024,
+            max_cache_size=16 * 1024 * 1024):
+        """Initialize a new ``AdaptiveEncoder``.
+
+        Arguments:
+            fair_rssi (int): The Wi-Fi RSSI, in dBm, below which we use
+                at least the ``COMPRESSED`` level.
+            poor_rssi (int): The Wi-Fi RSSI, in dBm, below which we use
+                the ``COARSE`` level.
+            max_transfer_time (timedelta): The amount of time it should
+                take a device to download an image. If we estimate that
+                downloading the original image would take longer, we use
+                at least the ``COMPRESSED`` level, and if we estimate
+                that it would take more than twice as long, we use the
+                ``COARSE`` level.
+            draw_overhead (timedelta): Our estimate of the amount of
+                time that ``Request.draw_time_ms`` includes for things
+                other than downloading the image, such as updating the
+                display.
+            max_devices (int): The maximum number of devices to track.
+                If we exceed this number, we forget about the least
+                recently seen devices.
+            max_cache_size (int): The maximum total number of bytes of
+                re-encoded image file data to cache.
+        """
+        if poor_rssi > fair_rssi:
+            raise ValueError('poor_rssi may not exceed fair_rssi')
+        self._fair_rssi = fair_rssi
+        self._poor_rssi = poor_rssi
+        self._max_transfer_time = max_transfer_time
+        self._draw_overhead_ms = int(
+            1000 * draw_overhead.total_seconds() + 0.5)
+        self._max_devices = max_devices
+        self._devices = OrderedDict()
+        self._lock = threading.Lock()
+        self._cache = LruCache(max_cache_size)
+        self._sources = LruCache(AdaptiveEncoder._MAX_SOURCES)
+
+    def _seconds_per_byte(self, request):
+        """Return our estimate of how long a device takes to download a byte.
+
+        This updates the estimate using the request's telemetry.
+
+        Arguments:
+            request (Request): The request we are responding to.
+
+        Returns:
+            float: The number of seconds, or ``None`` if we do not have
+            an estimate.
+        """
+        with self._lock:
+            device = self._devices.get(request.device_id)
+            if device is None:
+                return None
+            length, seconds_per_byte = device
+            if length > 0 and request.draw_time_ms is not None:
+                transfer_time_ms = max(
+                    request.draw_time_ms - self._draw_overhead_ms, 0)
+                seconds_per_byte = transfer_time_ms / (1000 * length)
+                self._devices[request.device_id] = (0, seconds_per_byte)
+            return seconds_per_byte
+
+    def level(self, request, length):
+        """Return the encoding level to use in response to a request.
+
+        This updates our estimate of how long the device takes to
+        download images, using the request's telemetry.
+
+        Arguments:
+            request (Request): The request.
+            length (int): The total number of bytes of image file data
+                in the response, without re-encoding.
+
+        Returns:
+            int: The level, e.g. ``AdaptiveEncoder.COMPRESSED``.
+        """
+        level = AdaptiveEncoder.NORMAL
+        if request.wi_fi_rssi is not None:
+            if request.wi_fi_rssi < self._poor_rssi:
+                level = AdaptiveEncoder.COARSE
+            elif request.wi_fi_rssi < self._fair_rssi:
+                level = AdaptiveEncoder.COMPRESSED
+
+        if request.device_id:
+            seconds_per_byte = self._seconds_per_byte(request)
+            if seconds_per_byte is not None:
+                transfer_time = timedelta(seconds=seconds_per_byte * length)
+                if transfer_time > 2 * self._max_transfer_time:
+                    level = AdaptiveEncoder.COARSE
+                elif transfer_time > self._max_transfer_time:
+                    level = max(level, AdaptiveEncoder.COMPRESSED)
+        return level
+
+    def encode(self, image_data, level, palette):
+        """Return the image file data to send at the specified level.
+
+        Arguments:
+            image_data (bytes): The PNG image file data, as returned by
+                ``ImageData.render_png``.
+            level (int): The encoding level, as returned by ``level``.
+            palette (Palette): The color palette for the image.
+
+        Returns:
+            bytes: The image file data to send.
+        """
+        if level == AdaptiveEncoder.NORMAL:
+            return image_data
+        frame_id = ServerIO.frame_id(image_data)
+        key = (frame_id, level)
+        encoded_data = self._cache.get(key)
+        if encoded_data is None:
+            encoded_data = ImageData.reencode_png(
+                image_data, palette, level == AdaptiveEncoder.COARSE)
+            if len(encoded_data) >= len(image_data):
+                encoded_data = image_data
+            self._cache.put(key, encoded_data, len(encoded_data))
+            self._sources.put(ServerIO.frame_id(encoded_data), frame_id, 1)
+        return encoded_data
+
+    def source_frame_id(self, frame_id):
+        """Return the ID of the image that we re-encoded to produce an image.
+
+        Arguments:
+            frame_id (bytes): The ID of an image, as in
+                ``ServerIO.frame_id``.
+
+        Returns:
+            bytes: The ID of the original image, if ``frame_id`` is the
+            ID of an image we recently returned from ``encode``.
+            Otherwise, this is ``frame_id``.
+        """
+        source_frame_id = self._sources.get(frame_id)
+        if source_frame_id is not None:
+            return source_frame_id
+        else:
+            return frame_id
+
+    def record(self, request, length):
+        """Record how much image data we are sending in response to a request.
+
+        Arguments:
+            request (Request): The request.
+            length (int): The total number of bytes of image file data
+                we are sending.
+        """
+        if not request.device_id:
+            return
+        with self._lock:
+            device = self._devices.pop(request.device_id, None)
+            if device is not None:
+                seconds_per_byte = device[1]
+            else:
+                seconds_per_byte = None
+            self._devices[request.device_id] = (length, seconds_per_byte)
+            if len(self._devices) > self._max_devices:
+                self._devices.popitem(False)
@@ -0,0 +1,80 @@
+from .server_io import ServerIO
+
+
+class BufferReader:
+    """Reads values that were encoded as in ``ServerIO`` from a buffer.
+
+    Whereas the read methods in ``ServerIO`` read from a file,
+    ``BufferReader`` reads directly from a ``bytes`` object or other
+    bytes-like object. It decodes integers in place using
+    ``ServerIO.INT_STRUCT``, and it returns byte sequences as
+    ``memoryview`` slices of the buffer, so reading does not copy any
+    of the data.
+
+    Unlike ``ServerIO``, if we reach the end of the buffer before
+    reading the desired value, we raise a ``ValueError``.
+    """
+
+    # Private attributes:
+    #
+    # int _offset - The index in _view of the next byte to read.
+    # memoryview _view - A flat, byte-oriented view of the buffer.
+
+    def __init__(self, buffer):
+        """Initialize a new ``BufferReader``.
+
+        Arguments:
+            buffer (object): The bytes-like object to read from. The
+                caller must not modify it while the ``BufferReader`` or
+                any of the views it returned are in use.
+        """
+        self._view = memoryview(buffer).cast('B')
+        self._offset = 0
+
+    def remaining(self):
+        """Return the number of bytes that we have not read yet."""
+        return len(self._view) - self._offset
+
+    def read(self, length):
+        """Return a view of the next ``length`` bytes.
+
+        Arguments:
+            length (int): The number of bytes to read.
+
+        Returns:
+            memoryview: The bytes.
+
+        Raises:
+            ValueError: If there are fewer than ``length`` bytes left.
+        """
+        if not 0 <= length <= len(self._view) - self._offset:
+            raise ValueError('Not enough bytes available')
+        view = self._view[self._offset:self._offset + length]
+        self._offset += length
+        return view
+
+    def read_int(self):
+        """Read a 32-bit signed integer, as in ``ServerIO.read_int``.
+
+        Returns:
+            int: The value.
+
+        Raises:
+            ValueError: If we reach the end of the buffer.
+        """
+        if len(self._view) - self._offset < ServerIO.INT_STRUCT.size:
+            raise ValueError('Not enough bytes available')
+        value = ServerIO.INT_STRUCT.unpack_from(self._view, self._offset)[0]
+        self._offset += ServerIO.INT_STRUCT.size
+        return value
+
+    def read_bytes(self):
+        """Return a view of the bytes written by ``ServerIO.write_bytes``.
+
+        Returns:
+            memoryview: The bytes.
+
+        Raises:
+            ValueError: If we reach the end of the buffer.
+        """
+        return self.read(self.read_int())
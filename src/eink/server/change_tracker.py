@@ -0,0 +1,104 @@
+from collections import OrderedDict
+import hashlib
+import threading
+
+
+class ChangeTracker:
+    """Learns how often the content for each e-ink device changes.
+
+    Each time a device polls the server, we compare the image file data
+    we send it to the image file data we sent it the previous time. If
+    the content has not changed, we lengthen the device's update time,
+    and if it has, we shorten it. As a result, the update time tends
+    toward the interval at which the content actually changes, within
+    the bounds the server specifies. When the device is unknown, we
+    track the content for the server as a whole.
+
+    ``ChangeTracker`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # OrderedDict<bytes, tuple<bytes, int>> _devices - A map from each device
+    #     ID we are tracking to a pair of the SHA-256 digest of the image file
+    #     data we most recently sent it and its current update time in tenths
+    #     of a second. The entries are in order from least recently to most
+    #     recently used. The key b'' is for unknown devices.
+    # Lock _lock - The lock for accessing _devices.
+    # int _max_devices - The maximum number of entries in _devices.
+
+    # The factor by which we multiply a device's update time when its content
+    # has not changed
+    _GROWTH_FACTOR = 1.5
+
+    # The factor by which we multiply a device's update time when its content
+    # has changed
+    _SHRINK_FACTOR = 0.5
+
+    def __init__(self, max_devices=1024):
+        """Initialize a new ``ChangeTracker``.
+
+        Arguments:
+            max_devices (int): The maximum number of devices to track.
+                If we exceed this number, we forget about the least
+                recently seen devices.
+        """
+        self._devices = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_devices = max_devices
+
+    def update_time_ds(self, device_id, image_data, min_time_ds, max_time_ds):
+        """Record that we are sending content to a device.
+
+        Return the update time to send to the device, i.e. the amount
+        of time it should wait before polling again.
+
+        Arguments:
+            device_id (bytes): The ID of the device, as in
+                ``Request.device_id``.
+            image_data (bytes): The image file data we are sending to
+                the device.
+            min_time_ds (int): The minimum update time, in tenths of a
+                second.
+            max_time_ds (int): The maximum update time, in tenths of a
+                second. This is at least ``min_time_ds``.
+
+        Returns:
+            int: The update time, in tenths of a second.
+        """
+        digest = hashlib.sha256(image_data).digest()
+        with self._lock:
+            entry = self._devices.pop(device_id, None)
+            if entry is None:
+                time_ds = min_time_ds
+            else:
+                prev_digest, prev_time_ds = entry
+                if digest == prev_digest:
+                    time_ds = int(
+                        ChangeTracker._GROWTH_FACTOR * prev_time_ds + 0.5)
+                else:
+                    time_ds = int(
+                        ChangeTracker._SHRINK_FACTOR * prev_time_ds + 0.5)
+                time_ds = max(min_time_ds, min(max_time_ds, time_ds))
+
+            self._devices[device_id] = (digest, time_ds)
+            if len(self._devices) > self._max_devices:
+                self._devices.popitem(last=False)
+        return time_ds
+
+    def has_sent(self, device_id, image_data):
+        """Return whether we most recently sent the given content to a device.
+
+        Arguments:
+            device_id (bytes): The ID of the device, as in
+                ``Request.device_id``.
+            image_data (bytes): The image file data.
+
+        Returns:
+            bool: Whether ``image_data`` is the image file data we most
+            recently passed to ``update_time_ds`` for the device.
+        """
+        digest = hashlib.sha256(image_data).digest()
+        with self._lock:
+            entry = self._devices.get(device_id)
+            return entry is not None and entry[0] == digest
@@ -0,0 +1,217 @@
+import asyncio
+from datetime import datetime
+from datetime import timedelta
+import logging
+
+from .replica_store import ReplicaStore
+from .server_io import ServerIO
+
+
+class ContentWatcher:
+    """Holds long-poll requests until a ``Server``'s content changes.
+
+    Devices that are not battery powered can make long-poll requests
+    (see ``Request.long_poll_frame_id``) rather than polling frequently.
+    ``HttpServer`` holds each long-poll request until the ID of the
+    image for the server's content, as in ``ServerIO.frame_id``,
+    differs from the one the device is displaying, or until a timeout
+    expires. The device makes another long-poll request as soon as it
+    receives the response, so it displays new content soon after it
+    becomes available.
+
+    Rather than rendering the content for each held request, a single
+    asyncio task renders it whenever it might have changed, as
+    indicated by ``Server.update_time()`` and
+    ``Server.next_update_boundary``, and wakes the requests whose
+    content changed. Until the content might change again, the server
+    responds to long-poll requests using the content that we rendered.
+    Holding a request costs little more than a coroutine and a socket,
+    so a worker can hold thousands of them. Because we render the
+    content once for all devices, long-poll requests are only suitable
+    for servers whose content does not depend on the device.
+
+    An ``HttpServer`` with several worker processes renders the content
+    in a single process, rather than once per worker. That process's
+    ``ContentWatcher`` writes the content to a ``ReplicaStore`` each
+    time it changes, and the workers' ``ContentWatcher`` objects read
+    it from the store rather than rendering it.
+
+    ``ContentWatcher`` must be used from a single event loop.
+    """
+
+    # Private attributes:
+    #
+    # Event _changed_event - An event that we set when the content changes,
+    #     and then replace with a new event.
+    # bool _closed - Whether close() has been called.
+    # bytes _frame_id - The ID of the image for the current content, or None
+    #     if we have not rendered it yet.
+    # bool _render - Whether we render the content, as opposed to reading it
+    #     from _store.
+    # Server _server - The server.
+    # ReplicaStore _store - The store we share with other processes, if any.
+    #     If _render is True, we write the content to it, and otherwise, we
+    #     read the content from it.
+    # Task _task - The task that renders the content, if we have started it.
+
+    # The minimum amount of time between renders
+    _MIN_RENDER_INTERVAL = timedelta(seconds=1)
+
+    # The amount of time to wait before rendering again after failing to
+    # render the content
+    _RETRY_TIME = timedelta(seconds=5)
+
+    # The amount of time between checks of the content when reading it from a
+    # ReplicaStore, as in Server.use_replica_store
+    _REPLICA_POLL_TIME = timedelta(seconds=1)
+
+    def __init__(self, server, store=None, render=True):
+        """Initialize a new ``ContentWatcher``.
+
+        Arguments:
+            server (Server): The server.
+            store (ReplicaStore): A store that we share with the
+                ``ContentWatcher`` objects in other processes, if any.
+            render (bool): Whether to render the content. If this is
+                ``True``, we write the content we render to ``store``,
+                if any. Otherwise, we read the content from ``store``,
+                which must not be ``None``.
+        """
+        if not render and store is None:
+            raise ValueError('A ContentWatcher must render or have a store')
+        self._server = server
+        self._store = store
+        self._render = render
+        self._frame_id = None
+        self._changed_event = asyncio.Event()
+        self._closed = False
+        self._task = None
+
+    def _update(self):
+        """Render or read the server's current content.
+
+        This is called in a thread pool.
+
+        Returns:
+            tuple<bytes, datetime>: A pair of the ID of the content's
+            image and the local time at which the content might change.
+            The time is ``None`` if the content will not change. The ID
+            is ``None`` if there is no content yet, which happens if we
+            are waiting to receive replicated content.
+        """
+        now = datetime.now()
+        state = self._server._state()
+        if state.replica_store is not None:
+            content = state.replica_store.content()
+            next_time = now + ContentWatcher._REPLICA_POLL_TIME
+            if content is None:
+                return None, next_time
+            return ServerIO.frame_id(content[0]), next_time
+
+        if not self._render:
+            content = self._store.content()
+            next_time = now + ContentWatcher._REPLICA_POLL_TIME
+            if content is None:
+                return None, next_time
+
+            # Rather than expiring the content, we replace it when the
+            # content in the store changes
+            state.watched_frame = (None, content[0])
+            return ServerIO.frame_id(content[0]), next_time
+
+        image_data = self._server._image_data(self._server.render(), 'render')
+        next_time = self._server._next_render_time(now)
+        state.watched_frame = (next_time, image_data)
+        frame_id = ServerIO.frame_id(image_data)
+        if self._store is not None and frame_id != self._frame_id:
+            self._store.put(ReplicaStore.encode(image_data, []))
+        return frame_id, next_time
+
+    async def _run(self):
+        """Update the content each time it might change, until we close."""
+        loop = asyncio.get_event_loop()
+        while not self._closed:
+            try:
+                frame_id, next_time = await loop.run_in_executor(
+                    None, self._update)
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'Error updating content')
+                frame_id = self._frame_id
+                next_time = datetime.now() + ContentWatcher._RETRY_TIME
+
+            if frame_id != self._frame_id:
+                self._frame_id = frame_id
+                self._changed_event.set()
+                self._changed_event = asyncio.Event()
+
+            if next_time is None:
+                # The content will not change, so wait until we are cancelled
+                await asyncio.Event().wait()
+            else:
+                await asyncio.sleep(
+                    max(
+                        (next_time - datetime.now()).total_seconds(),
+                        ContentWatcher._MIN_RENDER_INTERVAL.total_seconds()))
+
+    def start(self):
+        """Start the task that renders or reads the content.
+
+        This has no effect if we have already started it. ``wait``
+        starts it automatically.
+        """
+        if self._task is None and not self._closed:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    def frame_id(self):
+        """Return the ID of the image for the current content.
+
+        This is ``None`` if we have not rendered the content yet.
+        """
+        return self._frame_id
+
+    async def wait(self, frame_id, timeout):
+        """Wait until the content's image has a different ID.
+
+        We also return if the timeout expires or ``close()`` is called.
+        The first call starts the task that renders or reads the content.
+
+        Arguments:
+            frame_id (bytes): The ID of the image the device is
+                displaying, as in ``ServerIO.frame_id``.
+            timeout (timedelta): The maximum amount of time to wait.
+        """
+        # If the device received a re-encoded version of the image, as in
+        # Server.adaptive_encoder(), compare the ID of the original image
+        frame_id = self._server._source_frame_id(frame_id)
+        self.start()
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout.total_seconds()
+        while (not self._closed and
+                (self._frame_id is None or self._frame_id == frame_id)):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(
+                    self._changed_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def close(self):
+        """Stop rendering, and wake all of the requests we are holding."""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+        self._changed_event.set()
+
+    async def wait_closed(self):
+        """Wait for the task that renders the content to finish.
+
+        This must be called after ``close()``.
+        """
+        if self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,133 @@
+from .server import Server
+from .server_io import ServerIO
+
+
+class FrameCache:
+    """A reference model of an e-ink device's frame cache.
+
+    An e-ink device stores the most recent images it received from the
+    server in flash memory, and it reports their IDs, as in
+    ``ServerIO.frame_id``, in each request (see
+    ``Request.cached_frame_ids``). If the image the server would send is
+    already in the device's cache, the server responds with the image's
+    ID instead of the image file. This is useful for content that cycles
+    through a small set of images, such as a slideshow or a multi-page
+    dashboard. Because the device reports the contents of its cache in
+    each request, the server's view of the cache cannot become out of
+    sync with the device's.
+
+    ``FrameCache`` duplicates the behavior of the C++ functions in
+    ``frame_cache.cpp``. It makes it possible to test the behavior of a
+    server with respect to caching, e.g. using ``Simulator.connect``.
+    The cache has a fixed number of slots. When it stores a new image,
+    it uses the first empty slot, or if there is none, the least
+    recently used slot.
+    """
+
+    # Private attributes:
+    #
+    # int _clock - A counter that we increment each time we store or display
+    #     a frame. This is the C++ field ClientState.frameCacheClock.
+    # list<tuple<bytes, bytes, int>> _slots - The contents of each slot in the
+    #     cache. Each element is None if the slot is empty, and otherwise a
+    #     tuple of the frame ID, the image file data, and the value of _clock
+    #     when we most recently stored or displayed the frame.
+
+    def __init__(self, size=Server._FRAME_CACHE_SIZE):
+        """Initialize a new, empty ``FrameCache``.
+
+        Arguments:
+            size (int): The number of slots in the cache. The default is
+                the number of slots on an e-ink device.
+        """
+        self._slots = [None] * size
+        self._clock = 0
+
+    def frame_ids(self):
+        """Return the IDs of the cached frames, as in ``cached_frame_ids``.
+
+        Returns:
+            list<bytes>: The IDs, in the order in which the device
+            reports them.
+        """
+        return [slot[0] for slot in self._slots if slot is not None]
+
+    def _find(self, frame_id):
+        """Return the index of the slot containing the specified frame.
+
+        Return ``None`` if the frame is not in the cache.
+        """
+        for index, slot in enumerate(self._slots):
+            if slot is not None and slot[0] == frame_id:
+                return index
+        return None
+
+    def _slot_to_replace(self):
+        """Return the index of the slot to store a new frame in."""
+        best_index = 0
+        for index, slot in enumerate(self._slots):
+            if slot is None:
+                return index
+            if slot[2] < self._slots[best_index][2]:
+                best_index = index
+        return best_index
+
+    def get(self, frame_id):
+        """Return the image file data for the frame with the specified ID.
+
+        This marks the frame as the most recently used one.
+
+        Arguments:
+            frame_id (bytes): The frame ID.
+
+        Returns:
+            bytes: The image file data, or ``None`` if the frame is not
+            in the cache.
+        """
+        index = self._find(frame_id)
+        if index is None:
+            return None
+        self._clock += 1
+        slot = self._slots[index]
+        self._slots[index] = (slot[0], slot[1], self._clock)
+        return slot[1]
+
+    def put(self, image_data):
+        """Add the specified image file data to the cache.
+
+        Arguments:
+            image_data (bytes): The image file data.
+        """
+        frame_id = ServerIO.frame_id(image_data)
+        index = self._find(frame_id)
+        if index is None:
+            index = self._slot_to_replace()
+        self._clock += 1
+        self._slots[index] = (frame_id, image_data, self._clock)
+
+    def apply(self, response):
+        """Update the cache as a device does when it receives a ``Response``.
+
+        Arguments:
+            response (Response): The response.
+
+        Returns:
+            bytes: The image file data the device should display, or
+            ``b''`` if it should keep displaying its current image.
+
+        Raises:
+            ValueError: If the response refers to a frame that is not
+                in the cache, or it resumes an interrupted download.
+                ``FrameCache`` does not model interrupted downloads.
+        """
+        if response.image_start_chunk > 0:
+            raise ValueError('Resumed downloads are not supported')
+        if response.image_data is None:
+            image_data = self.get(response.image_id)
+            if image_data is None:
+                raise ValueError(
+                    'The response refers to a frame that is not in the cache')
+            return image_data
+        if response.image_data:
+            self.put(response.image_data)
+        return response.image_data
@@ -0,0 +1,82 @@
+from .server_io import ServerIO
+
+
+class FrameDecoder:
+    """Incrementally splits a stream of bytes into length-prefixed payloads.
+
+    This is the framing that ``TcpTransport`` uses: each payload is
+    preceded by its length, encoded as in ``ServerIO.write_int``. We
+    may feed a ``FrameDecoder`` the data it receives from a socket in
+    arbitrarily sized pieces, and it returns each payload once all of
+    its bytes have arrived.
+    """
+
+    # Private attributes:
+    #
+    # bytearray _buffer - The bytes we have received but not yet returned as
+    #     part of a payload.
+    # int _max_length - The maximum length of a payload, if any.
+
+    def __init__(self, max_length=None):
+        """Initialize a new ``FrameDecoder``.
+
+        Arguments:
+            max_length (int): The maximum number of bytes in a payload,
+                or ``None`` if there is no maximum.
+        """
+        self._max_length = max_length
+        self._buffer = bytearray()
+
+    @staticmethod
+    def encode(chunks):
+        """Return the chunks for sending the specified payload.
+
+        The return value is suitable for scatter-gather output, as in
+        ``socket.sendmsg`` or ``StreamWriter.writelines``, so that we
+        do not have to copy the payload to prepend its length.
+
+        Arguments:
+            chunks (list<bytes>): The chunks whose concatenation is the
+                payload, as in ``Server.exec_chunks``.
+
+        Returns:
+            list<bytes>: The chunks to send.
+        """
+        length = sum(len(chunk) for chunk in chunks)
+        return [ServerIO.INT_STRUCT.pack(length)] + list(chunks)
+
+    def feed(self, data):
+        """Add the specified received bytes to the stream.
+
+        Arguments:
+            data (bytes): The bytes.
+
+        Returns:
+            list<bytes>: The payloads that this completed, in order.
+
+        Raises:
+            ValueError: If a payload's length is negative or exceeds the
+                maximum.
+        """
+        self._buffer += data
+        payloads = []
+        offset = 0
+        header_size = ServerIO.INT_STRUCT.size
+        while len(self._buffer) - offset >= header_size:
+            length = ServerIO.INT_STRUCT.unpack_from(self._buffer, offset)[0]
+            if (length < 0 or
+                    (self._max_length is not None and
+                        length > self._max_length)):
+                raise ValueError('Invalid payload length')
+            end = offset + header_size + length
+            if end > len(self._buffer):
+                break
+            payloads.append(bytes(self._buffer[offset + header_size:end]))
+            offset = end
+        if offset > 0:
+            del self._buffer[:offset]
+        return payloads
+
+    def buffered_size(self):
+        """Return the number of bytes received for incomplete payloads."""
+        return len(self._buffer)
@@ -0,0 +1,754 @@
+import asyncio
+from datetime import timedelta
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+from .content_watcher import ContentWatcher
+from .errors import ServerError
+from .frame_decoder import FrameDecoder
+from .replica_store import ReplicaStore
+from .request import Request
+from .server_io import ServerIO
+
+
+class HttpServer:
+    """A lightweight HTTP server for a ``Server``, built on asyncio.
+
+    This is an alternative to running a ``Server`` in a web framework
+    such as Flask. The e-ink protocol only needs a single POST endpoint,
+    so ``HttpServer`` implements just enough of HTTP/1.1 for that:
+    persistent (keep-alive) connections, ``Content-Length`` request
+    bodies with a size limit, and responses that are written in chunks
+    as the client consumes them.
+
+    ``HttpServer`` can also listen for raw TCP connections from devices
+    that use a ``TcpTransport``. On such a connection, each request
+    payload is preceded by its length, encoded as in
+    ``ServerIO.write_int``, and we write each response payload preceded
+    by its length.
+
+    On platforms that support ``os.fork``, ``serve_forever()`` runs
+    several worker processes that share a listening socket. A parent
+    process supervises them, replacing any worker that exits
+    unexpectedly, and giving up if workers keep exiting shortly after
+    they start. Sending the parent ``SIGHUP`` gracefully restarts the
+    workers: it starts new workers and then asks the old ones to finish
+    their current requests and exit. Each worker calls the server
+    factory after it starts, so a restart picks up changes to the
+    server's code if the factory imports it. ``SIGTERM`` and ``SIGINT``
+    gracefully stop the server.
+
+    Within a worker, we execute requests as in ``Server.exec_chunks`` in a
+    thread pool, so that rendering does not block the event loop.
+
+    If ``long_poll_timeout`` is not ``None``, we hold long-poll requests
+    (see ``Request.long_poll_frame_id``) until the content changes or
+    the timeout expires, using a ``ContentWatcher``. Clients that make
+    long-poll requests must wait longer than the timeout for a
+    response. If there are several worker processes, the supervisor
+    also runs a render process, which renders the content for
+    long-poll requests and shares it with the workers through a
+    ``ReplicaStore`` in a temporary directory. The supervisor replaces
+    the render process if it exits unexpectedly, and it restarts it
+    along with the workers.
+    """
+
+    # Private attributes:
+    #
+    # set<StreamWriter> _busy_writers - The writers for the connections that
+    #     are currently handling a request, in a worker process.
+    # set<StreamWriter> _idle_writers - The writers for the connections that
+    #     are waiting for a request, in a worker process.
+    # str _host - The host to listen on.
+    # timedelta _keep_alive_timeout - The amount of time to keep an idle
+    #     connection open, and the maximum amount of time to wait for the
+    #     rest of a request body.
+    # AbstractEventLoop _loop - The worker's event loop, if any.
+    # timedelta _long_poll_timeout - The maximum amount of time to hold a
+    #     long-poll request, or None to respond to long-poll requests
+    #     immediately.
+    # int _max_request_size - The maximum number of bytes in a request body.
+    # str _path - The URL path of the endpoint.
+    # int _port - The port to listen on for HTTP connections.
+    # Server _server - The worker's server, if any.
+    # callable _server_factory - A function that returns the Server.
+    # str _store_dir - The directory of the ReplicaStore that the render
+    #     process uses to share the content for long-poll requests with the
+    #     workers, if any.
+    # int _tcp_port - The port to listen on for raw TCP connections, if any.
+    # Future _stop_future - A future that is resolved when the worker should
+    #     stop, if any.
+    # bool _stopping - Whether the worker is stopping.
+    # ContentWatcher _watcher - The worker's ContentWatcher, if any.
+    # int _workers - The number of worker processes.
+
+    # The maximum number of bytes in the request line and headers
+    _MAX_HEAD_SIZE = 16 * 1024
+
+    # The maximum number of bytes we write before waiting for the client to
+    # consume them
+    _WRITE_CHUNK_SIZE = 16 * 1024
+
+    # The maximum amount of time a worker waits for its requests to finish
+    # when it is stopping
+    _STOP_TIMEOUT = timedelta(seconds=30)
+
+    # The amount of time the supervisor process waits between checks of its
+    # workers
+    _SUPERVISOR_POLL_TIME = timedelta(milliseconds=200)
+
+    # If a worker exits unexpectedly less than this amount of time after it
+    # started, we regard it as having failed to start
+    _MIN_WORKER_LIFETIME = timedelta(seconds=5)
+
+    # The amount of time to wait before replacing a worker that failed to
+    # start. We double this for each round of consecutive failures.
+    _RESTART_DELAY = timedelta(seconds=1)
+
+    # The maximum amount of time to wait before replacing a worker
+    _MAX_RESTART_DELAY = timedelta(seconds=30)
+
+    # The number of consecutive rounds of failures to start the workers,
+    # after which the supervisor gives up
+    _MAX_START_FAILURES = 5
+
+    # A map from each status code we use to its reason phrase
+    _REASONS = {
+        200: 'OK',
+        400: 'Bad Request',
+        404: 'Not Found',
+        405: 'Method Not Allowed',
+        411: 'Length Required',
+        413: 'Payload Too Large',
+        431: 'Request Header Fields Too Large',
+        500: 'Internal Server Error',
+    }
+
+    def __init__(
+            self, server_factory, host='', port=5000, path='/', workers=1,
+            max_request_size=64 * 1024,
+            keep_alive_timeout=timedelta(seconds=75), tcp_port=None,
+            long_poll_timeout=None):
+        """Initialize a new ``HttpServer``.
+
+        Arguments:
+            server_factory (callable): A function that returns the
+                ``Server`` to run. Each worker process calls it once.
+            host (str): The host to listen on. ``''`` listens on all
+                interfaces.
+            port (int): The port to listen on for HTTP connections.
+            path (str): The URL path of the endpoint, e.g.
+                ``'/eink_server'``.
+            workers (int): The number of worker processes. This is
+                ignored on platforms that do not support ``os.fork``.
+            max_request_size (int): The maximum number of bytes in a
+                request body. We respond to larger requests with status
+                413.
+            keep_alive_timeout (timedelta): The amount of time to keep
+                an idle connection open. We also close a connection if
+                the client takes longer than this to send the rest of a
+                request body.
+            tcp_port (int): The port to listen on for raw TCP
+                connections, as in ``TcpTransport``, or ``None`` to only
+                listen for HTTP connections.
+            long_poll_timeout (timedelta): The maximum amount of time
+                to hold a long-poll request, or ``None`` to respond to
+                long-poll requests immediately.
+        """
+        if workers < 1:
+            raise ValueError('There must be at least one worker')
+        self._server_factory = server_factory
+        self._host = host
+        self._port = port
+        self._tcp_port = tcp_port
+        self._path = path
+        self._workers = workers
+        self._max_request_size = max_request_size
+        self._keep_alive_timeout = keep_alive_timeout
+        self._long_poll_timeout = long_poll_timeout
+        self._server = None
+        self._store_dir = None
+        self._watcher = None
+        self._loop = None
+        self._stop_future = None
+        self._stopping = False
+        self._busy_writers = set()
+        self._idle_writers = set()
+
+    def serve_forever(self):
+        """Run the server until it receives ``SIGTERM`` or ``SIGINT``.
+
+        Raises:
+            RuntimeError: If the worker processes keep exiting shortly
+                after they start, as described in the comments for
+                ``HttpServer``.
+        """
+        http_sock = self._listen(self._port)
+        tcp_sock = None
+        try:
+            if self._tcp_port is not None:
+                tcp_sock = self._listen(self._tcp_port)
+            if hasattr(os, 'fork'):
+                if self._long_poll_timeout is not None and self._workers > 1:
+                    self._store_dir = tempfile.mkdtemp(prefix='eink-server-')
+                self._supervise(http_sock, tcp_sock)
+            else:
+                self._run_worker(http_sock, tcp_sock)
+        finally:
+            http_sock.close()
+            if tcp_sock is not None:
+                tcp_sock.close()
+            if self._store_dir is not None:
+                shutil.rmtree(self._store_dir, ignore_errors=True)
+                self._store_dir = None
+
+    def _listen(self, port):
+        """Return a new socket listening on ``_host`` and the given port."""
+        address = socket.getaddrinfo(
+            self._host or None, port, type=socket.SOCK_STREAM,
+            flags=socket.AI_PASSIVE)[0]
+        sock = socket.socket(address[0], address[1], address[2])
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(address[4])
+            sock.listen(1024)
+            sock.setblocking(False)
+        except Exception:
+            sock.close()
+            raise
+        logging.getLogger(__name__).info(
+            'Listening on port {:d}'.format(sock.getsockname()[1]))
+        return sock
+
+    def _start_worker(self, http_sock, tcp_sock):
+        """Fork a worker process that serves requests on the given sockets.
+
+        Arguments:
+            http_sock (socket): The listening socket for HTTP
+                connections.
+            tcp_sock (socket): The listening socket for raw TCP
+                connections, if any.
+
+        Returns:
+            int: The worker's process ID.
+        """
+        return self._fork(self._run_worker, http_sock, tcp_sock)
+
+    def _start_renderer(self):
+        """Fork a process that renders the content for long-poll requests.
+
+        See the comments for ``HttpServer``.
+
+        Returns:
+            int: The process ID.
+        """
+        return self._fork(self._run_renderer)
+
+    def _fork(self, target, *args):
+        """Fork a child process that calls ``target(*args)`` and then exits.
+
+        Returns:
+            int: The child's process ID.
+        """
+        pid = os.fork()
+        if pid != 0:
+            return pid
+
+        exit_code = 1
+        try:
+            # The supervisor is responsible for SIGINT and SIGHUP
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            target(*args)
+            exit_code = 0
+        except Exception:
+            logging.getLogger(__name__).exception('Error in child process')
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+
+    def _supervise(self, http_sock, tcp_sock):
+        """Run and supervise the worker processes.
+
+        The arguments are the same as those for ``_start_worker``.
+
+        This returns after it receives ``SIGTERM`` or ``SIGINT`` and all
+        of the workers have exited. If a worker, or the render process
+        described in the comments for ``HttpServer``, exits
+        unexpectedly, we replace it. If processes keep exiting shortly
+        after they start, e.g. because the server factory raises an
+        exception, we wait exponentially longer before each
+        replacement, and we eventually give up.
+
+        Raises:
+            RuntimeError: If we gave up because processes kept exiting
+                shortly after they started.
+        """
+        events = {'restart': False, 'stop': False}
+
+        def handle_restart(signum, frame):
+            events['restart'] = True
+
+        def handle_stop(signum, frame):
+            events['stop'] = True
+
+        prev_handlers = {
+            signum: signal.signal(signum, handler) for signum, handler in (
+                (signal.SIGHUP, handle_restart),
+                (signal.SIGINT, handle_stop),
+                (signal.SIGTERM, handle_stop))}
+        logger = logging.getLogger(__name__)
+
+        # The function for starting each of the processes we run
+        start_funcs = self._workers * [
+            lambda: self._start_worker(http_sock, tcp_sock)]
+        if self._store_dir is not None:
+            start_funcs.append(self._start_renderer)
+
+        # A map from the ID of each process we are running, apart from those
+        # we are stopping, to the function we used to start it
+        processes = {}
+
+        # A map from the ID of each process we are running to the
+        # time.monotonic() value when we started it
+        start_times = {}
+
+        def start(start_func):
+            pid = start_func()
+            processes[pid] = start_func
+            start_times[pid] = time.monotonic()
+
+        def stop_all():
+            for pid in processes:
+                os.kill(pid, signal.SIGTERM)
+            retiring_processes.update(processes)
+            processes.clear()
+
+        retiring_processes = set()
+
+        # Pairs of the time.monotonic() value at which to start a replacement
+        # for a process that exited unexpectedly and the function for starting
+        # it, in ascending order of time
+        restarts = []
+
+        # The number of consecutive times a process exited unexpectedly
+        # shortly after it started
+        start_failures = 0
+        gave_up = False
+        try:
+            for start_func in start_funcs:
+                start(start_func)
+            while processes or retiring_processes or restarts:
+                if events['stop']:
+                    events['stop'] = False
+                    logger.info('Stopping')
+                    stop_all()
+                    restarts = []
+                if events['restart'] and (processes or restarts):
+                    events['restart'] = False
+                    logger.info('Restarting workers')
+                    stop_all()
+                    restarts = []
+                    start_failures = 0
+                    for start_func in start_funcs:
+                        start(start_func)
+
+                while restarts and restarts[0][0] <= time.monotonic():
+                    start(restarts.pop(0)[1])
+
+                while processes or retiring_processes:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                    if pid == 0:
+                        break
+                    start_time = start_times.pop(pid, None)
+                    if pid in retiring_processes:
+                        retiring_processes.remove(pid)
+                    elif pid in processes:
+                        start_func = processes.pop(pid)
+                        if (time.monotonic() - start_time <
+                                HttpServer._MIN_WORKER_LIFETIME
+                                .total_seconds()):
+                            start_failures += 1
+                        else:
+                            start_failures = 0
+                        if (start_failures >=
+                                HttpServer._MAX_START_FAILURES *
+                                len(start_funcs)):
+                            logger.error(
+                                'Process {:d} exited unexpectedly with status '
+                                '{:d}; processes keep exiting shortly after '
+                                'starting, so we are giving up'.format(
+                                    pid, status))
+                            gave_up = True
+                            stop_all()
+                            restarts = []
+                            continue
+
+                        if start_failures == 0:
+                            delay = 0
+                        else:
+                            delay = min(
+                                HttpServer._RESTART_DELAY.total_seconds() *
+                                2 ** (
+                                    (start_failures - 1) // len(start_funcs)),
+                                HttpServer._MAX_RESTART_DELAY.total_seconds())
+                        logger.error(
+                            'Process {:d} exited unexpectedly with status '
+                            '{:d}; replacing it in {:.1f} seconds'.format(
+                                pid, status, delay))
+                        restarts.append((time.monotonic() + delay, start_func))
+                        restarts.sort(key=lambda restart: restart[0])
+                time.sleep(HttpServer._SUPERVISOR_POLL_TIME.total_seconds())
+        except ChildProcessError:
+            pass
+        finally:
+            for signum, handler in prev_handlers.items():
+                signal.signal(signum, handler)
+        if gave_up:
+            raise RuntimeError('Processes keep exiting shortly after starting')
+
+    def _run_worker(self, http_sock, tcp_sock):
+        """Serve requests on the specified listening sockets until we stop.
+
+        The arguments are the same as those for ``_start_worker``.
+        """
+        self._run_until_stopped(lambda: self._serve(http_sock, tcp_sock))
+
+    def _run_renderer(self):
+        """Render the content for long-poll requests until we stop.
+
+        See the comments for ``HttpServer``.
+        """
+        self._run_until_stopped(self._render_content)
+
+    def _run_until_stopped(self, main):
+        """Create the server and run an event loop until we stop.
+
+        Arguments:
+            main (callable): A function that returns the coroutine to
+                run. The coroutine must return after ``_stop()`` is
+                called.
+        """
+        self._server = self._server_factory()
+        self._loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(self._loop)
+            self._stop_future = self._loop.create_future()
+            if threading.current_thread() is threading.main_thread():
+                self._loop.add_signal_handler(signal.SIGTERM, self._stop)
+            self._loop.run_until_complete(main())
+        finally:
+            self._loop.close()
+            asyncio.set_event_loop(None)
+
+    def _stop(self):
+        """Gracefully stop the worker. This must run in the event loop."""
+        if not self._stop_future.done():
+            self._stop_future.set_result(None)
+
+    def _stop_threadsafe(self):
+        """Gracefully stop the worker. This may be called from any thread."""
+        self._loop.call_soon_threadsafe(self._stop)
+
+    async def _serve(self, http_sock, tcp_sock):
+        """Serve requests until ``_stop()`` is called.
+
+        The arguments are the same as those for ``_start_worker``.
+        """
+        if self._long_poll_timeout is not None:
+            if self._store_dir is not None:
+                self._watcher = ContentWatcher(
+                    self._server, ReplicaStore(self._store_dir), False)
+            else:
+                self._watcher = ContentWatcher(self._server)
+        async_servers = [
+            await asyncio.start_server(
+                self._handle_connection, sock=http_sock,
+                limit=HttpServer._MAX_HEAD_SIZE)]
+        if tcp_sock is not None:
+            async_servers.append(
+                await asyncio.start_server(
+                    self._handle_tcp_connection, sock=tcp_sock))
+        await self._stop_future
+
+        self._stopping = True
+        if self._watcher is not None:
+            # Respond to the long-poll requests we are holding
+            self._watcher.close()
+        for async_server in async_servers:
+            async_server.close()
+        for writer in list(self._idle_writers):
+            writer.close()
+        deadline = time.monotonic() + HttpServer._STOP_TIMEOUT.total_seconds()
+        while self._busy_writers and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        for async_server in async_servers:
+            await async_server.wait_closed()
+        if self._watcher is not None:
+            await self._watcher.wait_closed()
+
+    async def _render_content(self):
+        """Render the content for long-poll requests until we stop.
+
+        We write the content to the ``ReplicaStore`` in ``_store_dir``.
+        """
+        watcher = ContentWatcher(self._server, ReplicaStore(self._store_dir))
+        watcher.start()
+        await self._stop_future
+        watcher.close()
+        await watcher.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        """Handle the requests on a new connection."""
+        try:
+            while not self._stopping:
+                self._idle_writers.add(writer)
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b'\r\n\r\n'),
+                        self._keep_alive_timeout.total_seconds())
+                except (asyncio.LimitOverrunError, ValueError):
+                    await self._write_response(writer, 431, [], False)
+                    return
+                except (
+                        asyncio.IncompleteReadError, asyncio.TimeoutError,
+                        ConnectionError):
+                    return
+                finally:
+                    self._idle_writers.discard(writer)
+
+                self._busy_writers.add(writer)
+                try:
+                    if not await self._handle_request(reader, writer, head):
+                        return
+                finally:
+                    self._busy_writers.discard(writer)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_tcp_connection(self, reader, writer):
+        """Handle the requests on a new raw TCP connection.
+
+        See the comments for ``TcpTransport``. If a request is too large
+        or is not a correctly formatted request payload, we close the
+        connection without responding.
+        """
+        try:
+            while not self._stopping:
+                self._idle_writers.add(writer)
+                try:
+                    length_bytes = await asyncio.wait_for(
+                        reader.readexactly(ServerIO.INT_STRUCT.size),
+                        self._keep_alive_timeout.total_seconds())
+                except (
+                        asyncio.IncompleteReadError, asyncio.TimeoutError,
+                        ConnectionError):
+                    return
+                finally:
+                    self._idle_writers.discard(writer)
+
+                self._busy_writers.add(writer)
+                try:
+                    length = ServerIO.INT_STRUCT.unpack(length_bytes)[0]
+                    if not 0 <= length <= self._max_request_size:
+                        return
+                    try:
+                        payload = await asyncio.wait_for(
+                            reader.readexactly(length),
+                            self._keep_alive_timeout.total_seconds())
+                    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                        return
+                    try:
+                        chunks = await self._exec(payload)
+                    except ServerError:
+                        return
+                    except Exception:
+                        logging.getLogger(__name__).exception(
+                            'Error executing request')
+                        return
+
+                    await self._write_chunks(
+                        writer, FrameDecoder.encode(chunks))
+                finally:
+                    self._busy_writers.discard(writer)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _exec(self, payload):
+        """Execute a request, as in ``Server.exec_chunks``.
+
+        If the request is a long-poll request, we first wait until the
+        content changes or the long-poll timeout expires. See the
+        comments for ``ContentWatcher``.
+
+        Arguments:
+            payload (bytes): The request payload.
+
+        Returns:
+            list<bytes>: The chunks of the response payload.
+
+        Raises:
+            ServerError: If the payload is not a correctly formatted
+                request payload.
+        """
+        request = Request.create_from_bytes(payload)
+        if (self._watcher is not None and not self._stopping and
+                request.long_poll_frame_id is not None):
+            await self._watcher.wait(
+                request.long_poll_frame_id, self._long_poll_timeout)
+        return await asyncio.get_event_loop().run_in_executor(
+            None, self._server._exec_parsed, request)
+
+    @staticmethod
+    def _parse_head(head):
+        """Parse the request line and headers of an HTTP request.
+
+        Arguments:
+            head (bytes): The request line and headers, including the
+                terminating blank line.
+
+        Returns:
+            tuple<str, str, str, dict<str, str>>: A tuple of the method,
+            the request target, the HTTP version, and a map from the
+            lowercase name of each header to its value. This is
+            ``None`` if ``head`` is malformed.
+        """
+        try:
+            lines = head.decode('iso-8859-1').split('\r\n')
+        except UnicodeDecodeError:
+            return None
+        parts = lines[0].split(' ')
+        if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+            return None
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, separator, value = line.partition(':')
+                if not separator:
+                    return None
+                headers[name.strip().lower()] = value.strip()
+        return (parts[0], parts[1], parts[2], headers)
+
+    async def _handle_request(self, reader, writer, head):
+        """Handle an HTTP request.
+
+        Arguments:
+            reader (StreamReader): The reader for the connection.
+            writer (StreamWriter): The writer for the connection.
+            head (bytes): The request line and headers, including the
+                terminating blank line.
+
+        Returns:
+            bool: Whether to keep the connection open.
+        """
+        parsed_head = HttpServer._parse_head(head)
+        if parsed_head is None:
+            await self._write_response(writer, 400, [], False)
+            return False
+        method, target, version, headers = parsed_head
+
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            keep_alive = connection == 'keep-alive'
+        else:
+            keep_alive = connection != 'close'
+        keep_alive = keep_alive and not self._stopping
+
+        if 'transfer-encoding' in headers:
+            await self._write_response(writer, 411, [], False)
+            return False
+        try:
+            content_length = int(headers.get('content-length', '0'))
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            await self._write_response(writer, 400, [], False)
+            return False
+        if content_length > self._max_request_size:
+            await self._write_response(writer, 413, [], False)
+            return False
+
+        if headers.get('expect', '').lower() == '100-continue':
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+        try:
+            body = await asyncio.wait_for(
+                reader.readexactly(content_length),
+                self._keep_alive_timeout.total_seconds())
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            # The client disconnected or stopped sending the body
+            return False
+
+        if target.split('?', 1)[0] != self._path:
+            status = 404
+            chunks = []
+        elif method != 'POST':
+            status = 405
+            chunks = []
+        else:
+            try:
+                chunks = await self._exec(body)
+                status = 200
+            except ServerError:
+                status = 400
+                chunks = []
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'Error executing request')
+                status = 500
+                chunks = []
+        await self._write_response(writer, status, chunks, keep_alive)
+        return keep_alive
+
+    async def _write_response(self, writer, status, chunks, keep_alive):
+        """Write an HTTP response.
+
+        Arguments:
+            writer (StreamWriter): The writer for the connection.
+            status (int): The status code.
+            chunks (list<bytes>): The chunks whose concatenation is the
+                response body.
+            keep_alive (bool): Whether to keep the connection open.
+        """
+        headers = [
+            'HTTP/1.1 {:d} {:s}'.format(status, HttpServer._REASONS[status]),
+            'Content-Length: {:d}'.format(
+                sum(len(chunk) for chunk in chunks)),
+            'Connection: {:s}'.format('keep-alive' if keep_alive else 'close'),
+        ]
+        if status == 200:
+            headers.append('Content-Type: application/octet-stream')
+        elif status == 405:
+            headers.append('Allow: POST')
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('iso-8859-1'))
+        await self._write_chunks(writer, chunks)
+
+    async def _write_chunks(self, writer, chunks):
+        """Write the given data, waiting for the client to consume it.
+
+        We write the data in pieces of at most ``_WRITE_CHUNK_SIZE``
+        bytes, waiting for the client to consume each piece before
+        writing the next one. We write views of the chunks rather than
+        concatenating them.
+
+        Arguments:
+            writer (StreamWriter): The writer for the connection.
+            chunks (list<bytes>): The chunks whose concatenation is the
+                data to write.
+        """
+        for chunk in chunks:
+            view = memoryview(chunk)
+            for start in range(0, len(view), HttpServer._WRITE_CHUNK_SIZE):
+                writer.write(view[start:start + HttpServer._WRITE_CHUNK_SIZE])
+                await writer.drain()
+        await writer.drain()
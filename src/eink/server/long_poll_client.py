@@ -0,0 +1,125 @@
+from datetime import timedelta
+import io
+import logging
+import random
+import time
+
+from PIL import Image
+
+from .frame_cache import FrameCache
+from .request import Request
+from .response import Response
+from .server_io import ServerIO
+from .simulator import Simulator
+
+
+class LongPollClient:
+    """A client that makes long-poll requests to a server.
+
+    A device that is not battery powered, such as a wall-mounted panel
+    on USB power, can make long-poll requests rather than polling
+    frequently. The server holds each long-poll request until the
+    content changes or a timeout expires (see the ``long_poll_timeout``
+    argument to ``HttpServer``), and the client makes another request as
+    soon as it receives the response. See the comments for
+    ``Request.long_poll_frame_id``.
+
+    ``LongPollClient`` behaves like such a device: it keeps track of the
+    image it is displaying, maintains a frame cache, and retries with
+    the same nonce until it receives a response. It is useful for
+    testing a server's long-poll support, and for displaying a server's
+    content on a computer.
+    """
+
+    # Private attributes:
+    #
+    # bytes _device_id - The device ID to report, as in Request.device_id.
+    # FrameCache _frame_cache - The simulated frame cache.
+    # bytes _frame_id - The ID of the image we are displaying, as in
+    #     ServerIO.frame_id, or None if we have not received an image yet.
+    # int _nonce - The nonce for the current request, as in Request.nonce.
+    # timedelta _timeout - The maximum amount of time to wait for the
+    #     connection or for data from the server.
+    # str _url - The URL of the server.
+
+    def __init__(self, url, device_id=b'', timeout=timedelta(seconds=90)):
+        """Initialize a new ``LongPollClient``.
+
+        Arguments:
+            url (str): The URL of the server, as in the ``url`` argument
+                to ``Simulator.connect``.
+            device_id (bytes): The device ID to report, as in
+                ``Request.device_id``.
+            timeout (timedelta): The maximum amount of time to wait for
+                the connection or for data from the server. This must
+                exceed the server's long-poll timeout.
+        """
+        self._url = url
+        self._device_id = device_id
+        self._timeout = timeout
+        self._frame_cache = FrameCache()
+        self._frame_id = None
+        self._nonce = LongPollClient._new_nonce()
+
+    @staticmethod
+    def _new_nonce():
+        """Return a random value for ``Request.nonce``."""
+        # Avoid Request._UNKNOWN, which would indicate that there is no nonce
+        return random.randrange(Request._UNKNOWN + 1, 2 ** 31)
+
+    def frame_id(self):
+        """Return the ID of the image we are displaying.
+
+        Returns:
+            bytes: The ID, as in ``ServerIO.frame_id``, or ``None`` if
+            we have not received an image yet.
+        """
+        return self._frame_id
+
+    def poll(self):
+        """Make a long-poll request and return the image to display.
+
+        This blocks until the content changes or the server's long-poll
+        timeout expires. The first request is not a long-poll request,
+        because we do not have an image yet.
+
+        Returns:
+            Image: The image to display, or ``None`` if the server
+            instructed us to keep displaying the current image.
+        """
+        request = Request(
+            self._device_id, cached_frame_ids=self._frame_cache.frame_ids(),
+            nonce=self._nonce, long_poll_frame_id=self._frame_id)
+        response_payload = Simulator._exec(
+            self._url, request.to_bytes(), timeout=self._timeout)
+        response = Response.create_from_bytes(response_payload)
+        image_data = self._frame_cache.apply(response)
+        self._nonce = LongPollClient._new_nonce()
+        if not image_data:
+            return None
+        self._frame_id = ServerIO.frame_id(image_data)
+        return Image.open(io.BytesIO(image_data))
+
+    def poll_forever(self, callback, retry_time=timedelta(seconds=30)):
+        """Repeatedly call ``poll()``, passing each new image to ``callback``.
+
+        If a request fails, we log the error and retry after
+        ``retry_time``. The server must hold long-poll requests, as in
+        the ``long_poll_timeout`` argument to ``HttpServer``. Otherwise,
+        we make requests continuously.
+
+        Arguments:
+            callback (callable): The function to call with each image
+                we receive, as a ``PIL.Image.Image``.
+            retry_time (timedelta): The amount of time to wait after a
+                failed request.
+        """
+        while True:
+            try:
+                image = self.poll()
+            except Exception:
+                logging.getLogger(__name__).exception('Error polling server')
+                time.sleep(retry_time.total_seconds())
+                continue
+            if image is not None:
+                callback(image)
@@ -0,0 +1,86 @@
+from collections import deque
+from collections import OrderedDict
+from datetime import datetime
+import threading
+
+
+class MetricsSink:
+    """Records the telemetry that e-ink devices report in their requests.
+
+    See the comments for ``Request`` and ``Server.metrics_sink()``. By
+    default, a ``MetricsSink`` retains the most recent samples for each
+    device in memory. Subclasses may override ``record`` to forward the
+    samples elsewhere, such as to a time series database.
+
+    ``MetricsSink`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # OrderedDict<bytes, deque<tuple<datetime, Request, int>>> _devices - A
+    #     map from each device ID we are tracking to its most recent samples,
+    #     in chronological order. Each sample is represented as a tuple of the
+    #     time of the request, the request, and the number of bytes in the
+    #     response payload. The entries are in order from least recently to
+    #     most recently used.
+    # Lock _lock - The lock for accessing _devices.
+    # int _max_devices - The maximum number of entries in _devices.
+    # int _max_samples - The maximum number of samples per device.
+
+    def __init__(self, max_samples=100, max_devices=1024):
+        """Initialize a new ``MetricsSink``.
+
+        Arguments:
+            max_samples (int): The maximum number of samples to retain
+                for each device.
+            max_devices (int): The maximum number of devices to retain
+                samples for. If we exceed this number, we forget about
+                the least recently seen devices.
+        """
+        self._devices = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_samples = max_samples
+        self._max_devices = max_devices
+
+    def record(self, request, response_length):
+        """Record the telemetry in the specified request.
+
+        Arguments:
+            request (Request): The request.
+            response_length (int): The number of bytes in the response
+                payload we are sending to the device.
+        """
+        sample = (datetime.now(), request, response_length)
+        with self._lock:
+            samples = self._devices.pop(request.device_id, None)
+            if samples is None:
+                samples = deque(maxlen=self._max_samples)
+            samples.append(sample)
+            self._devices[request.device_id] = samples
+            if len(self._devices) > self._max_devices:
+                self._devices.popitem(last=False)
+
+    def device_ids(self):
+        """Return the IDs of the devices we have samples for.
+
+        Returns:
+            list<bytes>: The device IDs, as in ``Request.device_id``.
+        """
+        with self._lock:
+            return list(self._devices.keys())
+
+    def samples(self, device_id):
+        """Return the most recent samples for the specified device.
+
+        Arguments:
+            device_id (bytes): The device ID, as in
+                ``Request.device_id``.
+
+        Returns:
+            list<tuple<datetime, Request, int>>: The samples, in
+                chronological order. Each sample is represented as a
+                tuple of the local time of the request, the request, and
+                the number of bytes in the response payload.
+        """
+        with self._lock:
+            return list(self._devices.get(device_id, []))
@@ -0,0 +1,84 @@
+from datetime import datetime
+from datetime import timedelta
+import logging
+import threading
+
+
+class Prerenderer:
+    """Calls ``Server.prerender()`` shortly before each content boundary.
+
+    See the comments for ``Server.next_update_boundary``. A
+    ``Prerenderer`` runs in a background daemon thread. For example:
+
+    .. code-block:: python
+
+        Prerenderer(MyServer.instance()).start()
+    """
+
+    # Private attributes:
+    #
+    # timedelta _lead_time - How long before each content boundary to call
+    #     Server.prerender().
+    # Server _server - The server.
+    # Event _stop_event - An event that is set when we should stop.
+    # Thread _thread - The background thread, if any.
+
+    def __init__(self, server, lead_time=timedelta(seconds=30)):
+        """Initialize a new ``Prerenderer``.
+
+        Arguments:
+            server (Server): The server.
+            lead_time (timedelta): How long before each content boundary
+                to call ``server.prerender()``. This should exceed the
+                amount of time it takes to render the content.
+        """
+        self._server = server
+        self._lead_time = lead_time
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start pre-rendering content in a background thread."""
+        if self._thread is not None:
+            raise RuntimeError('Prerenderer has already been started')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop pre-rendering content.
+
+        We wait for any ongoing call to ``Server.prerender()`` to
+        finish.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _wait_until(self, time):
+        """Wait until the specified local time or until ``stop()`` is called.
+
+        Returns:
+            bool: Whether ``stop()`` was called.
+        """
+        wait_time = (time - datetime.now()).total_seconds()
+        if wait_time <= 0:
+            return self._stop_event.is_set()
+        return self._stop_event.wait(wait_time)
+
+    def _run(self):
+        """Implementation of the background thread."""
+        while not self._stop_event.is_set():
+            boundary = self._server.next_update_boundary(datetime.now())
+            if boundary is None:
+                return
+            if self._wait_until(boundary - self._lead_time):
+                return
+            try:
+                self._server.prerender(boundary)
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'Error prerendering content')
+
+            # Make sure we don't prerender the same boundary twice
+            if self._wait_until(boundary):
+                return
@@ -0,0 +1,99 @@
+import threading
+import time
+
+
+class RenderTask:
+    """A call to ``Server.render()`` that runs in a background thread.
+
+    See the comments for ``Server.render_deadline()``.
+    """
+
+    # Private attributes:
+    #
+    # Event _done_event - An event that is set when the render finishes.
+    # Exception _exception - The exception that rendering raised, if any.
+    # float _finish_time - The time.monotonic() value when the render
+    #     finished, or None if it has not finished.
+    # bytes _image_data - The contents of the PNG image file for the
+    #     rendered content, if rendering succeeded.
+    # Request _request - The request that caused us to render the content.
+    # Server _server - The server.
+
+    def __init__(self, server, request):
+        """Initialize a new ``RenderTask``.
+
+        Arguments:
+            server (Server): The server.
+            request (Request): The request that caused us to render the
+                content. ``Server.current_request()`` returns this
+                during the call to ``render()``.
+        """
+        self._server = server
+        self._request = request
+        self._done_event = threading.Event()
+        self._image_data = None
+        self._exception = None
+        self._finish_time = None
+
+    def start(self):
+        """Start rendering the content in a background daemon thread.
+
+        The caller must have recorded the render as in
+        ``Server._start_render()``. We call ``Server._finish_render()``
+        when the render finishes.
+        """
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def wait(self, timeout=None):
+        """Wait for the render to finish.
+
+        Arguments:
+            timeout (float): The maximum number of seconds to wait, or
+                ``None`` to wait indefinitely.
+
+        Returns:
+            bool: Whether the render has finished.
+        """
+        return self._done_event.wait(timeout)
+
+    def finished_before(self, age):
+        """Return whether the render finished at least ``age`` ago.
+
+        Arguments:
+            age (timedelta): The amount of time.
+
+        Returns:
+            bool: The result. This is ``False`` if the render has not
+            finished.
+        """
+        return (
+            self._finish_time is not None and
+            time.monotonic() - self._finish_time >= age.total_seconds())
+
+    def result(self):
+        """Return the result of the render, which must have finished.
+
+        Returns:
+            bytes: The contents of the PNG image file.
+
+        Raises:
+            Exception: The exception that rendering raised, if any.
+        """
+        if self._exception is not None:
+            raise self._exception
+        return self._image_data
+
+    def _run(self):
+        """Implementation of the background thread."""
+        local = self._server._state().local
+        local.request = self._request
+        try:
+            self._image_data = self._server._image_data(
+                self._server.render(), 'render')
+        except Exception as exception:
+            self._exception = exception
+        finally:
+            local.request = None
+            self._finish_time = time.monotonic()
+            self._server._finish_render()
+            self._done_event.set()
@@ -0,0 +1,136 @@
+import logging
+import socket
+import socketserver
+import threading
+
+from .frame_decoder import FrameDecoder
+
+
+class _ReplicaRequestHandler(socketserver.BaseRequestHandler):
+    """Handles a connection to a ``ReplicaReceiver``."""
+
+    def handle(self):
+        self.server.receiver._handle_connection(self.request)
+
+
+class _ReplicaTcpServer(socketserver.ThreadingTCPServer):
+    """The TCP server for a ``ReplicaReceiver``."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address_family, server_address, receiver):
+        self.address_family = address_family
+        self.receiver = receiver
+        super().__init__(server_address, _ReplicaRequestHandler)
+
+
+class ReplicaReceiver:
+    """Receives content from a ``ReplicationLeader`` and stores it.
+
+    This runs on each serving node in a replicated deployment (see the
+    comments for ``ReplicaStore``). It listens for TCP connections from
+    the render leader. On each connection, the leader sends payloads
+    returned by ``ReplicaStore.encode``, each preceded by its length as
+    in ``FrameDecoder``. We store each payload in the ``ReplicaStore``,
+    and then we acknowledge it by sending an empty payload, i.e. a
+    length of 0. The protocol has no authentication, so the port should
+    only be reachable from the local network.
+    """
+
+    # Private attributes:
+    #
+    # str _host - The host to listen on.
+    # int _max_payload_size - The maximum number of bytes in a payload.
+    # int _port - The port to listen on.
+    # ReplicaStore _store - The store.
+    # _ReplicaTcpServer _tcp_server - The TCP server, if we have started
+    #     listening.
+    # Thread _thread - The background thread started by start(), if any.
+
+    def __init__(
+            self, store, host='', port=5001,
+            max_payload_size=64 * 1024 * 1024):
+        """Initialize a new ``ReplicaReceiver``.
+
+        Arguments:
+            store (ReplicaStore): The store in which to store the
+                content.
+            host (str): The host to listen on. ``''`` listens on all
+                interfaces.
+            port (int): The port to listen on. If this is 0, we use an
+                arbitrary unused port (see ``port()``).
+            max_payload_size (int): The maximum number of bytes in a
+                payload. We close connections that send larger payloads.
+        """
+        self._store = store
+        self._host = host
+        self._port = port
+        self._max_payload_size = max_payload_size
+        self._tcp_server = None
+        self._thread = None
+
+    def _listen(self):
+        """Start listening for connections, unless we already are."""
+        if self._tcp_server is not None:
+            return
+        address = socket.getaddrinfo(
+            self._host or None, self._port, type=socket.SOCK_STREAM,
+            flags=socket.AI_PASSIVE)[0]
+        self._tcp_server = _ReplicaTcpServer(address[0], address[4], self)
+        logging.getLogger(__name__).info(
+            'Listening for replicated content on port {:d}'.format(
+                self.port()))
+
+    def port(self):
+        """Return the port we are listening on.
+
+        This is only available after calling ``serve_forever()`` or
+        ``start()``.
+        """
+        return self._tcp_server.server_address[1]
+
+    def _handle_connection(self, sock):
+        """Receive and store the payloads on the specified connection.
+
+        Arguments:
+            sock (socket): The connection's socket.
+        """
+        decoder = FrameDecoder(self._max_payload_size)
+        ack = b''.join(FrameDecoder.encode([b'']))
+        try:
+            while True:
+                data = sock.recv(64 * 1024)
+                if not data:
+                    return
+                for payload in decoder.feed(data):
+                    self._store.put(payload)
+                    sock.sendall(ack)
+        except (OSError, ValueError):
+            logging.getLogger(__name__).exception(
+                'Error receiving replicated content')
+
+    def serve_forever(self):
+        """Receive content until ``stop()`` is called."""
+        self._listen()
+        self._tcp_server.serve_forever()
+
+    def start(self):
+        """Call ``serve_forever()`` in a background daemon thread.
+
+        When this returns, we are listening for connections.
+        """
+        if self._thread is not None:
+            raise RuntimeError('ReplicaReceiver has already been started')
+        self._listen()
+        self._thread = threading.Thread(
+            target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop receiving content and close the listening socket."""
+        if self._tcp_server is not None:
+            if self._thread is not None:
+                self._tcp_server.shutdown()
+                self._thread.join()
+            self._tcp_server.server_close()
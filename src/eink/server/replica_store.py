@@ -0,0 +1,197 @@
+import io
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from .buffer_reader import BufferReader
+from .server_io import ServerIO
+
+
+class ReplicaStore:
+    """Stores content that another node rendered, for serving requests.
+
+    In a replicated deployment, one node, the render leader, renders the
+    content and pushes it to several serving nodes using a
+    ``ReplicationLeader``. Each serving node receives the content using
+    a ``ReplicaReceiver``, which stores it in a ``ReplicaStore``, and it
+    responds to requests using the stored content rather than calling
+    ``Server.render()`` (see ``Server.use_replica_store``). Rendering is
+    typically much more expensive than responding to requests, so this
+    lets us add serving capacity without adding rendering capacity.
+    Devices can fail over between the serving nodes if we list each of
+    them as a separate transport in the ``ClientConfig``.
+
+    The content is stored in a file in a directory, so that every worker
+    process of an ``HttpServer`` sees the same content. We replace the
+    file atomically, so readers never see part of it.
+
+    ``ReplicaStore`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # tuple<tuple, float, bytes, list<tuple<int, bytes>>> _cached - The
+    #     content we most recently read from the file, if any. This is a tuple
+    #     of the result of _signature() for the file, the time at which the
+    #     content was rendered, in seconds since the epoch, the image data, and
+    #     the scheduled frames, as in the return value of decode.
+    # str _dir - The directory containing the file.
+    # Lock _lock - The lock for accessing _cached.
+
+    # The name of the file containing the content
+    FILENAME = 'replica.bin'
+
+    # The Struct for encoding the time at which the content was rendered
+    _TIME_STRUCT = struct.Struct('<d')
+
+    def __init__(self, dir_):
+        """Initialize a new ``ReplicaStore``.
+
+        Arguments:
+            dir_ (str): The directory in which to store the content. It
+                must already exist.
+        """
+        self._dir = dir_
+        self._cached = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def encode(image_data, frames, render_time=None):
+        """Return a payload for replicating the specified content.
+
+        Arguments:
+            image_data (bytes): The contents of the PNG image file for
+                ``Server.render()``.
+            frames (list<tuple<int, bytes>>): The scheduled frames, as
+                in ``Response.frames``. The times are relative to
+                ``render_time``.
+            render_time (float): The time at which we rendered the
+                content, in seconds since the epoch. The default is the
+                current time.
+
+        Returns:
+            bytes: The payload.
+        """
+        if render_time is None:
+            render_time = time.time()
+        output = io.BytesIO()
+        output.write(ServerIO.HEADER)
+        ServerIO.write_bytes(output, ServerIO.PROTOCOL_VERSION)
+        output.write(ReplicaStore._TIME_STRUCT.pack(render_time))
+        ServerIO.write_bytes(output, image_data)
+        ServerIO.write_int(output, len(frames))
+        for time_ds, frame_data in frames:
+            ServerIO.write_int(output, time_ds)
+            ServerIO.write_bytes(output, frame_data)
+        return output.getvalue()
+
+    @staticmethod
+    def decode(payload):
+        """Return the content in a payload returned by ``encode``.
+
+        Arguments:
+            payload (bytes): The payload. This may be any bytes-like
+                object.
+
+        Returns:
+            tuple<float, bytes, list<tuple<int, bytes>>>: A tuple of the
+            time at which the content was rendered, the image data, and
+            the scheduled frames, as in the arguments to ``encode``.
+
+        Raises:
+            ValueError: If the payload is not correctly formatted, or it
+                was produced by a different version of this library.
+        """
+        reader = BufferReader(payload)
+        try:
+            header = reader.read(len(ServerIO.HEADER))
+            if header != ServerIO.HEADER:
+                raise ValueError('Invalid replica payload')
+            version = reader.read_bytes()
+        except ValueError:
+            raise ValueError('Invalid replica payload')
+        if version != ServerIO.PROTOCOL_VERSION:
+            raise ValueError(
+                'Version mismatch. The render leader is running a different '
+                'version of the eink-server code than this node is.')
+
+        try:
+            render_time = ReplicaStore._TIME_STRUCT.unpack(
+                reader.read(ReplicaStore._TIME_STRUCT.size))[0]
+            image_data = bytes(reader.read_bytes())
+            frame_count = reader.read_int()
+            frames = []
+            for _ in range(frame_count):
+                time_ds = reader.read_int()
+                frames.append((time_ds, bytes(reader.read_bytes())))
+        except ValueError:
+            raise ValueError('Invalid replica payload')
+        if not image_data or reader.remaining() > 0:
+            raise ValueError('Invalid replica payload')
+        return render_time, image_data, frames
+
+    def put(self, payload):
+        """Store the content in the specified payload.
+
+        Arguments:
+            payload (bytes): The payload, as returned by ``encode``.
+
+        Raises:
+            ValueError: If the payload is not valid, as in ``decode``.
+        """
+        ReplicaStore.decode(payload)
+        fd, temp_path = tempfile.mkstemp(dir=self._dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(
+                temp_path, os.path.join(self._dir, ReplicaStore.FILENAME))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _signature(stat):
+        """Return a value that changes whenever the file is replaced.
+
+        Arguments:
+            stat (os.stat_result): The result of calling ``os.stat`` on
+                the file.
+        """
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def content(self):
+        """Return the stored content, as of the current time.
+
+        Returns:
+            tuple<bytes, list<tuple<int, bytes>>>: A pair of the image
+            data and the scheduled frames, as in ``Response.frames``.
+            The frame times are relative to the current time, and we
+            omit any frames whose time has passed. This is ``None`` if
+            we have not received any content.
+        """
+        path = os.path.join(self._dir, ReplicaStore.FILENAME)
+        try:
+            signature = ReplicaStore._signature(os.stat(path))
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._cached
+        if cached is None or cached[0] != signature:
+            with open(path, 'rb') as file:
+                payload = file.read()
+            cached = (signature,) + ReplicaStore.decode(payload)
+            with self._lock:
+                self._cached = cached
+
+        _, render_time, image_data, frames = cached
+        elapsed_ds = max(0, int(10 * (time.time() - render_time)))
+        return image_data, [
+            (time_ds - elapsed_ds, frame_data)
+            for time_ds, frame_data in frames if time_ds > elapsed_ds]
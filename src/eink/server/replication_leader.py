@@ -0,0 +1,183 @@
+from datetime import datetime
+from datetime import timedelta
+import logging
+import socket
+import threading
+
+from .frame_decoder import FrameDecoder
+from .replica_store import ReplicaStore
+
+
+class ReplicationLeader:
+    """Renders a ``Server``'s content and pushes it to serving nodes.
+
+    This is the render leader in a replicated deployment (see the
+    comments for ``ReplicaStore``). Each time the content changes, as in
+    ``Server.update_time()`` and ``Server.next_update_boundary``, we
+    render it once and push it to every peer's ``ReplicaReceiver``. If
+    we are unable to reach a peer, we keep trying to push the same
+    content to it every ``retry_time``, until it is time to render new
+    content. For example:
+
+    .. code-block:: python
+
+        ReplicationLeader(
+            MyServer.instance(),
+            [('10.0.0.2', 5001), ('10.0.0.3', 5001)]).start()
+
+    To serve requests from the leader as well, run a ``ReplicaReceiver``
+    on the leader and include it in the list of peers.
+    """
+
+    # Private attributes:
+    #
+    # list<tuple<str, int>> _peers - The host and port of each peer's
+    #     ReplicaReceiver.
+    # timedelta _retry_time - The amount of time between attempts to push
+    #     content to a peer we were unable to reach.
+    # Server _server - The server.
+    # Event _stop_event - An event that is set when we should stop.
+    # Thread _thread - The background thread, if any.
+    # timedelta _timeout - The timeout for each connection to a peer.
+
+    def __init__(
+            self, server, peers, retry_time=timedelta(seconds=30),
+            timeout=timedelta(seconds=10)):
+        """Initialize a new ``ReplicationLeader``.
+
+        Arguments:
+            server (Server): The server.
+            peers (list<tuple<str, int>>): The host and port of each
+                peer's ``ReplicaReceiver``.
+            retry_time (timedelta): The amount of time between attempts
+                to push content to a peer we were unable to reach.
+            timeout (timedelta): The timeout for connecting to a peer
+                and for each operation on the connection.
+        """
+        if not peers:
+            raise ValueError('There must be at least one peer')
+        self._server = server
+        self._peers = list(peers)
+        self._retry_time = retry_time
+        self._timeout = timeout
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def render(self):
+        """Render the server's current content.
+
+        Returns:
+            bytes: A payload for pushing the content to the peers, as in
+            ``ReplicaStore.encode``.
+        """
+        now = datetime.now()
+        image_data = self._server._image_data(self._server.render(), 'render')
+        return ReplicaStore.encode(image_data, self._server._frames(now))
+
+    def push(self, payload, peers=None):
+        """Push the specified content to the peers.
+
+        Arguments:
+            payload (bytes): The content, as returned by ``render()``.
+            peers (list<tuple<str, int>>): The peers to push the
+                content to. The default is all of the peers.
+
+        Returns:
+            list<tuple<str, int>>: The peers that did not acknowledge
+            that they stored the content.
+        """
+        if peers is None:
+            peers = self._peers
+        data = b''.join(FrameDecoder.encode([payload]))
+        failed_peers = []
+        for host, port in peers:
+            try:
+                self._push_to_peer(host, port, data)
+            except (OSError, ValueError):
+                logging.getLogger(__name__).exception(
+                    'Error pushing content to {:s}:{:d}'.format(host, port))
+                failed_peers.append((host, port))
+        return failed_peers
+
+    def _push_to_peer(self, host, port, data):
+        """Push content to a peer and wait for its acknowledgment.
+
+        Arguments:
+            host (str): The peer's host.
+            port (int): The peer's port.
+            data (bytes): The length-prefixed payload, as in
+                ``FrameDecoder.encode``.
+
+        Raises:
+            OSError: If a socket operation fails or times out.
+            ValueError: If the peer closes the connection without
+                acknowledging the content.
+        """
+        timeout = self._timeout.total_seconds()
+        with socket.create_connection((host, port), timeout) as sock:
+            sock.sendall(data)
+            # The acknowledgment is an empty payload
+            decoder = FrameDecoder(0)
+            while True:
+                received = sock.recv(64)
+                if not received:
+                    raise ValueError(
+                        'The peer closed the connection without storing the '
+                        'content')
+                if decoder.feed(received):
+                    return
+
+    def replicate(self):
+        """Render the server's current content and push it to the peers.
+
+        Returns:
+            list<tuple<str, int>>: The peers that did not acknowledge
+            that they stored the content.
+        """
+        return self.push(self.render())
+
+    def replicate_forever(self):
+        """Replicate the content periodically until ``stop()`` is called."""
+        while not self._stop_event.is_set():
+            payload = None
+            failed_peers = []
+            try:
+                payload = self.render()
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'Error rendering content')
+            if payload is not None:
+                failed_peers = self.push(payload)
+
+            render_time = self._server._next_render_time(datetime.now())
+            while failed_peers:
+                retry_time = datetime.now() + self._retry_time
+                if render_time is not None and render_time <= retry_time:
+                    break
+                if self._stop_event.wait(self._retry_time.total_seconds()):
+                    return
+                failed_peers = self.push(payload, failed_peers)
+
+            if render_time is None:
+                self._stop_event.wait()
+            else:
+                self._stop_event.wait(
+                    max((render_time - datetime.now()).total_seconds(), 0))
+
+    def start(self):
+        """Call ``replicate_forever()`` in a background daemon thread."""
+        if self._thread is not None:
+            raise RuntimeError('ReplicationLeader has already been started')
+        self._thread = threading.Thread(
+            target=self.replicate_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop replicating content.
+
+        We wait for any ongoing render or push in the background thread
+        to finish.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
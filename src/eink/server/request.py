@@ -1,11 +1,96 @@
 import io
 
+from .buffer_reader import BufferReader
 from .errors import ServerError
 from .server_io import ServerIO
 
 
 class Request:
-    """A parsed object representation of a request payload."""
+    """A parsed object representation of a request payload.
+
+    Apart from ``device_id``, ``nonce``, ``cached_frame_ids``,
+    ``resume_frame_id``, ``resume_chunk``, ``long_poll_frame_id``, and
+    ``transport_index``, the public attributes are telemetry that the
+    e-ink device reports about itself.
+    A value of ``None`` indicates that the device did not report the
+    value.
+
+    Public attributes:
+
+    bytes device_id - A value identifying the e-ink device that made the
+        request, such as its MAC address. This is ``b''`` if the device
+        is unknown, e.g. if the request came from ``Simulator``.
+    float battery_voltage - The battery voltage, in volts.
+    int wi_fi_rssi - The strength of the Wi-Fi signal, as a received
+        signal strength indicator in dBm.
+    int connect_time_ms - The number of milliseconds it took to connect
+        to the Wi-Fi network before making the request. This is 0 if the
+        device was already connected.
+    int draw_time_ms - The number of milliseconds it took to download,
+        decode, and draw the image from the previous successful
+        response.
+    int wake_count - The number of times the device has woken from sleep
+        since it was last reset.
+    int nonce - A random value identifying the device's current attempt
+        to obtain updated content. The device only changes the nonce
+        after it successfully applies a response, so requests with the
+        same device ID and nonce are retries of the same request. See
+        the comments for ``RetryCache``.
+    list<bytes> cached_frame_ids - The IDs of the images in the device's
+        frame cache, as in ``ServerIO.frame_id``. See the comments for
+        ``FrameCache``.
+    bytes resume_frame_id - The ID of the image, as in
+        ``ServerIO.frame_id``, whose download the device would like to
+        resume, or ``None`` if there is no such image. A download is
+        interrupted if, say, the Wi-Fi connection drops partway through
+        a response.
+    int resume_chunk - The number of checksummed chunks of the image
+        ``resume_frame_id`` that the device has already received and
+        stored, as in ``Response.to_chunks()``. This is 0 if
+        ``resume_frame_id`` is ``None``.
+    bytes long_poll_frame_id - The ID of the image the device is
+        displaying, as in ``ServerIO.frame_id``, if the device is making
+        a long-poll request, or ``None`` otherwise. A long-poll request
+        asks the server to wait until the content's image has a
+        different ID before responding. See the comments for
+        ``ContentWatcher``.
+    int transport_index - The index of the transport in the device's
+        ``ClientConfig`` that the device used to make the request. See
+        the comments for ``TransportBalancer``.
+    """
+
+    # The integer we use to encode a value of None for one of the telemetry
+    # fields. It duplicates the C++ constant UNKNOWN_TELEMETRY.
+    _UNKNOWN = -2 ** 31
+
+    # The maximum number of elements in cached_frame_ids that we accept in a
+    # request payload
+    _MAX_CACHED_FRAME_IDS = 1024
+
+    def __init__(
+            self, device_id=b'', battery_voltage=None, wi_fi_rssi=None,
+            connect_time_ms=None, draw_time_ms=None, wake_count=None,
+            cached_frame_ids=None, nonce=None, resume_frame_id=None,
+            resume_chunk=0, long_poll_frame_id=None, transport_index=None):
+        self.device_id = device_id
+        self.battery_voltage = battery_voltage
+        self.wi_fi_rssi = wi_fi_rssi
+        self.connect_time_ms = connect_time_ms
+        self.draw_time_ms = draw_time_ms
+        self.wake_count = wake_count
+        self.nonce = nonce
+        if cached_frame_ids is not None:
+            self.cached_frame_ids = cached_frame_ids
+        else:
+            self.cached_frame_ids = []
+        if resume_frame_id is not None and resume_chunk > 0:
+            self.resume_frame_id = resume_frame_id
+            self.resume_chunk = resume_chunk
+        else:
+            self.resume_frame_id = None
+            self.resume_chunk = 0
+        self.long_poll_frame_id = long_poll_frame_id
+        self.transport_index = transport_index
 
     def to_bytes(self):
         """Return a request payload for this ``Request`` object.
@@ -16,14 +101,73 @@ class Request:
         result = io.BytesIO()
         result.write(ServerIO.HEADER)
         ServerIO.write_bytes(result, ServerIO.PROTOCOL_VERSION)
+        ServerIO.write_bytes(result, self.device_id)
+
+        if self.battery_voltage is not None:
+            battery_mv = int(1000 * self.battery_voltage + 0.5)
+        else:
+            battery_mv = None
+        values = [
+            battery_mv, self.wi_fi_rssi, self.connect_time_ms,
+            self.draw_time_ms, self.wake_count, self.nonce]
+        for value in values:
+            if value is not None:
+                ServerIO.write_int(result, value)
+            else:
+                ServerIO.write_int(result, Request._UNKNOWN)
+
+        ServerIO.write_int(result, len(self.cached_frame_ids))
+        for frame_id in self.cached_frame_ids:
+            result.write(frame_id)
+
+        if self.resume_frame_id is not None:
+            result.write(self.resume_frame_id)
+        else:
+            result.write(bytes(ServerIO.FRAME_ID_LENGTH))
+        ServerIO.write_int(result, self.resume_chunk)
+
+        if self.long_poll_frame_id is not None:
+            result.write(self.long_poll_frame_id)
+        else:
+            result.write(bytes(ServerIO.FRAME_ID_LENGTH))
+
+        # The device overwrites the transport index for each transport it
+        # tries, so it must be at the end of the payload
+        if self.transport_index is not None:
+            ServerIO.write_int(result, self.transport_index)
+        else:
+            ServerIO.write_int(result, Request._UNKNOWN)
         return result.getvalue()
 
+    @staticmethod
+    def _read_telemetry(reader):
+        """Read a telemetry value from the specified ``BufferReader``.
+
+        This is the inverse of how ``to_bytes()`` writes each telemetry
+        value.
+
+        Arguments:
+            reader (BufferReader): The reader to read the value from.
+
+        Returns:
+            int: The value, or ``None`` if it is unknown.
+
+        Raises:
+            ValueError: If we reach the end of the payload.
+        """
+        value = reader.read_int()
+        if value != Request._UNKNOWN:
+            return value
+        else:
+            return None
+
     @staticmethod
     def create_from_bytes(bytes_):
         """Return a ``Request`` representation of the specified payload.
 
         Arguments:
-            bytes_ (bytes): The payload.
+            bytes_ (bytes): The payload. This may be any bytes-like
+                object, such as a ``memoryview`` of a larger buffer.
 
         Returns:
             Request: The request.
@@ -33,13 +177,56 @@ class Request:
                 valid encoding of a request payload, or at least not one
                 that this version of the library is able to handle.
         """
-        input_ = io.BytesIO(bytes_)
-        header = input_.read(len(ServerIO.HEADER))
+        reader = BufferReader(bytes_)
+        try:
+            header = reader.read(len(ServerIO.HEADER))
+        except ValueError:
+            raise ServerError('Invalid request payload')
         if header != ServerIO.HEADER:
             raise ServerError('Invalid request payload')
-        version = ServerIO.read_bytes(input_)
+        try:
+            version = reader.read_bytes()
+        except ValueError:
+            raise ServerError('Invalid request payload')
         if version != ServerIO.PROTOCOL_VERSION:
             raise ServerError(
                 'Version mismatch. The server is running a different version '
                 'of the eink-server code than the Inkplate device is.')
-        return Request()
+
+        try:
+            device_id = bytes(reader.read_bytes())
+            battery_mv = Request._read_telemetry(reader)
+            wi_fi_rssi = Request._read_telemetry(reader)
+            connect_time_ms = Request._read_telemetry(reader)
+            draw_time_ms = Request._read_telemetry(reader)
+            wake_count = Request._read_telemetry(reader)
+            nonce = Request._read_telemetry(reader)
+
+            cached_frame_count = reader.read_int()
+            if not 0 <= cached_frame_count <= Request._MAX_CACHED_FRAME_IDS:
+                raise ServerError('Invalid request payload')
+            cached_frame_ids = [
+                bytes(reader.read(ServerIO.FRAME_ID_LENGTH))
+                for _ in range(cached_frame_count)]
+
+            resume_frame_id = bytes(reader.read(ServerIO.FRAME_ID_LENGTH))
+            resume_chunk = reader.read_int()
+            if resume_chunk < 0:
+                raise ServerError('Invalid request payload')
+            long_poll_frame_id = bytes(
+                reader.read(ServerIO.FRAME_ID_LENGTH))
+            transport_index = Request._read_telemetry(reader)
+        except ValueError:
+            raise ServerError('Invalid request payload')
+
+        if battery_mv is not None:
+            battery_voltage = battery_mv / 1000
+        else:
+            battery_voltage = None
+        if long_poll_frame_id == bytes(ServerIO.FRAME_ID_LENGTH):
+            long_poll_frame_id = None
+        return Request(
+            device_id, battery_voltage, wi_fi_rssi, connect_time_ms,
+            draw_time_ms, wake_count, cached_frame_ids, nonce,
+            resume_frame_id, resume_chunk, long_poll_frame_id,
+            transport_index)
@@ -1,5 +1,7 @@
-import io
+import struct
+import zlib
 
+from .buffer_reader import BufferReader
 from .server_io import ServerIO
 
 
@@ -9,7 +11,10 @@ class Response:
     Public attributes:
 
     bytes image_data - The contents of the PNG image file that the e-ink
-        device should display.
+        device should display. If this is ``b''``, the device should
+        keep displaying its current image and any pending scheduled
+        frames. If this is ``None``, the device should display the image
+        in its frame cache whose ID is ``image_id``.
     list<int> request_times_ds - The amount of time between requests to
         the server, in tenths of a second, as in the C++ field
         ``ClientState.requestTimesDs``.
@@ -18,15 +23,69 @@ class Response:
     int screensaver_time_ds - The amount of time to wait before
         displaying the screensaver, in tenths of a second. If this is
         ``Server._INT_MAX``, we will never display a screensaver.
+    list<tuple<int, bytes>> frames - The scheduled frames, as in
+        ``Server.frame_times()``. Each frame is represented as a pair of
+        the time at which to display it, in tenths of a second after
+        the response, and the contents of the PNG image file to display.
+        The frames are in strictly increasing order of time.
+    bytes image_id - The ID of the image to display, as in
+        ``ServerIO.frame_id``. This is ``FRAME_ID_LENGTH`` zero bytes
+        if ``image_data`` is ``b''``.
+    int image_start_chunk - The index of the first chunk of the image
+        data to include in the payload, as in ``to_chunks()``. This is
+        nonzero when resuming an interrupted download (see
+        ``Request.resume_chunk``). For a ``Response`` returned by
+        ``create_from_bytes``, ``image_data`` only contains the bytes
+        starting at this chunk.
+    int preferred_transport - The index of the transport in the
+        device's ``ClientConfig`` that it should try first for its next
+        request, or ``None`` if it should keep using its current
+        preference. See the comments for ``TransportBalancer``.
     """
 
+    # The value of the image length in a response payload that indicates that
+    # the device should display the image from its frame cache with the given
+    # ID. This duplicates the C++ constant CACHED_IMAGE_LENGTH.
+    _CACHED_IMAGE_LENGTH = -1
+
+    # The value of the preferred transport in a response payload that
+    # indicates that the device should keep its current preference. This
+    # duplicates the C++ constant NO_PREFERRED_TRANSPORT.
+    _NO_PREFERRED_TRANSPORT = -1
+
+    # The Struct for encoding the checksum of a chunk of the image data
+    _CHECKSUM_STRUCT = struct.Struct('<I')
+
     def __init__(
             self, image_data, request_times_ds, screensaver_id,
-            screensaver_time_ds):
+            screensaver_time_ds, frames=None, image_id=None,
+            image_start_chunk=0, preferred_transport=None):
         self.image_data = image_data
         self.request_times_ds = request_times_ds
         self.screensaver_id = screensaver_id
         self.screensaver_time_ds = screensaver_time_ds
+        if frames is not None:
+            self.frames = frames
+        else:
+            self.frames = []
+        if image_id is not None:
+            self.image_id = image_id
+        elif image_data:
+            self.image_id = ServerIO.frame_id(image_data)
+        else:
+            self.image_id = bytes(ServerIO.FRAME_ID_LENGTH)
+        self.image_start_chunk = image_start_chunk
+        self.preferred_transport = preferred_transport
+
+    def image_chunk_count(self):
+        """Return the number of checksummed chunks in the image data.
+
+        This is the total number of chunks, including any before
+        ``image_start_chunk``.
+        """
+        if not self.image_data:
+            return 0
+        return -(-len(self.image_data) // ServerIO.IMAGE_CHUNK_SIZE)
 
     def to_bytes(self):
         """Return a response payload for this ``Response`` object.
@@ -34,46 +93,145 @@ class Response:
         Returns:
             bytes: The payload.
         """
-        result = io.BytesIO()
-        result.write(ServerIO.HEADER)
+        return b''.join(self.to_chunks())
 
-        ServerIO.write_int(result, len(self.request_times_ds))
-        for request_time_ds in self.request_times_ds:
-            ServerIO.write_int(result, request_time_ds)
+    def to_chunks(self):
+        """Return the chunks of a response payload for this ``Response``.
 
-        result.write(self.screensaver_id)
-        ServerIO.write_int(result, self.screensaver_time_ds)
+        The concatenation of the chunks is equal to ``to_bytes()``. The
+        image data and the frames' image data are separate chunks,
+        rather than copies, so this is suitable for scatter-gather
+        output, as in ``socket.sendmsg`` or ``StreamWriter.writelines``.
 
-        ServerIO.write_int(result, len(self.image_data))
-        result.write(self.image_data)
-        return result.getvalue()
+        The image data is divided into chunks of
+        ``ServerIO.IMAGE_CHUNK_SIZE`` bytes (the last chunk may be
+        shorter), each followed by its CRC-32 checksum. A device stores
+        each chunk as soon as it verifies it, so that if a download is
+        interrupted, it can ask for the remaining chunks, starting at
+        ``image_start_chunk``, rather than the whole image.
+
+        Returns:
+            list<bytes>: The chunks.
+        """
+        pack_int = ServerIO.INT_STRUCT.pack
+        head = [ServerIO.HEADER, pack_int(len(self.request_times_ds))]
+        head.extend(
+            pack_int(request_time_ds)
+            for request_time_ds in self.request_times_ds)
+        head.append(self.screensaver_id)
+        head.append(pack_int(self.screensaver_time_ds))
+        if self.preferred_transport is not None:
+            head.append(pack_int(self.preferred_transport))
+        else:
+            head.append(pack_int(Response._NO_PREFERRED_TRANSPORT))
+        head.append(self.image_id)
+        if self.image_data is None:
+            head.append(pack_int(Response._CACHED_IMAGE_LENGTH))
+        else:
+            head.append(pack_int(len(self.image_data)))
+        if self.image_data:
+            head.append(pack_int(self.image_start_chunk))
+        chunks = [b''.join(head)]
+        if self.image_data:
+            view = memoryview(self.image_data)
+            pack_checksum = Response._CHECKSUM_STRUCT.pack
+            for start in range(
+                    self.image_start_chunk * ServerIO.IMAGE_CHUNK_SIZE,
+                    len(view), ServerIO.IMAGE_CHUNK_SIZE):
+                chunk = view[start:start + ServerIO.IMAGE_CHUNK_SIZE]
+                chunks.append(chunk)
+                chunks.append(pack_checksum(zlib.crc32(chunk)))
+
+        tail = [pack_int(len(self.frames))]
+        for time_ds, image_data in self.frames:
+            tail.append(pack_int(time_ds))
+            tail.append(pack_int(len(image_data)))
+            chunks.append(b''.join(tail))
+            chunks.append(image_data)
+            tail = []
+        if tail:
+            chunks.append(b''.join(tail))
+        return chunks
 
     @staticmethod
     def create_from_bytes(bytes_):
         """Return a ``Response`` representation of the specified payload.
 
         Arguments:
-            bytes_ (bytes): The payload.
+            bytes_ (bytes): The payload. This may be any bytes-like
+                object, such as a ``memoryview`` of a larger buffer.
 
         Returns:
             Response: The response.
+
+        Raises:
+            ValueError: If the payload is not correctly formatted, or a
+                chunk of the image data does not match its checksum.
         """
-        input_ = io.BytesIO(bytes_)
-        header = input_.read(len(ServerIO.HEADER))
-        if header != ServerIO.HEADER:
+        reader = BufferReader(bytes_)
+        try:
+            header = reader.read(len(ServerIO.HEADER))
+            if header != ServerIO.HEADER:
+                raise ValueError('Invalid response payload')
+
+            request_times_count = reader.read_int()
+            request_times_ds = [
+                reader.read_int() for _ in range(request_times_count)]
+
+            screensaver_id = bytes(
+                reader.read(ServerIO.STATUS_IMAGE_ID_LENGTH))
+            screensaver_time_ds = reader.read_int()
+            preferred_transport = reader.read_int()
+            if preferred_transport == Response._NO_PREFERRED_TRANSPORT:
+                preferred_transport = None
+            image_id = bytes(reader.read(ServerIO.FRAME_ID_LENGTH))
+            image_length = reader.read_int()
+            image_start_chunk = 0
+            if image_length == Response._CACHED_IMAGE_LENGTH:
+                image_data = None
+            elif image_length == 0:
+                image_data = b''
+            else:
+                image_start_chunk = reader.read_int()
+                image_data = Response._read_image_chunks(
+                    reader, image_length, image_start_chunk)
+
+            frame_count = reader.read_int()
+            frames = []
+            for _ in range(frame_count):
+                time_ds = reader.read_int()
+                frames.append((time_ds, bytes(reader.read_bytes())))
+        except ValueError:
             raise ValueError('Invalid response payload')
+        return Response(
+            image_data, request_times_ds, screensaver_id, screensaver_time_ds,
+            frames, image_id, image_start_chunk, preferred_transport)
 
-        request_times_count = ServerIO.read_int(input_)
-        request_times_ds = []
-        for _ in range(request_times_count):
-            request_times_ds.append(ServerIO.read_int(input_))
+    @staticmethod
+    def _read_image_chunks(reader, image_length, start_chunk):
+        """Read and verify the checksummed chunks of a response's image data.
 
-        screensaver_id = input_.read(ServerIO.STATUS_IMAGE_ID_LENGTH)
-        screensaver_time_ds = ServerIO.read_int(input_)
+        Arguments:
+            reader (BufferReader): The reader for the payload.
+            image_length (int): The total length of the image data.
+            start_chunk (int): The index of the first chunk in the
+                payload.
 
-        image_data_length = ServerIO.read_int(input_)
-        image_data = input_.read(image_data_length)
-        if len(image_data) < image_data_length:
+        Returns:
+            bytes: The image data, starting at the chunk with index
+            ``start_chunk``.
+        """
+        start = start_chunk * ServerIO.IMAGE_CHUNK_SIZE
+        if not 0 <= start < image_length:
             raise ValueError('Invalid response payload')
-        return Response(
-            image_data, request_times_ds, screensaver_id, screensaver_time_ds)
+        chunks = []
+        while start < image_length:
+            chunk = reader.read(
+                min(ServerIO.IMAGE_CHUNK_SIZE, image_length - start))
+            checksum = Response._CHECKSUM_STRUCT.unpack(
+                reader.read(Response._CHECKSUM_STRUCT.size))[0]
+            if zlib.crc32(chunk) != checksum:
+                raise ValueError('Invalid response payload')
+            chunks.append(chunk)
+            start += len(chunk)
+        return b''.join(chunks)
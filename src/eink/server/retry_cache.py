@@ -0,0 +1,112 @@
+from datetime import timedelta
+import time
+
+from ..image.lru_cache import LruCache
+
+
+class RetryCache:
+    """Stores recent responses, so that retries don't re-render.
+
+    An e-ink device includes a nonce in each request (see
+    ``Request.nonce``), and it only changes the nonce once it has
+    successfully applied a response. If a response is cut off, e.g.
+    because of a flaky Wi-Fi connection, the device retries with the
+    same nonce, and we respond with the same content we sent the first
+    time, rather than rendering the content again. ``Server`` adjusts
+    the stored response's times for the time that has passed since we
+    stored it. If the device
+    received part of the image, the retry only needs to include the
+    rest of it (see ``Request.resume_chunk``).
+
+    A stored response may refer to frames in the device's frame cache,
+    as in ``FrameCache``. We only reuse it if the device still reports
+    all of the cached frames it reported in the original request.
+
+    ``RetryCache`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # LruCache _cache - The stored responses. Each key is a pair of the device
+    #     ID and the nonce. Each value is a tuple of the time.monotonic() value
+    #     when we stored the response, the set of cached frame IDs in the
+    #     original request, and the Response.
+    # timedelta _max_age - The maximum amount of time to keep a response.
+
+    # The approximate number of bytes of memory a Response uses, apart from
+    # its image data
+    _RESPONSE_OVERHEAD = 256
+
+    def __init__(
+            self, max_bytes=16 * 1024 * 1024, max_age=timedelta(minutes=15)):
+        """Initialize a new ``RetryCache``.
+
+        Arguments:
+            max_bytes (int): The approximate maximum number of bytes of
+                memory to use for the stored responses.
+            max_age (timedelta): The maximum amount of time after a
+                request at which we respond to a retry of the request
+                with the same payload.
+        """
+        self._cache = LruCache(max_bytes)
+        self._max_age = max_age
+
+    @staticmethod
+    def _key(request):
+        """Return the key for the specified ``Request``, if any.
+
+        Return ``None`` if we should not store the response to the
+        request, because we cannot identify retries of the request.
+        """
+        if not request.device_id or request.nonce is None:
+            return None
+        return (request.device_id, request.nonce)
+
+    def get(self, request):
+        """Return the response we stored for a previous attempt at a request.
+
+        Arguments:
+            request (Request): The request.
+
+        Returns:
+            tuple<Response, timedelta>: A pair of the response and the
+            amount of time since we stored it, or ``None`` if we do not
+            have a response that we may reuse.
+        """
+        key = RetryCache._key(request)
+        if key is None:
+            return None
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        store_time, cached_frame_ids, response = entry
+        age = timedelta(seconds=max(0, time.monotonic() - store_time))
+        if (age > self._max_age or
+                not cached_frame_ids.issubset(request.cached_frame_ids)):
+            self._cache.remove(key)
+            return None
+        return response, age
+
+    def put(self, request, response):
+        """Store the response to the specified request.
+
+        Arguments:
+            request (Request): The request.
+            response (Response): The response.
+        """
+        key = RetryCache._key(request)
+        if key is not None:
+            entry = (
+                time.monotonic(), frozenset(request.cached_frame_ids),
+                response)
+            self._cache.put(key, entry, RetryCache._size(response))
+
+    @staticmethod
+    def _size(response):
+        """Return the approximate number of bytes a ``Response`` uses."""
+        size = RetryCache._RESPONSE_OVERHEAD
+        if response.image_data:
+            size += len(response.image_data)
+        for _, image_data in response.frames:
+            size += len(image_data)
+        return size
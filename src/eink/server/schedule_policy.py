@@ -0,0 +1,251 @@
+from datetime import timedelta
+
+
+class SchedulePolicy:
+    """Determines how often e-ink devices poll, by time of day and week.
+
+    A ``SchedulePolicy`` assigns a polling interval to each hour of the
+    day, with one profile for weekdays and another for weekends. An
+    interval of ``None`` marks quiet hours, during which devices make no
+    requests. Rather than polling throughout the quiet hours, a device
+    sleeps once until they end. For example, an office display that
+    updates every five minutes during working hours, every half hour in
+    the evening, and not at all overnight or on weekends could use:
+
+    .. code-block:: python
+
+        SchedulePolicy(
+            7 * [None] + 12 * [timedelta(minutes=5)] +
+            3 * [timedelta(minutes=30)] + 2 * [None],
+            24 * [None])
+
+    ``Server.update_time()`` and ``Server.retry_times()`` delegate to a
+    ``SchedulePolicy`` like this:
+
+    .. code-block:: python
+
+        def update_time(self):
+            return self._policy.update_time(datetime.now())
+
+        def retry_times(self):
+            return self._policy.retry_times(datetime.now())
+
+    ``retry_times`` may return many more retry times than the client
+    can store. ``Server`` merges them to fit the limit, without making
+    the client retry during the quiet hours. See the comments for
+    ``Server.retry_times()``.
+
+    Times are naive ``datetime`` values in local time, like the return
+    value of ``datetime.now()``.
+    """
+
+    # Private attributes:
+    #
+    # timedelta _horizon - The amount of time that the retry times returned by
+    #     retry_times() cover.
+    # list<timedelta> _hourly_intervals - The polling interval for each hour
+    #     of a weekday, as in the "hourly_intervals" argument to the
+    #     constructor.
+    # list<timedelta> _weekend_hourly_intervals - The polling interval for
+    #     each hour of a weekend day.
+    # frozenset<int> _weekend_days - The days of the week that are weekend
+    #     days, as in datetime.weekday().
+
+    # The maximum number of retry times that retry_times() returns. This
+    # limits the amount of time it takes to merge them, as in
+    # Server._merge_retry_times_ds.
+    _MAX_RETRY_TIMES = 500
+
+    def __init__(
+            self, hourly_intervals, weekend_hourly_intervals=None,
+            weekend_days=(5, 6), horizon=timedelta(days=1)):
+        """Initialize a new ``SchedulePolicy``.
+
+        Arguments:
+            hourly_intervals (list<timedelta>): The polling interval for
+                each hour of a weekday. Element ``i`` applies from
+                ``i``:00 to ``i + 1``:00. An element of ``None`` marks
+                a quiet hour.
+            weekend_hourly_intervals (list<timedelta>): The polling
+                interval for each hour of a weekend day, in the same
+                format as ``hourly_intervals``. The default is
+                ``hourly_intervals``.
+            weekend_days (tuple<int>): The days of the week that are
+                weekend days, as in ``datetime.weekday()``.
+            horizon (timedelta): The amount of time that the retry times
+                returned by ``retry_times`` cover. After that, the
+                client retries at a constant interval. This should be
+                long enough to cover the next quiet hours.
+        """
+        if weekend_hourly_intervals is None:
+            weekend_hourly_intervals = hourly_intervals
+        for intervals in (hourly_intervals, weekend_hourly_intervals):
+            if len(intervals) != 24:
+                raise ValueError('There must be an interval for each hour')
+            for interval in intervals:
+                if interval is not None and interval <= timedelta():
+                    raise ValueError('Polling intervals must be positive')
+        self._hourly_intervals = list(hourly_intervals)
+        self._weekend_hourly_intervals = list(weekend_hourly_intervals)
+        self._weekend_days = frozenset(weekend_days)
+        self._horizon = horizon
+
+        if all(
+                interval is None
+                for day in range(7) for interval in self._day_intervals(day)):
+            raise ValueError('Every hour of the week is a quiet hour')
+
+    @staticmethod
+    def create_with_quiet_hours(
+            interval, quiet_start_hour, quiet_end_hour,
+            weekend_quiet_end_hour=None):
+        """Return a ``SchedulePolicy`` with a fixed interval and quiet hours.
+
+        Arguments:
+            interval (timedelta): The polling interval outside of the
+                quiet hours.
+            quiet_start_hour (int): The hour at which the quiet hours
+                start each night, from 0 to 23.
+            quiet_end_hour (int): The hour at which the quiet hours end
+                each morning, from 0 to 23.
+            weekend_quiet_end_hour (int): The hour at which the quiet
+                hours end on weekend days. The default is
+                ``quiet_end_hour``.
+
+        Returns:
+            SchedulePolicy: The policy.
+        """
+        if weekend_quiet_end_hour is None:
+            weekend_quiet_end_hour = quiet_end_hour
+        for hour in (quiet_start_hour, quiet_end_hour, weekend_quiet_end_hour):
+            if not 0 <= hour < 24:
+                raise ValueError('Hours must be between 0 and 23')
+
+        def hourly_intervals(end_hour):
+            intervals = []
+            for hour in range(24):
+                if quiet_start_hour <= end_hour:
+                    is_quiet = quiet_start_hour <= hour < end_hour
+                else:
+                    is_quiet = hour >= quiet_start_hour or hour < end_hour
+                intervals.append(None if is_quiet else interval)
+            return intervals
+
+        return SchedulePolicy(
+            hourly_intervals(quiet_end_hour),
+            hourly_intervals(weekend_quiet_end_hour))
+
+    def _day_intervals(self, weekday):
+        """Return the polling interval for each hour of the specified day.
+
+        Arguments:
+            weekday (int): The day of the week, as in
+                ``datetime.weekday()``.
+
+        Returns:
+            list<timedelta>: The intervals.
+        """
+        if weekday in self._weekend_days:
+            return self._weekend_hourly_intervals
+        else:
+            return self._hourly_intervals
+
+    @staticmethod
+    def _next_hour(time):
+        """Return the start of the hour after the one containing ``time``."""
+        return (
+            time.replace(minute=0, second=0, microsecond=0) +
+            timedelta(hours=1))
+
+    def interval(self, time):
+        """Return the polling interval at the specified time.
+
+        Arguments:
+            time (datetime): The time.
+
+        Returns:
+            timedelta: The interval, or ``None`` if ``time`` is in the
+            quiet hours.
+        """
+        return self._day_intervals(time.weekday())[time.hour]
+
+    def _quiet_end(self, time):
+        """Return the end of the quiet hours containing ``time``.
+
+        Arguments:
+            time (datetime): The time. This must be in the quiet hours.
+
+        Returns:
+            datetime: The first time after ``time`` that is not in the
+            quiet hours.
+        """
+        time = SchedulePolicy._next_hour(time)
+        while self.interval(time) is None:
+            time += timedelta(hours=1)
+        return time
+
+    def next_request_time(self, time):
+        """Return the time at which to make the request after ``time``.
+
+        Normally, this is ``time`` plus the polling interval at
+        ``time``. However, if the quiet hours start before then, the
+        device instead sleeps until they end. And if a shorter polling
+        interval starts before then, the device makes a request when it
+        starts.
+
+        Arguments:
+            time (datetime): The time of the previous request.
+
+        Returns:
+            datetime: The time of the next request. This is not in the
+            quiet hours.
+        """
+        interval = self.interval(time)
+        if interval is None:
+            return self._quiet_end(time)
+        request_time = time + interval
+        hour = SchedulePolicy._next_hour(time)
+        while hour <= request_time:
+            hour_interval = self.interval(hour)
+            if hour_interval is None:
+                return self._quiet_end(hour)
+            elif hour_interval < interval:
+                return hour
+            hour += timedelta(hours=1)
+        return request_time
+
+    def update_time(self, now):
+        """Return the value ``Server.update_time()`` should return.
+
+        Arguments:
+            now (datetime): The current time.
+
+        Returns:
+            timedelta: The amount of time until the next request.
+        """
+        return self.next_request_time(now) - now
+
+    def retry_times(self, now):
+        """Return the value ``Server.retry_times()`` should return.
+
+        The client retries at the same times it would make requests if
+        each request succeeded, starting at the time of the next
+        request. In particular, it does not retry during the quiet
+        hours.
+
+        Arguments:
+            now (datetime): The current time.
+
+        Returns:
+            list<timedelta>: The retry intervals.
+        """
+        time = self.next_request_time(now)
+        end_time = time + self._horizon
+        retry_times = []
+        while (time < end_time and
+                len(retry_times) < SchedulePolicy._MAX_RETRY_TIMES - 1):
+            request_time = self.next_request_time(time)
+            retry_times.append(request_time - time)
+            time = request_time
+        retry_times.append(self.interval(time))
+        return retry_times
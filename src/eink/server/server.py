@@ -1,11 +1,22 @@
+import copy
+from datetime import datetime
 from datetime import timedelta
+import hashlib
+import logging
+import os
+import random
+
+from PIL import Image
 
 from ..image import EinkGraphics
 from ..image import Palette
+from ..image import RegionImage
 from ..image.image_data import ImageData
+from .render_task import RenderTask
 from .request import Request
 from .response import Response
 from .server_io import ServerIO
+from .server_state import ServerState
 
 
 class Server:
@@ -31,6 +42,29 @@ class Server:
     # for that field.
     _MAX_REQUEST_TIMES = 20
 
+    # The number of retry times at the start of Server.retry_times() that we
+    # never merge, as in _merge_retry_times_ds. This keeps the retries soon
+    # after a failed request at their requested times, so that a single
+    # failure does not leave the content stale for long.
+    _UNMERGED_RETRY_TIMES = 3
+
+    # The maximum number of scheduled frames in a response. This is the maximum
+    # number of elements in the C++ field ClientState.frameDelaysDs. See the
+    # comments for that field.
+    _MAX_FRAMES = 24
+
+    # The number of frames in an e-ink device's frame cache. See the comments
+    # for FrameCache.
+    _FRAME_CACHE_SIZE = 8
+
+    # The amount of time after a content boundary, as in
+    # next_update_boundary(), at which a device should make its request
+    _BOUNDARY_DELAY = timedelta(seconds=1)
+
+    # The ServerState for this Server, as in _state(). This is None if we have
+    # not created it yet.
+    _server_state = None
+
     def update_time(self):
         """Return the time to wait before making another request to the server.
 
@@ -43,6 +77,85 @@ class Server:
         """
         raise NotImplementedError('Subclasses must implement')
 
+    def max_update_time(self):
+        """Return the maximum time to wait before making another request.
+
+        If this is greater than ``update_time()``, we adjust the update
+        time we send to each e-ink device based on how often its content
+        actually changes. Each time a device polls the server and
+        receives the same image as last time, we lengthen its update
+        time, up to ``max_update_time()``. Each time it receives a
+        different image, we shorten its update time, down to
+        ``update_time()``. This saves server CPU and device battery for
+        content that changes less frequently than ``update_time()``
+        suggests. Note that this affects the request times we compute
+        from ``retry_times()`` only to the extent that they depend on
+        ``update_time()``.
+
+        The default return value is ``update_time()``, which disables
+        this adjustment. The return value may not exceed 365 days. It
+        is ignored if ``update_time()`` is ``None``.
+
+        Returns:
+            timedelta: The amount of time.
+        """
+        return self.update_time()
+
+    def stagger_window(self):
+        """Return the window over which to spread e-ink devices' requests.
+
+        If many devices receive the same ``update_time()``, they tend to
+        make their requests to the server at the same moments, resulting
+        in spikes in server load. To avoid this, we can shorten each
+        device's update time by up to ``stagger_window()``, so that its
+        next request occurs at a particular phase of a repeating cycle
+        of length ``stagger_window()``. The phase is determined by a
+        hash of ``Request.device_id``, so it is the same for every
+        request from a given device, and different devices' requests are
+        spread evenly over the cycle. This never lengthens the update
+        time, so ``update_time()`` remains a bound on how stale the
+        content can become.
+
+        The default return value is ``None``, meaning we do not stagger
+        requests. The window is capped at the update time.
+
+        Returns:
+            timedelta: The window.
+        """
+        return None
+
+    def next_update_boundary(self, time):
+        """Return the time of the first content boundary after ``time``.
+
+        A content boundary is a moment when the content is expected to
+        change, such as the top of the hour or the time when a data
+        source publishes new data. If this returns a time, then rather
+        than simply waiting ``update_time()``, each e-ink device makes
+        its next request just after the next boundary, so that it
+        displays the new content as soon as possible without having to
+        poll more frequently. If the boundary is later than
+        ``update_time()`` from now, the device still makes its request
+        after ``update_time()``. If ``stagger_window()`` is not
+        ``None``, the devices' requests are spread over that window
+        after the boundary.
+
+        To avoid a spike in rendering work at each boundary, you can
+        implement ``render_at`` and call ``prerender()`` shortly before
+        the boundary, e.g. using a ``Prerenderer``. Requests made after
+        the boundary then receive the pre-rendered content.
+
+        The default return value is ``None``, meaning there are no
+        content boundaries.
+
+        Arguments:
+            time (datetime): The local time. The return value must be
+                after this time.
+
+        Returns:
+            datetime: The local time of the next boundary.
+        """
+        return None
+
     def screensaver_time(self):
         """Return the amount of time to wait before displaying the screensaver.
 
@@ -69,9 +182,91 @@ class Server:
         ``ClientConfig.set_rotation``). It may not have an alpha
         channel. We automatically reduce it to the device's color
         palette (i.e. ``palette()``) using ``EinkGraphics.round``.
+
+        Alternatively, this may return a ``RegionImage``, in which case
+        we reduce each region using the ``Reduction`` it specifies, as
+        in ``EinkGraphics.reduce``. This is useful for dithering photos
+        while keeping text crisp.
+
+        It may also return an ``ArrayImage``, or a NumPy array or other
+        buffer with a shape of ``(height, width)`` (grayscale) or
+        ``(height, width, 3)`` (RGB). This avoids converting
+        numerically computed frames to ``Image`` objects.
         """
         raise NotImplementedError('Subclasses must implement')
 
+    def render_deadline(self):
+        """Return the maximum amount of time to wait for ``render()``.
+
+        If ``render()`` takes longer than this, we respond immediately
+        with the last content we successfully sent to a device, and we
+        let ``render()`` finish in a background thread. Likewise, if
+        ``render()`` raises an exception, we log it and respond with the
+        last content. In both cases, the device makes its next request
+        after ``retry_times()[0]`` rather than ``update_time()``, and
+        the response has no scheduled frames. The next request uses the
+        result of the background render if it has finished, and waits
+        for it (subject to the deadline again) if it hasn't, unless it
+        finished more than ``update_time()`` ago. We never run more than
+        one background render at a time, and a background render counts
+        towards ``max_concurrent_renders()`` until it finishes.
+
+        This keeps slow upstream services from keeping the device's
+        Wi-Fi radio on for a long time, and it keeps errors from costing
+        the device a full retry cycle. If there is no previous content,
+        we wait for ``render()`` to finish and propagate any exception.
+
+        The default implementation returns ``None``, meaning there is
+        no deadline. In this case, we call ``render()`` in the request
+        thread and propagate any exception.
+
+        Returns:
+            timedelta: The deadline.
+        """
+        return None
+
+    def frame_times(self):
+        """Return the times at which to display scheduled frames.
+
+        Scheduled frames are images that the e-ink device stores and
+        displays on its own at the specified times, without contacting
+        the server. This is useful for content that changes at known
+        times, such as clocks and calendars, because it enables the
+        device to leave its Wi-Fi hardware off in between requests.
+
+        Each time is relative to the moment we respond to the current
+        request. The times must be in strictly increasing order, and
+        they may not exceed 365 days. There may be at most 24 of them.
+        For each time, we call ``render_at`` to compute the frame to
+        display. Frames whose times exceed ``update_time()`` are still
+        displayed if the next request fails. Any pending frames are
+        discarded when the device receives a new response.
+
+        The default return value is ``[]``, meaning there are no
+        scheduled frames.
+
+        Returns:
+            list<timedelta>: The times.
+        """
+        return []
+
+    def render_at(self, time):
+        """Return the ``Image`` to display at the specified time.
+
+        This is only called for times returned by ``frame_times()``.
+        The image has the same requirements as the return value of
+        ``render()``.
+
+        Arguments:
+            time (datetime): The local time at which the device will
+                display the image.
+
+        Returns:
+            Image: The image.
+        """
+        raise NotImplementedError(
+            'Subclasses that override frame_times() must implement')
+
     def retry_times(self):
         """Return the times for the client to retry the server.
 
@@ -90,8 +285,13 @@ class Server:
 
         There is a limit to the number of retry times the client can
         store. If the return value of ``retry_times()`` exceeds the
-        limit (currently 19), we will adjust the retry times as
-        appropriate to fit the limit.
+        limit (currently 19), we will merge adjacent retry times to fit
+        the limit. That is, the client will skip some of the retries,
+        but it will not retry at any other times, apart from repeating
+        the last retry time. We never merge the first three retry
+        times, so the client's first retries after a failure occur as
+        requested. This makes it possible to return a long
+        schedule, such as one computed using a ``SchedulePolicy``.
 
         Returns:
             list<timedelta>: The retry intervals.
@@ -120,6 +320,87 @@ class Server:
         """
         return 'connecting'
 
+    def max_concurrent_renders(self):
+        """Return the maximum number of requests that may render at once.
+
+        If this many requests are already rendering content, we shed
+        load: rather than calling ``render()``, we respond using
+        content we have already rendered. If the device already has the
+        most recent content we rendered (or if there is no such
+        content), we instruct it to keep displaying its current image.
+        Either way, the device makes its next request after roughly
+        ``retry_times()[0]``, with random jitter so that overloaded
+        devices do not all return at the same time.
+
+        The default implementation returns ``None``, meaning there is no
+        limit.
+
+        Returns:
+            int: The maximum number of requests.
+        """
+        return None
+
+    def max_load_average(self):
+        """Return the maximum system load average at which to render content.
+
+        If the one-minute system load average, as in ``os.getloadavg()``,
+        exceeds this value, we shed load as described in the comments
+        for ``max_concurrent_renders()``. This has no effect on systems
+        that do not report a load average.
+
+        The default implementation returns ``None``, meaning there is no
+        limit.
+
+        Returns:
+            float: The maximum load average.
+        """
+        return None
+
+    def metrics_sink(self):
+        """Return the ``MetricsSink`` in which to record device telemetry.
+
+        Each time we execute a request, we pass it to the sink's
+        ``record`` method. The default return value is ``None``, meaning
+        we do not record telemetry. If you override this, you should
+        return the same ``MetricsSink`` each time.
+        """
+        return None
+
+    def transport_balancer(self):
+        """Return the ``TransportBalancer`` that steers devices among nodes.
+
+        In a deployment with several serving nodes, each response tells
+        the device which of its transports to try first next time,
+        according to the balancer. The default return value is
+        ``None``, meaning devices keep trying their transports in the
+        order given in the ``ClientConfig``. If you override this, you
+        should return the same ``TransportBalancer`` each time.
+        """
+        return None
+
+    def adaptive_encoder(self):
+        """Return the ``AdaptiveEncoder`` for devices with poor connections.
+
+        If this is not ``None``, we re-encode the images we send to
+        devices whose connections are slow or unreliable, to reduce the
+        amount of data we send. The default return value is ``None``,
+        meaning every device receives the same image file data. If you
+        override this, you should return the same ``AdaptiveEncoder``
+        each time.
+        """
+        return None
+
+    def current_request(self):
+        """Return the ``Request`` we are currently executing.
+
+        This enables the other ``Server`` methods, such as ``render()``
+        and ``update_time()``, to adapt to the e-ink device that made
+        the request, using its ``device_id`` and its telemetry. Return
+        ``None`` if the current thread is not executing a request using
+        ``exec``.
+        """
+        return getattr(self._state().local, 'request', None)
+
     def palette(self):
         """Return the ``Palette`` to use.
 
@@ -133,7 +414,11 @@ class Server:
 
         This takes a binary request payload, which is a request from an
         e-ink device, and returns a binary response payload containing
-        updated content.
+        updated content. If the request is a retry of a recent request
+        whose response the device did not finish receiving, as
+        indicated by ``Request.nonce``, we return the same response as
+        before rather than rendering the content again, with its times
+        adjusted for the time that has passed since then.
 
         Arguments:
             payload (bytes): The request payload.
@@ -147,21 +432,609 @@ class Server:
                 not one that this version of the library is able to
                 handle.
         """
-        Request.create_from_bytes(payload)
-        request_times_ds = self._request_times_ds()
+        return b''.join(self.exec_chunks(payload))
+
+    def exec_chunks(self, payload):
+        """Execute a server request, returning the response in chunks.
+
+        This is the same as ``exec``, except that it returns the
+        response payload as a list of chunks whose concatenation is the
+        payload, as in ``Response.to_chunks()``. This is suitable for
+        scatter-gather output, and it avoids copying the image data into
+        a single buffer.
+
+        Arguments:
+            payload (bytes): The request payload. This may be any
+                bytes-like object.
+
+        Returns:
+            list<bytes>: The chunks of the response payload.
+
+        Raises:
+            ServerError: If we detect that the specified value is not a
+                correctly formatted e-ink request payload, or at least
+                not one that this version of the library is able to
+                handle.
+        """
+        return self._exec_parsed(Request.create_from_bytes(payload))
+
+    def _exec_parsed(self, request):
+        """Execute a server request that we have already parsed.
+
+        This is the same as ``exec_chunks``, except that it takes a
+        ``Request`` rather than a request payload.
+
+        Arguments:
+            request (Request): The request.
+
+        Returns:
+            list<bytes>: The chunks of the response payload.
+        """
+        state = self._state()
+        cached = state.retry_cache.get(request)
+        if cached is not None:
+            response = Server._age(*cached)
+        else:
+            state.local.request = request
+            try:
+                response = self._exec_request(request)
+            finally:
+                state.local.request = None
+            state.retry_cache.put(request, response)
+        chunks = Server._resume(response, request).to_chunks()
+
+        metrics_sink = self.metrics_sink()
+        if metrics_sink is not None:
+            metrics_sink.record(request, sum(len(chunk) for chunk in chunks))
+        return chunks
+
+    def _exec_request(self, request):
+        """Execute a server request.
+
+        Arguments:
+            request (Request): The request.
+
+        Returns:
+            Response: The response.
+        """
+        now = datetime.now()
+        if self._state().replica_store is not None:
+            return self._replica_response(request, now)
+        image_data = self._prerendered_image_data(now)
+        if image_data is None and request.long_poll_frame_id is not None:
+            image_data = self._watched_image_data(now)
+        if image_data is None:
+            if not self._start_render():
+                return self._load_shedding_response(request)
+            try:
+                if self.render_deadline() is None:
+                    image_data = self._image_data(self.render(), 'render')
+                else:
+                    image_data = self._render_before_deadline(request)
+            finally:
+                self._finish_render()
+            if image_data is None:
+                return self._retry_response(self._state().last_image_data)
+        self._state().last_image_data = image_data
+        frames = self._frames(now)
+
+        request_times_ds = self._request_times_ds(
+            self._adaptive_update_time_ds(request, image_data), request, now)
+        return self._response(image_data, request_times_ds, frames)
+
+    def _replica_response(self, request, now):
+        """Return the response to a request using replicated content.
+
+        See the comments for ``use_replica_store``.
+
+        Arguments:
+            request (Request): The request.
+            now (datetime): The current local time.
+
+        Returns:
+            Response: The response.
+        """
+        content = self._state().replica_store.content()
+        if content is None:
+            # We haven't received any content from the render leader yet
+            return self._retry_response(b'')
+        image_data, frames = content
+        self._state().last_image_data = image_data
+        request_times_ds = self._request_times_ds(
+            self._adaptive_update_time_ds(request, image_data), request, now)
+        return self._response(image_data, request_times_ds, frames)
+
+    @staticmethod
+    def _age(response, age):
+        """Return a stored response, adjusted for the time since we stored it.
+
+        The response's times are relative to when we created it. This
+        returns a copy of the response whose time until the next
+        request and whose scheduled frame times are relative to the
+        current time, so that a device that retries a request keeps
+        the schedule of the original response, e.g. with respect to
+        ``next_update_boundary``. We omit any frames whose time has
+        passed, as in ``ReplicaStore.content()``.
+
+        Arguments:
+            response (Response): The response.
+            age (timedelta): The amount of time since we created the
+                response.
+
+        Returns:
+            Response: The adjusted response.
+        """
+        elapsed_ds = int(10 * age.total_seconds())
+        if elapsed_ds <= 0:
+            return response
+        aged = copy.copy(response)
+        aged.request_times_ds = list(response.request_times_ds)
+        if aged.request_times_ds[0] < Server._INT_MAX:
+            aged.request_times_ds[0] = max(
+                1, aged.request_times_ds[0] - elapsed_ds)
+        aged.frames = [
+            (time_ds - elapsed_ds, frame_data)
+            for time_ds, frame_data in response.frames
+            if time_ds > elapsed_ds]
+        return aged
+
+    @staticmethod
+    def _resume(response, request):
+        """Return the response to send given the request's resume point.
+
+        If the request asks to resume the download of the response's
+        image, this returns a copy of the response that only includes
+        the chunks of the image that the device has not received yet.
+        See the comments for ``Request.resume_chunk``.
+
+        Arguments:
+            response (Response): The response.
+            request (Request): The request.
+
+        Returns:
+            Response: The response to send.
+        """
+        if (request.resume_frame_id is None or
+                not response.image_data or
+                response.image_id != request.resume_frame_id or
+                request.resume_chunk >= response.image_chunk_count()):
+            return response
+        resumed = copy.copy(response)
+        resumed.image_start_chunk = request.resume_chunk
+        return resumed
+
+    def _render_before_deadline(self, request):
+        """Return the image data for ``render()``, subject to the deadline.
+
+        See the comments for ``render_deadline()``.
+
+        Arguments:
+            request (Request): The request we are responding to.
+
+        Returns:
+            bytes: The contents of the PNG image file, or ``None`` if we
+            should respond with the last content.
+        """
+        state = self._state()
+        update_time = self.update_time()
+        with state.render_lock:
+            task = state.render_task
+            if (task is not None and update_time is not None and
+                    task.finished_before(update_time)):
+                # The content may have changed since the render finished
+                task = None
+            if task is None:
+                task = RenderTask(self, request)
+                state.render_task = task
+
+                # The background render counts towards
+                # max_concurrent_renders() until it finishes, even if we
+                # stop waiting for it
+                state.active_render_count += 1
+                task.start()
+
+        deadline = self.render_deadline()
+        if (not task.wait(deadline.total_seconds()) and
+                state.last_image_data is not None):
+            return None
+        task.wait()
+        with state.render_lock:
+            if state.render_task is task:
+                state.render_task = None
+
+        try:
+            return task.result()
+        except Exception:
+            if state.last_image_data is None:
+                raise
+            logging.getLogger(__name__).exception('Error rendering content')
+            return None
+
+    def _is_overloaded(self):
+        """Return whether the system load exceeds ``max_load_average()``."""
+        max_load_average = self.max_load_average()
+        if max_load_average is None:
+            return False
+        try:
+            load_average = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            return False
+        return load_average > max_load_average
+
+    def _start_render(self):
+        """Record that a request is about to render content.
+
+        If we should shed load instead, as in
+        ``max_concurrent_renders()``, this returns ``False`` and does
+        not record anything. Otherwise, the caller must call
+        ``_finish_render()`` when it is finished rendering.
+
+        Returns:
+            bool: Whether the request may render content.
+        """
+        if self._is_overloaded():
+            return False
+        max_renders = self.max_concurrent_renders()
+        state = self._state()
+        with state.render_lock:
+            if (max_renders is not None and
+                    state.active_render_count >= max_renders):
+                return False
+            state.active_render_count += 1
+        return True
+
+    def _finish_render(self):
+        """Record that a request has finished rendering content.
+
+        See the comments for ``_start_render()``.
+        """
+        state = self._state()
+        with state.render_lock:
+            state.active_render_count -= 1
+
+    def _load_shedding_response(self, request):
+        """Return a response for when we are shedding load.
+
+        See the comments for ``max_concurrent_renders()``.
+
+        Arguments:
+            request (Request): The request we are responding to.
+
+        Returns:
+            Response: The response.
+        """
+        state = self._state()
+        image_data = state.last_image_data
+        if (image_data is None or
+                state.change_tracker.has_sent(request.device_id, image_data)):
+            image_data = b''
+        else:
+            self._adaptive_update_time_ds(request, image_data)
+        return self._retry_response(image_data, True)
+
+    def _retry_response(self, image_data, jitter=False):
+        """Return a response that asks the device to retry soon.
+
+        The device will make its next request after
+        ``retry_times()[0]``. The response has no scheduled frames. See
+        the comments for ``render_deadline()`` and
+        ``max_concurrent_renders()``.
+
+        Arguments:
+            image_data (bytes): The contents of the PNG image file to
+                display, or ``b''`` if the device should keep
+                displaying its current image.
+            jitter (bool): Whether to multiply the time until the next
+                request by a random factor between 0.5 and 1.5.
+
+        Returns:
+            Response: The response.
+        """
+        retry_times = self.retry_times()
+        if not retry_times:
+            raise ValueError(
+                'Server.retry_times() may not return an empty list')
+        retry_time_ds = self._interval_to_ds(retry_times[0])
+        if jitter and retry_time_ds < Server._INT_MAX:
+            retry_time_ds = max(
+                1, int(retry_time_ds * random.uniform(0.5, 1.5) + 0.5))
+        request_times_ds = self._request_times_ds(retry_time_ds)
+        return self._response(image_data, request_times_ds)
+
+    def _response(self, image_data, request_times_ds, frames=None):
+        """Return a ``Response`` with the given content.
+
+        If the device that made the current request reported that the
+        image is in its frame cache, we refer to the image by its ID
+        rather than sending it again. See the comments for
+        ``FrameCache``. If the device reported that it is displaying the
+        image, as in ``Request.long_poll_frame_id``, we tell it to keep
+        displaying its current image. The response's preferred transport
+        is determined by ``transport_balancer()``.
+
+        Arguments:
+            image_data (bytes): The contents of the PNG image file to
+                display, or ``b''`` if the device should keep
+                displaying its current image.
+            request_times_ds (list<int>): The request times, as in
+                ``Response.request_times_ds``.
+            frames (list<tuple<int, bytes>>): The scheduled frames, as
+                in ``Response.frames``.
+
+        Returns:
+            Response: The response.
+        """
+        image_id = None
+        request = self.current_request()
+        encoder = self.adaptive_encoder()
+        if encoder is not None and request is not None:
+            image_data, frames = self._encode(
+                encoder, request, image_data, frames)
+        if image_data and request is not None:
+            image_id = ServerIO.frame_id(image_data)
+            if image_id == request.long_poll_frame_id:
+                # The device is already displaying the image
+                image_data = b''
+                image_id = None
+            elif image_id in request.cached_frame_ids:
+                image_data = None
+        if encoder is not None and request is not None:
+            length = len(image_data) if image_data else 0
+            if frames is not None:
+                length += sum(len(frame_data) for _, frame_data in frames)
+            encoder.record(request, length)
         screensaver_time_ds = self._interval_to_ds(self.screensaver_time())
         screensaver_id = ServerIO.image_id(self.screensaver_name())
+        balancer = self.transport_balancer()
+        if balancer is not None and request is not None:
+            preferred_transport = balancer.preferred_transport(request)
+        else:
+            preferred_transport = None
+        return Response(
+            image_data, request_times_ds, screensaver_id, screensaver_time_ds,
+            frames, image_id, preferred_transport=preferred_transport)
+
+    def _encode(self, encoder, request, image_data, frames):
+        """Re-encode a response's images as in ``adaptive_encoder()``.
+
+        Arguments:
+            encoder (AdaptiveEncoder): The encoder.
+            request (Request): The request we are responding to.
+            image_data (bytes): The contents of the PNG image file to
+                display, or ``b''`` if the device should keep
+                displaying its current image.
+            frames (list<tuple<int, bytes>>): The scheduled frames, as
+                in ``Response.frames``, if any.
+
+        Returns:
+            tuple<bytes, list<tuple<int, bytes>>>: The re-encoded image
+            file data and scheduled frames.
+        """
+        length = len(image_data)
+        if frames is not None:
+            length += sum(len(frame_data) for _, frame_data in frames)
+        level = encoder.level(request, length)
+        palette = self.palette()
+        if image_data:
+            image_data = encoder.encode(image_data, level, palette)
+        if frames is not None:
+            frames = list([
+                (time_ds, encoder.encode(frame_data, level, palette))
+                for time_ds, frame_data in frames])
+        return image_data, frames
+
+    def use_replica_store(self, store):
+        """Respond to requests using content that another node rendered.
+
+        After calling this, we respond to each request using the content
+        most recently stored in the specified ``ReplicaStore``, rather
+        than calling ``render()`` or ``render_at``. Until the store has
+        any content, we ask devices to retry later, as in
+        ``retry_times()``. The other methods, such as ``update_time()``
+        and ``screensaver_name()``, still apply. See the comments for
+        ``ReplicaStore``.
+
+        Arguments:
+            store (ReplicaStore): The store, or ``None`` to render the
+                content ourselves.
+        """
+        self._state().replica_store = store
+
+    def prerender(self, time=None):
+        """Render the content for a content boundary ahead of time.
+
+        This renders the content using ``render_at(time)`` and stores
+        it, so that we can respond to requests made after ``time`` (and
+        before the following boundary) without calling ``render()``.
+        See the comments for ``next_update_boundary``.
+
+        Arguments:
+            time (datetime): The local time of the content boundary. If
+                this is ``None``, we use the next boundary after the
+                current time.
+        """
+        if time is None:
+            time = self.next_update_boundary(datetime.now())
+            if time is None:
+                raise ValueError(
+                    'Server.next_update_boundary() returned None, so there '
+                    'is nothing to prerender')
+        image_data = self._image_data(self.render_at(time), 'render_at')
+        self._state().prerendered_frame = (time, image_data)
+
+    def _prerendered_image_data(self, now):
+        """Return the image file data from ``prerender()`` for the given time.
+
+        Return ``None`` if there is no pre-rendered content for the
+        specified time.
+
+        Arguments:
+            now (datetime): The current local time.
+
+        Returns:
+            bytes: The contents of the PNG image file.
+        """
+        prerendered_frame = self._state().prerendered_frame
+        if prerendered_frame is None:
+            return None
+        time, image_data = prerendered_frame
+        if now < time:
+            return None
+        next_boundary = self.next_update_boundary(time)
+        if next_boundary is not None and now >= next_boundary:
+            return None
+        return image_data
+
+    def _watched_image_data(self, now):
+        """Return the image file data a ``ContentWatcher`` rendered.
+
+        Return ``None`` if there is no such content, or if the content
+        might have changed since the watcher rendered it.
+
+        Arguments:
+            now (datetime): The current local time.
+
+        Returns:
+            bytes: The contents of the PNG image file.
+        """
+        watched_frame = self._state().watched_frame
+        if watched_frame is None:
+            return None
+        next_time, image_data = watched_frame
+        if next_time is not None and now >= next_time:
+            return None
+        return image_data
+
+    def _source_frame_id(self, frame_id):
+        """Return the ID of the image we re-encoded to produce an image.
+
+        This reverses the re-encoding described in the comments for
+        ``adaptive_encoder()``.
+
+        Arguments:
+            frame_id (bytes): The ID of an image, as in
+                ``ServerIO.frame_id``.
+
+        Returns:
+            bytes: The ID of the original image, or ``frame_id`` if we
+            did not recently produce the image by re-encoding another
+            image.
+        """
+        encoder = self.adaptive_encoder()
+        if encoder is None:
+            return frame_id
+        return encoder.source_frame_id(frame_id)
+
+    def _next_render_time(self, now):
+        """Return the time at which to render the content for pushing.
+
+        This is for components that render the content ahead of
+        requests and push it somewhere, such as ``StaticPublisher``. It
+        is the earlier of the next content boundary, as in
+        ``next_update_boundary``, and ``update_time()`` after ``now``.
+        It is ``None`` if there is no such time.
+
+        Arguments:
+            now (datetime): The current local time.
+
+        Returns:
+            datetime: The time.
+        """
+        update_time = self.update_time()
+        if update_time is not None:
+            render_time = now + update_time
+        else:
+            render_time = None
+        boundary = self.next_update_boundary(now)
+        if boundary is not None and (
+                render_time is None or boundary < render_time):
+            render_time = boundary
+        return render_time
+
+    def _image_data(self, image, method_name):
+        """Return the image file data for displaying the specified image.
+
+        Arguments:
+            image (object): The image, as returned by ``render()`` or
+                ``render_at``.
+            method_name (str): The name of the ``Server`` method that
+                returned the image. We use this in error messages.
 
-        image = self.render()
-        if EinkGraphics._has_alpha(image):
+        Returns:
+            bytes: The contents of the PNG image file.
+        """
+        if isinstance(image, RegionImage):
+            source = image.image
+        else:
+            source = image
+        if (isinstance(source, Image.Image) and
+                EinkGraphics._has_alpha(source)):
             raise ValueError(
-                'Server.render() may not return an image with an alpha '
-                'channel')
-        image_data = ImageData.render_png(
-            EinkGraphics.round(image, self.palette()), self.palette())
-        response = Response(
-            image_data, request_times_ds, screensaver_id, screensaver_time_ds)
-        return response.to_bytes()
+                'Server.{:s}() may not return an image with an alpha '
+                'channel'.format(method_name))
+        return ImageData.render_png(
+            EinkGraphics.reduce(image, self.palette()), self.palette())
+
+    def _frames(self, now):
+        """Return the scheduled frames to include in a response.
+
+        Arguments:
+            now (datetime): The current local time.
+
+        Returns:
+            list<tuple<int, bytes>>: The frames, as in
+                ``Response.frames``.
+        """
+        frame_times = self.frame_times()
+        if len(frame_times) > Server._MAX_FRAMES:
+            raise ValueError(
+                'Server.frame_times() may not return more than {:d} '
+                'times'.format(Server._MAX_FRAMES))
+
+        frames = []
+        prev_time_ds = -1
+        for time in frame_times:
+            time_ds = self._interval_to_ds(time)
+            if time_ds >= Server._INT_MAX:
+                raise ValueError('Frame times may not be None')
+            if time_ds <= prev_time_ds:
+                raise ValueError(
+                    'Server.frame_times() must return times in strictly '
+                    'increasing order')
+            prev_time_ds = time_ds
+            image = self.render_at(now + time)
+            frames.append((time_ds, self._image_data(image, 'render_at')))
+        return frames
+
+    def _state(self):
+        """Return the ``ServerState`` for this ``Server``."""
+        if self._server_state is None:
+            with ServerState.create_lock:
+                if self._server_state is None:
+                    self._server_state = ServerState()
+        return self._server_state
+
+    def _adaptive_update_time_ds(self, request, image_data):
+        """Return the update time to send in response to a request.
+
+        This implements the adjustment described in the comments for
+        ``max_update_time()``.
+
+        Arguments:
+            request (Request): The request.
+            image_data (bytes): The image file data we are sending in
+                the response.
+
+        Returns:
+            int: The update time, in tenths of a second.
+        """
+        # We record the content even if the update time is fixed, for the
+        # sake of _load_shedding_response
+        min_time_ds = self._interval_to_ds(self.update_time())
+        max_time_ds = max(
+            min_time_ds, self._interval_to_ds(self.max_update_time()))
+        return self._state().change_tracker.update_time_ds(
+            request.device_id, image_data, min_time_ds, max_time_ds)
 
     def _interval_to_ds(self, interval):
         """Convert the specified amount of time to tenths of a second.
@@ -187,25 +1060,217 @@ class Server:
         else:
             return int(10 * interval.total_seconds() + 0.5)
 
-    def _request_times_ds(self):
+    def _staggered_update_time_ds(self, update_time_ds, device_id, now):
+        """Return the result of staggering the specified update time.
+
+        This implements the adjustment described in the comments for
+        ``stagger_window()``.
+
+        Arguments:
+            update_time_ds (int): The update time, in tenths of a
+                second.
+            device_id (bytes): The ID of the device, as in
+                ``Request.device_id``.
+            now (datetime): The current local time.
+
+        Returns:
+            int: The staggered update time, in tenths of a second.
+        """
+        stagger_window = self.stagger_window()
+        if stagger_window is None:
+            return update_time_ds
+        window_ds = min(self._interval_to_ds(stagger_window), update_time_ds)
+        if window_ds <= 0:
+            return update_time_ds
+
+        phase_ds = self._stagger_phase_ds(device_id, window_ds)
+        now_ds = int(10 * now.timestamp())
+        end_ds = now_ds + update_time_ds
+        return update_time_ds - (end_ds - phase_ds) % window_ds
+
+    def _stagger_phase_ds(self, device_id, window_ds):
+        """Return the phase of a device in a cycle of the specified length.
+
+        See the comments for ``stagger_window()``.
+
+        Arguments:
+            device_id (bytes): The ID of the device, as in
+                ``Request.device_id``.
+            window_ds (int): The length of the cycle, in tenths of a
+                second. This must be positive.
+
+        Returns:
+            int: The phase, in tenths of a second. This is in the range
+                ``[0, window_ds)``.
+        """
+        digest = hashlib.sha256(device_id).digest()
+        return int.from_bytes(digest[:8], 'little') % window_ds
+
+    def _boundary_update_time_ds(self, device_id, now):
+        """Return the update time for waking just after a content boundary.
+
+        See the comments for ``next_update_boundary``. Return ``None``
+        if there is no next content boundary.
+
+        Arguments:
+            device_id (bytes): The ID of the device, as in
+                ``Request.device_id``.
+            now (datetime): The current local time.
+
+        Returns:
+            int: The update time, in tenths of a second.
+        """
+        boundary = self.next_update_boundary(now)
+        if boundary is None:
+            return None
+        elif boundary <= now:
+            raise ValueError(
+                'Server.next_update_boundary(time) must return a time after '
+                '"time"')
+        boundary_time = boundary - now + Server._BOUNDARY_DELAY
+        if boundary_time > Server.MAX_TIME:
+            return None
+        update_time_ds = self._interval_to_ds(boundary_time)
+
+        stagger_window = self.stagger_window()
+        if stagger_window is not None:
+            window_ds = self._interval_to_ds(stagger_window)
+            if 0 < window_ds < Server._INT_MAX:
+                update_time_ds += self._stagger_phase_ds(device_id, window_ds)
+        return update_time_ds
+
+    def _request_times_ds(self, update_time_ds=None, request=None, now=None):
         """Return the request times.
 
         Return the request times in tenths of a second, as in the C++
         field ``ClientState.requestTimesDs``.
+
+        Arguments:
+            update_time_ds (int): The amount of time to wait before
+                making another request to the server, in tenths of a
+                second. If this is ``None``, we use ``update_time()``.
+            request (Request): The request we are responding to. If
+                this is ``None``, we do not adjust the update time as in
+                ``stagger_window()`` and ``next_update_boundary``.
+            now (datetime): The current local time. This may only be
+                ``None`` if ``request`` is ``None``.
+
+        Returns:
+            list<int>: The request times.
         """
-        request_times = [self.update_time()] + self.retry_times()
-        if len(request_times) <= 1:
+        retry_times = self.retry_times()
+        if not retry_times:
             raise ValueError(
                 'Server.retry_times() may not return an empty list')
-        request_times_ds = list([
-            self._interval_to_ds(time) for time in request_times])
+        if update_time_ds is None:
+            update_time_ds = self._interval_to_ds(self.update_time())
+        if request is not None:
+            boundary_time_ds = self._boundary_update_time_ds(
+                request.device_id, now)
+            if (boundary_time_ds is not None and
+                    boundary_time_ds < update_time_ds):
+                update_time_ds = boundary_time_ds
+            elif update_time_ds < Server._INT_MAX:
+                update_time_ds = self._staggered_update_time_ds(
+                    update_time_ds, request.device_id, now)
+        request_times_ds = [update_time_ds] + list([
+            self._interval_to_ds(time) for time in retry_times])
         for index, time_ds in enumerate(request_times_ds):
             if time_ds >= Server._INT_MAX:
                 request_times_ds = request_times_ds[:index + 1]
                 break
 
         if len(request_times_ds) > Server._MAX_REQUEST_TIMES:
+            # Retry times equal to the last one are redundant, because the
+            # client repeats the last one
+            end = len(request_times_ds) - 1
+            while (end > 1 and
+                    request_times_ds[end - 1] == request_times_ds[-1]):
+                end -= 1
+            unmerged_end = min(1 + Server._UNMERGED_RETRY_TIMES, end)
             request_times_ds = (
-                request_times_ds[:Server._MAX_REQUEST_TIMES - 1] +
+                request_times_ds[:unmerged_end] +
+                Server._merge_retry_times_ds(
+                    request_times_ds[unmerged_end:end],
+                    Server._MAX_REQUEST_TIMES - unmerged_end - 1) +
                 [request_times_ds[-1]])
         return request_times_ds
+
+    @staticmethod
+    def _merge_retry_times_ds(retry_times_ds, count):
+        """Merge adjacent retry times so that there are ``count`` of them.
+
+        Merging adjacent retry times means skipping the retry between
+        them, so the times at which the client retries are a subset of
+        the requested times. In particular, the client does not make a
+        request during a long wait, such as the quiet hours of a
+        ``SchedulePolicy``. We choose the merges that minimize the sum
+        of the squares of the resulting retry times. If the server is
+        unreachable, this minimizes the average amount of time since the
+        client's most recent attempt.
+
+        We use dynamic programming, with the divide and conquer
+        optimization. This is valid because the cost of a group of
+        merged retry times satisfies the quadrangle inequality, so the
+        optimal start of the last group does not decrease as we add
+        retry times. The running time is O(``count`` * n log n), where n
+        is the number of retry times.
+
+        Arguments:
+            retry_times_ds (list<int>): The retry times, in tenths of a
+                second. These must be less than ``_INT_MAX``.
+            count (int): The number of retry times to return. This must
+                be positive.
+
+        Returns:
+            list<int>: The merged retry times. We cap them at
+            ``MAX_TIME``.
+        """
+        if len(retry_times_ds) <= count:
+            return list(retry_times_ds)
+        prefix_sums = [0]
+        for time_ds in retry_times_ds:
+            prefix_sums.append(prefix_sums[-1] + time_ds)
+        n = len(retry_times_ds)
+
+        # costs[j] is the minimum cost of merging the first j retry times
+        # into k groups, for the current value of k. starts[k - 2][j] is the
+        # index of the first retry time in the last group in such a merging.
+        costs = [prefix_sum * prefix_sum for prefix_sum in prefix_sums]
+        starts = []
+        for k in range(2, count + 1):
+            prev_costs = costs
+            costs = [None] * (n + 1)
+            group_starts = [None] * (n + 1)
+
+            def solve(min_end, max_end, min_start, max_start):
+                if min_end > max_end:
+                    return
+                end = (min_end + max_end) // 2
+                best_cost = None
+                best_start = None
+                for start in range(min_start, min(end - 1, max_start) + 1):
+                    group_time_ds = prefix_sums[end] - prefix_sums[start]
+                    cost = prev_costs[start] + group_time_ds * group_time_ds
+                    if best_cost is None or cost < best_cost:
+                        best_cost = cost
+                        best_start = start
+                costs[end] = best_cost
+                group_starts[end] = best_start
+                solve(min_end, end - 1, min_start, best_start)
+                solve(end + 1, max_end, best_start, max_start)
+
+            solve(k, n, k - 1, n - 1)
+            starts.append(group_starts)
+
+        max_time_ds = int(10 * Server.MAX_TIME.total_seconds())
+        merged_times_ds = []
+        end = n
+        for group_starts in reversed(starts):
+            start = group_starts[end]
+            merged_times_ds.append(
+                min(prefix_sums[end] - prefix_sums[start], max_time_ds))
+            end = start
+        merged_times_ds.append(min(prefix_sums[end], max_time_ds))
+        merged_times_ds.reverse()
+        return merged_times_ds
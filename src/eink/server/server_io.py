@@ -18,11 +18,21 @@ class ServerIO:
     # Bytes identifying the version of the protocol that this program uses to
     # communicate with the client. Whenever the protocol changes, we should
     # change the version.
-    PROTOCOL_VERSION = b'2021-02-27T23:07:41Z'
+    PROTOCOL_VERSION = b'2026-10-19T05:41:07Z'
 
     # The length of the return value of image_id()
     STATUS_IMAGE_ID_LENGTH = 32
 
+    # The length of the return value of frame_id()
+    FRAME_ID_LENGTH = 8
+
+    # The number of bytes in each checksummed chunk of the image data in a
+    # response payload, except possibly the last. See Response.to_chunks().
+    IMAGE_CHUNK_SIZE = 4096
+
+    # The Struct for encoding 32-bit signed integers, as in write_int
+    INT_STRUCT = struct.Struct('<i')
+
     @staticmethod
     def write_int(output, value):
         """Write the specified 32-bit signed integer value to ``output``.
@@ -34,7 +44,7 @@ class ServerIO:
             output (file): The file to write the value to.
             value (int): The value to write.
         """
-        output.write(struct.pack('<i', value))
+        output.write(ServerIO.INT_STRUCT.pack(value))
 
     @staticmethod
     def read_int(input_):
@@ -49,9 +59,9 @@ class ServerIO:
         Returns:
             int: The value.
         """
-        bytes_ = input_.read(4)
-        if len(bytes_) >= 4:
-            return struct.unpack('<i', bytes_)[0]
+        bytes_ = input_.read(ServerIO.INT_STRUCT.size)
+        if len(bytes_) >= ServerIO.INT_STRUCT.size:
+            return ServerIO.INT_STRUCT.unpack(bytes_)[0]
         else:
             return 0
 
@@ -111,3 +121,20 @@ class ServerIO:
         digest = hashlib.sha256()
         digest.update(name.encode())
         return digest.digest()
+
+    @staticmethod
+    def frame_id(image_data):
+        """Return an ID identifying the specified image file data.
+
+        This is used to refer to images in the e-ink device's frame
+        cache. See the comments for ``FrameCache``. The return value is
+        a prefix of the SHA-256 hash of the data. It has length
+        ``FRAME_ID_LENGTH``.
+
+        Arguments:
+            image_data (bytes): The contents of the image file.
+
+        Returns:
+            bytes: The frame ID.
+        """
+        return hashlib.sha256(image_data).digest()[:ServerIO.FRAME_ID_LENGTH]
@@ -0,0 +1,59 @@
+import threading
+
+from .change_tracker import ChangeTracker
+from .retry_cache import RetryCache
+
+
+class ServerState:
+    """The mutable state that a ``Server`` retains between requests.
+
+    ``Server`` subclasses are not required to call a superclass
+    initializer, so a ``Server`` creates its ``ServerState`` lazily.
+
+    Public attributes:
+
+    int active_render_count - The number of requests that are currently
+        rendering content, as in ``Server.max_concurrent_renders()``,
+        plus one if there is an unfinished background render, as in
+        ``Server.render_deadline()``.
+    ChangeTracker change_tracker - Tracks how often the content changes,
+        for adjusting the update time as in ``Server.max_update_time()``.
+    local local - Thread-local data. The ``request`` attribute, if
+        present, is the return value of ``Server.current_request()``.
+    bytes last_image_data - The contents of the PNG image file for the
+        most recent content we successfully sent to a device, if any.
+        This is the fallback for ``Server.render_deadline()``.
+    tuple<datetime, bytes> prerendered_frame - The most recent content
+        from ``Server.prerender``, if any. This is represented as a pair
+        of the content boundary and the contents of the PNG image file.
+    Lock render_lock - The lock for accessing ``active_render_count``
+        and ``render_task``.
+    RenderTask render_task - The most recent background call to
+        ``Server.render()`` whose result no request has used, if any.
+        See ``Server.render_deadline()``.
+    RetryCache retry_cache - The recent responses, for
+        responding to retries of the same request.
+    ReplicaStore replica_store - The store containing the content to
+        respond with, as in ``Server.use_replica_store``, if any.
+    tuple<datetime, bytes> watched_frame - The content most recently
+        rendered by a ``ContentWatcher``, if any. This is represented as
+        a pair of the time at which the content might change, or
+        ``None`` if it will not change or the ``ContentWatcher`` will
+        replace it when it changes, and the contents of the PNG image
+        file.
+    """
+
+    # A lock for creating ServerState objects, as in Server._state()
+    create_lock = threading.Lock()
+
+    def __init__(self):
+        self.change_tracker = ChangeTracker()
+        self.local = threading.local()
+        self.prerendered_frame = None
+        self.last_image_data = None
+        self.render_lock = threading.Lock()
+        self.render_task = None
+        self.active_render_count = 0
+        self.retry_cache = RetryCache()
+        self.replica_store = None
+        self.watched_frame = None
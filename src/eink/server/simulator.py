@@ -1,8 +1,11 @@
 import io
+import socket
+import urllib.parse
 import urllib.request
 
 from PIL import Image
 
+from .frame_decoder import FrameDecoder
 from .request import Request
 from .response import Response
 
@@ -11,25 +14,105 @@ class Simulator:
     """Provides the ability to simulate a request to a server."""
 
     @staticmethod
-    def connect(url):
+    def connect(url, static=False, frame_cache=None):
         """Return the image returned when requesting the specified URL.
 
         This should be the URL of an e-ink server. The image indicates
         the content that the server is instructing the e-ink device to
-        display.
+        display. To connect to a server using raw TCP, as in
+        ``TcpTransport``, use a URL of the form ``tcp://host:port``.
 
         Arguments:
             url (str): The URL.
+            static (bool): Whether to make a GET request without a
+                request payload, as in ``StaticWebTransport``, rather
+                than a POST request.
+            frame_cache (FrameCache): The frame cache of the simulated
+                device, or ``None`` to simulate a device whose frame
+                cache is empty. If this is not ``None``, we update it
+                to reflect the response.
 
         Returns:
-            Image: The image.
+            Image: The image, or ``None`` if the server instructed the
+            device to keep displaying its current image.
         """
-        request_payload = Request().to_bytes()
-        url_request = urllib.request.Request(
-            url, data=request_payload,
-            headers={'Content-Type': 'application/octet-stream'},
-            method='POST')
-        with urllib.request.urlopen(url_request) as url_response:
-            response_payload = url_response.read()
+        if frame_cache is not None:
+            request = Request(cached_frame_ids=frame_cache.frame_ids())
+        else:
+            request = Request()
+        response_payload = Simulator._exec(url, request.to_bytes(), static)
         response = Response.create_from_bytes(response_payload)
-        return Image.open(io.BytesIO(response.image_data))
+        if frame_cache is not None:
+            image_data = frame_cache.apply(response)
+        else:
+            image_data = response.image_data
+        if not image_data:
+            return None
+        return Image.open(io.BytesIO(image_data))
+
+    @staticmethod
+    def _exec(url, request_payload, static=False, timeout=None):
+        """Send a request to the server at the specified URL.
+
+        Arguments:
+            url (str): The URL, as in the ``url`` argument to
+                ``connect``.
+            request_payload (bytes): The request payload.
+            static (bool): Whether to make a GET request without a
+                request payload, as in ``StaticWebTransport``, rather
+                than a POST request.
+            timeout (timedelta): The maximum amount of time to wait for
+                the connection or for data from the server, or ``None``
+                to wait indefinitely.
+
+        Returns:
+            bytes: The response payload.
+        """
+        if timeout is not None:
+            timeout_seconds = timeout.total_seconds()
+        else:
+            timeout_seconds = socket.getdefaulttimeout()
+        parsed_url = urllib.parse.urlsplit(url)
+        if parsed_url.scheme == 'tcp':
+            return Simulator._exec_tcp(
+                parsed_url.hostname, parsed_url.port, request_payload,
+                timeout_seconds)
+
+        if static:
+            url_request = urllib.request.Request(url, method='GET')
+        else:
+            url_request = urllib.request.Request(
+                url, data=request_payload,
+                headers={'Content-Type': 'application/octet-stream'},
+                method='POST')
+        with urllib.request.urlopen(
+                url_request, timeout=timeout_seconds) as url_response:
+            return url_response.read()
+
+    @staticmethod
+    def _exec_tcp(host, port, request_payload, timeout_seconds=None):
+        """Send a request to a server using raw TCP, as in ``TcpTransport``.
+
+        Arguments:
+            host (str): The server's host.
+            port (int): The server's port.
+            request_payload (bytes): The request payload.
+            timeout_seconds (float): The maximum number of seconds to
+                wait for the connection or for data from the server, or
+                ``None`` to wait indefinitely.
+
+        Returns:
+            bytes: The response payload.
+        """
+        if host is None or port is None:
+            raise ValueError('A TCP URL must have the form tcp://host:port')
+        decoder = FrameDecoder()
+        with socket.create_connection((host, port), timeout_seconds) as sock:
+            sock.sendall(b''.join(FrameDecoder.encode([request_payload])))
+            while True:
+                data = sock.recv(64 * 1024)
+                if not data:
+                    raise ValueError('The server closed the connection')
+                payloads = decoder.feed(data)
+                if payloads:
+                    return payloads[0]
@@ -0,0 +1,251 @@
+from datetime import datetime
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from .request import Request
+from .response import Response
+
+
+class StaticPublisher:
+    """Periodically writes a ``Server``'s response payload to a directory.
+
+    This lets a static file server such as nginx serve the content, so
+    that no Python code runs when a device requests an update. Devices
+    fetch the payloads using a ``StaticWebTransport`` whose URL refers
+    to the pointer file ``current.bin``.
+
+    Each payload is stored in a file whose name is derived from its
+    SHA-256 hash, such as ``payload-<hash>.bin``. After writing a
+    payload, we atomically replace the pointer file with a symbolic link
+    to it (or, on platforms that do not support symbolic links, with a
+    copy of it). Files are written to a temporary name and then renamed,
+    so a file server never serves a partially written payload. We keep
+    a few of the most recent payload files, so that downloads that are
+    in progress when we publish a new payload are not interrupted.
+
+    Since devices using a ``StaticWebTransport`` do not send a request
+    payload, the published payload is the response to a request with
+    no device ID or telemetry. Its times are relative to when we publish
+    it, but a device applies them relative to when it fetches the file,
+    which may be as much as ``update_time()`` later. This is why we do
+    not support servers that use ``frame_times()``,
+    ``next_update_boundary``, or ``stagger_window()``: their times would
+    be off by the age of the file. It is also why the time until each
+    device's next request is at most ``update_time()``, the interval at
+    which we publish, so that no device's content is more than about
+    two publish intervals old. For example:
+
+    .. code-block:: python
+
+        StaticPublisher(MyServer.instance(), '/var/www/eink').start()
+    """
+
+    # Private attributes:
+    #
+    # str _dir - The directory to write the payloads to.
+    # int _keep - The number of payload files to keep.
+    # Server _server - The server.
+    # Event _stop_event - An event that is set when we should stop.
+    # Thread _thread - The background thread, if any.
+
+    # The name of the pointer file
+    POINTER_FILENAME = 'current.bin'
+
+    # The prefix of the names of the payload files
+    _PAYLOAD_PREFIX = 'payload-'
+
+    # The suffix of the names of the payload files
+    _PAYLOAD_SUFFIX = '.bin'
+
+    def __init__(self, server, dir_, keep=5):
+        """Initialize a new ``StaticPublisher``.
+
+        Arguments:
+            server (Server): The server.
+            dir_ (str): The directory to write the payloads to. It must
+                already exist.
+            keep (int): The number of payload files to keep, including
+                the current one.
+        """
+        if keep < 1:
+            raise ValueError('We must keep at least one payload file')
+        self._server = server
+        self._dir = dir_
+        self._keep = keep
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        """Render and publish the server's current content.
+
+        Returns:
+            str: The name of the payload file, relative to the
+            directory.
+
+        Raises:
+            ValueError: If the server uses ``frame_times()``,
+                ``next_update_boundary``, or ``stagger_window()``.
+        """
+        self._check_server(datetime.now())
+        payload = self._server.exec(Request().to_bytes())
+        payload = self._cap_request_time(payload)
+        filename = '{:s}{:s}{:s}'.format(
+            StaticPublisher._PAYLOAD_PREFIX,
+            hashlib.sha256(payload).hexdigest(),
+            StaticPublisher._PAYLOAD_SUFFIX)
+        path = os.path.join(self._dir, filename)
+        if os.path.exists(path):
+            # Update the modification time, for the sake of _prune()
+            os.utime(path)
+        else:
+            self._write_atomically(filename, payload)
+        self._point_to(filename, payload)
+        self._prune(filename)
+        return filename
+
+    def _check_server(self, now):
+        """Raise if the server's times do not suit published payloads.
+
+        Arguments:
+            now (datetime): The current local time.
+
+        Raises:
+            ValueError: If the server uses ``frame_times()``,
+                ``next_update_boundary``, or ``stagger_window()``.
+        """
+        if self._server.frame_times():
+            raise ValueError(
+                'StaticPublisher does not support Server.frame_times()')
+        if self._server.next_update_boundary(now) is not None:
+            raise ValueError(
+                'StaticPublisher does not support '
+                'Server.next_update_boundary')
+        if self._server.stagger_window() is not None:
+            raise ValueError(
+                'StaticPublisher does not support Server.stagger_window()')
+
+    def _cap_request_time(self, payload):
+        """Limit the time until the next request to the publish interval.
+
+        Arguments:
+            payload (bytes): The response payload.
+
+        Returns:
+            bytes: The response payload, with a time until the next
+            request of at most ``update_time()``.
+        """
+        update_time = self._server.update_time()
+        if update_time is None:
+            return payload
+        max_time_ds = self._server._interval_to_ds(update_time)
+        response = Response.create_from_bytes(payload)
+        if response.request_times_ds[0] <= max_time_ds:
+            return payload
+        response.request_times_ds[0] = max_time_ds
+        return response.to_bytes()
+
+    def _write_atomically(self, filename, data):
+        """Write the specified file so that readers never see part of it.
+
+        Arguments:
+            filename (str): The name of the file, relative to the
+                directory.
+            data (bytes): The contents of the file.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self._dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, os.path.join(self._dir, filename))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _point_to(self, filename, payload):
+        """Atomically make the pointer file refer to the given payload file.
+
+        Arguments:
+            filename (str): The name of the payload file, relative to
+                the directory.
+            payload (bytes): The contents of the payload file.
+        """
+        temp_path = os.path.join(
+            self._dir, '.tmp-{:s}'.format(StaticPublisher.POINTER_FILENAME))
+        pointer_path = os.path.join(
+            self._dir, StaticPublisher.POINTER_FILENAME)
+        try:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            os.symlink(filename, temp_path)
+        except (AttributeError, NotImplementedError, OSError):
+            self._write_atomically(StaticPublisher.POINTER_FILENAME, payload)
+            return
+        os.replace(temp_path, pointer_path)
+
+    def _prune(self, current_filename):
+        """Remove all but the ``_keep`` most recent payload files.
+
+        Arguments:
+            current_filename (str): The name of the current payload
+                file. We never remove this file.
+        """
+        paths = []
+        for filename in os.listdir(self._dir):
+            if (filename != current_filename and
+                    filename.startswith(StaticPublisher._PAYLOAD_PREFIX) and
+                    filename.endswith(StaticPublisher._PAYLOAD_SUFFIX)):
+                path = os.path.join(self._dir, filename)
+                paths.append((os.stat(path).st_mtime_ns, path))
+        paths.sort(reverse=True)
+        for _, path in paths[self._keep - 1:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def publish_forever(self):
+        """Publish the content periodically until ``stop()`` is called.
+
+        Raises:
+            ValueError: If the server uses ``frame_times()``,
+                ``next_update_boundary``, or ``stagger_window()``.
+        """
+        self._check_server(datetime.now())
+        while not self._stop_event.is_set():
+            try:
+                self.publish()
+            except Exception:
+                logging.getLogger(__name__).exception(
+                    'Error publishing content')
+            now = datetime.now()
+            publish_time = self._server._next_render_time(now)
+            if publish_time is None:
+                self._stop_event.wait()
+            else:
+                self._stop_event.wait(
+                    max((publish_time - now).total_seconds(), 0))
+
+    def start(self):
+        """Call ``publish_forever()`` in a background daemon thread."""
+        if self._thread is not None:
+            raise RuntimeError('StaticPublisher has already been started')
+        self._thread = threading.Thread(
+            target=self.publish_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop publishing content.
+
+        We wait for any ongoing call to ``publish()`` in the background
+        thread to finish.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,136 @@
+from datetime import timedelta
+import hashlib
+import math
+import threading
+import time
+
+
+class TransportBalancer:
+    """Steers e-ink devices toward lightly loaded serving nodes.
+
+    In a deployment with several serving nodes, such as the one
+    described in the comments for ``ReplicaStore``, each of a device's
+    transports (see ``ClientConfig``) refers to a different node. Each
+    response may tell the device which transport to try first for its
+    next request (see ``Response.preferred_transport``). This lets an
+    overloaded node steer devices to other nodes without reprogramming
+    the devices. See ``Server.transport_balancer()``.
+
+    ``TransportBalancer`` assigns each device to a node using weighted
+    rendezvous hashing of its device ID, where each node's weight is its
+    spare capacity: its capacity minus its current load. This spreads
+    devices over the nodes in proportion to their spare capacity, and
+    when the loads change, only a proportionate number of devices move
+    to a different node.
+
+    Each node's load must be reported using ``set_load``, e.g. by
+    periodically passing each node's ``os.getloadavg()[0]`` to every
+    node. We do not steer devices to nodes whose load has not been
+    reported recently, since they might be down. Subclasses may
+    override ``loads()`` to obtain the loads some other way, such as
+    from a monitoring system.
+
+    ``TransportBalancer`` is thread-safe.
+    """
+
+    # Private attributes:
+    #
+    # list<float> _capacities - The capacity of each node, in the order of the
+    #     devices' transports.
+    # dict<int, tuple<float, float>> _loads - A map from the index of each node
+    #     whose load has been reported to a pair of the time.monotonic() value
+    #     when it was reported and the load.
+    # Lock _lock - The lock for accessing _loads.
+    # timedelta _max_age - The amount of time after which we disregard a
+    #     reported load.
+
+    # The minimum weight of a node, as a fraction of its capacity. This ensures
+    # that if every node is overloaded, we still spread the devices over the
+    # nodes.
+    _MIN_WEIGHT_FRACTION = 0.01
+
+    def __init__(self, capacities, max_age=timedelta(minutes=2)):
+        """Initialize a new ``TransportBalancer``.
+
+        Arguments:
+            capacities (list<float>): The capacity of each node, in the
+                same units as the loads, in the order of the transports
+                in the ``ClientConfig``. For example, if the loads are
+                load averages, each capacity could be the node's number
+                of CPU cores.
+            max_age (timedelta): The amount of time after which we
+                disregard a reported load.
+        """
+        if not capacities:
+            raise ValueError('There must be at least one node')
+        for capacity in capacities:
+            if capacity <= 0:
+                raise ValueError('Capacities must be positive')
+        self._capacities = list(capacities)
+        self._max_age = max_age
+        self._loads = {}
+        self._lock = threading.Lock()
+
+    def set_load(self, transport_index, load):
+        """Report the current load on the specified node.
+
+        Arguments:
+            transport_index (int): The index of the node's transport.
+            load (float): The load, such as the node's load average.
+        """
+        if not 0 <= transport_index < len(self._capacities):
+            raise ValueError('Invalid transport index')
+        with self._lock:
+            self._loads[transport_index] = (time.monotonic(), load)
+
+    def loads(self):
+        """Return the current load on each node.
+
+        Returns:
+            list<float>: The loads, in the order of the transports. An
+            element is ``None`` if the node's load has not been
+            reported recently, as in ``set_load``.
+        """
+        min_time = time.monotonic() - self._max_age.total_seconds()
+        loads = [None] * len(self._capacities)
+        with self._lock:
+            for index, (report_time, load) in self._loads.items():
+                if report_time >= min_time:
+                    loads[index] = load
+        return loads
+
+    @staticmethod
+    def _hash(device_id, transport_index):
+        """Return a pseudorandom number in (0, 1) for a device and node."""
+        digest = hashlib.sha256(
+            device_id + transport_index.to_bytes(4, 'little')).digest()
+        return (int.from_bytes(digest[:8], 'little') + 0.5) / 2 ** 64
+
+    def preferred_transport(self, request):
+        """Return the transport the device should try first next time.
+
+        Arguments:
+            request (Request): The request we are responding to.
+
+        Returns:
+            int: The index of the transport, or ``None`` if we have no
+            preference, because the device ID is unknown or no node's
+            load has been reported recently.
+        """
+        if not request.device_id:
+            return None
+        best_index = None
+        best_score = None
+        for index, load in enumerate(self.loads()):
+            if load is None:
+                continue
+            capacity = self._capacities[index]
+            weight = max(
+                capacity - load,
+                capacity * TransportBalancer._MIN_WEIGHT_FRACTION)
+            score = weight / -math.log(
+                TransportBalancer._hash(request.device_id, index))
+            if best_score is None or score > best_score:
+                best_index = index
+                best_score = score
+        return best_index
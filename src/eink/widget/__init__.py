@@ -0,0 +1,6 @@
+from .canvas import Canvas
+from .image_widget import ImageWidget
+from .text_widget import TextWidget
+from .widget import Widget
+
+__all__ = ['Canvas', 'ImageWidget', 'TextWidget', 'Widget']
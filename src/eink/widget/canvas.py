@@ -0,0 +1,206 @@
+import threading
+
+from PIL import Image
+
+from ..image import EinkGraphics
+from ..image import Palette
+
+
+class Canvas:
+    """A retained collection of widgets that renders frames incrementally.
+
+    A ``Canvas`` keeps the previous frame it rendered, along with each
+    widget's raster, reduced to the canvas's palette. When we render a
+    new frame, we only call ``render()`` on the widgets whose
+    ``state()`` changed, and we only recomposite the regions of the
+    frame that they (and any added or removed widgets) occupy. This is
+    much cheaper than redrawing and reducing the entire frame when only
+    a few widgets change between requests.
+
+    Widgets are drawn in the order in which they were added, so later
+    widgets appear on top of earlier widgets. Regions that are not
+    covered by any widget are filled with the background color.
+
+    The frames that ``render()`` returns are ``Images`` of mode ``'P'``
+    whose pixels are indices into the palette. ``Server.render()`` may
+    return them directly, and ``EinkGraphics.round`` recognizes them as
+    already reduced, so the server does not make another pass over the
+    frame. ``Canvas`` is thread-safe, but callers must not modify widgets
+    while another thread is rendering the canvas.
+    """
+
+    # Private attributes:
+    #
+    # int _background - The index in the palette of the background color.
+    # list<tuple<int, int, int, int>> _dirty_boxes - The boxes that we need to
+    #     recomposite the next time we render, apart from those of widgets
+    #     whose state changed. This consists of the boxes of the widgets that
+    #     were added or removed since the last frame.
+    # Image _frame - The most recent frame we rendered, or None if we have
+    #     not rendered a frame. This has mode 'P', with the colors of _palette.
+    # bool _is_frame_shared - Whether render() returned _frame. If so, we must
+    #     copy it before changing it.
+    # Lock _lock - The lock for rendering.
+    # Palette _palette - The palette to reduce to.
+    # dict<Widget, tuple<object, Image>> _rasters - A map from each widget we
+    #     have rendered to a pair of its state() at the time we rendered it
+    #     and its raster, reduced to the palette, as in _to_indices.
+    # tuple<int, int> _size - The width and height of the frames.
+    # list<Widget> _widgets - The widgets, in the order in which we draw them.
+
+    def __init__(
+            self, size, palette=Palette.THREE_BIT_GRAYSCALE, background=None):
+        """Initialize a new ``Canvas``.
+
+        Arguments:
+            size (tuple<int, int>): The width and height of the frames
+                to render.
+            palette (Palette): The palette to reduce the frames to.
+            background (object): The background color, in a format
+                appropriate for an ``Image`` of mode ``'L'`` if
+                ``palette`` is a grayscale palette and ``'RGB'``
+                otherwise. If this is ``None``, the background is white.
+        """
+        self._size = tuple(size)
+        self._palette = palette
+        if palette._is_grayscale:
+            mode = 'L'
+        else:
+            mode = 'RGB'
+        if background is None:
+            background = 'white'
+        self._background = self._to_indices(
+            EinkGraphics.round(
+                Image.new(mode, (1, 1), background), palette)).getpixel(
+                    (0, 0))
+        self._widgets = []
+        self._rasters = {}
+        self._dirty_boxes = []
+        self._frame = None
+        self._is_frame_shared = False
+        self._lock = threading.Lock()
+
+    def size(self):
+        """Return the width and height of the frames."""
+        return self._size
+
+    def widgets(self):
+        """Return the widgets, in the order in which they are drawn."""
+        return list(self._widgets)
+
+    def add(self, widget):
+        """Add the specified ``Widget`` to the top of the canvas."""
+        with self._lock:
+            self._widgets.append(widget)
+            self._dirty_boxes.append(widget.box())
+
+    def remove(self, widget):
+        """Remove the specified ``Widget`` from the canvas."""
+        with self._lock:
+            self._widgets.remove(widget)
+            self._rasters.pop(widget, None)
+            self._dirty_boxes.append(widget.box())
+
+    def render(self):
+        """Return an ``Image`` with the current contents of the canvas.
+
+        The return value has mode ``'P'``, and its pixels are indices
+        into the palette. The caller must not modify it. If nothing has
+        changed since the previous call to ``render()``, we return the
+        same ``Image``.
+        """
+        with self._lock:
+            if self._frame is None:
+                self._frame = Image.new('P', self._size, self._background)
+                self._frame.putpalette(self._palette._flattened_colors())
+                dirty_boxes = [(0, 0) + self._size]
+            else:
+                dirty_boxes = self._dirty_boxes
+            self._dirty_boxes = []
+
+            for widget in self._widgets:
+                state = widget.state()
+                entry = self._rasters.get(widget)
+                if entry is None or entry[0] != state:
+                    self._rasters[widget] = (state, self._reduce(widget))
+                    dirty_boxes.append(widget.box())
+
+            if dirty_boxes and self._is_frame_shared:
+                self._frame = self._frame.copy()
+            for box in dirty_boxes:
+                self._composite(box)
+            self._is_frame_shared = True
+            return self._frame
+
+    def _reduce(self, widget):
+        """Render the specified ``Widget`` and reduce it to the palette.
+
+        Returns:
+            Image: The reduced raster.
+        """
+        raster = widget.render()
+        if raster.size != widget.size():
+            raise ValueError(
+                'Widget.render() must return an image the size of the '
+                'widget\'s box')
+        if widget.dither():
+            reduced = EinkGraphics.dither(raster, self._palette)
+        else:
+            reduced = EinkGraphics.round(raster, self._palette)
+        return self._to_indices(reduced)
+
+    def _to_indices(self, image):
+        """Return an image of the palette indices of a reduced image.
+
+        Arguments:
+            image (Image): The image, as returned by
+                ``EinkGraphics.round`` or ``EinkGraphics.dither``.
+
+        Returns:
+            Image: An image of mode ``'P'`` whose pixels are the indices
+            in the palette of the pixels in ``image``, with the colors of
+            the palette.
+        """
+        if image.mode == 'L':
+            image = image.point(self._palette._index_lookup_table())
+        else:
+            image = image.copy()
+        image.putpalette(self._palette._flattened_colors())
+        return image
+
+    @staticmethod
+    def _intersection(box1, box2):
+        """Return the intersection of the specified boxes.
+
+        Returns:
+            tuple<int, int, int, int>: The intersection, or ``None`` if
+            it is empty.
+        """
+        left = max(box1[0], box2[0])
+        top = max(box1[1], box2[1])
+        right = min(box1[2], box2[2])
+        bottom = min(box1[3], box2[3])
+        if left < right and top < bottom:
+            return (left, top, right, bottom)
+        else:
+            return None
+
+    def _composite(self, box):
+        """Redraw the specified box of ``_frame`` from the widgets' rasters.
+        """
+        box = Canvas._intersection(box, (0, 0) + self._size)
+        if box is None:
+            return
+        self._frame.paste(self._background, box)
+        for widget in self._widgets:
+            widget_box = widget.box()
+            intersection = Canvas._intersection(box, widget_box)
+            if intersection is not None:
+                raster = self._rasters[widget][1]
+                self._frame.paste(
+                    raster.crop((
+                        intersection[0] - widget_box[0],
+                        intersection[1] - widget_box[1],
+                        intersection[2] - widget_box[0],
+                        intersection[3] - widget_box[1])),
+                    intersection)
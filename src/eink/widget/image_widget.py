@@ -0,0 +1,45 @@
+from .widget import Widget
+
+
+class ImageWidget(Widget):
+    """A ``Widget`` that displays an ``Image``, resized to fit its box."""
+
+    # Private attributes:
+    #
+    # Image _image - The image.
+
+    def __init__(self, box, image, dither=True):
+        """Initialize a new ``ImageWidget``.
+
+        Arguments:
+            box (tuple<int, int, int, int>): The box that the widget
+                occupies, as in the ``Widget`` initializer.
+            image (Image): The image to display. This may not have an
+                alpha channel. The widget does not copy the image, so
+                the caller should call ``set_image`` rather than
+                modifying it.
+            dither (bool): Whether to reduce the image to the palette
+                using dithering, as in the ``Widget`` initializer.
+        """
+        super().__init__(box, dither)
+        self._image = image
+
+    def image(self):
+        """Return the image that the widget displays."""
+        return self._image
+
+    def set_image(self, image):
+        """Set the image that the widget displays.
+
+        If ``image`` is not the same object as the current image, the
+        widget will be rendered again.
+        """
+        if image is not self._image:
+            self._image = image
+            self.invalidate()
+
+    def render(self):
+        if self._image.size == self.size():
+            return self._image
+        else:
+            return self._image.resize(self.size())
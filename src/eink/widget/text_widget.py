@@ -0,0 +1,57 @@
+from PIL import Image
+from PIL import ImageDraw
+
+from .widget import Widget
+
+
+class TextWidget(Widget):
+    """A ``Widget`` that displays a piece of text on a solid background."""
+
+    # Private attributes:
+    #
+    # object _background - The background color.
+    # object _fill - The color of the text.
+    # FreeTypeFont _font - The font.
+    # str _mode - The mode of the Images we render, e.g. 'L'.
+    # str _text - The text.
+
+    def __init__(
+            self, box, text, font, fill=0, background=255, mode='L'):
+        """Initialize a new ``TextWidget``.
+
+        Arguments:
+            box (tuple<int, int, int, int>): The box that the widget
+                occupies, as in the ``Widget`` initializer.
+            text (str): The text to display. This may consist of
+                multiple lines.
+            font (FreeTypeFont): The font.
+            fill (object): The color of the text, in a format
+                appropriate for ``mode``.
+            background (object): The background color, in a format
+                appropriate for ``mode``.
+            mode (str): The mode of the images to render: ``'L'`` or
+                ``'RGB'``.
+        """
+        super().__init__(box)
+        self._text = text
+        self._font = font
+        self._fill = fill
+        self._background = background
+        self._mode = mode
+
+    def text(self):
+        """Return the text that the widget displays."""
+        return self._text
+
+    def set_text(self, text):
+        """Set the text that the widget displays."""
+        self._text = text
+
+    def state(self):
+        return self._text
+
+    def render(self):
+        image = Image.new(self._mode, self.size(), self._background)
+        ImageDraw.Draw(image).multiline_text(
+            (0, 0), self._text, fill=self._fill, font=self._font)
+        return image
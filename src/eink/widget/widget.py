@@ -0,0 +1,85 @@
+class Widget:
+    """A rectangular element of a ``Canvas``.
+
+    A widget occupies a fixed box in the canvas. It renders itself by
+    returning an ``Image`` the size of its box, which the ``Canvas``
+    reduces to the canvas's palette and caches. The canvas only calls
+    ``render`` again when the widget's ``state()`` changes, and it only
+    recomposites the regions of the frame that changed.
+
+    Subclasses must override ``render``. They should either override
+    ``state`` to return a value that summarizes their inputs, or call
+    ``invalidate()`` whenever their inputs change.
+    """
+
+    # Private attributes:
+    #
+    # tuple<int, int, int, int> _box - The box that the widget occupies, as
+    #     in the "box" argument to the initializer.
+    # bool _dither - Whether to reduce the widget's raster to the palette
+    #     using dithering rather than rounding.
+    # int _version - The number of times we have called invalidate().
+
+    def __init__(self, box, dither=False):
+        """Initialize a new ``Widget``.
+
+        Arguments:
+            box (tuple<int, int, int, int>): The box that the widget
+                occupies in the canvas. This is a tuple of the left,
+                top, right, and bottom coordinates, where the right and
+                bottom coordinates are exclusive.
+            dither (bool): Whether to reduce the widget's raster to the
+                canvas's palette using ``EinkGraphics.dither``, as
+                opposed to ``EinkGraphics.round``. Dithering is usually
+                appropriate for photos and gradients, and rounding for
+                text and line art.
+        """
+        if box[2] <= box[0] or box[3] <= box[1]:
+            raise ValueError('A widget\'s box must have a positive area')
+        self._box = tuple(box)
+        self._dither = dither
+        self._version = 0
+
+    def box(self):
+        """Return the box that the widget occupies.
+
+        Returns:
+            tuple<int, int, int, int>: The left, top, right, and bottom
+            coordinates of the box, where the right and bottom
+            coordinates are exclusive.
+        """
+        return self._box
+
+    def size(self):
+        """Return the width and height of the widget's box."""
+        return (self._box[2] - self._box[0], self._box[3] - self._box[1])
+
+    def dither(self):
+        """Return whether the widget's raster should be dithered.
+
+        See the ``dither`` argument to the initializer.
+        """
+        return self._dither
+
+    def state(self):
+        """Return a value that summarizes the widget's inputs.
+
+        The ``Canvas`` calls ``render`` again whenever this value
+        differs from the value it had the last time it called
+        ``render``. The default implementation returns a counter that
+        ``invalidate()`` increments.
+        """
+        return self._version
+
+    def invalidate(self):
+        """Mark the widget as needing to be rendered again."""
+        self._version += 1
+
+    def render(self):
+        """Return an ``Image`` with the contents of the widget.
+
+        The image must have the same size as the widget's box, and it
+        may not have an alpha channel. The ``Canvas`` reduces it to
+        its palette.
+        """
+        raise NotImplementedError('Subclasses must implement')
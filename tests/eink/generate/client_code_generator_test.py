@@ -0,0 +1,37 @@
+from datetime import timedelta
+import os
+import tempfile
+import unittest
+
+from eink.generate import ClientCodeGenerator
+from eink.generate import ClientConfig
+from eink.generate import StatusImages
+from eink.generate import WebTransport
+
+
+class ClientCodeGeneratorTest(unittest.TestCase):
+    """Tests the ``ClientCodeGenerator`` class."""
+
+    def test_long_poll_timeout(self):
+        """Test ``ClientConfig.set_long_poll_timeout``."""
+        config = ClientConfig(
+            WebTransport('http://www.example.com/'),
+            StatusImages.create_default(20, 20))
+        config.add_wi_fi_network('network', 'password')
+        with tempfile.TemporaryDirectory() as dir_:
+            ClientCodeGenerator.gen(config, dir_)
+            with open(os.path.join(dir_, 'generated.cpp')) as file:
+                self.assertIn('const int LONG_POLL_TIMEOUT_MS = 0;\n', file)
+
+            config.set_long_poll_timeout(timedelta(seconds=45))
+            ClientCodeGenerator.gen(config, dir_)
+            with open(os.path.join(dir_, 'generated.cpp')) as file:
+                self.assertIn(
+                    'const int LONG_POLL_TIMEOUT_MS = 45000;\n', file)
+
+            config.set_long_poll_timeout(timedelta(minutes=2))
+            with self.assertRaises(ValueError):
+                ClientCodeGenerator.gen(config, dir_)
+            config.set_long_poll_timeout(timedelta())
+            with self.assertRaises(ValueError):
+                ClientCodeGenerator.gen(config, dir_)
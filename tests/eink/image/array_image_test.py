@@ -0,0 +1,81 @@
+import io
+import unittest
+
+from PIL import Image
+
+from eink.image import ArrayImage
+from eink.image import EinkGraphics
+from eink.image import Palette
+from eink.image.image_data import ImageData
+
+
+class ArrayImageTest(unittest.TestCase):
+    """Tests the ``ArrayImage`` class."""
+
+    def test_grayscale(self):
+        """Test ``ArrayImage`` with grayscale pixels."""
+        data = bytearray(range(0, 240, 10))
+        view = memoryview(data).cast('B', (4, 6))
+        array_image = ArrayImage(view)
+        self.assertEqual('L', array_image.mode)
+        self.assertEqual((6, 4), array_image.size)
+
+        image = array_image.to_image(Palette.THREE_BIT_GRAYSCALE)
+        self.assertEqual('L', image.mode)
+        self.assertEqual((6, 4), image.size)
+        self.assertEqual(list(data), list(image.get_flattened_data()))
+
+        # The image should share memory with the array
+        data[7] = 255
+        self.assertEqual(255, image.getpixel((1, 1)))
+
+        expected = Image.frombytes('L', (6, 4), bytes(data))
+        self.assertEqual(
+            list(EinkGraphics.round(expected).get_flattened_data()),
+            list(EinkGraphics.round(view).get_flattened_data()))
+        self.assertEqual(
+            list(EinkGraphics.dither(expected).get_flattened_data()),
+            list(EinkGraphics.dither(array_image).get_flattened_data()))
+
+    def test_rgb(self):
+        """Test ``ArrayImage`` with RGB pixels."""
+        data = bytes(range(36))
+        view = memoryview(data).cast('B', (3, 4, 3))
+        array_image = ArrayImage(view)
+        self.assertEqual('RGB', array_image.mode)
+        self.assertEqual((4, 3), array_image.size)
+        expected = Image.frombytes('RGB', (4, 3), data)
+        self.assertEqual(
+            list(expected.get_flattened_data()),
+            list(array_image.to_image(None).get_flattened_data()))
+
+        array_image2 = ArrayImage(data, 'RGB', (6, 2))
+        self.assertEqual((6, 2), array_image2.to_image(None).size)
+
+    def test_palette_indices(self):
+        """Test ``ArrayImage`` with palette indices."""
+        palette = Palette.BLACK_WHITE_AND_RED
+        array_image = ArrayImage(bytes([0, 1, 2, 1, 0, 2]), 'P', (3, 2))
+        image = EinkGraphics.round(array_image, palette)
+        self.assertEqual(
+            [
+                (0, 0, 0), (255, 255, 255), (255, 0, 0), (255, 255, 255),
+                (0, 0, 0), (255, 0, 0)],
+            list(image.convert('RGB').get_flattened_data()))
+
+        image_data = ImageData.render_png(image, palette)
+        self.assertEqual(
+            list(image.convert('RGB').get_flattened_data()),
+            list(Image.open(io.BytesIO(image_data)).convert(
+                'RGB').get_flattened_data()))
+
+    def test_invalid(self):
+        """Test that ``ArrayImage`` rejects invalid data."""
+        with self.assertRaises(ValueError):
+            ArrayImage(bytes(6))
+        with self.assertRaises(ValueError):
+            ArrayImage(bytes(6), 'L', (4, 2))
+        with self.assertRaises(ValueError):
+            ArrayImage(bytes(6), 'RGBA', (3, 2))
+        with self.assertRaises(ValueError):
+            ArrayImage(memoryview(bytes(24)).cast('B', (2, 3, 4)))
@@ -1,10 +1,13 @@
 import random
 import unittest
+from unittest import mock
 
 from PIL import Image
 
 from eink.image import EinkGraphics
 from eink.image import Palette
+from eink.image import Reduction
+from eink.image import RegionImage
 
 
 class EinkGraphicsTest(unittest.TestCase):
@@ -205,3 +208,84 @@ class EinkGraphicsTest(unittest.TestCase):
         """Test ``EinkGraphics.dither`` with grayscale ``Palettes``."""
         self._check_dither_grayscale(Palette.THREE_BIT_GRAYSCALE, 36, 73)
         self._check_dither_grayscale(Palette.FOUR_BIT_GRAYSCALE, 136, 153)
+
+    def _check_reduce(self, palette):
+        """Test ``EinkGraphics.reduce`` with the specified ``Palette``."""
+        image = self._random_image()
+        self.assertEqual(
+            list(EinkGraphics.round(image, palette).convert(
+                'RGB').get_flattened_data()),
+            list(EinkGraphics.reduce(image, palette).convert(
+                'RGB').get_flattened_data()))
+
+        region_image = RegionImage(image)
+        region_image.add_region((2, 3, 10, 12), Reduction.DITHER)
+        region_image.add_region((-5, 15, 8, 40), Reduction.DITHER)
+        region_image.add_region((4, 5, 6, 7), Reduction.ROUND)
+        result = EinkGraphics.reduce(region_image, palette).convert('RGB')
+        self.assertEqual(image.size, result.size)
+        self.assertTrue(self._are_pixels_in(result, palette._colors))
+
+        expected = EinkGraphics.round(image, palette).convert('RGB')
+        for box in [(2, 3, 10, 12), (0, 15, 8, image.height)]:
+            expected.paste(
+                EinkGraphics.dither(image.crop(box), palette).convert('RGB'),
+                box)
+        expected.paste(
+            EinkGraphics.round(image.crop((4, 5, 6, 7)), palette).convert(
+                'RGB'),
+            (4, 5, 6, 7))
+        self.assertEqual(
+            list(expected.get_flattened_data()),
+            list(result.get_flattened_data()))
+
+        region_image2 = RegionImage(
+            image, [((0, 0, 4, 4), Reduction.ROUND)], Reduction.DITHER)
+        result2 = EinkGraphics.reduce(region_image2, palette).convert('RGB')
+        self.assertTrue(self._are_pixels_in(result2, palette._colors))
+        self.assertEqual(
+            list(EinkGraphics.round(image.crop((0, 0, 4, 4)), palette).convert(
+                'RGB').get_flattened_data()),
+            list(result2.crop((0, 0, 4, 4)).get_flattened_data()))
+
+        # Rounded regions should not be rounded again, except where they cover
+        # dithered regions
+        region_image3 = RegionImage(image)
+        region_image3.add_region((0, 0, 4, 4), Reduction.ROUND)
+        region_image3.add_region((2, 3, 10, 12), Reduction.DITHER)
+        region_image3.add_region((12, 12, 18, 18), Reduction.ROUND)
+        with mock.patch.object(
+                EinkGraphics, 'round', wraps=EinkGraphics.round) as round_:
+            result3 = EinkGraphics.reduce(region_image3, palette)
+        self.assertEqual(1, round_.call_count)
+        expected = EinkGraphics.round(image, palette).convert('RGB')
+        expected.paste(
+            EinkGraphics.dither(
+                image.crop((2, 3, 10, 12)), palette).convert('RGB'),
+            (2, 3, 10, 12))
+        self.assertEqual(
+            list(expected.get_flattened_data()),
+            list(result3.convert('RGB').get_flattened_data()))
+
+        region_image3.add_region((4, 5, 6, 7), Reduction.ROUND)
+        with mock.patch.object(
+                EinkGraphics, 'round', wraps=EinkGraphics.round) as round_:
+            EinkGraphics.reduce(region_image3, palette)
+        self.assertEqual(2, round_.call_count)
+
+        # We should not modify an image that is already reduced
+        reduced = Image.new('P', image.size, len(palette._colors) - 1)
+        reduced.putpalette(palette._flattened_colors())
+        self.assertIs(reduced, EinkGraphics.reduce(reduced, palette))
+        result4 = EinkGraphics.reduce(
+            RegionImage(reduced, [((0, 0, 4, 4), Reduction.DITHER)]), palette)
+        self.assertIsNot(reduced, result4)
+        self.assertEqual(
+            list(reduced.convert('RGB').get_flattened_data()),
+            list(result4.convert('RGB').get_flattened_data()))
+
+    def test_reduce(self):
+        """Test ``EinkGraphics.reduce``."""
+        self._check_reduce(Palette.THREE_BIT_GRAYSCALE)
+        self._check_reduce(Palette.MONOCHROME)
+        self._check_reduce(Palette.SEVEN_COLOR)
@@ -61,3 +61,35 @@ class ImageDataTest(unittest.TestCase):
         self._check_render_png(Palette.FOUR_BIT_GRAYSCALE)
         self._check_render_png(Palette.MONOCHROME)
         self._check_render_png(Palette.SEVEN_COLOR)
+
+    def test_reencode_png(self):
+        """Test ``ImageData.reencode_png``."""
+        image = Image.linear_gradient('L').resize((64, 64))
+        palette = Palette.THREE_BIT_GRAYSCALE
+        image = EinkGraphics.reduce(image, palette)
+        image_data = ImageData.render_png(image, palette)
+
+        compressed_data = ImageData.reencode_png(image_data, palette)
+        self.assertLessEqual(len(compressed_data), len(image_data))
+        self.assertEqual(
+            list(image.convert('RGB').get_flattened_data()),
+            list(
+                Image.open(io.BytesIO(compressed_data)).convert('RGB').
+                get_flattened_data()))
+
+        coarse_data = ImageData.reencode_png(image_data, palette, True)
+        self.assertLess(len(coarse_data), len(image_data))
+        coarse_image = Image.open(io.BytesIO(coarse_data)).convert('L')
+        self.assertEqual(
+            {0, 73, 182, 255}, set(coarse_image.get_flattened_data()))
+
+        color = Palette.SEVEN_COLOR._colors[4]
+        image_data = ImageData.render_png(
+            Image.new('RGB', (20, 20), color), Palette.SEVEN_COLOR)
+        coarse_data = ImageData.reencode_png(
+            image_data, Palette.SEVEN_COLOR, True)
+        self.assertEqual(
+            [color] * 400,
+            list(
+                Image.open(io.BytesIO(coarse_data)).convert('RGB').
+                get_flattened_data()))
@@ -30,3 +30,13 @@ class PaletteTest(unittest.TestCase):
         expected = ([0] * 128) + ([255] * 128)
         actual = Palette.MONOCHROME._round_lookup_table()
         self.assertEqual(expected, actual)
+
+    def test_coarse(self):
+        """Test ``Palette._coarse()``."""
+        self.assertEqual(
+            [(0, 0, 0), (73, 73, 73), (182, 182, 182), (255, 255, 255)],
+            Palette.THREE_BIT_GRAYSCALE._coarse()._colors)
+        self.assertEqual(
+            8, len(Palette.FOUR_BIT_GRAYSCALE._coarse()._colors))
+        self.assertIs(Palette.MONOCHROME, Palette.MONOCHROME._coarse())
+        self.assertIs(Palette.SEVEN_COLOR, Palette.SEVEN_COLOR._coarse())
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from PIL import Image
+
+from eink.image import ResourceCache
+
+
+class ResourceCacheTest(unittest.TestCase):
+    """Tests the ``ResourceCache`` class."""
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write_image(self, filename, color, mtime):
+        """Write a 4 x 2 grayscale PNG image with the specified color.
+
+        Arguments:
+            filename (str): The filename, relative to the temporary
+                directory.
+            color (int): The color.
+            mtime (int): The modification time to assign to the file.
+
+        Returns:
+            str: The absolute filename.
+        """
+        filename = os.path.join(self._dir, filename)
+        Image.new('L', (4, 2), color).save(filename)
+        os.utime(filename, (mtime, mtime))
+        return filename
+
+    def test_image(self):
+        """Test ``ResourceCache.image``."""
+        cache = ResourceCache()
+        filename = self._write_image('image.png', 64, 1000000000)
+        image = cache.image(filename)
+        self.assertEqual((4, 2), image.size)
+        self.assertEqual(64, image.getpixel((0, 0)))
+        self.assertIs(image, cache.image(filename))
+
+        # Changing the file should invalidate the cached image
+        self._write_image('image.png', 128, 1000000010)
+        image2 = cache.image(filename)
+        self.assertIsNot(image, image2)
+        self.assertEqual(128, image2.getpixel((0, 0)))
+        self.assertIs(image2, cache.image(filename))
+
+        cache.clear()
+        self.assertIsNot(image2, cache.image(filename))
+
+    def test_eviction(self):
+        """Test that ``ResourceCache`` evicts least recently used assets."""
+        cache = ResourceCache(20)
+        filename1 = self._write_image('image1.png', 0, 1000000000)
+        filename2 = self._write_image('image2.png', 64, 1000000000)
+        filename3 = self._write_image('image3.png', 128, 1000000000)
+        image1 = cache.image(filename1)
+        image2 = cache.image(filename2)
+        self.assertIs(image1, cache.image(filename1))
+        image3 = cache.image(filename3)
+        self.assertIs(image1, cache.image(filename1))
+        self.assertIs(image3, cache.image(filename3))
+        self.assertIsNot(image2, cache.image(filename2))
+
+    def test_font(self):
+        """Test ``ResourceCache.font``."""
+        cache = ResourceCache()
+        font_filename = os.path.join(
+            os.path.dirname(__file__), '..', '..', '..', 'src', 'eink',
+            'assets', 'server_skeleton', 'GentiumPlus-R.ttf')
+        font = cache.font(font_filename, 36)
+        self.assertEqual(36, font.size)
+        self.assertIs(font, cache.font(font_filename, 36))
+        font2 = cache.font(font_filename, 18)
+        self.assertEqual(18, font2.size)
+        self.assertIsNot(font, font2)
+
+    def test_default(self):
+        """Test ``ResourceCache.default``."""
+        self.assertIsInstance(ResourceCache.default(), ResourceCache)
+        self.assertIs(ResourceCache.default(), ResourceCache.default())
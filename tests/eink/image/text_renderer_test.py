@@ -0,0 +1,108 @@
+import io
+import os
+import unittest
+
+from PIL import Image
+from PIL import ImageDraw
+from PIL import ImageFont
+
+from eink.image import Palette
+from eink.image import TextRenderer
+
+
+class TextRendererTest(unittest.TestCase):
+    """Tests the ``TextRenderer`` class."""
+
+    def _font_filename(self):
+        """Return the filename of the skeleton's Gentium Plus font."""
+        return os.path.join(
+            os.path.dirname(__file__), '..', '..', '..', 'src', 'eink',
+            'assets', 'server_skeleton', 'GentiumPlus-R.ttf')
+
+    def _font(self, size):
+        """Return the skeleton's Gentium Plus font at the specified size."""
+        return ImageFont.truetype(self._font_filename(), size)
+
+    def test_draw_text_grayscale(self):
+        """Test ``TextRenderer.draw_text`` with a grayscale palette."""
+        renderer = TextRenderer(Palette.THREE_BIT_GRAYSCALE)
+        font = self._font(24)
+        image = Image.new('L', (200, 100), 255)
+        renderer.draw_text(image, (10, 20), 'Hello,\nworld!', font)
+        palette_colors = set(
+            color[0] for color in Palette.THREE_BIT_GRAYSCALE._colors)
+        self.assertTrue(
+            set(image.get_flattened_data()).issubset(palette_colors))
+
+        # The text should cover the same region as ImageDraw.multiline_text
+        expected = Image.new('L', (200, 100), 255)
+        ImageDraw.Draw(expected).multiline_text(
+            (10, 20), 'Hello,\nworld!', fill=0, font=font)
+        self.assertEqual(
+            expected.point(lambda v: 255 if v >= 128 else 0).getbbox(),
+            image.point(lambda v: 255 if v >= 128 else 0).getbbox())
+
+        # Drawing the text again should reuse the cached raster
+        size = renderer._cache.size()
+        image2 = Image.new('L', (200, 100), 255)
+        renderer.draw_text(image2, (10, 20), 'Hello,\nworld!', font)
+        self.assertEqual(size, renderer._cache.size())
+        self.assertEqual(
+            list(image.get_flattened_data()),
+            list(image2.get_flattened_data()))
+
+        # The anchor should be respected
+        image3 = Image.new('L', (200, 100), 255)
+        renderer.draw_text(image3, (100, 50), 'Hello', font, anchor='mm')
+        left, top, right, bottom = image3.point(
+            lambda v: 0 if v == 255 else 255).getbbox()
+        self.assertLessEqual(abs((left + right) / 2 - 100), 2)
+        self.assertLessEqual(abs((top + bottom) / 2 - 50), 4)
+
+    def test_draw_text_color(self):
+        """Test ``TextRenderer.draw_text`` with a color palette."""
+        renderer = TextRenderer(Palette.BLACK_WHITE_AND_RED)
+        image = Image.new('RGB', (120, 40), (255, 255, 255))
+        renderer.draw_text(image, (5, 5), 'Alert', self._font(20), (200, 0, 0))
+        self.assertEqual(
+            {(255, 255, 255), (255, 0, 0)}, set(image.get_flattened_data()))
+
+    def test_draw_empty_text(self):
+        """Test ``TextRenderer.draw_text`` with an empty string."""
+        renderer = TextRenderer()
+        image = Image.new('L', (20, 20), 255)
+        renderer.draw_text(image, (5, 5), '', self._font(12))
+        self.assertEqual({255}, set(image.get_flattened_data()))
+
+    def test_font_keys(self):
+        """Test which fonts ``TextRenderer`` caches text for."""
+        renderer = TextRenderer()
+        image = Image.new('L', (100, 40), 255)
+        renderer.draw_text(image, (5, 5), 'Hello', self._font(16))
+        size = renderer._cache.size()
+
+        # Fonts loaded from the same file should share cache entries
+        renderer.draw_text(image, (5, 5), 'Hello', self._font(16))
+        self.assertEqual(size, renderer._cache.size())
+        renderer.draw_text(image, (5, 5), 'Hello', self._font(17))
+        self.assertGreater(renderer._cache.size(), size)
+        size = renderer._cache.size()
+
+        # Fonts loaded from the same bytes should share cache entries
+        with open(self._font_filename(), 'rb') as file:
+            font_bytes = file.read()
+        renderer.draw_text(
+            image, (5, 5), 'Hello',
+            ImageFont.truetype(io.BytesIO(font_bytes), 16))
+        self.assertGreater(renderer._cache.size(), size)
+        size = renderer._cache.size()
+        renderer.draw_text(
+            image, (5, 5), 'Hello',
+            ImageFont.truetype(io.BytesIO(font_bytes), 16))
+        self.assertEqual(size, renderer._cache.size())
+
+        # We should not cache text in fonts that do not have a source
+        if hasattr(ImageFont, 'load_default_imagefont'):
+            renderer.draw_text(
+                image, (5, 5), 'Hello', ImageFont.load_default_imagefont())
+            self.assertEqual(size, renderer._cache.size())
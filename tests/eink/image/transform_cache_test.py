@@ -0,0 +1,81 @@
+import random
+import unittest
+
+from PIL import Image
+
+from eink.image import EinkGraphics
+from eink.image import Palette
+from eink.image import TransformCache
+
+
+class TransformCacheTest(unittest.TestCase):
+    """Tests the ``TransformCache`` class."""
+
+    def _random_image(self, rng, mode, size):
+        """Return a random ``Image`` with the specified mode and size."""
+        image = Image.new('RGB', size)
+        image.putdata([
+            (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            for _ in range(size[0] * size[1])])
+        return image.convert(mode)
+
+    def _assert_images_equal(self, expected, actual):
+        """Assert that the specified ``Images`` have the same pixels."""
+        self.assertEqual(expected.size, actual.size)
+        self.assertEqual(
+            list(expected.convert('RGB').get_flattened_data()),
+            list(actual.convert('RGB').get_flattened_data()))
+
+    def test_transforms(self):
+        """Test ``TransformCache.round``, ``dither``, and ``resize``."""
+        rng = random.Random(1357924680)
+        cache = TransformCache()
+        for mode in ('L', 'RGB'):
+            for palette in (
+                    Palette.THREE_BIT_GRAYSCALE, Palette.SEVEN_COLOR):
+                image = self._random_image(rng, mode, (12, 8))
+                rounded = cache.round(image, palette)
+                self._assert_images_equal(
+                    EinkGraphics.round(image, palette), rounded)
+                self.assertIs(rounded, cache.round(image.copy(), palette))
+
+                dithered = cache.dither(image, palette)
+                self._assert_images_equal(
+                    EinkGraphics.dither(image, palette), dithered)
+                self.assertIs(dithered, cache.dither(image.copy(), palette))
+
+            resized = cache.resize(image, (6, 4))
+            self._assert_images_equal(image.resize((6, 4)), resized)
+            self.assertIs(resized, cache.resize(image, (6, 4)))
+            self.assertIsNot(
+                resized, cache.resize(image, (6, 4), Image.NEAREST))
+
+    def test_cache_keys(self):
+        """Test that ``TransformCache`` distinguishes different inputs."""
+        rng = random.Random(2468013579)
+        cache = TransformCache()
+        image = self._random_image(rng, 'L', (8, 8))
+        image2 = image.copy()
+        image2.putpixel((3, 3), 255 - image.getpixel((3, 3)))
+        self.assertIsNot(cache.dither(image), cache.dither(image2))
+        self.assertIsNot(
+            cache.round(image), cache.round(image, Palette.MONOCHROME))
+        self.assertIsNot(cache.round(image), cache.dither(image))
+        self.assertIsNot(cache.round(image), cache.round(image.convert('RGB')))
+
+    def test_eviction(self):
+        """Test that ``TransformCache`` respects its memory limit."""
+        rng = random.Random(-97531)
+        cache = TransformCache(100)
+        image1 = self._random_image(rng, 'L', (8, 8))
+        image2 = self._random_image(rng, 'L', (8, 8))
+        rounded1 = cache.round(image1)
+        self.assertIs(rounded1, cache.round(image1))
+        cache.round(image2)
+        self.assertIsNot(rounded1, cache.round(image1))
+        self.assertLessEqual(cache._cache.size(), 100)
+
+    def test_default(self):
+        """Test ``TransformCache.default``."""
+        self.assertIsInstance(TransformCache.default(), TransformCache)
+        self.assertIs(TransformCache.default(), TransformCache.default())
@@ -0,0 +1,88 @@
+from datetime import timedelta
+import io
+import unittest
+
+from PIL import Image
+
+from eink.image import EinkGraphics
+from eink.image import Palette
+from eink.image.image_data import ImageData
+from eink.server import AdaptiveEncoder
+from eink.server.request import Request
+
+
+class AdaptiveEncoderTest(unittest.TestCase):
+    """Tests the ``AdaptiveEncoder`` class."""
+
+    def test_level_rssi(self):
+        """Test ``AdaptiveEncoder.level`` with Wi-Fi signal strengths."""
+        encoder = AdaptiveEncoder()
+        self.assertEqual(
+            AdaptiveEncoder.NORMAL, encoder.level(Request(b'a'), 10000))
+        self.assertEqual(
+            AdaptiveEncoder.NORMAL,
+            encoder.level(Request(b'a', wi_fi_rssi=-50), 10000))
+        self.assertEqual(
+            AdaptiveEncoder.COMPRESSED,
+            encoder.level(Request(b'a', wi_fi_rssi=-75), 10000))
+        self.assertEqual(
+            AdaptiveEncoder.COARSE,
+            encoder.level(Request(b'a', wi_fi_rssi=-90), 10000))
+
+    def test_level_transfer_time(self):
+        """Test ``AdaptiveEncoder.level`` with past transfer times."""
+        encoder = AdaptiveEncoder(
+            max_transfer_time=timedelta(seconds=4),
+            draw_overhead=timedelta(seconds=1))
+        encoder.record(Request(b'a'), 10000)
+        encoder.record(Request(b'b'), 10000)
+        encoder.record(Request(b'c'), 10000)
+
+        # 1 second per 10000 bytes
+        request = Request(b'a', wi_fi_rssi=-50, draw_time_ms=2000)
+        self.assertEqual(AdaptiveEncoder.NORMAL, encoder.level(request, 30000))
+        self.assertEqual(
+            AdaptiveEncoder.COMPRESSED, encoder.level(request, 50000))
+        self.assertEqual(AdaptiveEncoder.COARSE, encoder.level(request, 90000))
+
+        # 5 seconds per 10000 bytes
+        request = Request(b'b', draw_time_ms=6000)
+        self.assertEqual(
+            AdaptiveEncoder.COMPRESSED, encoder.level(request, 10000))
+
+        # The device did not download an image, so the previous estimate
+        # still applies
+        encoder.record(request, 0)
+        self.assertEqual(
+            AdaptiveEncoder.COARSE,
+            encoder.level(Request(b'b', draw_time_ms=1000), 20000))
+
+        self.assertEqual(
+            AdaptiveEncoder.COMPRESSED,
+            encoder.level(Request(b'c', wi_fi_rssi=-75), 10000))
+        self.assertEqual(
+            AdaptiveEncoder.NORMAL,
+            encoder.level(Request(b'd', draw_time_ms=60000), 10000))
+
+    def test_encode(self):
+        """Test ``AdaptiveEncoder.encode``."""
+        image = Image.linear_gradient('L').resize((64, 64))
+        palette = Palette.FOUR_BIT_GRAYSCALE
+        image_data = ImageData.render_png(
+            EinkGraphics.reduce(image, palette), palette)
+        encoder = AdaptiveEncoder()
+        self.assertIs(
+            image_data,
+            encoder.encode(image_data, AdaptiveEncoder.NORMAL, palette))
+
+        compressed_data = encoder.encode(
+            image_data, AdaptiveEncoder.COMPRESSED, palette)
+        self.assertLessEqual(len(compressed_data), len(image_data))
+        coarse_data = encoder.encode(
+            image_data, AdaptiveEncoder.COARSE, palette)
+        self.assertLess(len(coarse_data), len(image_data))
+        coarse_image = Image.open(io.BytesIO(coarse_data)).convert('L')
+        self.assertLessEqual(len(set(coarse_image.get_flattened_data())), 8)
+        self.assertIs(
+            coarse_data,
+            encoder.encode(image_data, AdaptiveEncoder.COARSE, palette))
@@ -0,0 +1,51 @@
+import unittest
+
+from eink.server.change_tracker import ChangeTracker
+
+
+class ChangeTrackerTest(unittest.TestCase):
+    """Tests the ``ChangeTracker`` class."""
+
+    def test_update_time_ds(self):
+        """Test ``ChangeTracker.update_time_ds``."""
+        tracker = ChangeTracker()
+        self.assertEqual(
+            3000, tracker.update_time_ds(b'a', b'foo', 3000, 36000))
+        self.assertEqual(
+            4500, tracker.update_time_ds(b'a', b'foo', 3000, 36000))
+        self.assertEqual(
+            6750, tracker.update_time_ds(b'a', b'foo', 3000, 36000))
+        self.assertEqual(
+            3000, tracker.update_time_ds(b'b', b'foo', 3000, 36000))
+        self.assertEqual(
+            3375, tracker.update_time_ds(b'a', b'bar', 3000, 36000))
+        self.assertEqual(
+            3000, tracker.update_time_ds(b'a', b'foo', 3000, 36000))
+
+        for _ in range(20):
+            time_ds = tracker.update_time_ds(b'a', b'foo', 3000, 36000)
+        self.assertEqual(36000, time_ds)
+        self.assertEqual(
+            18000, tracker.update_time_ds(b'a', b'bar', 3000, 36000))
+
+    def test_max_devices(self):
+        """Test the ``max_devices`` argument to ``ChangeTracker``."""
+        tracker = ChangeTracker(2)
+        tracker.update_time_ds(b'a', b'foo', 100, 1000)
+        tracker.update_time_ds(b'b', b'foo', 100, 1000)
+        tracker.update_time_ds(b'a', b'foo', 100, 1000)
+        tracker.update_time_ds(b'c', b'foo', 100, 1000)
+        self.assertEqual(225, tracker.update_time_ds(b'a', b'foo', 100, 1000))
+        self.assertEqual(100, tracker.update_time_ds(b'b', b'foo', 100, 1000))
+
+    def test_has_sent(self):
+        """Test ``ChangeTracker.has_sent``."""
+        tracker = ChangeTracker()
+        self.assertFalse(tracker.has_sent(b'a', b'foo'))
+        tracker.update_time_ds(b'a', b'foo', 100, 1000)
+        self.assertTrue(tracker.has_sent(b'a', b'foo'))
+        self.assertFalse(tracker.has_sent(b'a', b'bar'))
+        self.assertFalse(tracker.has_sent(b'b', b'foo'))
+        tracker.update_time_ds(b'a', b'bar', 100, 1000)
+        self.assertFalse(tracker.has_sent(b'a', b'foo'))
+        self.assertTrue(tracker.has_sent(b'a', b'bar'))
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import timedelta
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from eink.server import ReplicaStore
+from eink.server.content_watcher import ContentWatcher
+from eink.server.server_io import ServerIO
+from .test_server import TestServer
+
+
+class ContentWatcherTest(unittest.TestCase):
+    """Tests the ``ContentWatcher`` class."""
+
+    def test_wait(self):
+        """Test ``ContentWatcher.wait``."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(milliseconds=100),
+            [timedelta(minutes=1)], 'mountain', None)
+
+        async def run():
+            watcher = ContentWatcher(server)
+            try:
+                # The device is not displaying the current content
+                await watcher.wait(b'\x01' * 8, timedelta(seconds=10))
+                frame_id = watcher.frame_id()
+                self.assertEqual(
+                    ServerIO.frame_id(server._state().watched_frame[1]),
+                    frame_id)
+
+                # The content does not change before the timeout
+                start_time = time.monotonic()
+                await watcher.wait(frame_id, timedelta(milliseconds=200))
+                self.assertGreaterEqual(time.monotonic() - start_time, 0.15)
+                self.assertEqual(frame_id, watcher.frame_id())
+
+                server._image = Image.new('L', (20, 20), 0)
+                await watcher.wait(frame_id, timedelta(seconds=10))
+                self.assertNotEqual(frame_id, watcher.frame_id())
+                self.assertEqual(
+                    ServerIO.frame_id(server._state().watched_frame[1]),
+                    watcher.frame_id())
+
+                # Closing the watcher should wake the waiting requests
+                task = asyncio.get_event_loop().create_task(
+                    watcher.wait(watcher.frame_id(), timedelta(seconds=10)))
+                await asyncio.sleep(0.05)
+                self.assertFalse(task.done())
+                watcher.close()
+                await asyncio.wait_for(task, 1)
+            finally:
+                watcher.close()
+                await watcher.wait_closed()
+
+        asyncio.run(run())
+
+    def test_store(self):
+        """Test ``ContentWatcher`` objects that share a ``ReplicaStore``."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(milliseconds=100),
+            [timedelta(minutes=1)], 'mountain', None)
+        server2 = TestServer(
+            Image.new('L', (20, 20), 128), timedelta(milliseconds=100),
+            [timedelta(minutes=1)], 'mountain', None)
+
+        async def run(store):
+            renderer = ContentWatcher(server, store)
+            watcher = ContentWatcher(server2, store, False)
+            try:
+                # Nothing has been rendered yet
+                await watcher.wait(b'\x01' * 8, timedelta(milliseconds=100))
+                self.assertIsNone(watcher.frame_id())
+
+                renderer.start()
+                await watcher.wait(b'\x01' * 8, timedelta(seconds=10))
+                frame_id = watcher.frame_id()
+                self.assertEqual(
+                    ServerIO.frame_id(server._state().watched_frame[1]),
+                    frame_id)
+                self.assertEqual(
+                    server._state().watched_frame[1],
+                    server2._state().watched_frame[1])
+
+                server._image = Image.new('L', (20, 20), 0)
+                await watcher.wait(frame_id, timedelta(seconds=10))
+                self.assertNotEqual(frame_id, watcher.frame_id())
+                self.assertEqual(renderer.frame_id(), watcher.frame_id())
+            finally:
+                renderer.close()
+                watcher.close()
+                await renderer.wait_closed()
+                await watcher.wait_closed()
+
+        with tempfile.TemporaryDirectory() as dir_, \
+                mock.patch.object(
+                    ContentWatcher, '_MIN_RENDER_INTERVAL',
+                    timedelta(milliseconds=50)), \
+                mock.patch.object(
+                    ContentWatcher, '_REPLICA_POLL_TIME',
+                    timedelta(milliseconds=50)):
+            asyncio.run(run(ReplicaStore(dir_)))
+        self.assertEqual([], server2.render_requests)
+        with self.assertRaises(ValueError):
+            ContentWatcher(server, None, False)
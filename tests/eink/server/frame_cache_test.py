@@ -0,0 +1,82 @@
+from datetime import timedelta
+import unittest
+
+from PIL import Image
+
+from eink.server import FrameCache
+from eink.server.request import Request
+from eink.server.response import Response
+from eink.server.server_io import ServerIO
+from .test_server import TestServer
+
+
+class FrameCacheTest(unittest.TestCase):
+    """Tests the ``FrameCache`` class."""
+
+    def test_get_put(self):
+        """Test ``FrameCache.get`` and ``FrameCache.put``."""
+        cache = FrameCache(2)
+        self.assertEqual([], cache.frame_ids())
+        cache.put(b'abc')
+        cache.put(b'def')
+        self.assertEqual(
+            [ServerIO.frame_id(b'abc'), ServerIO.frame_id(b'def')],
+            cache.frame_ids())
+        self.assertEqual(b'abc', cache.get(ServerIO.frame_id(b'abc')))
+
+        # b'def' is the least recently used frame, so it should be replaced
+        cache.put(b'ghi')
+        self.assertEqual(
+            [ServerIO.frame_id(b'abc'), ServerIO.frame_id(b'ghi')],
+            cache.frame_ids())
+        self.assertIsNone(cache.get(ServerIO.frame_id(b'def')))
+
+        # Storing a frame that is already cached should not use another slot
+        cache.put(b'abc')
+        cache.put(b'jkl')
+        self.assertEqual(
+            [ServerIO.frame_id(b'abc'), ServerIO.frame_id(b'jkl')],
+            cache.frame_ids())
+
+    def test_exec(self):
+        """Test ``Server.exec`` with a device that has a frame cache."""
+        image1 = Image.new('L', (20, 20), 255)
+        image2 = Image.new('L', (20, 20), 0)
+        server = TestServer(
+            image1, timedelta(hours=1), [timedelta(minutes=5)], 'mountain',
+            None)
+        cache = FrameCache()
+
+        response1 = Response.create_from_bytes(
+            server.exec(
+                Request(b'a', cached_frame_ids=cache.frame_ids()).to_bytes()))
+        self.assertTrue(response1.image_data)
+        image_data1 = cache.apply(response1)
+        self.assertEqual(response1.image_data, image_data1)
+
+        server._image = image2
+        response2 = Response.create_from_bytes(
+            server.exec(
+                Request(b'a', cached_frame_ids=cache.frame_ids()).to_bytes()))
+        self.assertTrue(response2.image_data)
+        image_data2 = cache.apply(response2)
+
+        # When the content cycles back, the server should refer to the cached
+        # frame instead of sending it again
+        server._image = image1
+        payload3 = server.exec(
+            Request(b'a', cached_frame_ids=cache.frame_ids()).to_bytes())
+        response3 = Response.create_from_bytes(payload3)
+        self.assertIsNone(response3.image_data)
+        self.assertEqual(ServerIO.frame_id(image_data1), response3.image_id)
+        self.assertEqual(image_data1, cache.apply(response3))
+        self.assertLess(len(payload3), len(image_data1))
+
+        # A device with an empty cache should receive the image file
+        response4 = Response.create_from_bytes(
+            server.exec(Request(b'b').to_bytes()))
+        self.assertEqual(image_data1, response4.image_data)
+
+        with self.assertRaises(ValueError):
+            FrameCache().apply(response3)
+        self.assertNotEqual(image_data1, image_data2)
@@ -0,0 +1,46 @@
+import unittest
+
+from eink.server.frame_decoder import FrameDecoder
+
+
+class FrameDecoderTest(unittest.TestCase):
+    """Tests the ``FrameDecoder`` class."""
+
+    def test_feed(self):
+        """Test ``FrameDecoder.feed``."""
+        stream = b''.join(
+            FrameDecoder.encode([b'Hello', b', world!']) +
+            FrameDecoder.encode([]) +
+            FrameDecoder.encode([b'\x2a' * 1000]))
+
+        # Feed the whole stream at once
+        decoder = FrameDecoder()
+        self.assertEqual(
+            [b'Hello, world!', b'', b'\x2a' * 1000], decoder.feed(stream))
+        self.assertEqual(0, decoder.buffered_size())
+
+        # Feed the stream one byte at a time
+        decoder = FrameDecoder()
+        payloads = []
+        for index in range(len(stream)):
+            payloads.extend(decoder.feed(stream[index:index + 1]))
+        self.assertEqual([b'Hello, world!', b'', b'\x2a' * 1000], payloads)
+
+        # Feed the stream in pieces that do not line up with the payloads
+        decoder = FrameDecoder()
+        self.assertEqual([], decoder.feed(stream[:10]))
+        self.assertEqual(10, decoder.buffered_size())
+        self.assertEqual(
+            [b'Hello, world!', b''], decoder.feed(stream[10:30]))
+        self.assertEqual([b'\x2a' * 1000], decoder.feed(stream[30:]))
+        self.assertEqual(0, decoder.buffered_size())
+
+    def test_max_length(self):
+        """Test ``FrameDecoder`` with a maximum payload length."""
+        decoder = FrameDecoder(5)
+        stream = b''.join(FrameDecoder.encode([b'abcde']))
+        self.assertEqual([b'abcde'], decoder.feed(stream))
+        with self.assertRaises(ValueError):
+            decoder.feed(b''.join(FrameDecoder.encode([b'abcdef'])))
+        with self.assertRaises(ValueError):
+            FrameDecoder().feed(b'\xff\xff\xff\xff')
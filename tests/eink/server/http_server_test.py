@@ -0,0 +1,290 @@
+from datetime import timedelta
+import http.client
+import io
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from eink.server import HttpServer
+from eink.server import LongPollClient
+from eink.server import Simulator
+from eink.server.content_watcher import ContentWatcher
+from eink.server.request import Request
+from eink.server.response import Response
+from eink.server.server_io import ServerIO
+from .test_server import TestServer
+
+
+class HttpServerTest(unittest.TestCase):
+    """Tests the ``HttpServer`` class."""
+
+    def setUp(self):
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(hours=1),
+            [timedelta(minutes=5)], 'mountain', None)
+        self._http_server = HttpServer(
+            lambda: server, '127.0.0.1', 0, '/eink_server',
+            max_request_size=1024, keep_alive_timeout=timedelta(seconds=1),
+            tcp_port=0,
+            long_poll_timeout=timedelta(milliseconds=300))
+        self._sock = self._http_server._listen(0)
+        self._port = self._sock.getsockname()[1]
+        self._tcp_sock = self._http_server._listen(0)
+        self._tcp_port = self._tcp_sock.getsockname()[1]
+        self._thread = threading.Thread(
+            target=self._http_server._run_worker,
+            args=(self._sock, self._tcp_sock))
+        self._thread.start()
+
+    def tearDown(self):
+        while self._http_server._stop_future is None:
+            self._thread.join(0.01)
+        self._http_server._stop_threadsafe()
+        self._thread.join()
+        self._sock.close()
+        self._tcp_sock.close()
+
+    def test_exec(self):
+        """Test executing requests using ``HttpServer``."""
+        connection = http.client.HTTPConnection('127.0.0.1', self._port)
+        try:
+            # Make several requests using the same connection
+            for _ in range(3):
+                connection.request(
+                    'POST', '/eink_server', Request(b'abc').to_bytes(),
+                    {'Content-Type': 'application/octet-stream'})
+                http_response = connection.getresponse()
+                self.assertEqual(200, http_response.status)
+                self.assertEqual(
+                    'keep-alive', http_response.getheader('Connection'))
+                response = Response.create_from_bytes(http_response.read())
+                self.assertEqual(36000, response.request_times_ds[0])
+
+            connection.request('POST', '/eink_server', b'invalid')
+            http_response = connection.getresponse()
+            http_response.read()
+            self.assertEqual(400, http_response.status)
+
+            connection.request('POST', '/other', Request().to_bytes())
+            http_response = connection.getresponse()
+            http_response.read()
+            self.assertEqual(404, http_response.status)
+
+            connection.request('GET', '/eink_server')
+            http_response = connection.getresponse()
+            http_response.read()
+            self.assertEqual(405, http_response.status)
+            self.assertEqual('POST', http_response.getheader('Allow'))
+
+            connection.request('POST', '/eink_server', b'x' * 1025)
+            http_response = connection.getresponse()
+            http_response.read()
+            self.assertEqual(413, http_response.status)
+            self.assertEqual('close', http_response.getheader('Connection'))
+        finally:
+            connection.close()
+
+    def test_connection_close(self):
+        """Test ``HttpServer`` with a ``Connection: close`` request."""
+        with socket.create_connection(('127.0.0.1', self._port)) as sock:
+            payload = Request().to_bytes()
+            sock.sendall(
+                'POST /eink_server HTTP/1.1\r\nHost: localhost\r\n'
+                'Connection: close\r\nContent-Length: {:d}\r\n\r\n'.format(
+                    len(payload)).encode() + payload)
+            chunks = []
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            head, _, body = b''.join(chunks).partition(b'\r\n\r\n')
+            self.assertTrue(head.startswith(b'HTTP/1.1 200 OK\r\n'))
+            self.assertIn(b'Connection: close', head)
+            Response.create_from_bytes(body)
+
+    def _read_all(self, sock):
+        """Return all of the data ``sock`` receives until the peer closes it.
+        """
+        chunks = []
+        while True:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+    def test_truncated_body(self):
+        """Test ``HttpServer`` on requests whose bodies are incomplete."""
+        while self._http_server._stop_future is None:
+            self._thread.join(0.01)
+        exceptions = []
+        self._http_server._loop.set_exception_handler(
+            lambda loop, context: exceptions.append(context))
+
+        head = (
+            b'POST /eink_server HTTP/1.1\r\nHost: localhost\r\n'
+            b'Content-Length: 100\r\n\r\nabc')
+
+        # The client disconnects partway through the body
+        with socket.create_connection(('127.0.0.1', self._port)) as sock:
+            sock.sendall(head)
+            sock.shutdown(socket.SHUT_WR)
+            self.assertEqual(b'', self._read_all(sock))
+
+        # The client stops sending the body
+        with socket.create_connection(('127.0.0.1', self._port)) as sock:
+            sock.sendall(head)
+            start_time = time.monotonic()
+            self.assertEqual(b'', self._read_all(sock))
+            self.assertLess(time.monotonic() - start_time, 10)
+
+        image = Simulator.connect(
+            'http://127.0.0.1:{:d}/eink_server'.format(self._port))
+        self.assertEqual((20, 20), image.size)
+        self.assertEqual([], exceptions)
+
+    def test_tcp(self):
+        """Test executing requests over raw TCP using ``HttpServer``."""
+        with socket.create_connection(('127.0.0.1', self._tcp_port)) as sock:
+            reader = sock.makefile('rb')
+            try:
+                # Make several requests using the same connection
+                for _ in range(3):
+                    payload = Request(b'abc').to_bytes()
+                    output = io.BytesIO()
+                    ServerIO.write_bytes(output, payload)
+                    sock.sendall(output.getvalue())
+                    response_payload = ServerIO.read_bytes(reader)
+                    response = Response.create_from_bytes(response_payload)
+                    self.assertEqual(36000, response.request_times_ds[0])
+
+                # The server should close the connection after an invalid
+                # request
+                output = io.BytesIO()
+                ServerIO.write_bytes(output, b'invalid')
+                sock.sendall(output.getvalue())
+                self.assertEqual(b'', reader.read())
+            finally:
+                reader.close()
+
+        image = Simulator.connect(
+            'tcp://127.0.0.1:{:d}'.format(self._tcp_port))
+        self.assertEqual((20, 20), image.size)
+
+    def test_long_poll(self):
+        """Test long-poll requests using ``HttpServer``."""
+        for url in (
+                'http://127.0.0.1:{:d}/eink_server'.format(self._port),
+                'tcp://127.0.0.1:{:d}'.format(self._tcp_port)):
+            client = LongPollClient(url, b'abc')
+            image = client.poll()
+            self.assertEqual((20, 20), image.size)
+            self.assertIsNotNone(client.frame_id())
+
+            # The server should hold the request until the timeout expires. It
+            # should only parse the request payload once.
+            start_time = time.monotonic()
+            with mock.patch.object(
+                    Request, 'create_from_bytes',
+                    wraps=Request.create_from_bytes) as create_from_bytes:
+                self.assertIsNone(client.poll())
+            self.assertGreaterEqual(time.monotonic() - start_time, 0.25)
+            self.assertEqual(1, create_from_bytes.call_count)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_supervise_start_failures(self):
+        """Test supervising workers that exit as soon as they start."""
+        http_server = HttpServer(lambda: os._exit(3), workers=2)
+        sock = http_server._listen(0)
+        try:
+            with mock.patch.object(
+                    HttpServer, '_RESTART_DELAY',
+                    timedelta(milliseconds=50)), \
+                    mock.patch.object(
+                        HttpServer, '_SUPERVISOR_POLL_TIME',
+                        timedelta(milliseconds=10)), \
+                    mock.patch.object(HttpServer, '_MAX_START_FAILURES', 3):
+                start_time = time.monotonic()
+                with self.assertLogs(
+                        'eink.server.http_server', 'ERROR') as logs:
+                    with self.assertRaises(RuntimeError):
+                        http_server._supervise(sock, None)
+        finally:
+            sock.close()
+
+        # 2 workers * 3 rounds, with restart delays of 50 ms and 100 ms
+        self.assertEqual(6, len(logs.records))
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.15)
+        self.assertIn('giving up', logs.records[-1].getMessage())
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_long_poll_workers(self):
+        """Test long-poll requests to an ``HttpServer`` with several workers.
+        """
+        with tempfile.TemporaryDirectory() as dir_:
+            renders_filename = os.path.join(dir_, 'renders.txt')
+
+            class RecordingServer(TestServer):
+                def render(self):
+                    # Record the ID of each process that renders
+                    with open(renders_filename, 'a') as file:
+                        file.write('{:d}\n'.format(os.getpid()))
+                    return super().render()
+
+            with socket.socket() as sock:
+                sock.bind(('127.0.0.1', 0))
+                port = sock.getsockname()[1]
+            http_server = HttpServer(
+                lambda: RecordingServer(
+                    Image.new('L', (20, 20), 255), timedelta(hours=1),
+                    [timedelta(minutes=5)], 'mountain', None),
+                '127.0.0.1', port, '/eink_server', workers=2,
+                long_poll_timeout=timedelta(milliseconds=300))
+            with mock.patch.object(
+                    ContentWatcher, '_REPLICA_POLL_TIME',
+                    timedelta(milliseconds=50)):
+                pid = os.fork()
+                if pid == 0:
+                    exit_code = 1
+                    try:
+                        http_server.serve_forever()
+                        exit_code = 0
+                    finally:
+                        os._exit(exit_code)
+
+            try:
+                url = 'http://127.0.0.1:{:d}/eink_server'.format(port)
+                client = LongPollClient(url)
+                deadline = time.monotonic() + 10
+                while True:
+                    try:
+                        self.assertIsNotNone(client.poll())
+                        break
+                    except OSError:
+                        if time.monotonic() >= deadline:
+                            raise
+                        time.sleep(0.05)
+
+                # Give the workers time to read the rendered content
+                time.sleep(0.3)
+                for _ in range(4):
+                    self.assertIsNone(client.poll())
+            finally:
+                os.kill(pid, signal.SIGTERM)
+                _, status = os.waitpid(pid, 0)
+            self.assertEqual(0, status)
+
+            # One render should come from the render process, and one should
+            # come from the client's first request, which was not a long-poll
+            # request
+            with open(renders_filename) as file:
+                pids = file.read().split()
+            self.assertEqual(2, len(pids))
+            self.assertEqual(2, len(set(pids)))
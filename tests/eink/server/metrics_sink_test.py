@@ -0,0 +1,37 @@
+import unittest
+
+from eink.server import MetricsSink
+from eink.server import Request
+
+
+class MetricsSinkTest(unittest.TestCase):
+    """Tests the ``MetricsSink`` class."""
+
+    def test_record(self):
+        """Test ``MetricsSink.record``."""
+        sink = MetricsSink(2, 2)
+        request1 = Request(b'a', 4.1, -50, 1000, 2000, 1)
+        request2 = Request(b'a', 4.0, -52, 1100, 2100, 2)
+        request3 = Request(b'a', 3.9, -54, 1200, 2200, 3)
+        request4 = Request(b'b', 3.8, -70, 3000, 9000, 0)
+        self.assertEqual([], sink.device_ids())
+        self.assertEqual([], sink.samples(b'a'))
+
+        sink.record(request1, 1234)
+        sink.record(request2, 2345)
+        sink.record(request4, 3456)
+        self.assertEqual([b'a', b'b'], sink.device_ids())
+        samples = sink.samples(b'a')
+        self.assertEqual(
+            [(request1, 1234), (request2, 2345)],
+            list([(sample[1], sample[2]) for sample in samples]))
+        self.assertLessEqual(samples[0][0], samples[1][0])
+
+        sink.record(request3, 4567)
+        self.assertEqual(
+            [request2, request3],
+            list([sample[1] for sample in sink.samples(b'a')]))
+
+        sink.record(Request(b'c'), 5678)
+        self.assertEqual([b'a', b'c'], sink.device_ids())
+        self.assertEqual([], sink.samples(b'b'))
@@ -0,0 +1,65 @@
+from datetime import datetime
+from datetime import timedelta
+import time
+import unittest
+
+from PIL import Image
+
+from eink.server import Prerenderer
+from .test_server import TestServer
+
+
+class PrerendererTest(unittest.TestCase):
+    """Tests the ``Prerenderer`` class."""
+
+    def test_prerender(self):
+        """Test that ``Prerenderer`` prerenders each content boundary."""
+        interval = timedelta(milliseconds=200)
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None,
+            update_boundary_interval=interval)
+        prerenderer = Prerenderer(server, timedelta(milliseconds=150))
+        start_time = datetime.now()
+        prerenderer.start()
+        try:
+            with self.assertRaises(RuntimeError):
+                prerenderer.start()
+            deadline = time.monotonic() + 10
+            while (len(server.render_at_times) < 2 and
+                    time.monotonic() < deadline):
+                time.sleep(0.01)
+        finally:
+            prerenderer.stop()
+        self.assertFalse(prerenderer._thread.is_alive())
+
+        render_at_times = list(server.render_at_times)
+        self.assertGreaterEqual(len(render_at_times), 2)
+        boundary = server.next_update_boundary(start_time)
+        self.assertIn(render_at_times[0], (boundary, boundary + interval))
+        for prev_time, render_time in zip(
+                render_at_times, render_at_times[1:]):
+            self.assertEqual(prev_time + interval, render_time)
+        self.assertEqual(
+            render_at_times[-1], server._state().prerendered_frame[0])
+
+        # After stop() returns, we should not prerender anything else
+        time.sleep(0.3)
+        self.assertEqual(render_at_times, server.render_at_times)
+
+    def test_stop(self):
+        """Test stopping a ``Prerenderer`` while it is waiting."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None,
+            update_boundary_interval=timedelta(hours=1))
+        prerenderer = Prerenderer(server, timedelta(seconds=1))
+        prerenderer.stop()
+
+        prerenderer = Prerenderer(server, timedelta())
+        prerenderer.start()
+        start_time = time.monotonic()
+        prerenderer.stop()
+        self.assertLess(time.monotonic() - start_time, 5)
+        self.assertFalse(prerenderer._thread.is_alive())
+        self.assertEqual([], server.render_at_times)
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import time
+import unittest
+
+from eink.server import ReplicaStore
+
+
+class ReplicaStoreTest(unittest.TestCase):
+    """Tests the ``ReplicaStore`` class."""
+
+    def test_encode_decode(self):
+        """Test ``ReplicaStore.encode`` and ``ReplicaStore.decode``."""
+        payload = ReplicaStore.encode(
+            b'abc', [(600, b'def'), (1200, b'ghi')], 1234.5)
+        self.assertEqual(
+            (1234.5, b'abc', [(600, b'def'), (1200, b'ghi')]),
+            ReplicaStore.decode(payload))
+        with self.assertRaises(ValueError):
+            ReplicaStore.decode(payload[:-1])
+        with self.assertRaises(ValueError):
+            ReplicaStore.decode(payload + b'x')
+        with self.assertRaises(ValueError):
+            ReplicaStore.decode(b'Hello, world!')
+
+    def test_put_content(self):
+        """Test ``ReplicaStore.put`` and ``ReplicaStore.content()``."""
+        with tempfile.TemporaryDirectory() as dir_:
+            store = ReplicaStore(dir_)
+            self.assertIsNone(store.content())
+
+            store.put(
+                ReplicaStore.encode(
+                    b'abc', [(600, b'def'), (1200, b'ghi')],
+                    time.time() - 70))
+            image_data, frames = store.content()
+            self.assertEqual(b'abc', image_data)
+            self.assertEqual(1, len(frames))
+            self.assertAlmostEqual(500, frames[0][0], delta=5)
+            self.assertEqual(b'ghi', frames[0][1])
+
+            # Other ReplicaStores for the same directory, e.g. in other
+            # processes, should see new content
+            ReplicaStore(dir_).put(ReplicaStore.encode(b'xyz', []))
+            self.assertEqual((b'xyz', []), store.content())
+
+            with self.assertRaises(ValueError):
+                store.put(b'Hello, world!')
+            self.assertEqual((b'xyz', []), store.content())
+            self.assertEqual([ReplicaStore.FILENAME], os.listdir(dir_))
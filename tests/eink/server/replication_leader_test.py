@@ -0,0 +1,84 @@
+from datetime import timedelta
+import socket
+import tempfile
+import unittest
+
+from PIL import Image
+
+from eink.server import ReplicaReceiver
+from eink.server import ReplicaStore
+from eink.server import ReplicationLeader
+from eink.server.request import Request
+from eink.server.response import Response
+from .test_server import TestServer
+
+
+class ReplicationLeaderTest(unittest.TestCase):
+    """Tests ``ReplicationLeader`` and ``ReplicaReceiver``."""
+
+    def _unused_port(self):
+        """Return a local TCP port that nothing is listening on."""
+        with socket.socket() as sock:
+            sock.bind(('localhost', 0))
+            return sock.getsockname()[1]
+
+    def test_replicate(self):
+        """Test replicating content from a leader to serving nodes."""
+        leader_server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None,
+            [timedelta(minutes=10)])
+        with tempfile.TemporaryDirectory() as dir1, \
+                tempfile.TemporaryDirectory() as dir2:
+            receiver1 = ReplicaReceiver(ReplicaStore(dir1), 'localhost', 0)
+            receiver2 = ReplicaReceiver(ReplicaStore(dir2), 'localhost', 0)
+            receiver1.start()
+            receiver2.start()
+            try:
+                unused_port = self._unused_port()
+                leader = ReplicationLeader(
+                    leader_server, [
+                        ('localhost', receiver1.port()),
+                        ('localhost', unused_port),
+                        ('localhost', receiver2.port()),
+                    ],
+                    timeout=timedelta(seconds=5))
+                with self.assertLogs(
+                        'eink.server.replication_leader', 'ERROR'):
+                    failed_peers = leader.replicate()
+                self.assertEqual([('localhost', unused_port)], failed_peers)
+                self.assertEqual(1, len(leader_server.render_requests))
+
+                # The serving nodes should respond using the replicated
+                # content, without rendering
+                serving_server = TestServer(
+                    Image.new('L', (20, 20), 0), timedelta(minutes=5),
+                    [timedelta(minutes=1)], 'mountain', None,
+                    [timedelta(minutes=10)])
+                serving_server.use_replica_store(ReplicaStore(dir2))
+                response = Response.create_from_bytes(
+                    serving_server.exec(Request().to_bytes()))
+                expected = Response.create_from_bytes(
+                    leader_server.exec(Request().to_bytes()))
+                self.assertEqual(expected.image_data, response.image_data)
+                self.assertEqual(3000, response.request_times_ds[0])
+                self.assertEqual(1, len(response.frames))
+                self.assertAlmostEqual(6000, response.frames[0][0], delta=5)
+                self.assertEqual([], serving_server.render_requests)
+                self.assertEqual([], serving_server.render_at_times)
+            finally:
+                receiver1.stop()
+                receiver2.stop()
+
+    def test_no_content(self):
+        """Test a serving node that has not received any content."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None)
+        with tempfile.TemporaryDirectory() as dir_:
+            server.use_replica_store(ReplicaStore(dir_))
+            response = Response.create_from_bytes(
+                server.exec(Request().to_bytes()))
+            self.assertEqual(b'', response.image_data)
+            self.assertEqual(600, response.request_times_ds[0])
+            self.assertEqual([], server.render_requests)
@@ -1,5 +1,6 @@
 import unittest
 
+from eink.server import ServerError
 from eink.server.request import Request
 
 
@@ -10,3 +11,90 @@ class RequestTest(unittest.TestCase):
         """Test ``Request.to_bytes()`` and ``Request.create_from_bytes``."""
         self.assertIsInstance(
             Request.create_from_bytes(Request().to_bytes()), Request)
+        self.assertEqual(
+            b'', Request.create_from_bytes(Request().to_bytes()).device_id)
+        request = Request(b'\x01\x02\x03\x04\x05\x06')
+        self.assertEqual(
+            b'\x01\x02\x03\x04\x05\x06',
+            Request.create_from_bytes(request.to_bytes()).device_id)
+
+    def test_to_from_bytes_telemetry(self):
+        """Test ``Request`` payloads that contain telemetry."""
+        request = Request.create_from_bytes(Request().to_bytes())
+        self.assertIsNone(request.battery_voltage)
+        self.assertIsNone(request.wi_fi_rssi)
+        self.assertIsNone(request.connect_time_ms)
+        self.assertIsNone(request.draw_time_ms)
+        self.assertIsNone(request.wake_count)
+
+        request = Request.create_from_bytes(
+            Request(b'abc', 3.912, -67, 1534, 9021, 12).to_bytes())
+        self.assertEqual(b'abc', request.device_id)
+        self.assertAlmostEqual(3.912, request.battery_voltage)
+        self.assertEqual(-67, request.wi_fi_rssi)
+        self.assertEqual(1534, request.connect_time_ms)
+        self.assertEqual(9021, request.draw_time_ms)
+        self.assertEqual(12, request.wake_count)
+
+        self.assertIsNone(request.nonce)
+        request = Request.create_from_bytes(
+            Request(b'abc', nonce=-123456789).to_bytes())
+        self.assertEqual(-123456789, request.nonce)
+
+        request = Request.create_from_bytes(
+            Request(b'abc', None, -67, 0, None, 0).to_bytes())
+        self.assertIsNone(request.battery_voltage)
+        self.assertEqual(-67, request.wi_fi_rssi)
+        self.assertEqual(0, request.connect_time_ms)
+        self.assertIsNone(request.draw_time_ms)
+        self.assertEqual(0, request.wake_count)
+
+    def test_to_from_bytes_cached_frame_ids(self):
+        """Test ``Request`` payloads that contain cached frame IDs."""
+        request = Request.create_from_bytes(Request().to_bytes())
+        self.assertEqual([], request.cached_frame_ids)
+        frame_ids = [b'\x01' * 8, b'\x02' * 8, b'\x00' * 8]
+        request = Request.create_from_bytes(
+            Request(b'abc', cached_frame_ids=frame_ids).to_bytes())
+        self.assertEqual(b'abc', request.device_id)
+        self.assertEqual(frame_ids, request.cached_frame_ids)
+
+    def test_to_from_bytes_resume(self):
+        """Test ``Request`` payloads that resume an interrupted download."""
+        request = Request.create_from_bytes(Request().to_bytes())
+        self.assertIsNone(request.resume_frame_id)
+        self.assertEqual(0, request.resume_chunk)
+        request = Request.create_from_bytes(
+            Request(
+                b'abc', resume_frame_id=b'\x01' * 8, resume_chunk=3)
+            .to_bytes())
+        self.assertEqual(b'\x01' * 8, request.resume_frame_id)
+        self.assertEqual(3, request.resume_chunk)
+
+    def test_to_from_bytes_long_poll(self):
+        """Test ``Request.long_poll_frame_id``."""
+        request = Request.create_from_bytes(Request().to_bytes())
+        self.assertIsNone(request.long_poll_frame_id)
+        request = Request.create_from_bytes(
+            Request(
+                b'abc', long_poll_frame_id=b'\x02' * 8, transport_index=1)
+            .to_bytes())
+        self.assertEqual(b'\x02' * 8, request.long_poll_frame_id)
+        self.assertEqual(1, request.transport_index)
+
+    def test_to_from_bytes_transport_index(self):
+        """Test ``Request.transport_index``."""
+        request = Request.create_from_bytes(Request().to_bytes())
+        self.assertIsNone(request.transport_index)
+        request = Request.create_from_bytes(
+            Request(b'abc', transport_index=2).to_bytes())
+        self.assertEqual(2, request.transport_index)
+
+    def test_create_from_bytes_invalid(self):
+        """Test ``Request.create_from_bytes`` on invalid payloads."""
+        with self.assertRaises(ServerError):
+            Request.create_from_bytes(b'')
+        with self.assertRaises(ServerError):
+            Request.create_from_bytes(b'Hello, world!')
+        with self.assertRaises(ServerError):
+            Request.create_from_bytes(Request(b'abc').to_bytes()[:-2])
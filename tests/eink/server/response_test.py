@@ -25,3 +25,107 @@ class ResponseTest(unittest.TestCase):
             [100, 500, 1000, Server._INT_MAX], result.request_times_ds)
         self.assertEqual(ServerIO.image_id('mountain'), result.screensaver_id)
         self.assertEqual(700, result.screensaver_time_ds)
+        self.assertEqual([], result.frames)
+        self.assertIsNone(result.preferred_transport)
+
+        response.preferred_transport = 2
+        result = Response.create_from_bytes(response.to_bytes())
+        self.assertEqual(2, result.preferred_transport)
+
+        frame_image = Image.new('L', (20, 20), 0)
+        frame_data = ImageData.render_png(
+            frame_image, Palette.THREE_BIT_GRAYSCALE)
+        response = Response(
+            image_data, [100], ServerIO.image_id('mountain'),
+            Server._INT_MAX, [(600, frame_data), (1200, image_data)])
+        result = Response.create_from_bytes(response.to_bytes())
+        self.assertEqual(image_data, result.image_data)
+        self.assertEqual([100], result.request_times_ds)
+        self.assertEqual(Server._INT_MAX, result.screensaver_time_ds)
+        self.assertEqual(
+            [(600, frame_data), (1200, image_data)], result.frames)
+
+    def test_to_chunks(self):
+        """Test ``Response.to_chunks()``."""
+        image = Image.new('L', (20, 20), 255)
+        image_data = ImageData.render_png(image, Palette.THREE_BIT_GRAYSCALE)
+        frame_image = Image.new('L', (20, 20), 0)
+        frame_data = ImageData.render_png(
+            frame_image, Palette.THREE_BIT_GRAYSCALE)
+        response = Response(
+            image_data, [100, 500], ServerIO.image_id('mountain'), 700,
+            [(600, frame_data)])
+        chunks = response.to_chunks()
+        self.assertEqual(response.to_bytes(), b''.join(chunks))
+
+        # The image data should not be copied
+        self.assertTrue(
+            any(
+                isinstance(chunk, memoryview) and chunk.obj is image_data
+                for chunk in chunks))
+        self.assertTrue(any(chunk is frame_data for chunk in chunks))
+
+        # Parse the payload from a view of a larger buffer
+        buffer = bytearray(b'xyz' + b''.join(chunks) + b'xyz')
+        result = Response.create_from_bytes(
+            memoryview(buffer)[3:len(buffer) - 3])
+        self.assertEqual(image_data, result.image_data)
+        self.assertEqual([100, 500], result.request_times_ds)
+        self.assertEqual([(600, frame_data)], result.frames)
+
+        response = Response(b'', [100], ServerIO.image_id('mountain'), 700)
+        self.assertEqual(
+            b'', Response.create_from_bytes(response.to_bytes()).image_data)
+
+    def test_to_from_bytes_cached(self):
+        """Test ``Response`` payloads that refer to a cached frame."""
+        frame_id = ServerIO.frame_id(b'abc')
+        response = Response(
+            None, [100], ServerIO.image_id('mountain'), 700, image_id=frame_id)
+        result = Response.create_from_bytes(response.to_bytes())
+        self.assertIsNone(result.image_data)
+        self.assertEqual(frame_id, result.image_id)
+        self.assertEqual([100], result.request_times_ds)
+
+        result = Response.create_from_bytes(
+            Response(b'abc', [100], ServerIO.image_id('mountain'), 700)
+            .to_bytes())
+        self.assertEqual(b'abc', result.image_data)
+        self.assertEqual(frame_id, result.image_id)
+
+    def test_to_from_bytes_resumed(self):
+        """Test ``Response`` payloads that resume an interrupted download."""
+        image_data = bytes(range(256)) * 40
+        response = Response(image_data, [100], b'', 700)
+        self.assertEqual(3, response.image_chunk_count())
+        response = Response(
+            image_data, [100], ServerIO.image_id('mountain'), 700,
+            image_start_chunk=1)
+        full_response = Response(
+            image_data, [100], ServerIO.image_id('mountain'), 700)
+        self.assertEqual(
+            len(full_response.to_bytes()) - ServerIO.IMAGE_CHUNK_SIZE - 4,
+            len(response.to_bytes()))
+        result = Response.create_from_bytes(response.to_bytes())
+        self.assertEqual(1, result.image_start_chunk)
+        self.assertEqual(
+            image_data[ServerIO.IMAGE_CHUNK_SIZE:], result.image_data)
+        self.assertEqual(ServerIO.frame_id(image_data), result.image_id)
+        result = Response.create_from_bytes(full_response.to_bytes())
+        self.assertEqual(0, result.image_start_chunk)
+        self.assertEqual(image_data, result.image_data)
+
+        # A corrupted chunk should fail its checksum
+        payload = bytearray(full_response.to_bytes())
+        payload[len(payload) // 2] ^= 1
+        with self.assertRaises(ValueError):
+            Response.create_from_bytes(payload)
+
+    def test_create_from_bytes_invalid(self):
+        """Test ``Response.create_from_bytes`` on invalid payloads."""
+        response = Response(b'abc', [100], ServerIO.image_id('mountain'), 700)
+        payload = response.to_bytes()
+        with self.assertRaises(ValueError):
+            Response.create_from_bytes(payload[:-6])
+        with self.assertRaises(ValueError):
+            Response.create_from_bytes(b'Hello, world!')
@@ -0,0 +1,112 @@
+from datetime import datetime
+from datetime import timedelta
+import unittest
+
+from PIL import Image
+
+from eink.server import SchedulePolicy
+from .test_server import TestServer
+
+
+class SchedulePolicyTest(unittest.TestCase):
+    """Tests the ``SchedulePolicy`` class."""
+
+    def test_quiet_hours(self):
+        """Test a ``SchedulePolicy`` with quiet hours."""
+        policy = SchedulePolicy.create_with_quiet_hours(
+            timedelta(minutes=10), 22, 7, 9)
+
+        # Thursday
+        now = datetime(2021, 3, 4, 12, 34, 56)
+        self.assertEqual(timedelta(minutes=10), policy.interval(now))
+        self.assertEqual(timedelta(minutes=10), policy.update_time(now))
+        self.assertIsNone(policy.interval(datetime(2021, 3, 4, 23, 0)))
+        self.assertIsNone(policy.interval(datetime(2021, 3, 5, 6, 59)))
+        self.assertEqual(
+            datetime(2021, 3, 5, 7, 0),
+            policy.next_request_time(datetime(2021, 3, 4, 21, 55)))
+        self.assertEqual(
+            datetime(2021, 3, 5, 7, 0),
+            policy.next_request_time(datetime(2021, 3, 4, 21, 50)))
+        self.assertEqual(
+            datetime(2021, 3, 4, 21, 59),
+            policy.next_request_time(datetime(2021, 3, 4, 21, 49)))
+        self.assertEqual(
+            datetime(2021, 3, 5, 7, 0),
+            policy.next_request_time(datetime(2021, 3, 5, 3, 0)))
+
+        # Friday night to Saturday morning
+        self.assertEqual(
+            datetime(2021, 3, 6, 9, 0),
+            policy.next_request_time(datetime(2021, 3, 5, 21, 55)))
+
+    def test_hourly_intervals(self):
+        """Test a ``SchedulePolicy`` with per-hour intervals."""
+        policy = SchedulePolicy(
+            7 * [None] + 2 * [timedelta(hours=2)] +
+            10 * [timedelta(minutes=5)] + 5 * [timedelta(hours=1)],
+            24 * [None])
+        self.assertEqual(
+            datetime(2021, 3, 4, 9, 0),
+            policy.next_request_time(datetime(2021, 3, 4, 8, 30)))
+        self.assertEqual(
+            datetime(2021, 3, 4, 19, 0),
+            policy.next_request_time(datetime(2021, 3, 4, 18, 55)))
+        self.assertEqual(
+            datetime(2021, 3, 5, 7, 0),
+            policy.next_request_time(datetime(2021, 3, 4, 23, 30)))
+
+        # The weekend is quiet
+        self.assertEqual(
+            datetime(2021, 3, 8, 7, 0),
+            policy.next_request_time(datetime(2021, 3, 5, 23, 30)))
+        self.assertEqual(
+            timedelta(days=2, hours=7, minutes=30),
+            policy.update_time(datetime(2021, 3, 5, 23, 30)))
+
+        with self.assertRaises(ValueError):
+            SchedulePolicy(24 * [None])
+        with self.assertRaises(ValueError):
+            SchedulePolicy(23 * [timedelta(minutes=5)])
+        with self.assertRaises(ValueError):
+            SchedulePolicy(24 * [timedelta()])
+
+    def test_retry_times(self):
+        """Test ``SchedulePolicy.retry_times``."""
+        policy = SchedulePolicy.create_with_quiet_hours(
+            timedelta(minutes=10), 22, 7)
+        now = datetime(2021, 3, 4, 20, 0)
+        retry_times = policy.retry_times(now)
+        self.assertEqual(
+            10 * [timedelta(minutes=10)] + [timedelta(hours=9, minutes=10)] +
+            80 * [timedelta(minutes=10)], retry_times)
+
+        time = now + policy.update_time(now)
+        for retry_time in retry_times:
+            time += retry_time
+            self.assertIsNotNone(policy.interval(time))
+
+    def test_server_retry_times(self):
+        """Test the request times for a ``Server`` using a ``SchedulePolicy``.
+        """
+        policy = SchedulePolicy(
+            7 * [None] + 12 * [timedelta(minutes=5)] +
+            3 * [timedelta(minutes=30)] + 2 * [None],
+            24 * [None])
+
+        # Monday
+        now = datetime(2021, 3, 8, 9, 0)
+        server = TestServer(
+            Image.new('L', (20, 20), 255), policy.update_time(now),
+            policy.retry_times(now), 'mountain', None)
+        request_times_ds = server._request_times_ds()
+        self.assertEqual(20, len(request_times_ds))
+
+        # A single failed request should not leave the content stale for long
+        self.assertEqual(4 * [3000], request_times_ds[:4])
+
+        # The client should not make requests during the quiet hours
+        time = now
+        for time_ds in request_times_ds:
+            time += timedelta(seconds=time_ds / 10)
+            self.assertIsNotNone(policy.interval(time))
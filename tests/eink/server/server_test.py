@@ -1,10 +1,19 @@
+from datetime import datetime
 from datetime import timedelta
 import io
+import threading
 import unittest
 
 from PIL import Image
 
+from eink.image import ArrayImage
+from eink.image import EinkGraphics
+from eink.image import Reduction
+from eink.image import RegionImage
+from eink.server import AdaptiveEncoder
+from eink.server import MetricsSink
 from eink.server import Server
+from eink.server import TransportBalancer
 from eink.server.request import Request
 from eink.server.response import Response
 from eink.server.server_io import ServerIO
@@ -116,8 +125,593 @@ class ServerTest(unittest.TestCase):
             image1, timedelta(), request_times, 'mountain', None)
         response5 = Response.create_from_bytes(server5.exec(request_bytes))
         Image.open(io.BytesIO(response5.image_data))
-        for time_ds in response5.request_times_ds:
-            self.assertTrue(0 <= time_ds <= 99990)
+        self.assertEqual(
+            Server._MAX_REQUEST_TIMES, len(response5.request_times_ds))
+        self.assertEqual(99990, response5.request_times_ds[-1])
+        self.assertEqual(
+            10 * sum(range(9999)), sum(response5.request_times_ds[1:-1]))
         self.assertEqual(
             ServerIO.image_id('mountain'), response5.screensaver_id)
         self.assertEqual(Server._INT_MAX, response5.screensaver_time_ds)
+
+    def test_exec_frames(self):
+        """Test ``Server.exec`` with scheduled frames."""
+        image = Image.new('L', (20, 20), 255)
+        request_bytes = Request().to_bytes()
+        server1 = TestServer(
+            image, timedelta(hours=1), [timedelta(minutes=5)], 'mountain',
+            None)
+        response1 = Response.create_from_bytes(server1.exec(request_bytes))
+        self.assertEqual([], response1.frames)
+        self.assertEqual([], server1.render_at_times)
+
+        server2 = TestServer(
+            image, timedelta(hours=1), [timedelta(minutes=5)], 'mountain',
+            None, [timedelta(minutes=15), timedelta(minutes=30)])
+        response2 = Response.create_from_bytes(server2.exec(request_bytes))
+        self.assertEqual(
+            [9000, 18000], list([frame[0] for frame in response2.frames]))
+        self.assertEqual(2, len(server2.render_at_times))
+        self.assertEqual(
+            timedelta(minutes=15),
+            server2.render_at_times[1] - server2.render_at_times[0])
+        for _, image_data in response2.frames:
+            frame_image = Image.open(io.BytesIO(image_data))
+            self.assertEqual((20, 20), frame_image.size)
+
+        server3 = TestServer(
+            image, timedelta(hours=1), [timedelta(minutes=5)], 'mountain',
+            None, [timedelta(minutes=30), timedelta(minutes=15)])
+        with self.assertRaises(ValueError):
+            server3.exec(request_bytes)
+
+        server4 = TestServer(
+            image, timedelta(hours=1), [timedelta(minutes=5)], 'mountain',
+            None, [timedelta(minutes=i + 1) for i in range(25)])
+        with self.assertRaises(ValueError):
+            server4.exec(request_bytes)
+
+    def test_exec_region_image(self):
+        """Test ``Server.exec`` when ``render()`` returns a ``RegionImage``."""
+        image = Image.linear_gradient('L').resize((20, 20))
+        region_image = RegionImage(image)
+        region_image.add_region((0, 10, 20, 20), Reduction.DITHER)
+        server = TestServer(
+            region_image, timedelta(hours=1), [timedelta(minutes=5)],
+            'mountain', None)
+        response = Response.create_from_bytes(
+            server.exec(Request().to_bytes()))
+        response_image = Image.open(io.BytesIO(response.image_data))
+        self.assertEqual(
+            list(EinkGraphics.reduce(region_image).get_flattened_data()),
+            list(response_image.convert('L').get_flattened_data()))
+        self.assertEqual(
+            list(EinkGraphics.round(image.crop((0, 0, 20, 10)))
+                 .get_flattened_data()),
+            list(response_image.convert('L').crop((0, 0, 20, 10))
+                 .get_flattened_data()))
+
+        alpha_image = RegionImage(Image.new('LA', (20, 20)))
+        server2 = TestServer(
+            alpha_image, timedelta(hours=1), [timedelta(minutes=5)],
+            'mountain', None)
+        with self.assertRaises(ValueError):
+            server2.exec(Request().to_bytes())
+
+    def test_exec_array_image(self):
+        """Test ``Server.exec`` when ``render()`` returns an array."""
+        data = bytes([8 * i for i in range(32)] * 2)
+        expected = list(
+            EinkGraphics.round(Image.frombytes('L', (16, 4), data))
+            .get_flattened_data())
+        for image in (
+                memoryview(data).cast('B', (4, 16)),
+                ArrayImage(data, 'L', (16, 4))):
+            server = TestServer(
+                image, timedelta(hours=1), [timedelta(minutes=5)],
+                'mountain', None)
+            response = Response.create_from_bytes(
+                server.exec(Request().to_bytes()))
+            response_image = Image.open(io.BytesIO(response.image_data))
+            self.assertEqual(
+                expected,
+                list(response_image.convert('L').get_flattened_data()))
+
+    def test_exec_render_deadline(self):
+        """Test ``Server.exec`` when ``render_deadline()`` is overridden."""
+        image1 = Image.new('L', (20, 20), 0)
+        image2 = Image.new('L', (20, 20), 255)
+        server = TestServer(
+            image1, timedelta(hours=1),
+            [timedelta(minutes=1), timedelta(minutes=5)], 'mountain', None,
+            render_deadline=timedelta(milliseconds=50))
+        request_bytes = Request().to_bytes()
+
+        def response_color(response):
+            image = Image.open(io.BytesIO(response.image_data))
+            return image.convert('L').getpixel((0, 0))
+
+        response1 = Response.create_from_bytes(server.exec(request_bytes))
+        self.assertEqual(0, response_color(response1))
+        self.assertTrue(
+            self._are_request_times_equal(
+                [36000, 600, 3000], response1.request_times_ds))
+
+        # A slow render should fall back to the last content
+        server._image = image2
+        server.render_event = threading.Event()
+        response2 = Response.create_from_bytes(server.exec(request_bytes))
+        self.assertEqual(0, response_color(response2))
+        self.assertTrue(
+            self._are_request_times_equal(
+                [600, 600, 3000], response2.request_times_ds))
+        self.assertEqual([], response2.frames)
+        response3 = Response.create_from_bytes(server.exec(request_bytes))
+        self.assertEqual(0, response_color(response3))
+        self.assertEqual(2, len(server.render_requests))
+
+        # The background render should count towards max_concurrent_renders()
+        # until it finishes
+        self.assertEqual(1, server._state().active_render_count)
+        server._max_concurrent_renders = 1
+        response = Response.create_from_bytes(server.exec(request_bytes))
+        self.assertEqual(b'', response.image_data)
+        self.assertEqual(2, len(server.render_requests))
+        server._max_concurrent_renders = None
+
+        # The next request should use the result of the background render
+        server.render_event.set()
+        server._state().render_task.wait()
+        self.assertEqual(0, server._state().active_render_count)
+        response4 = Response.create_from_bytes(server.exec(request_bytes))
+        self.assertEqual(255, response_color(response4))
+        self.assertTrue(
+            self._are_request_times_equal(
+                [36000, 600, 3000], response4.request_times_ds))
+        self.assertEqual(2, len(server.render_requests))
+
+        # An exception should fall back to the last content
+        server._image = image1
+        server.render_exception = RuntimeError('Upstream error')
+        with self.assertLogs('eink.server.server'):
+            response5 = Response.create_from_bytes(
+                server.exec(request_bytes))
+        self.assertEqual(255, response_color(response5))
+        self.assertTrue(
+            self._are_request_times_equal(
+                [600, 600, 3000], response5.request_times_ds))
+
+        # We should not use the result of a background render that finished
+        # more than update_time() ago
+        server.render_exception = None
+        server.render_event = threading.Event()
+        Response.create_from_bytes(server.exec(request_bytes))
+        self.assertEqual(4, len(server.render_requests))
+        server._image = image2
+        server.render_event.set()
+        task = server._state().render_task
+        task.wait()
+        task._finish_time -= timedelta(hours=2).total_seconds()
+        response6 = Response.create_from_bytes(server.exec(request_bytes))
+        self.assertEqual(255, response_color(response6))
+        self.assertEqual(5, len(server.render_requests))
+
+        # If there is no previous content, exceptions should propagate
+        server2 = TestServer(
+            image1, timedelta(hours=1), [timedelta(minutes=1)], 'mountain',
+            None, render_deadline=timedelta(milliseconds=50))
+        server2.render_exception = RuntimeError('Upstream error')
+        with self.assertRaises(RuntimeError):
+            server2.exec(request_bytes)
+
+    def test_exec_load_shedding(self):
+        """Test ``Server.exec`` when it sheds load."""
+        image = Image.new('L', (20, 20), 0)
+        server = TestServer(
+            image, timedelta(hours=1), [timedelta(minutes=10)], 'mountain',
+            None, max_load_average=-1)
+        request_bytes1 = Request(b'abcdef').to_bytes()
+        request_bytes2 = Request(b'ghijkl').to_bytes()
+
+        # With no previous content, the device should keep its image
+        response1 = Response.create_from_bytes(server.exec(request_bytes1))
+        self.assertEqual(b'', response1.image_data)
+        self.assertEqual([], server.render_requests)
+        self.assertGreaterEqual(response1.request_times_ds[0], 3000)
+        self.assertLessEqual(response1.request_times_ds[0], 9000)
+        self.assertEqual(6000, response1.request_times_ds[1])
+
+        server._max_load_average = None
+        response2 = Response.create_from_bytes(server.exec(request_bytes1))
+        self.assertNotEqual(b'', response2.image_data)
+        self.assertEqual(1, len(server.render_requests))
+
+        # Devices that lack the last content should receive it, and other
+        # devices should keep their images
+        server._max_concurrent_renders = 0
+        response3 = Response.create_from_bytes(server.exec(request_bytes2))
+        self.assertEqual(response2.image_data, response3.image_data)
+        response4 = Response.create_from_bytes(server.exec(request_bytes2))
+        self.assertEqual(b'', response4.image_data)
+        response5 = Response.create_from_bytes(server.exec(request_bytes1))
+        self.assertEqual(b'', response5.image_data)
+        self.assertEqual(1, len(server.render_requests))
+
+        server._max_concurrent_renders = 1
+        Response.create_from_bytes(server.exec(request_bytes1))
+        self.assertEqual(2, len(server.render_requests))
+        self.assertEqual(0, server._state().active_render_count)
+
+    def test_exec_max_update_time(self):
+        """Test ``Server.exec`` when ``max_update_time()`` is overridden."""
+        image1 = Image.new('L', (20, 20), 255)
+        image2 = Image.new('L', (20, 20), 0)
+        server = TestServer(
+            image1, timedelta(minutes=5), [timedelta(minutes=1)], 'mountain',
+            None, max_update_time=timedelta(minutes=10))
+        request_bytes1 = Request(b'\x01').to_bytes()
+        request_bytes2 = Request(b'\x02').to_bytes()
+
+        update_times_ds = []
+        for _ in range(3):
+            response = Response.create_from_bytes(server.exec(request_bytes1))
+            update_times_ds.append(response.request_times_ds[0])
+        self.assertEqual([3000, 4500, 6000], update_times_ds)
+        response = Response.create_from_bytes(server.exec(request_bytes2))
+        self.assertEqual(3000, response.request_times_ds[0])
+
+        server._image = image2
+        response = Response.create_from_bytes(server.exec(request_bytes1))
+        self.assertEqual(3000, response.request_times_ds[0])
+        self.assertEqual(600, response.request_times_ds[1])
+
+    def test_request_times_ds_stagger(self):
+        """Test ``Server._request_times_ds`` with a ``stagger_window()``."""
+        image = Image.new('L', (20, 20), 255)
+        server = TestServer(
+            image, timedelta(minutes=10), [timedelta(minutes=1)], 'mountain',
+            None, stagger_window=timedelta(minutes=2))
+        now = datetime(2021, 3, 4, 5, 6, 7, 800000)
+        now_ds = int(10 * now.timestamp())
+        end_times_ds = set()
+        for i in range(100):
+            request = Request(bytes([i]))
+            request_times_ds = server._request_times_ds(None, request, now)
+            time_ds = request_times_ds[0]
+            self.assertTrue(4800 < time_ds <= 6000)
+            self.assertEqual(600, request_times_ds[1])
+            self.assertEqual(
+                request_times_ds,
+                server._request_times_ds(None, request, now))
+            end_times_ds.add((now_ds + time_ds) % 1200)
+
+            later = now + timedelta(seconds=317)
+            later_time_ds = server._request_times_ds(None, request, later)[0]
+            self.assertEqual(
+                (now_ds + time_ds) % 1200,
+                (now_ds + 3170 + later_time_ds) % 1200)
+        self.assertGreater(len(end_times_ds), 90)
+
+        self.assertEqual(
+            [6000, 600], server._request_times_ds(None, None, None))
+        server._stagger_window = timedelta(minutes=20)
+        time_ds = server._request_times_ds(None, Request(b'a'), now)[0]
+        self.assertTrue(0 < time_ds <= 6000)
+
+    def test_request_times_ds_boundary(self):
+        """Test ``Server._request_times_ds`` with content boundaries."""
+        image = Image.new('L', (20, 20), 255)
+        server = TestServer(
+            image, timedelta(hours=2), [timedelta(minutes=1)], 'mountain',
+            None, update_boundary_interval=timedelta(hours=1))
+        now = datetime(2021, 3, 4, 5, 6, 7, 800000)
+        request = Request(b'a')
+        self.assertEqual(
+            [32332, 600], server._request_times_ds(None, request, now))
+        self.assertEqual(
+            [72000, 600], server._request_times_ds(None, None, None))
+
+        server._update_time = timedelta(minutes=30)
+        self.assertEqual(
+            [18000, 600], server._request_times_ds(None, request, now))
+        server._update_time = None
+        self.assertEqual(
+            [32332, 600], server._request_times_ds(None, request, now))
+
+        server._stagger_window = timedelta(minutes=5)
+        for i in range(20):
+            request = Request(bytes([i]))
+            time_ds = server._request_times_ds(None, request, now)[0]
+            self.assertTrue(32332 <= time_ds < 35332)
+
+    def test_request_times_ds_merge(self):
+        """Test ``Server._request_times_ds`` with many retry times."""
+        image = Image.new('L', (20, 20), 255)
+        server = TestServer(
+            image, timedelta(minutes=10), 30 * [timedelta(minutes=1)],
+            'mountain', None)
+        self.assertEqual(
+            [6000, 600], server._request_times_ds(None, None, None))
+
+        server._retry_times = (
+            [timedelta(minutes=1), timedelta(minutes=2)] +
+            20 * [timedelta(minutes=10)] + [timedelta(hours=8)] +
+            20 * [timedelta(minutes=10)] + [timedelta(minutes=5)])
+        request_times_ds = server._request_times_ds(None, None, None)
+        self.assertEqual(20, len(request_times_ds))
+        self.assertEqual(6000, request_times_ds[0])
+        self.assertEqual(3000, request_times_ds[-1])
+        self.assertIn(288000, request_times_ds)
+        self.assertEqual(
+            sum(
+                server._interval_to_ds(retry_time)
+                for retry_time in server._retry_times[:-1]),
+            sum(request_times_ds[1:-1]))
+
+        # The client should only retry at times in the original schedule
+        retry_times_ds = set()
+        time_ds = 0
+        for retry_time in server._retry_times:
+            time_ds += server._interval_to_ds(retry_time)
+            retry_times_ds.add(time_ds)
+        time_ds = 0
+        for merged_time_ds in request_times_ds[1:]:
+            time_ds += merged_time_ds
+            self.assertIn(time_ds, retry_times_ds)
+
+        server._retry_times = 30 * [timedelta(minutes=1)] + [None]
+        request_times_ds = server._request_times_ds(None, None, None)
+        self.assertEqual(20, len(request_times_ds))
+        self.assertEqual(Server._INT_MAX, request_times_ds[-1])
+        self.assertEqual(18000, sum(request_times_ds[1:-1]))
+        self.assertTrue(
+            all(
+                time_ds in (600, 1200)
+                for time_ds in request_times_ds[1:-1]))
+
+    def test_merge_retry_times_ds(self):
+        """Test ``Server._merge_retry_times_ds``."""
+        self.assertEqual(
+            [1, 2, 3], Server._merge_retry_times_ds([1, 2, 3], 5))
+        self.assertEqual(
+            [6, 6, 6, 50],
+            Server._merge_retry_times_ds([1, 5, 3, 3, 2, 4, 50], 4))
+        self.assertEqual(
+            [100, 100, 100],
+            Server._merge_retry_times_ds(30 * [10], 3))
+        self.assertEqual(
+            [30, 1000, 30],
+            Server._merge_retry_times_ds(3 * [10] + [1000] + 3 * [10], 3))
+
+    def test_prerender(self):
+        """Test ``Server.prerender()``."""
+        image = Image.new('L', (20, 20), 255)
+        server = TestServer(
+            image, timedelta(hours=2), [timedelta(minutes=1)], 'mountain',
+            None, update_boundary_interval=timedelta(hours=1))
+        boundary = datetime(2021, 3, 4, 6)
+        self.assertIsNone(server._prerendered_image_data(boundary))
+        server.prerender(boundary)
+        self.assertEqual([boundary], server.render_at_times)
+
+        image_data = server._prerendered_image_data(boundary)
+        self.assertEqual(
+            [0] * 400,
+            list(
+                Image.open(io.BytesIO(image_data)).convert('L')
+                .get_flattened_data()))
+        self.assertEqual(
+            image_data,
+            server._prerendered_image_data(datetime(2021, 3, 4, 6, 59)))
+        self.assertIsNone(
+            server._prerendered_image_data(datetime(2021, 3, 4, 5, 59)))
+        self.assertIsNone(
+            server._prerendered_image_data(datetime(2021, 3, 4, 7, 0)))
+
+    def test_exec_telemetry(self):
+        """Test ``Server.exec`` with respect to device telemetry."""
+        image = Image.new('L', (20, 20), 255)
+        server = TestServer(
+            image, timedelta(minutes=5), [timedelta(minutes=1)], 'mountain',
+            None)
+        server.exec(Request(b'a', 4.1, -50, 1000, 2000, 1).to_bytes())
+        self.assertEqual(1, len(server.render_requests))
+        self.assertEqual(b'a', server.render_requests[0].device_id)
+        self.assertEqual(-50, server.render_requests[0].wi_fi_rssi)
+        self.assertIsNone(server.current_request())
+
+        server._metrics_sink = MetricsSink()
+        response_payload = server.exec(
+            Request(b'b', 3.9, -60, 900, 1900, 2).to_bytes())
+        samples = server._metrics_sink.samples(b'b')
+        self.assertEqual(1, len(samples))
+        self.assertEqual(1900, samples[0][1].draw_time_ms)
+        self.assertEqual(len(response_payload), samples[0][2])
+
+    def test_exec_retry(self):
+        """Test ``Server.exec`` on retries of the same request."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None)
+        payload1 = server.exec(Request(b'a', nonce=17).to_bytes())
+        self.assertEqual(1, len(server.render_requests))
+
+        # A retry should receive the same content without rendering again,
+        # even if the content has changed
+        server._image = Image.new('L', (20, 20), 0)
+        payload2 = server.exec(Request(b'a', 3.9, -50, nonce=17).to_bytes())
+        response1 = Response.create_from_bytes(payload1)
+        response2 = Response.create_from_bytes(payload2)
+        self.assertEqual(response1.image_data, response2.image_data)
+        self.assertLessEqual(
+            response1.request_times_ds[0] - response2.request_times_ds[0], 10)
+        self.assertEqual(1, len(server.render_requests))
+
+        # Requests with a different nonce or device are not retries
+        payload3 = server.exec(Request(b'a', nonce=18).to_bytes())
+        self.assertNotEqual(
+            response1.image_data,
+            Response.create_from_bytes(payload3).image_data)
+        self.assertEqual(2, len(server.render_requests))
+        server.exec(Request(b'b', nonce=17).to_bytes())
+        self.assertEqual(3, len(server.render_requests))
+        server.exec(Request(b'a').to_bytes())
+        server.exec(Request(b'a').to_bytes())
+        self.assertEqual(5, len(server.render_requests))
+
+        # If the device has lost a cached frame that the original response
+        # may have referred to, we should not reuse the response
+        frame_id = ServerIO.frame_id(b'abc')
+        server.exec(
+            Request(b'a', nonce=19, cached_frame_ids=[frame_id]).to_bytes())
+        self.assertEqual(6, len(server.render_requests))
+        server.exec(
+            Request(b'a', nonce=19, cached_frame_ids=[frame_id]).to_bytes())
+        self.assertEqual(6, len(server.render_requests))
+        server.exec(Request(b'a', nonce=19).to_bytes())
+        self.assertEqual(7, len(server.render_requests))
+
+    def test_exec_retry_age(self):
+        """Test that retries account for the time since the original request.
+        """
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None,
+            [timedelta(minutes=1), timedelta(minutes=2)])
+        request = Request(b'a', nonce=17)
+        response1 = Response.create_from_bytes(server.exec(request.to_bytes()))
+        self.assertEqual(
+            [600, 1200], [time_ds for time_ds, _ in response1.frames])
+
+        # Pretend that the device retries 90 seconds later
+        cache = server._state().retry_cache._cache
+        key = (b'a', 17)
+        store_time, cached_frame_ids, response = cache.get(key)
+        cache.put(key, (store_time - 90, cached_frame_ids, response), 1)
+        response2 = Response.create_from_bytes(server.exec(request.to_bytes()))
+        self.assertEqual(1, len(server.render_requests))
+        self.assertEqual(response1.image_data, response2.image_data)
+        self.assertAlmostEqual(
+            response1.request_times_ds[0] - 900,
+            response2.request_times_ds[0], delta=10)
+        self.assertEqual(
+            response1.request_times_ds[1:], response2.request_times_ds[1:])
+        self.assertEqual(1, len(response2.frames))
+        self.assertAlmostEqual(300, response2.frames[0][0], delta=10)
+        self.assertEqual(response1.frames[1][1], response2.frames[0][1])
+
+    def test_exec_transport_balancer(self):
+        """Test ``Server.exec`` with a ``Server.transport_balancer()``."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None)
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a').to_bytes()))
+        self.assertIsNone(response.preferred_transport)
+
+        server._transport_balancer = TransportBalancer([4, 4])
+        server._transport_balancer.set_load(1, 0)
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a', transport_index=0).to_bytes()))
+        self.assertEqual(1, response.preferred_transport)
+
+    def test_exec_adaptive_encoder(self):
+        """Test ``Server.exec`` with a ``Server.adaptive_encoder()``."""
+        server = TestServer(
+            Image.linear_gradient('L').resize((100, 100)),
+            timedelta(minutes=5), [timedelta(minutes=1)], 'mountain', None,
+            [timedelta(minutes=1)])
+        server._adaptive_encoder = AdaptiveEncoder()
+        response1 = Response.create_from_bytes(
+            server.exec(Request(b'a', wi_fi_rssi=-50).to_bytes()))
+        response2 = Response.create_from_bytes(
+            server.exec(Request(b'b', wi_fi_rssi=-90).to_bytes()))
+        self.assertLess(
+            len(response2.image_data), len(response1.image_data))
+        self.assertLess(
+            len(response2.frames[0][1]), len(response1.frames[0][1]))
+        self.assertEqual(
+            ServerIO.frame_id(response2.image_data), response2.image_id)
+        image = Image.open(io.BytesIO(response2.image_data)).convert('L')
+        self.assertEqual(
+            {0, 73, 182, 255}, set(image.get_flattened_data()))
+
+        # The device already has the coarse image in its frame cache
+        response3 = Response.create_from_bytes(
+            server.exec(
+                Request(
+                    b'b', wi_fi_rssi=-90,
+                    cached_frame_ids=[response2.image_id]).to_bytes()))
+        self.assertIsNone(response3.image_data)
+        self.assertEqual(response2.image_id, response3.image_id)
+
+    def test_exec_long_poll(self):
+        """Test ``Server.exec`` on long-poll requests."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(minutes=5),
+            [timedelta(minutes=1)], 'mountain', None)
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a').to_bytes()))
+        image_data = response.image_data
+        frame_id = response.image_id
+
+        # The device is already displaying the image
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a', long_poll_frame_id=frame_id).to_bytes()))
+        self.assertEqual(b'', response.image_data)
+        self.assertEqual(bytes(ServerIO.FRAME_ID_LENGTH), response.image_id)
+        response = Response.create_from_bytes(
+            server.exec(
+                Request(b'a', long_poll_frame_id=b'\x01' * 8).to_bytes()))
+        self.assertEqual(image_data, response.image_data)
+
+        # Long-poll requests should use the content a ContentWatcher rendered
+        watched_data = server._image_data(
+            Image.new('L', (20, 20), 0), 'render')
+        server._state().watched_frame = (
+            datetime.now() + timedelta(minutes=5), watched_data)
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a', long_poll_frame_id=frame_id).to_bytes()))
+        self.assertEqual(watched_data, response.image_data)
+        self.assertEqual(3, len(server.render_requests))
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a').to_bytes()))
+        self.assertEqual(image_data, response.image_data)
+
+        server._state().watched_frame = (
+            datetime.now() - timedelta(seconds=1), watched_data)
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a', long_poll_frame_id=frame_id).to_bytes()))
+        self.assertEqual(b'', response.image_data)
+
+    def test_exec_resume(self):
+        """Test ``Server.exec`` on requests that resume a download."""
+        server = TestServer(
+            Image.effect_noise((200, 200), 64).convert('L'),
+            timedelta(minutes=5), [timedelta(minutes=1)], 'mountain', None)
+        response = Response.create_from_bytes(
+            server.exec(Request(b'a', nonce=17).to_bytes()))
+        image_data = response.image_data
+        self.assertGreater(response.image_chunk_count(), 2)
+
+        # Resuming the download should only send the remaining chunks
+        response = Response.create_from_bytes(
+            server.exec(
+                Request(
+                    b'a', nonce=17, resume_frame_id=response.image_id,
+                    resume_chunk=2)
+                .to_bytes()))
+        self.assertEqual(1, len(server.render_requests))
+        self.assertEqual(2, response.image_start_chunk)
+        self.assertEqual(
+            image_data[2 * ServerIO.IMAGE_CHUNK_SIZE:], response.image_data)
+
+        # We should ignore resume points for other images
+        response = Response.create_from_bytes(
+            server.exec(
+                Request(
+                    b'a', nonce=17, resume_frame_id=b'\x01' * 8,
+                    resume_chunk=2)
+                .to_bytes()))
+        self.assertEqual(0, response.image_start_chunk)
+        self.assertEqual(image_data, response.image_data)
@@ -0,0 +1,106 @@
+from datetime import timedelta
+import os
+import pathlib
+import tempfile
+import unittest
+
+from PIL import Image
+
+from eink.server import Simulator
+from eink.server import StaticPublisher
+from eink.server.request import Request
+from eink.server.response import Response
+from .test_server import TestServer
+
+
+class StaticPublisherTest(unittest.TestCase):
+    """Tests the ``StaticPublisher`` class."""
+
+    def _payload_filenames(self, dir_):
+        """Return the names of the payload files in the given directory."""
+        return set(
+            filename for filename in os.listdir(dir_)
+            if filename.startswith('payload-'))
+
+    def test_publish(self):
+        """Test ``StaticPublisher.publish()``."""
+        server = TestServer(
+            Image.new('L', (20, 20), 255), timedelta(hours=1),
+            [timedelta(minutes=5)], 'mountain', None)
+        with tempfile.TemporaryDirectory() as dir_:
+            publisher = StaticPublisher(server, dir_, 2)
+            pointer_path = os.path.join(dir_, StaticPublisher.POINTER_FILENAME)
+            filename1 = publisher.publish()
+            with open(pointer_path, 'rb') as file:
+                payload1 = file.read()
+            with open(os.path.join(dir_, filename1), 'rb') as file:
+                self.assertEqual(payload1, file.read())
+            response = Response.create_from_bytes(payload1)
+            self.assertEqual(36000, response.request_times_ds[0])
+            self.assertEqual({filename1}, self._payload_filenames(dir_))
+
+            # Publishing the same content should reuse the same file
+            self.assertEqual(filename1, publisher.publish())
+            self.assertEqual({filename1}, self._payload_filenames(dir_))
+
+            server._image = Image.new('L', (20, 20), 0)
+            filename2 = publisher.publish()
+            self.assertNotEqual(filename1, filename2)
+            with open(pointer_path, 'rb') as file:
+                payload2 = file.read()
+            self.assertNotEqual(payload1, payload2)
+            self.assertEqual(
+                {filename1, filename2}, self._payload_filenames(dir_))
+
+            image = Simulator.connect(
+                pathlib.Path(pointer_path).as_uri(), True)
+            self.assertEqual(0, image.getpixel((0, 0)))
+
+            # We should only keep the two most recent payload files
+            server._image = Image.new('L', (20, 20), 128)
+            filename3 = publisher.publish()
+            self.assertEqual(
+                {filename2, filename3}, self._payload_filenames(dir_))
+            self.assertEqual(
+                [], [
+                    filename for filename in os.listdir(dir_)
+                    if filename.startswith('.tmp-')])
+
+    def test_server_times(self):
+        """Test ``StaticPublisher`` with the server's timing methods."""
+        image = Image.new('L', (20, 20), 255)
+        servers = [
+            TestServer(
+                image, timedelta(hours=1), [timedelta(minutes=5)],
+                'mountain', None, frame_times=[timedelta(minutes=30)]),
+            TestServer(
+                image, timedelta(hours=1), [timedelta(minutes=5)],
+                'mountain', None, stagger_window=timedelta(minutes=10)),
+            TestServer(
+                image, timedelta(hours=1), [timedelta(minutes=5)],
+                'mountain', None,
+                update_boundary_interval=timedelta(minutes=15)),
+        ]
+        with tempfile.TemporaryDirectory() as dir_:
+            for server in servers:
+                publisher = StaticPublisher(server, dir_)
+                with self.assertRaises(ValueError):
+                    publisher.publish()
+                with self.assertRaises(ValueError):
+                    publisher.publish_forever()
+            self.assertEqual(set(), self._payload_filenames(dir_))
+
+            # The time until the next request should not exceed the publish
+            # interval, even if the server would lengthen it
+            server = TestServer(
+                image, timedelta(hours=1), [timedelta(minutes=5)],
+                'mountain', None, max_update_time=timedelta(hours=4))
+            publisher = StaticPublisher(server, dir_)
+            for _ in range(3):
+                filename = publisher.publish()
+                with open(os.path.join(dir_, filename), 'rb') as file:
+                    response = Response.create_from_bytes(file.read())
+                self.assertEqual(36000, response.request_times_ds[0])
+            response = Response.create_from_bytes(
+                server.exec(Request().to_bytes()))
+            self.assertGreater(response.request_times_ds[0], 36000)
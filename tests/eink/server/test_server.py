@@ -1,3 +1,5 @@
+from PIL import Image
+
 from eink.server import Server
 
 
@@ -6,22 +8,73 @@ class TestServer(Server):
 
     def __init__(
             self, image, update_time, retry_times, screensaver_name,
-            screensaver_time):
+            screensaver_time, frame_times=None, max_update_time=None,
+            stagger_window=None, update_boundary_interval=None,
+            render_deadline=None, max_concurrent_renders=None,
+            max_load_average=None):
         """Initialize a new ``TestServer``.
 
         All of the ``Server`` methods that have the same names as one of
         the arguments return those arguments. The ``render()`` method
-        returns ``image``.
+        returns ``image``. The ``render_at`` method returns a solid
+        grayscale image whose color depends on the minute of the
+        specified time. A ``frame_times`` or ``max_update_time`` value
+        of ``None`` indicates the default return value of the
+        corresponding method. If ``update_boundary_interval`` is not
+        ``None``, the content boundaries are the multiples of that
+        amount of time since midnight.
+
+        If the ``render_event`` attribute is not ``None``, ``render()``
+        waits for it to be set before returning. If the
+        ``render_exception`` attribute is not ``None``, ``render()``
+        raises it.
         """
         self._image = image
         self._update_time = update_time
         self._retry_times = retry_times
         self._screensaver_name = screensaver_name
         self._screensaver_time = screensaver_time
+        self._frame_times = frame_times
+        self._max_update_time = max_update_time
+        self._stagger_window = stagger_window
+        self._update_boundary_interval = update_boundary_interval
+        self.render_at_times = []
+        self.render_requests = []
+        self.render_event = None
+        self.render_exception = None
+        self._render_deadline = render_deadline
+        self._max_concurrent_renders = max_concurrent_renders
+        self._max_load_average = max_load_average
+        self._metrics_sink = None
+        self._transport_balancer = None
+        self._adaptive_encoder = None
 
     def render(self):
+        self.render_requests.append(self.current_request())
+        if self.render_event is not None:
+            self.render_event.wait()
+        if self.render_exception is not None:
+            raise self.render_exception
         return self._image
 
+    def render_deadline(self):
+        return self._render_deadline
+
+    def max_concurrent_renders(self):
+        return self._max_concurrent_renders
+
+    def max_load_average(self):
+        return self._max_load_average
+
+    def render_at(self, time):
+        self.render_at_times.append(time)
+        return Image.new('L', self._image.size, 4 * time.minute)
+
+    def frame_times(self):
+        if self._frame_times is None:
+            return super().frame_times()
+        return self._frame_times
+
     def update_time(self):
         return self._update_time
 
@@ -33,3 +86,27 @@ class TestServer(Server):
 
     def screensaver_time(self):
         return self._screensaver_time
+
+    def max_update_time(self):
+        if self._max_update_time is None:
+            return super().max_update_time()
+        return self._max_update_time
+
+    def stagger_window(self):
+        return self._stagger_window
+
+    def next_update_boundary(self, time):
+        if self._update_boundary_interval is None:
+            return None
+        midnight = time.replace(hour=0, minute=0, second=0, microsecond=0)
+        intervals = (time - midnight) // self._update_boundary_interval
+        return midnight + (intervals + 1) * self._update_boundary_interval
+
+    def metrics_sink(self):
+        return self._metrics_sink
+
+    def transport_balancer(self):
+        return self._transport_balancer
+
+    def adaptive_encoder(self):
+        return self._adaptive_encoder
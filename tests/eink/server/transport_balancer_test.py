@@ -0,0 +1,69 @@
+from datetime import timedelta
+import time
+import unittest
+
+from eink.server import TransportBalancer
+from eink.server.request import Request
+
+
+class TransportBalancerTest(unittest.TestCase):
+    """Tests the ``TransportBalancer`` class."""
+
+    def _counts(self, balancer, device_count=1000):
+        """Return the number of devices that prefer each transport.
+
+        Arguments:
+            balancer (TransportBalancer): The balancer.
+            device_count (int): The number of devices to simulate.
+
+        Returns:
+            list<int>: The number of devices for each transport.
+        """
+        counts = [0] * 3
+        for i in range(device_count):
+            request = Request(i.to_bytes(6, 'little'))
+            counts[balancer.preferred_transport(request)] += 1
+        return counts
+
+    def test_preferred_transport(self):
+        """Test ``TransportBalancer.preferred_transport``."""
+        balancer = TransportBalancer([4, 4, 8])
+        self.assertIsNone(balancer.preferred_transport(Request(b'a')))
+        for index in range(3):
+            balancer.set_load(index, 0)
+        self.assertIsNone(balancer.preferred_transport(Request()))
+
+        # Devices should be spread in proportion to spare capacity
+        counts = self._counts(balancer)
+        self.assertTrue(200 <= counts[0] <= 300)
+        self.assertTrue(200 <= counts[1] <= 300)
+        self.assertTrue(450 <= counts[2] <= 550)
+
+        # An overloaded node should shed its devices to the others, and
+        # devices on the other nodes should not move
+        preferences = [
+            balancer.preferred_transport(Request(i.to_bytes(6, 'little')))
+            for i in range(1000)]
+        balancer.set_load(2, 10)
+        counts = self._counts(balancer)
+        self.assertLess(counts[2], 50)
+        for i in range(1000):
+            if preferences[i] != 2:
+                self.assertEqual(
+                    preferences[i],
+                    balancer.preferred_transport(
+                        Request(i.to_bytes(6, 'little'))))
+
+    def test_max_age(self):
+        """Test that we disregard loads that have not been reported."""
+        balancer = TransportBalancer([4, 4, 4], timedelta(milliseconds=50))
+        balancer.set_load(0, 0)
+        time.sleep(0.1)
+        balancer.set_load(1, 0)
+        self.assertEqual([None, 0, None], balancer.loads())
+        self.assertEqual([0, 1000, 0], self._counts(balancer))
+
+        with self.assertRaises(ValueError):
+            balancer.set_load(3, 0)
+        with self.assertRaises(ValueError):
+            TransportBalancer([])
@@ -0,0 +1,131 @@
+import unittest
+
+from PIL import Image
+
+from eink.image import EinkGraphics
+from eink.image import Palette
+from eink.widget import Canvas
+from eink.widget import ImageWidget
+from eink.widget import Widget
+
+
+class SolidWidget(Widget):
+    """A ``Widget`` that displays a solid color.
+
+    Public attributes:
+
+    int render_count - The number of times we have called ``render()``.
+    """
+
+    def __init__(self, box, color):
+        super().__init__(box)
+        self._color = color
+        self.render_count = 0
+
+    def set_color(self, color):
+        self._color = color
+
+    def state(self):
+        return self._color
+
+    def render(self):
+        self.render_count += 1
+        return Image.new('L', self.size(), self._color)
+
+
+class CanvasTest(unittest.TestCase):
+    """Tests the ``Canvas`` class."""
+
+    def _assert_images_equal(self, expected, actual):
+        """Assert that the specified ``Images`` have the same pixels.
+
+        ``actual`` is a frame returned by ``Canvas.render()``.
+        """
+        self.assertEqual('P', actual.mode)
+        actual = actual.convert(expected.mode)
+        self.assertEqual(expected.size, actual.size)
+        self.assertEqual(
+            list(expected.get_flattened_data()),
+            list(actual.get_flattened_data()))
+
+    def _expected_frame(self, size, widgets):
+        """Return the frame we expect for solid widgets in a 3-bit canvas."""
+        image = Image.new('L', size, 255)
+        for widget in widgets:
+            image.paste(widget._color, widget.box())
+        return EinkGraphics.round(image)
+
+    def test_render(self):
+        """Test ``Canvas.render``."""
+        canvas = Canvas((40, 30))
+        widget1 = SolidWidget((0, 0, 20, 20), 0)
+        widget2 = SolidWidget((10, 10, 30, 25), 146)
+        widget3 = SolidWidget((30, 0, 40, 10), 73)
+        for widget in (widget1, widget2, widget3):
+            canvas.add(widget)
+        self._assert_images_equal(
+            self._expected_frame((40, 30), [widget1, widget2, widget3]),
+            canvas.render())
+        self.assertEqual(1, widget1.render_count)
+
+        # Unchanged widgets should not be rendered again, and the frame
+        # should not be copied or reduced again
+        frame = canvas.render()
+        self.assertIs(frame, canvas.render())
+        self.assertIs(
+            frame, EinkGraphics.round(frame, Palette.THREE_BIT_GRAYSCALE))
+        self.assertEqual(1, widget1.render_count)
+        self.assertEqual(1, widget2.render_count)
+
+        # Changing a widget beneath another should keep the z-order. It should
+        # not change the frames we already returned.
+        expected_frame = self._expected_frame(
+            (40, 30), [widget1, widget2, widget3])
+        widget1.set_color(219)
+        self._assert_images_equal(
+            self._expected_frame((40, 30), [widget1, widget2, widget3]),
+            canvas.render())
+        self._assert_images_equal(expected_frame, frame)
+        self.assertEqual(2, widget1.render_count)
+        self.assertEqual(1, widget2.render_count)
+        self.assertEqual(1, widget3.render_count)
+
+        # Removing a widget should reveal what was beneath it
+        canvas.remove(widget2)
+        self._assert_images_equal(
+            self._expected_frame((40, 30), [widget1, widget3]),
+            canvas.render())
+        self.assertEqual(2, widget1.render_count)
+
+        canvas.add(widget2)
+        self._assert_images_equal(
+            self._expected_frame((40, 30), [widget1, widget3, widget2]),
+            canvas.render())
+        self.assertEqual(2, widget2.render_count)
+
+    def test_image_widget(self):
+        """Test ``Canvas`` with an ``ImageWidget`` and a color palette."""
+        canvas = Canvas(
+            (20, 10), Palette.BLACK_WHITE_AND_RED, (255, 255, 255))
+        image = Image.new('RGB', (5, 5), (250, 10, 10))
+        widget = ImageWidget((0, 0, 10, 10), image)
+        canvas.add(widget)
+        frame = canvas.render()
+        self.assertIs(
+            frame, EinkGraphics.round(frame, Palette.BLACK_WHITE_AND_RED))
+        frame = frame.convert('RGB')
+        self.assertEqual((255, 0, 0), frame.getpixel((5, 5)))
+        self.assertEqual((255, 255, 255), frame.getpixel((15, 5)))
+
+        widget.set_image(Image.new('RGB', (10, 10), (0, 0, 0)))
+        self.assertEqual(
+            (0, 0, 0), canvas.render().convert('RGB').getpixel((5, 5)))
+
+    def test_invalid_raster(self):
+        """Test that ``Canvas`` rejects rasters of the wrong size."""
+        canvas = Canvas((10, 10))
+        widget = SolidWidget((0, 0, 5, 5), 0)
+        widget.render = lambda: Image.new('L', (4, 4))
+        canvas.add(widget)
+        with self.assertRaises(ValueError):
+            canvas.render()